@@ -0,0 +1,95 @@
+"""Full retries avoided by repairing malformed completions in place.
+
+Usage: python scripts/bench_json_repair.py [--calls 200] [--workers 8] [--malformed-rate 0.3]
+
+Sends planner and executor calls (with their pydantic schemas) to the stub LLM
+server, which breaks `--malformed-rate` of its completions: truncated output,
+trailing commas, JSON wrapped in prose, or no JSON at all. Rows: repair off
+(every broken completion costs a tenacity retry of the whole request), the
+local scanner and schema coercion only, and local repair plus the "fix this
+JSON" follow-up call. `saved` is the fraction of calls needing repair that did
+not need a full retry.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from plan_and_act.core.schemas import ExecutorAction, PlannerOutput
+from plan_and_act.core.types import ClientPoolConfig, JSONRepairConfig, StubLatencyConfig, StubServerConfig
+from plan_and_act.loadtest.stub_server import StubLLMServer
+from plan_and_act.utils.json_repair import configure_json_repairer
+from plan_and_act.utils.llm import LLMClient, configure_client_registry
+
+_ROLES = (
+    ("You are the Planner.", "Goal: find the top contributor of org/repo", PlannerOutput),
+    ("You are the Executor.", "Goal: find the top contributor of org/repo\nCurrent step: {'step_id': 1, 'intent': 'search'}", ExecutorAction),
+)
+
+
+def _run(label: str, config: JSONRepairConfig, args: argparse.Namespace) -> None:
+    stub_config = StubServerConfig(
+        port=0,
+        latency=StubLatencyConfig(distribution="fixed", median_ms=args.latency_ms),
+        malformed_rate=args.malformed_rate,
+        seed=11,
+    )
+    repairer = configure_json_repairer(config)
+    with StubLLMServer(stub_config) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ["OPENAI_API_KEY"] = "stub"
+        configure_client_registry(ClientPoolConfig(http2=False, max_connections=args.workers * 2))
+        traces: list[dict[str, Any]] = []
+        client = LLMClient(trace_hook=traces.append)
+
+        def call(index: int) -> bool:
+            system_prompt, user_prompt, schema = _ROLES[index % 2]
+            try:
+                client.chat_json(
+                    model="gpt-4",
+                    system_prompt=system_prompt,
+                    user_prompt=f"{user_prompt} #{index}",
+                    temperature=0.0,
+                    schema=schema,
+                )
+                return True
+            except Exception:
+                return False
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            ok = list(pool.map(call, range(args.calls)))
+        elapsed = time.perf_counter() - start
+        stats = server.stats()
+    repair = repairer.stats()
+    retries = len(traces) - args.calls
+    follow_ups = stats["requests"] - len(traces)
+    tokens = stats["total_tokens"]
+    saved = f"{repair['saved_fraction'] * 100:.1f}" if config.enabled else "-"
+    print(
+        f"{label:<16} {stats['requests']:>8} {retries:>8} {follow_ups:>10} {saved:>7} "
+        f"{args.calls - sum(ok):>7} {tokens:>8} {elapsed:>7.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--malformed-rate", type=float, default=0.3)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    print(f"{'repair':<16} {'requests':>8} {'retries':>8} {'follow-ups':>10} {'saved%':>7} {'failed':>7} {'tokens':>8} {'wall s':>7}")
+    _run("off", JSONRepairConfig(enabled=False), args)
+    _run("local", JSONRepairConfig(follow_up=False), args)
+    _run("local+follow-up", JSONRepairConfig(), args)
+    configure_json_repairer(JSONRepairConfig())
+
+
+if __name__ == "__main__":
+    main()
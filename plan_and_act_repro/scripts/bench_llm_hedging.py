@@ -0,0 +1,73 @@
+"""Tail latency and extra tokens of chat_json calls with and without hedging.
+
+Usage: python scripts/bench_llm_hedging.py [--calls 400] [--workers 8] [--median-ms 40] [--sigma 0.9]
+
+Sends executor calls from `--workers` threads to the stub LLM server, whose
+per-request latency is lognormal (heavy right tail). The hedged rows send a
+duplicate once a call has been pending for the given percentile of recent
+latencies; the first answer wins. Extra tokens are those of dropped duplicates
+(prompt estimate for abandoned ones) relative to the tokens of the answers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from plan_and_act.core.types import CallDeadlineConfig, ClientPoolConfig, StubLatencyConfig, StubServerConfig
+from plan_and_act.eval.metrics import percentile
+from plan_and_act.loadtest.stub_server import StubLLMServer
+from plan_and_act.utils.deadlines import CallDeadlines
+from plan_and_act.utils.llm import LLMClient, configure_client_registry
+
+
+def _run(label: str, config: CallDeadlineConfig | None, args: argparse.Namespace) -> None:
+    latency = StubLatencyConfig(distribution="lognormal", median_ms=args.median_ms, sigma=args.sigma)
+    with StubLLMServer(StubServerConfig(port=0, latency=latency, seed=7)) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ["OPENAI_API_KEY"] = "stub"
+        configure_client_registry(ClientPoolConfig(http2=False, max_connections=args.workers * 4))
+        deadlines = CallDeadlines(config) if config is not None else None
+        traces: list[dict] = []
+        client = LLMClient(deadlines=deadlines, trace_hook=traces.append)
+
+        def call(index: int) -> float:
+            start = time.perf_counter()
+            client.chat_json(
+                model="gpt-4",
+                system_prompt="You are the Executor.",
+                user_prompt=f"Goal: task {index}",
+                temperature=0.0,
+                trace_context={"component": "executor"},
+            )
+            return (time.perf_counter() - start) * 1000
+
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            latencies = list(pool.map(call, range(args.calls)))
+    answered = sum(int(t["usage"].get("total_tokens", 0)) for t in traces)
+    extra = sum(int(t["deadline"].get("extra_usage", {}).get("total_tokens", 0)) for t in traces)
+    hedged = sum(1 for t in traces if t["deadline"].get("hedged"))
+    print(
+        f"{label:<12} {percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} {percentile(latencies, 99):>8.1f} "
+        f"{max(latencies):>8.1f} {hedged / len(traces) * 100:>8.1f} {extra / answered * 100 if answered else 0:>8.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--median-ms", type=float, default=40.0)
+    parser.add_argument("--sigma", type=float, default=0.9)
+    args = parser.parse_args()
+
+    print(f"{'hedging':<12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'hedged%':>8} {'extra%':>8}")
+    _run("off", None, args)
+    for q in (95, 90):
+        _run(f"after p{q}", CallDeadlineConfig(hedge=True, hedge_percentile=q, hedge_min_samples=20), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Observation tokens per tool call: full JSON results versus compact renderings.
+
+Usage: python scripts/bench_observation_compaction.py
+
+Feeds result shapes of the built-in tools (a max-size fetch_url page, a
+10-result web_search, a calculator answer) through ToolCallingEnvironment with
+compaction on and off, and reports the estimated tokens of each observation,
+i.e. what lands in the next executor and replanner prompts.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from plan_and_act.core.schemas import ExecutorAction
+from plan_and_act.core.types import ObservationConfig
+from plan_and_act.environments.tooling import ToolCallingEnvironment
+from plan_and_act.prompts.context import estimate_tokens
+from plan_and_act.tools.base import ToolRegistry
+
+_PAGE = " ".join(f"The company reported revenue of {i * 13} million dollars in quarter {i % 4 + 1}." for i in range(200))
+_RESULTS: dict[str, dict[str, Any]] = {
+    "fetch_url": {
+        "ok": True,
+        "url": "https://example.com/annual-report",
+        "status": 200,
+        "final_url": "https://example.com/annual-report",
+        "title": "Annual report 2023",
+        "content_preview": _PAGE[:8000],
+        "content_length": len(_PAGE),
+    },
+    "web_search": {
+        "ok": True,
+        "query": "annual report revenue 2023",
+        "count": 10,
+        "results": [
+            {"title": f"Annual report {i}: revenue, margins and outlook", "url": f"https://example.com/reports/{i}?ref=search"}
+            for i in range(10)
+        ],
+    },
+    "calculator": {"ok": True, "expression": "1300 * 4", "value": 5200},
+}
+
+
+class _Canned:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        return _RESULTS[self.name]
+
+
+def _observation_tokens(config: ObservationConfig, tool: str) -> int:
+    env = ToolCallingEnvironment(ToolRegistry({name: _Canned(name) for name in _RESULTS}), observations=config)
+    result = env.step(action=ExecutorAction(action_type="click", target=f"tool:{tool}"), step_count=1)
+    return estimate_tokens(result.observation)
+
+
+def main() -> None:
+    print(f"{'tool':<14}{'full':>8}{'compact':>10}{'saved':>9}")
+    for tool in _RESULTS:
+        full = _observation_tokens(ObservationConfig(enabled=False), tool)
+        compact = _observation_tokens(ObservationConfig(enabled=True), tool)
+        print(f"{tool:<14}{full:>8}{compact:>10}{1 - compact / full:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Plan library lookup latency (LSH vs brute force) and hit rate on a recurring goal stream.
+
+Usage: python scripts/bench_plan_library.py [--entries 10000] [--lookups 500] [--stream 2000]
+
+The library is filled with `--entries` synthetic goal templates (verb x object
+x qualifier combinations, each with one owner/repo slot). Lookups then query
+templates that are stored with a different repository. Brute force scores
+every stored template with exact Jaccard similarity. The LSH path is
+`PlanLibrary.lookup`, which also fills the plan's slots and reads the plan row
+from SQLite. The stream part replays goals drawn from 50 task kinds with
+random repositories against an empty library, storing the plan after each miss
+as an episode would.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from plan_and_act.agents.plan_library import PlanLibrary, extract_slots, jaccard, shingles
+from plan_and_act.core.schemas import PlannerOutput, PlanStep
+from plan_and_act.core.types import PlanLibraryConfig
+
+_VERBS = ["find", "list", "count", "summarize", "compare", "open", "report", "rank", "check", "export"]
+_OBJECTS = [
+    "the top contributor", "the latest release", "open issues", "closed pull requests", "the license",
+    "the default branch", "stale branches", "the release notes", "failing workflows", "the star history",
+    "security advisories", "the oldest issue", "recent commits", "the changelog", "open discussions",
+    "the test coverage", "the dependency graph", "merged pull requests", "the README", "the maintainers",
+]
+_QUALIFIERS = [
+    "of", "for the past week in", "for the past month in", "labelled bug in", "labelled docs in",
+    "by star count in", "by activity in", "since the last tag in", "created this year in", "with most comments in",
+    "assigned to nobody in", "marked good first issue in", "touching the tests in", "touching the docs in", "in the main branch of",
+    "in the dev branch of", "from first-time contributors in", "waiting for review in", "blocked on CI in", "older than a year in",
+    "with linked issues in", "reverted later in", "tagged as breaking in", "affecting windows in", "affecting macos in",
+    "about performance in", "about memory use in", "about packaging in", "about typing in", "about async support in",
+    "mentioning python 3.12 in", "mentioning numpy in", "with a milestone in", "without a milestone in", "in draft state in",
+    "opened by bots in", "closed as duplicate in", "closed as wontfix in", "with the most reactions in", "edited recently in",
+    "with long threads in", "about the CLI in", "about the API in", "about the docs site in", "about installation in",
+    "about logging in", "about configuration in", "about plugins in", "about security in", "about licensing in",
+]
+
+
+def _goal(verb: str, obj: str, qualifier: str, repo: str) -> str:
+    return f"{verb} {obj} {qualifier} {repo}"
+
+
+def _repo(rng: random.Random) -> str:
+    return f"org{rng.randrange(1000)}/project-{rng.randrange(1000)}"
+
+
+def _plan(goal: str, repo: str) -> PlannerOutput:
+    return PlannerOutput(
+        goal=goal,
+        steps=[
+            PlanStep(step_id=1, intent=f"Open the GitHub page of {repo}", success_criteria=f"{repo} page is shown"),
+            PlanStep(step_id=2, intent="Collect the requested information"),
+            PlanStep(step_id=3, intent="exit with the answer"),
+        ],
+    )
+
+
+def _bench_lookup(entries: int, lookups: int, seed: int) -> None:
+    rng = random.Random(seed)
+    combos = list(itertools.product(_VERBS, _OBJECTS, _QUALIFIERS))[:entries]
+    with tempfile.TemporaryDirectory() as tmp:
+        library = PlanLibrary(PlanLibraryConfig(enabled=True, path=str(Path(tmp) / "plans.sqlite"), max_entries=0))
+        start = time.perf_counter()
+        for verb, obj, qualifier in combos:
+            repo = _repo(rng)
+            goal = _goal(verb, obj, qualifier, repo)
+            library.add(goal, _plan(goal, repo))
+        build_s = time.perf_counter() - start
+        stored = [shingles(extract_slots(_goal(v, o, q, "a/b"))[0]) for v, o, q in combos]
+
+        queries = [_goal(*rng.choice(combos), _repo(rng)) for _ in range(lookups)]
+        start = time.perf_counter()
+        brute_hits = 0
+        for goal in queries:
+            features = shingles(extract_slots(goal)[0])
+            best = max(jaccard(features, entry) for entry in stored)
+            brute_hits += best >= library.config.min_similarity
+        brute_ms = (time.perf_counter() - start) * 1000 / lookups
+
+        start = time.perf_counter()
+        lsh_hits = sum(library.lookup(goal) is not None for goal in queries)
+        lsh_ms = (time.perf_counter() - start) * 1000 / lookups
+        library.close()
+
+    print(f"library: {len(combos)} entries, built in {build_s:.1f}s; {lookups} lookups")
+    print(f"{'method':<12} {'ms/lookup':>10} {'hits':>6}")
+    print(f"{'brute force':<12} {brute_ms:>10.3f} {brute_hits:>6}")
+    print(f"{'lsh':<12} {lsh_ms:>10.3f} {lsh_hits:>6}")
+    print(f"speedup: {brute_ms / lsh_ms:.1f}x")
+
+
+def _bench_stream(stream: int, seed: int) -> None:
+    rng = random.Random(seed)
+    kinds = rng.sample(list(itertools.product(_VERBS, _OBJECTS, _QUALIFIERS)), 50)
+    with tempfile.TemporaryDirectory() as tmp:
+        library = PlanLibrary(PlanLibraryConfig(enabled=True, path=str(Path(tmp) / "plans.sqlite")))
+        for _ in range(stream):
+            repo = _repo(rng)
+            goal = _goal(*rng.choice(kinds), repo)
+            if library.lookup(goal) is None:
+                library.add(goal, _plan(goal, repo))
+        stats = library.stats()
+        library.close()
+    print(f"\nstream: {stream} goals over 50 task kinds")
+    print(f"hits={stats['hits']} stores={stats['stores']} hit_rate={stats['hit_rate']:.1%} (planner LLM calls saved)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--stream", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    _bench_lookup(args.entries, args.lookups, args.seed)
+    _bench_stream(args.stream, args.seed)
+
+
+if __name__ == "__main__":
+    main()
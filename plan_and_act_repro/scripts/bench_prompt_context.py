@@ -0,0 +1,69 @@
+"""Prompt tokens per episode: full action_history dump versus the budgeted context builder.
+
+Usage: python scripts/bench_prompt_context.py [--steps 10 25 50 100]
+
+Replays a synthetic episode where the planner and replanner are called at every
+step (dynamic replanning) and sums the estimated user-prompt tokens of both,
+plus the time spent rendering the prompts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any
+
+from plan_and_act.agents.planner import PlannerAgent
+from plan_and_act.agents.replanner import ReplannerAgent
+from plan_and_act.core.types import ContextConfig, ModelConfig
+from plan_and_act.prompts.context import estimate_tokens
+from plan_and_act.prompts.templates import PromptTemplates
+
+
+def _action(i: int) -> dict[str, Any]:
+    return {
+        "action_type": ("search", "click", "type")[i % 3],
+        "target": "tool:web_search" if i % 3 == 0 else f"#result-{i % 10}",
+        "arguments": {"query": f"quarterly revenue of company {i} in 2023"},
+        "rationale": "The current plan step asks for the revenue figure, so search for it first.",
+        "is_final": False,
+        "final_answer": "",
+    }
+
+
+def _episode_tokens(context: ContextConfig, steps: int) -> tuple[int, int, float]:
+    prompts = PromptTemplates(config_dir="configs/prompts")
+    planner = PlannerAgent(ModelConfig(), prompts, context=context)
+    replanner = ReplannerAgent(ModelConfig(), prompts, context=context)
+    plan = [{"step_id": i + 1, "intent": f"open result {i} and read the revenue table", "success_criteria": "figure found"} for i in range(12)]
+    observation = "Search results: " + " | ".join(f"Company {i} revenue report 2023" for i in range(40))
+    history: list[dict[str, Any]] = []
+    total = last = 0
+    render_s = 0.0
+    for step in range(steps):
+        start = time.perf_counter()
+        _, planner_prompt = planner._build_prompts(goal="g", observation=observation, action_history=history, use_cot=False)
+        _, replanner_prompt = replanner._build_prompts(
+            goal="g", previous_plan=plan, action_history=history, observation=observation, use_cot=False
+        )
+        render_s += time.perf_counter() - start
+        last = estimate_tokens(planner_prompt) + estimate_tokens(replanner_prompt)
+        total += last
+        history.append(_action(step))
+    return total, last, render_s
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, nargs="+", default=[10, 25, 50, 100])
+    args = parser.parse_args()
+
+    print(f"{'steps':>6}{'full total':>13}{'budget total':>14}{'full last':>11}{'budget last':>13}{'render ms':>11}")
+    for steps in args.steps:
+        full_total, full_last, _ = _episode_tokens(ContextConfig(enabled=False), steps)
+        budget_total, budget_last, render_s = _episode_tokens(ContextConfig(enabled=True), steps)
+        print(f"{steps:>6}{full_total:>13}{budget_total:>14}{full_last:>11}{budget_last:>13}{render_s * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
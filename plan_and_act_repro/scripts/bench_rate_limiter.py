@@ -0,0 +1,75 @@
+"""429s, wall time and failed calls with and without the client-side rate limiter.
+
+Usage: python scripts/bench_rate_limiter.py [--calls 160] [--workers 16] [--rpm 120]
+
+Fires `--calls` executor/judge-style calls from `--workers` threads at the
+stub LLM server, which enforces `--rpm` requests per sliding minute and
+answers anything above it with a 429 whose retry-after points at the end of
+the window. Rows: no limiter (the SDK's and tenacity's retries absorb the
+429s), the limiter learning the limit from x-ratelimit-* headers only, and
+the limiter configured with the model's RPM up front.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from plan_and_act.core.types import ClientPoolConfig, ModelRateLimit, RateLimitConfig, StubLatencyConfig, StubServerConfig
+from plan_and_act.loadtest.stub_server import StubLLMServer
+from plan_and_act.utils.llm import LLMClient, configure_client_registry
+from plan_and_act.utils.rate_limit import Limiter, RateLimiter
+
+
+def _call(client: LLMClient, index: int) -> bool:
+    component = "judge" if index % 4 == 3 else "executor"
+    try:
+        client.chat_json(
+            model="gpt-4",
+            system_prompt="You are the Executor.",
+            user_prompt=f"Goal: task {index}",
+            temperature=0.0,
+            trace_context={"component": component},
+        )
+        return True
+    except Exception:
+        return False
+
+
+def _run(label: str, limiter: Limiter | None, args: argparse.Namespace) -> None:
+    config = StubServerConfig(port=0, latency=StubLatencyConfig(distribution="fixed", median_ms=args.latency_ms), rpm_limit=args.rpm)
+    with StubLLMServer(config) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ["OPENAI_API_KEY"] = "stub"
+        configure_client_registry(ClientPoolConfig(http2=False, max_connections=args.workers * 2))
+        client = LLMClient(limiter=limiter)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            ok = list(pool.map(lambda index: _call(client, index), range(args.calls)))
+        elapsed = time.perf_counter() - start
+        stats = server.stats()
+    print(
+        f"{label:<16} {elapsed:>8.1f} {stats.get('requests', 0):>9} {stats.get('rate_limited', 0):>6} "
+        f"{args.calls - sum(ok):>7} {args.calls / elapsed * 60:>9.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=160)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rpm", type=int, default=120)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    print(f"{'limiter':<16} {'wall s':>8} {'requests':>9} {'429s':>6} {'failed':>7} {'calls/min':>9}")
+    _run("off", None, args)
+    _run("headers only", RateLimiter(RateLimitConfig(enabled=True)), args)
+    configured = RateLimitConfig(enabled=True, models={"gpt-4": ModelRateLimit(rpm=args.rpm)})
+    _run("configured rpm", RateLimiter(configured), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Replanner calls per replan-trigger policy on a scripted simulator benchmark.
+
+Usage: python scripts/bench_replan_policies.py [--episodes 200] [--fail-every 7]
+
+Each episode is a task of 4-12 steps run on GenericSimulatorEnvironment with
+dynamic replanning on. The planner and replanner return the task's remaining
+steps, so every policy reaches the same final state and only the number of
+replanner calls (LLM calls in a real run) differs. Every `--fail-every`-th
+action fails (the simulator's stand-in for a failed tool call) and every 5th
+step carries a success_criteria that the observation does not confirm.
+`completed` counts episodes where every task step ran without failing: a
+policy that never replans skips failed steps instead of retrying them.
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Any
+
+from plan_and_act.core.schemas import ExecutorAction, PlannerOutput, PlanStep
+from plan_and_act.core.state import build_initial_state
+from plan_and_act.core.types import ReplanPolicyConfig
+from plan_and_act.environments.base import EnvironmentStepResult
+from plan_and_act.environments.simulator import GenericSimulatorEnvironment
+from plan_and_act.graph.replan_policies import AlwaysReplan, build_replan_policy
+from plan_and_act.graph.workflow import build_workflow
+
+_KINDS = [("search", "Search executed"), ("click", "Click executed"), ("type", "Type executed")]
+
+
+def _task(length: int) -> list[PlanStep]:
+    steps = []
+    for i in range(length):
+        kind, criteria = _KINDS[i % 3]
+        if i % 5 == 4:
+            criteria = "Confirmation banner displayed"
+        intent = "exit with the answer" if i == length - 1 else f"{kind} item {i}"
+        steps.append(PlanStep(step_id=i + 1, intent=intent, success_criteria=criteria))
+    return steps
+
+
+class ScriptedPlanner:
+    def __init__(self, length: int) -> None:
+        self.task = _task(length)
+        self.replans = 0
+
+    def plan(self, **kwargs: Any) -> PlannerOutput:
+        return PlannerOutput(goal=kwargs["goal"], steps=self.task)
+
+    def replan(self, **kwargs: Any) -> PlannerOutput:
+        self.replans += 1
+        done = sum(1 for action in kwargs["action_history"] if not action["arguments"].get("failed"))
+        remaining = self.task[done:] or self.task[-1:]
+        return PlannerOutput(goal=kwargs["goal"], steps=[step.model_copy(update={"step_id": i + 1}) for i, step in enumerate(remaining)])
+
+
+class ScriptedExecutor:
+    def __init__(self, fail_every: int) -> None:
+        self.fail_every = fail_every
+        self.actions = 0
+
+    def act(self, **kwargs: Any) -> ExecutorAction:
+        step: PlanStep = kwargs["current_step"]
+        if step.intent.startswith("exit"):
+            return ExecutorAction(action_type="exit", is_final=True, final_answer="done")
+        self.actions += 1
+        failed = self.fail_every > 0 and self.actions % self.fail_every == 0
+        kind = step.intent.split()[0]
+        return ExecutorAction(action_type=kind, target=f"#{step.intent.split()[-1]}", arguments={"failed": failed})
+
+
+class FlakySimulator(GenericSimulatorEnvironment):
+    def step(self, *, action: ExecutorAction, step_count: int) -> EnvironmentStepResult:
+        if action.arguments.get("failed"):
+            return EnvironmentStepResult(observation=f"Step {step_count}: Error: element not found.", failed=True)
+        return super().step(action=action, step_count=step_count)
+
+
+def _run(policy_name: str, episodes: int, fail_every: int) -> tuple[int, int, int]:
+    """(replanner calls, executed steps, completed episodes) over the benchmark."""
+    if policy_name == "always":
+        policy = AlwaysReplan()
+    elif policy_name == "combined":
+        policy = build_replan_policy(ReplanPolicyConfig(triggers=["tool_failure", "success_criteria", "plan_exhausted"]))
+    else:
+        policy = build_replan_policy(ReplanPolicyConfig(triggers=[policy_name]))
+    replans = steps = completed = 0
+    for episode in range(episodes):
+        length = 4 + episode % 9
+        planner = ScriptedPlanner(length)
+        workflow = build_workflow(
+            planner, ScriptedExecutor(fail_every), planner, environment=FlakySimulator(), replan_policy=policy
+        )
+        state = workflow.invoke(
+            build_initial_state(goal=f"task {episode}", max_steps=3 * length, dynamic_replanning=True, use_cot=False),
+            config={"recursion_limit": 20 * length},
+        )
+        replans += planner.replans
+        steps += state["step_count"]
+        actions = [action for action in state["action_history"] if action["action_type"] != "exit"]
+        succeeded = sum(1 for action in actions if not action["arguments"]["failed"])
+        completed += bool(state["success"]) and succeeded == length - 1
+    return replans, steps, completed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--episodes", type=int, default=200)
+    parser.add_argument("--fail-every", type=int, default=7)
+    args = parser.parse_args()
+
+    policies = ["always", "tool_failure", "plan_exhausted", "every_n_steps", "observation_novelty", "success_criteria", "combined"]
+    baseline, _, _ = _run("always", args.episodes, args.fail_every)
+    print(f"{'policy':<22}{'replans':>9}{'saved':>8}{'steps':>8}{'completed':>11}")
+    for name in policies:
+        replans, steps, completed = _run(name, args.episodes, args.fail_every)
+        print(f"{name:<22}{replans:>9}{1 - replans / baseline:>8.0%}{steps:>8}{completed / args.episodes:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Streaming trace-to-SFT export versus materializing every row first.
+
+Usage: python scripts/bench_sft_export.py [--runs 1000] [--calls-per-run 100] [--workers 0]
+
+The materialized baseline is what the list-based builders force: collect every
+llm_call record, build the dataset, validate it, then write it. Peak memory is
+measured with tracemalloc in a second, untimed run; the streaming export runs
+in-process there so the numbers are comparable. The last line times the
+process-pool export (`--workers 0` = one per core).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import orjson
+
+from plan_and_act.training.build_sft_data import build_sft_dataset
+from plan_and_act.training.dataset_checks import validate_dataset
+from plan_and_act.training.trace_export import export_sft_from_traces, iter_llm_call_records, iter_trace_runs
+
+_COMPONENTS = ["planner", "executor", "executor", "replanner"]
+
+
+def _write_runs(base_dir: Path, runs: int, calls_per_run: int) -> None:
+    for r in range(runs):
+        run_dir = base_dir / f"run-{r:06d}"
+        run_dir.mkdir()
+        lines = []
+        for seq in range(calls_per_run):
+            payload = {
+                "component": _COMPONENTS[seq % len(_COMPONENTS)],
+                "status": "success",
+                "model": "gpt-4",
+                "system_prompt": "You are a careful web agent. " * 20,
+                "user_prompt": f"Goal and context for run {r}, call {seq}. " * 10,
+                "raw_response": '{"action_type": "click", "target": "#submit"}',
+                "parsed_output": {"action_type": "click", "target": "#submit"},
+            }
+            lines.append(orjson.dumps({"run_id": run_dir.name, "seq": seq, "step": seq, "event_type": "llm_call", "payload": payload}))
+        (run_dir / "events.jsonl").write_bytes(b"\n".join(lines) + b"\n")
+        (run_dir / "session.json").write_bytes(orjson.dumps({"run_id": run_dir.name, "status": "completed"}))
+
+
+def _materialized(base_dir: Path, out_dir: Path) -> int:
+    records = [record for run_dir in iter_trace_runs(base_dir) for record, _ in iter_llm_call_records(run_dir) if record]
+    rows = build_sft_dataset(records)
+    assert not validate_dataset(records)
+    out_dir.mkdir()
+    with (out_dir / "all.jsonl").open("wb") as f:
+        for row in rows:
+            f.write(orjson.dumps(row) + b"\n")
+    return len(rows)
+
+
+def _measure(fn) -> tuple[float, float]:
+    """Wall time of an untraced run, then peak traced memory of a second run."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--calls-per-run", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp) / "traces"
+        base_dir.mkdir()
+        _write_runs(base_dir, args.runs, args.calls_per_run)
+
+        print(f"runs={args.runs} llm_calls={args.runs * args.calls_per_run}")
+        print(f"{'pipeline':<28}{'seconds':>10}{'peak_MB':>10}")
+        seconds, peak = _measure(lambda: _materialized(base_dir, Path(tempfile.mkdtemp(dir=tmp)) / "out"))
+        print(f"{'materialized list':<28}{seconds:>10.2f}{peak:>10.1f}")
+        seconds, peak = _measure(lambda: export_sft_from_traces(base_dir, Path(tmp) / "streamed", workers=1))
+        print(f"{'streaming, in-process':<28}{seconds:>10.2f}{peak:>10.1f}")
+
+        start = time.perf_counter()
+        export_sft_from_traces(base_dir, Path(tmp) / "pool", workers=workers)
+        print(f"{f'streaming, {workers} workers':<28}{time.perf_counter() - start:>10.2f}{'-':>10}")
+
+
+if __name__ == "__main__":
+    main()
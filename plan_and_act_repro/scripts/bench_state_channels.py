@@ -0,0 +1,80 @@
+"""Per-step cost of the append-only history channels as the horizon grows.
+
+Usage: python scripts/bench_state_channels.py [--horizons 100 200 400 800 1600]
+
+Two measurements:
+1. Channel micro-benchmark: one history update per step via the legacy
+   `history + [item]` rebuild versus the `append_items` reducer.
+2. End-to-end `workflow.invoke` with stub agents (no LLM, no tracing), reported
+   as microseconds per executor step.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from plan_and_act.core.schemas import ExecutorAction, PlannerOutput, PlanStep
+from plan_and_act.core.state import append_items, build_initial_state
+from plan_and_act.graph.workflow import build_workflow
+
+
+class _LongPlanner:
+    def __init__(self, length: int) -> None:
+        self.length = length
+
+    def plan(self, **kwargs) -> PlannerOutput:
+        steps = [PlanStep(step_id=i + 1, intent=f"step {i + 1}") for i in range(self.length)]
+        return PlannerOutput(goal=kwargs["goal"], steps=steps)
+
+    replan = plan
+
+
+class _ClickExecutor:
+    def act(self, **kwargs) -> ExecutorAction:
+        return ExecutorAction(action_type="click", target="button", arguments={"step": kwargs["step"]})
+
+
+def _bench_channel(steps: int) -> tuple[float, float]:
+    item = {"action_type": "click", "target": "button", "arguments": {}}
+
+    start = time.perf_counter()
+    legacy: list[dict] = []
+    for _ in range(steps):
+        legacy = legacy + [item]
+    legacy_us = (time.perf_counter() - start) * 1e6 / steps
+
+    start = time.perf_counter()
+    channel: list[dict] = []
+    for _ in range(steps):
+        channel = append_items(channel, [item])
+    append_us = (time.perf_counter() - start) * 1e6 / steps
+    return legacy_us, append_us
+
+
+def _bench_workflow(steps: int) -> float:
+    workflow = build_workflow(planner=_LongPlanner(steps), executor=_ClickExecutor(), replanner=_LongPlanner(steps))
+    init = build_initial_state(goal="bench", max_steps=steps, dynamic_replanning=False, use_cot=False)
+    start = time.perf_counter()
+    final_state = workflow.invoke(init, {"recursion_limit": steps * 2 + 10})
+    elapsed = time.perf_counter() - start
+    assert len(final_state["action_history"]) == steps
+    return elapsed * 1e6 / steps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--horizons", type=int, nargs="+", default=[100, 200, 400, 800, 1600])
+    parser.add_argument("--channel-scale", type=int, default=50, help="Multiplier for the channel micro-benchmark.")
+    args = parser.parse_args()
+
+    print(f"{'steps':>8} {'workflow_us/step':>17} {'appends':>9} {'legacy_us/append':>17} {'reducer_us/append':>18}")
+    for steps in args.horizons:
+        appends = steps * args.channel_scale
+        legacy_us, append_us = _bench_channel(appends)
+        workflow_us = _bench_workflow(steps)
+        print(f"{steps:>8} {workflow_us:>17.1f} {appends:>9} {legacy_us:>17.3f} {append_us:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Framework overhead and retry cost of full episodes against the local stub LLM server.
+
+Usage: python scripts/bench_stub_server.py [--episodes 40] [--workers 8] [--latency-ms 50]
+
+Runs the real planner/executor/replanner agents (OpenAI client path) through
+`build_workflow` on the simulator, with the stub answering every call after a
+fixed `--latency-ms`. Overhead is the episode wall time minus the injected
+latency of its calls, i.e. what the framework itself adds per episode. The
+second row injects 429s (retry-after 50 ms) and 5xx errors to show what the
+client's retries cost.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from statistics import mean
+
+from plan_and_act.agents.executor import ExecutorAgent
+from plan_and_act.agents.planner import PlannerAgent
+from plan_and_act.agents.replanner import ReplannerAgent
+from plan_and_act.core.state import build_initial_state
+from plan_and_act.core.types import ClientPoolConfig, ModelConfig, StubLatencyConfig, StubServerConfig
+from plan_and_act.environments.simulator import GenericSimulatorEnvironment
+from plan_and_act.graph.workflow import build_workflow
+from plan_and_act.loadtest.stub_server import StubLLMServer
+from plan_and_act.prompts.templates import PromptTemplates
+from plan_and_act.utils.llm import configure_client_registry
+
+
+def _episode(index: int) -> tuple[float, bool]:
+    prompts = PromptTemplates(config_dir="configs/prompts")
+    model = ModelConfig(provider="openai", model="gpt-4")
+    workflow = build_workflow(
+        PlannerAgent(model, prompts),
+        ExecutorAgent(model, prompts),
+        ReplannerAgent(model, prompts),
+        environment=GenericSimulatorEnvironment(),
+    )
+    start = time.perf_counter()
+    try:
+        final = workflow.invoke(
+            build_initial_state(goal=f"Find the top contributor of org/repo-{index}", max_steps=12, dynamic_replanning=False, use_cot=False)
+        )
+        ok = bool(final["success"])
+    except Exception:
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def _run(label: str, config: StubServerConfig, episodes: int, workers: int) -> None:
+    with StubLLMServer(config) as server:
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ["OPENAI_API_KEY"] = "stub"
+        configure_client_registry(ClientPoolConfig(http2=False, max_connections=workers * 2))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_episode, range(episodes)))
+        elapsed = time.perf_counter() - start
+        stats = server.stats()
+    calls_per_episode = stats.get("completions", 0) / episodes
+    wall_ms = mean(seconds for seconds, _ in results) * 1000
+    overhead_ms = wall_ms - calls_per_episode * config.latency.median_ms
+    retried = stats.get("rate_limited", 0) + stats.get("server_errors", 0)
+    print(
+        f"{label:<10} {episodes / elapsed:>8.1f} {wall_ms:>10.1f} {calls_per_episode:>6.1f} "
+        f"{overhead_ms:>12.1f} {retried:>8} {sum(ok for _, ok in results):>4}/{episodes}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--episodes", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--plan-steps", type=int, default=5)
+    args = parser.parse_args()
+
+    latency = StubLatencyConfig(distribution="fixed", median_ms=args.latency_ms)
+    base = StubServerConfig(port=0, latency=latency, plan_steps=args.plan_steps, retry_after_s=0.05)
+    print(f"{'scenario':<10} {'ep/s':>8} {'wall ms':>10} {'calls':>6} {'overhead ms':>12} {'retried':>8} {'ok':>6}")
+    _run("clean", base, args.episodes, args.workers)
+    _run("faults", base.model_copy(update={"rate_limit_rate": 0.1, "server_error_rate": 0.05}), args.episodes, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Cross-run questions answered by globbing trace directories versus the SQLite catalog.
+
+Usage: python scripts/bench_trace_catalog.py [--runs 50000] [--events-per-run 20]
+
+The question is "which gpt-4 executor runs had parse_error llm_calls". Runs are
+written straight to disk in the collector's layout (session.json + events.jsonl)
+so generating tens of thousands of them stays quick.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import orjson
+
+from plan_and_act.tracing.catalog import TraceCatalog
+
+_MODELS = ["gpt-4", "gpt-4o-mini", "qwen2.5-7b"]
+
+
+def _write_runs(base_dir: Path, runs: int, events_per_run: int) -> None:
+    rng = random.Random(0)
+    for i in range(runs):
+        run_dir = base_dir / f"run-{i:06d}"
+        run_dir.mkdir()
+        lines = []
+        for seq in range(events_per_run):
+            if seq % 2:
+                payload = {"tool_name": "calculator", "ok": rng.random() > 0.1}
+                event_type = "tool_call_end"
+            else:
+                status = "parse_error" if rng.random() < 0.01 else "ok"
+                payload = {"status": status, "latency_ms": 100.0, "usage": {"total_tokens": 300}}
+                event_type = "llm_call"
+            lines.append(orjson.dumps({"run_id": run_dir.name, "seq": seq, "step": seq // 4, "event_type": event_type, "payload": payload}))
+        (run_dir / "events.jsonl").write_bytes(b"\n".join(lines) + b"\n")
+        session = {
+            "run_id": run_dir.name,
+            "status": "completed",
+            "started_at": f"2026-01-01T00:00:{i:09d}",
+            "finished_at": "",
+            "goal": "bench",
+            "model_stack": {"executor": {"model": _MODELS[i % len(_MODELS)]}},
+            "summary": {"success": True, "step_count": events_per_run // 4},
+        }
+        (run_dir / "session.json").write_bytes(orjson.dumps(session))
+
+
+def _glob_scan(base_dir: Path) -> set[str]:
+    matches = set()
+    for session_path in base_dir.glob("*/session.json"):
+        session = orjson.loads(session_path.read_bytes())
+        if session["model_stack"].get("executor", {}).get("model") != "gpt-4":
+            continue
+        with (session_path.parent / "events.jsonl").open("rb") as f:
+            for line in f:
+                event = orjson.loads(line)
+                if event["event_type"] == "llm_call" and event["payload"].get("status") == "parse_error":
+                    matches.add(session["run_id"])
+                    break
+    return matches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=50000)
+    parser.add_argument("--events-per-run", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp)
+        _write_runs(base_dir, args.runs, args.events_per_run)
+
+        start = time.perf_counter()
+        expected = _glob_scan(base_dir)
+        glob_ms = (time.perf_counter() - start) * 1000
+
+        catalog = TraceCatalog(base_dir / "catalog.sqlite")
+        start = time.perf_counter()
+        catalog.ingest(base_dir)
+        first_ingest_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stats = catalog.ingest(base_dir)
+        noop_ingest_ms = (time.perf_counter() - start) * 1000
+        assert stats["runs_unchanged"] == args.runs
+
+        start = time.perf_counter()
+        rows = catalog.find_runs(executor_model="gpt-4", event_type="llm_call", event_status="parse_error", limit=args.runs)
+        query_ms = (time.perf_counter() - start) * 1000
+        assert {row["run_id"] for row in rows} == expected
+        catalog.close()
+
+    print(f"runs={args.runs} events/run={args.events_per_run} matching runs={len(expected)}")
+    print(f"{'glob + parse every run':<32}{glob_ms:>10.1f} ms")
+    print(f"{'catalog query':<32}{query_ms:>10.1f} ms")
+    print(f"{'first ingest (one-off)':<32}{first_ingest_s:>10.1f} s")
+    print(f"{'re-ingest, nothing new':<32}{noop_ingest_ms:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Per-model latency and failure rates: parsing events.jsonl versus the Parquet export.
+
+Usage: python scripts/bench_trace_parquet.py [--runs 2000] [--events-per-run 250]
+
+Needs the `parquet` extra. The JSON side is the notebook-style loop over every
+run's events; the Parquet side scans the partitioned dataset and aggregates with
+pyarrow compute. The one-off export time is reported separately.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import orjson
+import pyarrow.compute as pc
+
+from plan_and_act.tracing.columnar import ParquetTraceExporter
+
+_MODELS = ["gpt-4", "gpt-4o-mini", "qwen2.5-7b"]
+
+
+def _write_runs(base_dir: Path, runs: int, events_per_run: int) -> None:
+    for r in range(runs):
+        run_dir = base_dir / f"run-{r:06d}"
+        run_dir.mkdir()
+        model = _MODELS[r % len(_MODELS)]
+        lines = []
+        for seq in range(events_per_run):
+            if seq % 2:
+                event = {"event_type": "tool_call_end", "payload": {"tool_name": "calculator", "ok": seq % 7 != 0}}
+            else:
+                payload = {
+                    "component": "executor",
+                    "model": model,
+                    "status": "parse_error" if seq % 50 == 0 else "success",
+                    "latency_ms": 100.0 + seq % 97,
+                    "usage": {"prompt_tokens": 800, "completion_tokens": 60, "total_tokens": 860},
+                    "user_prompt": "context " * 40,
+                }
+                event = {"event_type": "llm_call", "payload": payload}
+            event.update({"run_id": run_dir.name, "seq": seq, "step": seq // 6, "timestamp": "2026-03-01T10:00:00+00:00"})
+            lines.append(orjson.dumps(event))
+        (run_dir / "events.jsonl").write_bytes(b"\n".join(lines) + b"\n")
+        session = {"run_id": run_dir.name, "status": "completed", "started_at": "2026-03-01T10:00:00+00:00"}
+        (run_dir / "session.json").write_bytes(orjson.dumps(session))
+
+
+def _json_stats(base_dir: Path) -> dict[str, tuple[float, float]]:
+    totals: dict[str, list[float]] = defaultdict(lambda: [0, 0.0, 0])
+    for events_path in base_dir.glob("*/events.jsonl"):
+        with events_path.open("rb") as f:
+            for line in f:
+                event = orjson.loads(line)
+                if event["event_type"] != "llm_call":
+                    continue
+                payload = event["payload"]
+                row = totals[payload["model"]]
+                row[0] += 1
+                row[1] += payload["latency_ms"]
+                row[2] += payload["status"] == "parse_error"
+    return {model: (row[1] / row[0], row[2] / row[0]) for model, row in totals.items()}
+
+
+def _parquet_stats(exporter: ParquetTraceExporter) -> dict[str, tuple[float, float]]:
+    table = exporter.dataset().to_table(
+        columns=["model", "latency_ms", "status"], filter=pc.field("event_type") == "llm_call"
+    )
+    table = table.append_column("parse_error", pc.cast(pc.equal(table["status"], "parse_error"), "int64"))
+    grouped = table.group_by("model").aggregate([("latency_ms", "mean"), ("parse_error", "mean")])
+    return {row["model"]: (row["latency_ms_mean"], row["parse_error_mean"]) for row in grouped.to_pylist()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--events-per-run", type=int, default=250)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp) / "traces"
+        base_dir.mkdir()
+        _write_runs(base_dir, args.runs, args.events_per_run)
+        exporter = ParquetTraceExporter(Path(tmp) / "parquet")
+
+        start = time.perf_counter()
+        exporter.export(base_dir)
+        export_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = _json_stats(base_dir)
+        json_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        got = _parquet_stats(exporter)
+        parquet_ms = (time.perf_counter() - start) * 1000
+        for model, (latency, error_rate) in expected.items():
+            assert abs(got[model][0] - latency) < 1e-6 and abs(got[model][1] - error_rate) < 1e-9
+
+        jsonl_mb = sum(path.stat().st_size for path in base_dir.glob("*/events.jsonl")) / 1e6
+        parquet_mb = sum(path.stat().st_size for path in (Path(tmp) / "parquet").rglob("*.parquet")) / 1e6
+
+    print(f"events={args.runs * args.events_per_run}  jsonl={jsonl_mb:.1f} MB  parquet={parquet_mb:.1f} MB")
+    print(f"{'groupby over events.jsonl':<30}{json_ms:>10.1f} ms")
+    print(f"{'groupby over parquet':<30}{parquet_ms:>10.1f} ms")
+    print(f"{'one-off export':<30}{export_s:>10.1f} s")
+
+
+if __name__ == "__main__":
+    main()
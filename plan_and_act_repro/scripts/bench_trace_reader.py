@@ -0,0 +1,83 @@
+"""Indexed lookups versus a full line-by-line scan of events.jsonl.
+
+Usage: python scripts/bench_trace_reader.py [--events 200000]
+
+Queries mirror trace review work: all llm_call events at one step, and the
+last tool_call_end of the run. The indexed numbers include opening the
+reader (mmap + loading the sidecar index), which a review session pays once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import orjson
+
+from plan_and_act.tracing import TraceReader
+from plan_and_act.tracing.writer import TraceWriter
+
+_TYPES = ["executor_input", "llm_call", "tool_call_start", "tool_call_end", "llm_call", "environment_step"]
+
+
+def _scan(path: Path, event_type: str, step: int | None) -> list[dict]:
+    out = []
+    with path.open("rb") as f:
+        for line in f:
+            event = orjson.loads(line)
+            if event["event_type"] == event_type and (step is None or event["step"] == step):
+                out.append(event)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = TraceWriter(base_dir=tmp, run_id="bench", flush_every=256)
+        for seq in range(args.events):
+            writer.append_event(
+                {
+                    "seq": seq,
+                    "step": seq // 12,
+                    "event_type": _TYPES[seq % len(_TYPES)],
+                    "payload": {"observation": "tool output " * 30, "seq": seq},
+                }
+            )
+        writer.close()
+        events_path = writer.events_path
+        step = (args.events // 12) // 2
+
+        start = time.perf_counter()
+        reader = TraceReader(Path(tmp) / "bench")
+        len(reader)
+        open_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{'query':<32}{'scan_ms':>10}{'indexed_ms':>12}{'matches':>9}")
+        for label, event_type, query_step in [
+            (f"llm_call at step {step}", "llm_call", step),
+            ("last tool_call_end", "tool_call_end", None),
+        ]:
+            start = time.perf_counter()
+            scanned = _scan(events_path, event_type, query_step)
+            scan_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            if query_step is None:
+                found = [reader.last(event_type, rehydrate=False)]
+                scanned = scanned[-1:]
+            else:
+                found = list(reader.find(event_type=event_type, step=query_step, rehydrate=False))
+            indexed_ms = (time.perf_counter() - start) * 1000
+            assert found == scanned
+            print(f"{label:<32}{scan_ms:>10.1f}{indexed_ms:>12.3f}{len(found):>9}")
+        print(f"(reader open + index load: {open_ms:.1f} ms for {args.events} events)")
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Events/sec of the buffered TraceWriter versus the legacy open-write-close writer.
+
+Usage: python scripts/bench_trace_writer.py [--events 20000] [--threads 1]
+
+Each event is a realistic `llm_call`-sized payload serialised with the same
+TraceEvent schema the collector uses. Throughput includes `close()`, so every
+buffered event is on disk when the clock stops.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from plan_and_act.tracing.schemas import TraceEvent
+from plan_and_act.tracing.writer import TraceWriter
+
+
+class _LegacyWriter:
+    """The pre-buffering writer: one open/write/close per event."""
+
+    def __init__(self, *, base_dir: str, run_id: str) -> None:
+        self.events_path = Path(base_dir) / run_id / "events.jsonl"
+        self.events_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def append_event(self, payload: dict[str, Any]) -> None:
+        line = orjson.dumps(payload)
+        with self.events_path.open("ab") as f:
+            f.write(line)
+            f.write(b"\n")
+
+    def close(self) -> None:
+        pass
+
+
+def _payload(i: int) -> dict[str, Any]:
+    return TraceEvent(
+        run_id="bench",
+        seq=i,
+        step=i // 10,
+        event_type="llm_call",
+        payload={
+            "model": "gpt-4",
+            "system_prompt": "You are the executor. " * 20,
+            "user_prompt": f"Current step {i}: " + "observation text " * 40,
+            "raw_content": '{"action_type": "click", "target": "button"}',
+            "usage": {"prompt_tokens": 512, "completion_tokens": 32, "total_tokens": 544},
+        },
+    ).model_dump()
+
+
+def _run(writer: Any, events: list[dict[str, Any]], threads: int) -> float:
+    def _produce(chunk: list[dict[str, Any]]) -> None:
+        for event in chunk:
+            writer.append_event(event)
+
+    chunks = [events[i::threads] for i in range(threads)]
+    workers = [threading.Thread(target=_produce, args=(chunk,)) for chunk in chunks]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    writer.close()
+    return len(events) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+
+    events = [_payload(i) for i in range(args.events)]
+    variants: list[tuple[str, dict[str, Any] | None]] = [
+        ("legacy open/write/close", None),
+        ("buffered flush_every=1", {"flush_every": 1}),
+        ("buffered flush_every=64", {"flush_every": 64}),
+        ("background flush_every=64", {"flush_every": 64, "background": True}),
+    ]
+
+    print(f"{'writer':<28}{'events/s':>12}{'speedup':>10}")
+    baseline = 0.0
+    with tempfile.TemporaryDirectory() as tmp:
+        for index, (name, options) in enumerate(variants):
+            run_id = f"run_{index}"
+            if options is None:
+                writer: Any = _LegacyWriter(base_dir=tmp, run_id=run_id)
+            else:
+                writer = TraceWriter(base_dir=tmp, run_id=run_id, **options)
+            rate = _run(writer, events, args.threads)
+            baseline = baseline or rate
+            print(f"{name:<28}{rate:>12.0f}{rate / baseline:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
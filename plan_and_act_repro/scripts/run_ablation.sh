@@ -3,6 +3,17 @@ set -euo pipefail
 
 source .venv/bin/activate
 
-plan-act-run run-episode --goal "Find the top contributor and follow them" --environment simulator --no-dynamic-replanning --no-use-cot
-plan-act-run run-episode --goal "Find the top contributor and follow them" --environment simulator --dynamic-replanning --no-use-cot
-plan-act-run run-episode --goal "Find the top contributor and follow them" --environment simulator --dynamic-replanning --use-cot
+GOALS_FILE="$(mktemp -t ablation_goals.XXXXXX.jsonl)"
+trap 'rm -f "${GOALS_FILE}"' EXIT
+
+cat > "${GOALS_FILE}" <<'JSONL'
+{"goal": "Find the top contributor and follow them", "dynamic_replanning": false, "use_cot": false}
+{"goal": "Find the top contributor and follow them", "dynamic_replanning": true, "use_cot": false}
+{"goal": "Find the top contributor and follow them", "dynamic_replanning": true, "use_cot": true}
+JSONL
+
+plan-act-run run-batch \
+  --goals-file "${GOALS_FILE}" \
+  --output artifacts/runs/ablation_results.jsonl \
+  --environment simulator \
+  --workers 3
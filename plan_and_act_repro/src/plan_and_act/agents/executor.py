@@ -3,10 +3,13 @@ from __future__ import annotations
 from typing import Any
 
 from plan_and_act.core.schemas import ExecutorAction, PlanStep
-from plan_and_act.core.types import ModelConfig
+from plan_and_act.core.types import ContextConfig, ModelConfig
+from plan_and_act.eval.metrics import UsageMeter
+from plan_and_act.prompts.context import ContextBuilder
 from plan_and_act.prompts.templates import PromptTemplates
 from plan_and_act.tracing.collector import TraceCollector
-from plan_and_act.utils.llm import LLMClient
+from plan_and_act.tracing.spans import span
+from plan_and_act.utils.llm import AsyncLLMClient, LLMClient
 
 
 class ExecutorAgent:
@@ -15,11 +18,23 @@ class ExecutorAgent:
         model_config: ModelConfig,
         prompts: PromptTemplates,
         tracer: TraceCollector | None = None,
+        meter: UsageMeter | None = None,
+        context: ContextConfig | None = None,
     ) -> None:
         self.model_config = model_config
         self.prompts = prompts
+        self.context = ContextBuilder(context)
         self.tracer = tracer
-        self.llm = LLMClient(trace_hook=self._llm_trace_hook if tracer else None)
+        trace_hook = self._llm_trace_hook if tracer else None
+        usage_hook = meter.record_llm_call if meter is not None else None
+        self.llm = LLMClient(trace_hook=trace_hook, trace_filter=self._llm_trace_filter, usage_hook=usage_hook)
+        self.async_llm = AsyncLLMClient(
+            trace_hook=trace_hook, trace_filter=self._llm_trace_filter, usage_hook=usage_hook
+        )
+
+    def _llm_trace_filter(self, trace_context: dict[str, Any]) -> bool:
+        raw_step = trace_context.get("step", -1)
+        return self.tracer is not None and self.tracer.wants("llm_call", raw_step if isinstance(raw_step, int) else -1)
 
     def _llm_trace_hook(self, payload: dict[str, Any]) -> None:
         if self.tracer is None:
@@ -28,6 +43,9 @@ class ExecutorAgent:
         step = raw_step if isinstance(raw_step, int) else -1
         self.tracer.log_event(event_type="llm_call", step=step, payload=payload)
 
+    def _span_attributes(self) -> dict[str, Any]:
+        return {"component": "executor", "model": self.model_config.model}
+
     def act(
         self,
         *,
@@ -49,6 +67,27 @@ class ExecutorAgent:
             )
         return self._act_heuristic(goal, current_step, step_index, total_steps)
 
+    async def aact(
+        self,
+        *,
+        goal: str,
+        current_step: PlanStep,
+        observation: str,
+        step_index: int,
+        total_steps: int,
+        use_cot: bool,
+        step: int = -1,
+    ) -> ExecutorAction:
+        if self.model_config.provider == "openai" and self.async_llm.enabled:
+            return await self._aact_with_openai(
+                goal=goal,
+                current_step=current_step,
+                observation=observation,
+                use_cot=use_cot,
+                step=step,
+            )
+        return self._act_heuristic(goal, current_step, step_index, total_steps)
+
     def _act_with_openai(
         self,
         *,
@@ -58,6 +97,57 @@ class ExecutorAgent:
         use_cot: bool,
         step: int,
     ) -> ExecutorAction:
+        system_prompt, user_prompt = self._build_prompts(
+            goal=goal,
+            current_step=current_step,
+            observation=observation,
+            use_cot=use_cot,
+        )
+        with span(self.tracer, "llm.chat_json", step=step, attributes=self._span_attributes()):
+            payload = self.llm.chat_json(
+                model=self.model_config.model,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=self.model_config.temperature,
+                trace_context={"component": "executor", "step": step},
+                schema=ExecutorAction,
+            )
+        return ExecutorAction.model_validate(payload)
+
+    async def _aact_with_openai(
+        self,
+        *,
+        goal: str,
+        current_step: PlanStep,
+        observation: str,
+        use_cot: bool,
+        step: int,
+    ) -> ExecutorAction:
+        system_prompt, user_prompt = self._build_prompts(
+            goal=goal,
+            current_step=current_step,
+            observation=observation,
+            use_cot=use_cot,
+        )
+        with span(self.tracer, "llm.chat_json", step=step, attributes=self._span_attributes()):
+            payload = await self.async_llm.chat_json(
+                model=self.model_config.model,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=self.model_config.temperature,
+                trace_context={"component": "executor", "step": step},
+                schema=ExecutorAction,
+            )
+        return ExecutorAction.model_validate(payload)
+
+    def _build_prompts(
+        self,
+        *,
+        goal: str,
+        current_step: PlanStep,
+        observation: str,
+        use_cot: bool,
+    ) -> tuple[str, str]:
         executor_cfg = self.prompts.executor
         cot_hint = self.prompts.cot.get("instruction", "") if use_cot else ""
         system_prompt = (
@@ -70,17 +160,10 @@ class ExecutorAgent:
             {
                 "goal": goal,
                 "current_step": current_step.model_dump(),
-                "observation": observation,
+                "observation": self.context.observation(observation),
             },
         )
-        payload = self.llm.chat_json(
-            model=self.model_config.model,
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            temperature=self.model_config.temperature,
-            trace_context={"component": "executor", "step": step},
-        )
-        return ExecutorAction.model_validate(payload)
+        return system_prompt, user_prompt
 
     @staticmethod
     def _act_heuristic(
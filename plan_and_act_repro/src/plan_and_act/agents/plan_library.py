@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from plan_and_act.core.schemas import PlannerOutput
+from plan_and_act.core.types import PlanLibraryConfig
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    id INTEGER PRIMARY KEY,
+    template TEXT NOT NULL UNIQUE,
+    goal TEXT NOT NULL,
+    slot_count INTEGER NOT NULL,
+    plan TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    source_run_id TEXT NOT NULL,
+    successes INTEGER NOT NULL DEFAULT 1,
+    failures INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+"""
+
+# Goal fragments that vary between otherwise identical requests, most specific first.
+_SLOT_RE = re.compile(
+    r"https?://\S+"
+    r"|\"[^\"]+\"|'[^']+'"
+    r"|[\w.+-]+@[\w-]+\.[\w.]+"
+    r"|\b[\w.-]+/[\w./-]+"
+    r"|\b\d+(?:[.,]\d+)*\b"
+    r"|(?<=\s)[A-Z][\w-]*(?:\s+[A-Z][\w-]*)*"
+)
+_WORD_RE = re.compile(r"<<\d+>>|[a-z0-9]+")
+_MARKER_RE = re.compile(r"<<(\d+)(?:\.(\d+))?>>")
+_MERSENNE_61 = (1 << 61) - 1
+
+
+def slot_marker(index: int, part: int | None = None) -> str:
+    return f"<<{index}>>" if part is None else f"<<{index}.{part}>>"
+
+
+def extract_slots(goal: str) -> tuple[str, list[str]]:
+    """Split a goal into a template with `<<i>>` markers and the entity values they replace."""
+    slots: list[str] = []
+
+    def _replace(match: re.Match[str]) -> str:
+        slots.append(match.group().strip("\"'").rstrip(".,;:?!"))
+        return slot_marker(len(slots) - 1)
+
+    template = _SLOT_RE.sub(_replace, goal.strip())
+    return " ".join(_WORD_RE.findall(template.lower())), slots
+
+
+def _slot_parts(value: str) -> list[str]:
+    return [part for part in re.split(r"[/@]", value) if part] if re.search(r"[/@]", value) else []
+
+
+def _sub_value(text: str, value: str, marker: str) -> str:
+    return re.sub(rf"(?<![\w-]){re.escape(value)}(?![\w-])", marker, text, flags=re.IGNORECASE)
+
+
+def templatize_plan(plan: PlannerOutput, slots: list[str]) -> dict[str, Any]:
+    """Replace the goal's slot values (and owner/repo style parts) in the plan with markers."""
+    replacements: list[tuple[str, str]] = []
+    for index, value in enumerate(slots):
+        replacements.append((value, slot_marker(index)))
+        replacements.extend((part, slot_marker(index, i)) for i, part in enumerate(_slot_parts(value)))
+    # Longest values first so "openai-python" is replaced before "openai".
+    replacements.sort(key=lambda item: len(item[0]), reverse=True)
+
+    def _template(text: str) -> str:
+        for value, marker in replacements:
+            if len(value) > 1:
+                text = _sub_value(text, value, marker)
+        return text
+
+    data = plan.model_dump()
+    data["goal"] = _template(data["goal"])
+    for step in data["steps"]:
+        step["intent"] = _template(step["intent"])
+        step["success_criteria"] = _template(step["success_criteria"])
+    return data
+
+
+def fill_plan(template: dict[str, Any], slots: list[str], goal: str) -> PlannerOutput:
+    """Plan for `goal` from a stored template: markers become the new goal's slot values."""
+
+    def _value(match: re.Match[str]) -> str:
+        index = int(match.group(1))
+        if index >= len(slots):
+            return match.group()
+        if match.group(2) is None:
+            return slots[index]
+        parts = _slot_parts(slots[index])
+        part = int(match.group(2))
+        return parts[part] if part < len(parts) else slots[index]
+
+    steps = [
+        {
+            **step,
+            "intent": _MARKER_RE.sub(_value, step["intent"]),
+            "success_criteria": _MARKER_RE.sub(_value, step["success_criteria"]),
+        }
+        for step in template["steps"]
+    ]
+    return PlannerOutput(goal=goal, steps=steps)
+
+
+def shingles(template: str) -> set[str]:
+    """Word unigrams and bigrams of a template, with every slot marker collapsed to `<slot>`."""
+    words = [("<slot>" if word.startswith("<<") else word) for word in template.split()]
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class MinHasher:
+    """MinHash signatures from seeded universal hashes; stable across processes and runs."""
+
+    def __init__(self, num_perm: int, seed: int = 1) -> None:
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, _MERSENNE_61), rng.randrange(0, _MERSENNE_61)) for _ in range(num_perm)]
+
+    def signature(self, features: set[str]) -> array:
+        bases = [int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little") for f in features]
+        if not bases:
+            return array("Q", [_MERSENNE_61] * len(self.params))
+        return array("Q", [min((a * x + b) % _MERSENNE_61 for x in bases) for a, b in self.params])
+
+
+@dataclass
+class PlanMatch:
+    entry_id: int
+    similarity: float
+    template: str
+    plan: PlannerOutput
+
+
+class PlanLibrary:
+    """Successful plans of past episodes, looked up by goal similarity with slot filling.
+
+    Goals are reduced to templates ("find the top contributor of <<0>>") and
+    indexed with MinHash LSH over word shingles. A lookup scores the LSH
+    candidates by exact Jaccard similarity, keeps those with the same number
+    of slots, and returns the best plan at or above `min_similarity` with the
+    new goal's entities filled in. Entries that failed more often than they
+    succeeded are skipped.
+    """
+
+    def __init__(self, config: PlanLibraryConfig) -> None:
+        self.config = config
+        self._hasher = MinHasher(config.num_perm)
+        self._rows_per_band = config.num_perm // config.bands
+        self._lock = threading.Lock()
+        self._buckets: dict[tuple[int, bytes], set[int]] = defaultdict(set)
+        self._entries: dict[int, tuple[str, int, set[str]]] = {}
+        self._stats = {"lookups": 0, "hits": 0, "stores": 0}
+
+        path = Path(config.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        for entry_id, template, slot_count, blob in self._conn.execute(
+            "SELECT id, template, slot_count, signature FROM plans"
+        ):
+            self._index(entry_id, template, slot_count, array("Q", blob))
+
+    def _bands(self, signature: array) -> list[tuple[int, bytes]]:
+        r = self._rows_per_band
+        return [(band, signature[band * r : (band + 1) * r].tobytes()) for band in range(self.config.bands)]
+
+    def _index(self, entry_id: int, template: str, slot_count: int, signature: array) -> None:
+        self._entries[entry_id] = (template, slot_count, shingles(template))
+        for key in self._bands(signature):
+            self._buckets[key].add(entry_id)
+
+    def lookup(self, goal: str) -> PlanMatch | None:
+        template, slots = extract_slots(goal)
+        features = shingles(template)
+        signature = self._hasher.signature(features)
+        with self._lock:
+            self._stats["lookups"] += 1
+            candidates = set().union(*(self._buckets.get(key, ()) for key in self._bands(signature)))
+            scored = []
+            for entry_id in candidates:
+                _, slot_count, entry_features = self._entries[entry_id]
+                if slot_count == len(slots):
+                    scored.append((jaccard(features, entry_features), entry_id))
+            scored.sort(reverse=True)
+            for similarity, entry_id in scored:
+                if similarity < self.config.min_similarity:
+                    break
+                row = self._conn.execute(
+                    "SELECT template, plan, successes, failures FROM plans WHERE id = ?", (entry_id,)
+                ).fetchone()
+                if row is None or row[3] > row[2]:
+                    continue
+                self._stats["hits"] += 1
+                self._conn.execute("UPDATE plans SET last_used_at = ? WHERE id = ?", (time.time(), entry_id))
+                plan = fill_plan(orjson.loads(row[1]), slots, goal)
+                return PlanMatch(entry_id=entry_id, similarity=round(similarity, 4), template=row[0], plan=plan)
+        return None
+
+    def add(self, goal: str, plan: PlannerOutput, *, run_id: str = "") -> int:
+        """Store (or replace) the plan for this goal's template; returns its entry id."""
+        template, slots = extract_slots(goal)
+        signature = self._hasher.signature(shingles(template))
+        plan_json = orjson.dumps(templatize_plan(plan, slots)).decode("utf-8")
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO plans (template, goal, slot_count, plan, signature, source_run_id, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(template) DO UPDATE SET goal = excluded.goal, plan = excluded.plan, "
+                "source_run_id = excluded.source_run_id, successes = 1, failures = 0, last_used_at = excluded.last_used_at",
+                (template, goal, len(slots), plan_json, signature.tobytes(), run_id, now, now),
+            )
+            entry_id = self._conn.execute("SELECT id FROM plans WHERE template = ?", (template,)).fetchone()[0]
+            if entry_id not in self._entries:
+                self._index(entry_id, template, len(slots), signature)
+            self._stats["stores"] += 1
+            self._evict_locked()
+        return entry_id
+
+    def record_outcome(self, entry_id: int, *, success: bool) -> None:
+        column = "successes" if success else "failures"
+        with self._lock:
+            self._conn.execute(f"UPDATE plans SET {column} = {column} + 1 WHERE id = ?", (entry_id,))
+
+    def _evict_locked(self) -> None:
+        if not self.config.max_entries or len(self._entries) <= self.config.max_entries:
+            return
+        excess = len(self._entries) - self.config.max_entries
+        rows = self._conn.execute("SELECT id, signature FROM plans ORDER BY last_used_at ASC LIMIT ?", (excess,)).fetchall()
+        for entry_id, blob in rows:
+            self._conn.execute("DELETE FROM plans WHERE id = ?", (entry_id,))
+            for key in self._bands(array("Q", blob)):
+                self._buckets[key].discard(entry_id)
+            self._entries.pop(entry_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+            out["entries"] = len(self._entries)
+        out["hit_rate"] = round(out["hits"] / out["lookups"], 4) if out["lookups"] else 0.0
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_library_lock = threading.Lock()
+_library: PlanLibrary | None = None
+
+
+def get_plan_library() -> PlanLibrary | None:
+    with _library_lock:
+        return _library
+
+
+def configure_plan_library(config: PlanLibraryConfig) -> PlanLibrary | None:
+    """Install (or remove, when disabled) the process-wide plan library."""
+    global _library
+    with _library_lock:
+        previous = _library
+        _library = PlanLibrary(config) if config.enabled else None
+        current = _library
+    if previous is not None:
+        previous.close()
+    return current
@@ -2,11 +2,15 @@ from __future__ import annotations
 
 from typing import Any
 
+from plan_and_act.agents.plan_library import PlanLibrary
 from plan_and_act.core.schemas import PlanStep, PlannerOutput
-from plan_and_act.core.types import ModelConfig
+from plan_and_act.core.types import ContextConfig, ModelConfig
+from plan_and_act.eval.metrics import UsageMeter
+from plan_and_act.prompts.context import ContextBuilder
 from plan_and_act.prompts.templates import PromptTemplates
 from plan_and_act.tracing.collector import TraceCollector
-from plan_and_act.utils.llm import LLMClient
+from plan_and_act.tracing.spans import span
+from plan_and_act.utils.llm import AsyncLLMClient, LLMClient
 
 
 class PlannerAgent:
@@ -15,11 +19,30 @@ class PlannerAgent:
         model_config: ModelConfig,
         prompts: PromptTemplates,
         tracer: TraceCollector | None = None,
+        meter: UsageMeter | None = None,
+        context: ContextConfig | None = None,
+        plan_library: PlanLibrary | None = None,
     ) -> None:
         self.model_config = model_config
         self.prompts = prompts
+        self.context = ContextBuilder(context)
+        self.plan_library = plan_library
+        # Where the latest plan came from ("library", "llm" or "heuristic"), for `record_outcome`.
+        self.last_plan_source = ""
+        self._last_goal = ""
+        self._last_plan: PlannerOutput | None = None
+        self._library_entry_id = 0
         self.tracer = tracer
-        self.llm = LLMClient(trace_hook=self._llm_trace_hook if tracer else None)
+        trace_hook = self._llm_trace_hook if tracer else None
+        usage_hook = meter.record_llm_call if meter is not None else None
+        self.llm = LLMClient(trace_hook=trace_hook, trace_filter=self._llm_trace_filter, usage_hook=usage_hook)
+        self.async_llm = AsyncLLMClient(
+            trace_hook=trace_hook, trace_filter=self._llm_trace_filter, usage_hook=usage_hook
+        )
+
+    def _llm_trace_filter(self, trace_context: dict[str, Any]) -> bool:
+        raw_step = trace_context.get("step", -1)
+        return self.tracer is not None and self.tracer.wants("llm_call", raw_step if isinstance(raw_step, int) else -1)
 
     def _llm_trace_hook(self, payload: dict[str, Any]) -> None:
         if self.tracer is None:
@@ -28,6 +51,9 @@ class PlannerAgent:
         step = raw_step if isinstance(raw_step, int) else -1
         self.tracer.log_event(event_type="llm_call", step=step, payload=payload)
 
+    def _span_attributes(self) -> dict[str, Any]:
+        return {"component": "planner", "model": self.model_config.model}
+
     def plan(
         self,
         *,
@@ -37,15 +63,79 @@ class PlannerAgent:
         use_cot: bool,
         step: int = -1,
     ) -> PlannerOutput:
+        cached = self._plan_from_library(goal, step)
+        if cached is not None:
+            return cached
         if self.model_config.provider == "openai" and self.llm.enabled:
-            return self._plan_with_openai(
+            output = self._plan_with_openai(
+                goal=goal,
+                observation=observation,
+                action_history=action_history,
+                use_cot=use_cot,
+                step=step,
+            )
+            return self._remember(goal, output, "llm")
+        return self._remember(goal, self._plan_heuristic(goal), "heuristic")
+
+    async def aplan(
+        self,
+        *,
+        goal: str,
+        observation: str,
+        action_history: list[dict[str, Any]],
+        use_cot: bool,
+        step: int = -1,
+    ) -> PlannerOutput:
+        cached = self._plan_from_library(goal, step)
+        if cached is not None:
+            return cached
+        if self.model_config.provider == "openai" and self.async_llm.enabled:
+            output = await self._aplan_with_openai(
                 goal=goal,
                 observation=observation,
                 action_history=action_history,
                 use_cot=use_cot,
                 step=step,
             )
-        return self._plan_heuristic(goal)
+            return self._remember(goal, output, "llm")
+        return self._remember(goal, self._plan_heuristic(goal), "heuristic")
+
+    def _remember(self, goal: str, output: PlannerOutput, source: str) -> PlannerOutput:
+        self._last_goal, self._last_plan, self.last_plan_source = goal, output, source
+        return output
+
+    def _plan_from_library(self, goal: str, step: int) -> PlannerOutput | None:
+        if self.plan_library is None:
+            return None
+        match = self.plan_library.lookup(goal)
+        if self.tracer:
+            stats = self.plan_library.stats()
+            self.tracer.log_event(
+                event_type="plan_library_lookup",
+                step=step,
+                payload=lambda: {
+                    "hit": match is not None,
+                    "entry_id": match.entry_id if match else 0,
+                    "similarity": match.similarity if match else 0.0,
+                    "template": match.template if match else "",
+                    "lookups": stats["lookups"],
+                    "hits": stats["hits"],
+                    "hit_rate": stats["hit_rate"],
+                },
+            )
+        if match is None:
+            return None
+        self._library_entry_id = match.entry_id
+        return self._remember(goal, match.plan, "library")
+
+    def record_outcome(self, *, success: bool, run_id: str = "") -> None:
+        """Feed the episode result back: store a successful LLM plan, or score a reused one."""
+        if self.plan_library is None or self._last_plan is None:
+            return
+        if self.last_plan_source == "library":
+            self.plan_library.record_outcome(self._library_entry_id, success=success)
+        elif self.last_plan_source == "llm" and success:
+            self.plan_library.add(self._last_goal, self._last_plan, run_id=run_id)
 
     def _plan_with_openai(
         self,
@@ -56,6 +146,57 @@ class PlannerAgent:
         use_cot: bool,
         step: int,
     ) -> PlannerOutput:
+        system_prompt, user_prompt = self._build_prompts(
+            goal=goal,
+            observation=observation,
+            action_history=action_history,
+            use_cot=use_cot,
+        )
+        with span(self.tracer, "llm.chat_json", step=step, attributes=self._span_attributes()):
+            payload = self.llm.chat_json(
+                model=self.model_config.model,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=self.model_config.temperature,
+                trace_context={"component": "planner", "step": step},
+                schema=PlannerOutput,
+            )
+        return PlannerOutput.model_validate(payload)
+
+    async def _aplan_with_openai(
+        self,
+        *,
+        goal: str,
+        observation: str,
+        action_history: list[dict[str, Any]],
+        use_cot: bool,
+        step: int,
+    ) -> PlannerOutput:
+        system_prompt, user_prompt = self._build_prompts(
+            goal=goal,
+            observation=observation,
+            action_history=action_history,
+            use_cot=use_cot,
+        )
+        with span(self.tracer, "llm.chat_json", step=step, attributes=self._span_attributes()):
+            payload = await self.async_llm.chat_json(
+                model=self.model_config.model,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=self.model_config.temperature,
+                trace_context={"component": "planner", "step": step},
+                schema=PlannerOutput,
+            )
+        return PlannerOutput.model_validate(payload)
+
+    def _build_prompts(
+        self,
+        *,
+        goal: str,
+        observation: str,
+        action_history: list[dict[str, Any]],
+        use_cot: bool,
+    ) -> tuple[str, str]:
         planner_cfg = self.prompts.planner
         cot_hint = self.prompts.cot.get("instruction", "") if use_cot else ""
         system_prompt = (
@@ -67,18 +208,11 @@ class PlannerAgent:
             planner_cfg["user_template"],
             {
                 "goal": goal,
-                "observation": observation,
-                "action_history": action_history,
+                "observation": self.context.observation(observation),
+                "action_history": self.context.history(action_history),
             },
         )
-        payload = self.llm.chat_json(
-            model=self.model_config.model,
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            temperature=self.model_config.temperature,
-            trace_context={"component": "planner", "step": step},
-        )
-        return PlannerOutput.model_validate(payload)
+        return system_prompt, user_prompt
 
     @staticmethod
     def _plan_heuristic(goal: str) -> PlannerOutput:
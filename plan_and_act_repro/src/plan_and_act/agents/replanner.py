@@ -3,10 +3,13 @@ from __future__ import annotations
 from typing import Any
 
 from plan_and_act.core.schemas import PlanStep, PlannerOutput
-from plan_and_act.core.types import ModelConfig
+from plan_and_act.core.types import ContextConfig, ModelConfig
+from plan_and_act.eval.metrics import UsageMeter
+from plan_and_act.prompts.context import ContextBuilder
 from plan_and_act.prompts.templates import PromptTemplates
 from plan_and_act.tracing.collector import TraceCollector
-from plan_and_act.utils.llm import LLMClient
+from plan_and_act.tracing.spans import span
+from plan_and_act.utils.llm import AsyncLLMClient, LLMClient
 
 
 class ReplannerAgent:
@@ -15,11 +18,23 @@ class ReplannerAgent:
         model_config: ModelConfig,
         prompts: PromptTemplates,
         tracer: TraceCollector | None = None,
+        meter: UsageMeter | None = None,
+        context: ContextConfig | None = None,
     ) -> None:
         self.model_config = model_config
         self.prompts = prompts
+        self.context = ContextBuilder(context)
         self.tracer = tracer
-        self.llm = LLMClient(trace_hook=self._llm_trace_hook if tracer else None)
+        trace_hook = self._llm_trace_hook if tracer else None
+        usage_hook = meter.record_llm_call if meter is not None else None
+        self.llm = LLMClient(trace_hook=trace_hook, trace_filter=self._llm_trace_filter, usage_hook=usage_hook)
+        self.async_llm = AsyncLLMClient(
+            trace_hook=trace_hook, trace_filter=self._llm_trace_filter, usage_hook=usage_hook
+        )
+
+    def _llm_trace_filter(self, trace_context: dict[str, Any]) -> bool:
+        raw_step = trace_context.get("step", -1)
+        return self.tracer is not None and self.tracer.wants("llm_call", raw_step if isinstance(raw_step, int) else -1)
 
     def _llm_trace_hook(self, payload: dict[str, Any]) -> None:
         if self.tracer is None:
@@ -28,6 +43,9 @@ class ReplannerAgent:
         step = raw_step if isinstance(raw_step, int) else -1
         self.tracer.log_event(event_type="llm_call", step=step, payload=payload)
 
+    def _span_attributes(self) -> dict[str, Any]:
+        return {"component": "replanner", "model": self.model_config.model}
+
     def replan(
         self,
         *,
@@ -49,6 +67,27 @@ class ReplannerAgent:
             )
         return self._replan_heuristic(goal, observation)
 
+    async def areplan(
+        self,
+        *,
+        goal: str,
+        previous_plan: list[dict[str, Any]],
+        action_history: list[dict[str, Any]],
+        observation: str,
+        use_cot: bool,
+        step: int = -1,
+    ) -> PlannerOutput:
+        if self.model_config.provider == "openai" and self.async_llm.enabled:
+            return await self._areplan_with_openai(
+                goal=goal,
+                previous_plan=previous_plan,
+                action_history=action_history,
+                observation=observation,
+                use_cot=use_cot,
+                step=step,
+            )
+        return self._replan_heuristic(goal, observation)
+
     def _replan_with_openai(
         self,
         *,
@@ -59,6 +98,61 @@ class ReplannerAgent:
         use_cot: bool,
         step: int,
     ) -> PlannerOutput:
+        system_prompt, user_prompt = self._build_prompts(
+            goal=goal,
+            previous_plan=previous_plan,
+            action_history=action_history,
+            observation=observation,
+            use_cot=use_cot,
+        )
+        with span(self.tracer, "llm.chat_json", step=step, attributes=self._span_attributes()):
+            payload = self.llm.chat_json(
+                model=self.model_config.model,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=self.model_config.temperature,
+                trace_context={"component": "replanner", "step": step},
+                schema=PlannerOutput,
+            )
+        return PlannerOutput.model_validate(payload)
+
+    async def _areplan_with_openai(
+        self,
+        *,
+        goal: str,
+        previous_plan: list[dict[str, Any]],
+        action_history: list[dict[str, Any]],
+        observation: str,
+        use_cot: bool,
+        step: int,
+    ) -> PlannerOutput:
+        system_prompt, user_prompt = self._build_prompts(
+            goal=goal,
+            previous_plan=previous_plan,
+            action_history=action_history,
+            observation=observation,
+            use_cot=use_cot,
+        )
+        with span(self.tracer, "llm.chat_json", step=step, attributes=self._span_attributes()):
+            payload = await self.async_llm.chat_json(
+                model=self.model_config.model,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=self.model_config.temperature,
+                trace_context={"component": "replanner", "step": step},
+                schema=PlannerOutput,
+            )
+        return PlannerOutput.model_validate(payload)
+
+    def _build_prompts(
+        self,
+        *,
+        goal: str,
+        previous_plan: list[dict[str, Any]],
+        action_history: list[dict[str, Any]],
+        observation: str,
+        use_cot: bool,
+    ) -> tuple[str, str]:
         replanner_cfg = self.prompts.replanner
         cot_hint = self.prompts.cot.get("instruction", "") if use_cot else ""
         system_prompt = (
@@ -70,19 +164,12 @@ class ReplannerAgent:
             replanner_cfg["user_template"],
             {
                 "goal": goal,
-                "plan": previous_plan,
-                "action_history": action_history,
-                "observation": observation,
+                "plan": self.context.plan(previous_plan),
+                "action_history": self.context.history(action_history),
+                "observation": self.context.observation(observation),
             },
         )
-        payload = self.llm.chat_json(
-            model=self.model_config.model,
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            temperature=self.model_config.temperature,
-            trace_context={"component": "replanner", "step": step},
-        )
-        return PlannerOutput.model_validate(payload)
+        return system_prompt, user_prompt
 
     @staticmethod
     def _replan_heuristic(goal: str, observation: str) -> PlannerOutput:
@@ -1,24 +1,178 @@
 from __future__ import annotations
 
-from typing import Any, TypedDict
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import islice
+from typing import Annotated, Any, TypedDict, TypeVar, overload
+
+from langgraph.channels.base import BaseChannel
+
+T = TypeVar("T")
+_append_lock = threading.Lock()
+
+
+class AppendOnlyList(Sequence[T]):
+    """Immutable view of the first `len(self)` items of a buffer shared between versions.
+
+    Appending to the newest version extends the shared buffer and returns a
+    longer view, in O(len(new)). Older views keep their length, so a history
+    a node or checkpoint already holds never changes. Appending to an older
+    view shares the buffer too when the buffer already continues with the
+    same item objects (LangGraph applies a step's writes to a scratch copy of
+    the channels, then to the real ones); any other branch copies its prefix.
+    """
+
+    __slots__ = ("_items", "_length")
+
+    def __init__(self, items: Iterable[T] = ()) -> None:
+        self._items: list[T] = list(items)
+        self._length = len(self._items)
+
+    @classmethod
+    def _view(cls, items: list[T], length: int) -> AppendOnlyList[T]:
+        view = cls.__new__(cls)
+        view._items, view._length = items, length
+        return view
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[T]: ...
+
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            return self._items[start:stop] if step == 1 else self._items[: self._length][index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("AppendOnlyList index out of range")
+        return self._items[index]
+
+    def __iter__(self) -> Iterator[T]:
+        return islice(self._items, self._length)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (AppendOnlyList, list, tuple)):
+            return NotImplemented
+        return len(other) == self._length and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"AppendOnlyList({list(self)!r})"
+
+    def extends(self, other: AppendOnlyList[Any]) -> bool:
+        """True if this view starts with all of `other`'s items, known without comparing them."""
+        return self._items is other._items and self._length >= other._length
+
+    def append_items(self, new: Sequence[T]) -> AppendOnlyList[T]:
+        if not new:
+            return self
+        end = self._length + len(new)
+        with _append_lock:
+            items = self._items
+            if len(items) == self._length:
+                items.extend(new)
+            elif not (len(items) >= end and all(a is b for a, b in zip(islice(items, self._length, end), new))):
+                items = [*islice(items, self._length), *new]
+        return self._view(items, end)
+
+
+def append_items(existing: Sequence[T], new: Sequence[T]) -> AppendOnlyList[T]:
+    """Reducer for append-only channels: O(len(new)) per step instead of O(len(history)).
+
+    Nodes return only the items to append. A plain list (initial input or a
+    value restored from a checkpoint) is copied once into an AppendOnlyList.
+    """
+    if not isinstance(existing, AppendOnlyList):
+        existing = AppendOnlyList(existing)
+    return existing.append_items(new)
+
+
+class AppendOnlyChannel(BaseChannel[AppendOnlyList[Any], Sequence[Any], list[Any]]):
+    """State channel holding an AppendOnlyList; each write is a batch of items to append.
+
+    Channel copies share the immutable view. Checkpoints store a plain list,
+    so the saved state does not depend on this type.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, typ: Any = list) -> None:
+        super().__init__(typ)
+        self.value: AppendOnlyList[Any] = AppendOnlyList()
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, AppendOnlyChannel)
+
+    @property
+    def ValueType(self) -> Any:
+        return self.typ
+
+    @property
+    def UpdateType(self) -> Any:
+        return self.typ
+
+    def copy(self) -> AppendOnlyChannel:
+        channel = self.__class__(self.typ)
+        channel.key = self.key
+        channel.value = self.value
+        return channel
+
+    def from_checkpoint(self, checkpoint: Any) -> AppendOnlyChannel:
+        channel = self.__class__(self.typ)
+        channel.key = self.key
+        if isinstance(checkpoint, (list, tuple)):
+            channel.value = AppendOnlyList(checkpoint)
+        return channel
+
+    def update(self, values: Sequence[Sequence[Any]]) -> bool:
+        if not values:
+            return False
+        for batch in values:
+            self.value = append_items(self.value, batch)
+        return True
+
+    def get(self) -> AppendOnlyList[Any]:
+        return self.value
+
+    def is_available(self) -> bool:
+        return True
+
+    def checkpoint(self) -> list[Any]:
+        return list(self.value)
+
+
+def plain_state(state: dict[str, Any]) -> dict[str, Any]:
+    """Copy of `state` with its history views as plain lists, for writing it out."""
+    return {key: list(value) if isinstance(value, AppendOnlyList) else value for key, value in state.items()}
 
 
 class PlanActState(TypedDict):
     goal: str
     observation: str
+    previous_observation: str
     plan: list[dict[str, Any]]
     current_step_idx: int
-    action_history: list[dict[str, Any]]
+    action_history: Annotated[Sequence[dict[str, Any]], AppendOnlyChannel]
     latest_action: dict[str, Any]
     step_count: int
     max_steps: int
     dynamic_replanning: bool
     needs_replan: bool
+    step_failed: bool
     done: bool
     success: bool
     final_answer: str
     use_cot: bool
-    notes: list[str]
+    notes: Annotated[Sequence[str], AppendOnlyChannel]
+    # The environment's `snapshot()` after the last step, checkpointed so `--resume` can restore it.
+    environment_state: dict[str, Any]
 
 
 def build_initial_state(
@@ -31,6 +185,7 @@ def build_initial_state(
     return {
         "goal": goal,
         "observation": observation,
+        "previous_observation": "",
         "plan": [],
         "current_step_idx": 0,
         "action_history": [],
@@ -39,9 +194,11 @@ def build_initial_state(
         "max_steps": max_steps,
         "dynamic_replanning": dynamic_replanning,
         "needs_replan": False,
+        "step_failed": False,
         "done": False,
         "success": False,
         "final_answer": "",
         "use_cot": use_cot,
         "notes": [],
+        "environment_state": {},
     }
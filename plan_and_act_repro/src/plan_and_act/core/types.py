@@ -2,9 +2,15 @@ from __future__ import annotations
 
 from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 ActionType = Literal["click", "type", "search", "exit"]
+CacheMode = Literal["read_write", "read_only", "bypass"]
+LatencyDistribution = Literal["fixed", "uniform", "exponential", "lognormal"]
+MalformedKind = Literal["truncated", "trailing_comma", "prose", "not_json"]
+ReplanTrigger = Literal[
+    "always", "tool_failure", "plan_exhausted", "every_n_steps", "observation_novelty", "success_criteria"
+]
 
 
 class ModelConfig(BaseModel):
@@ -13,11 +19,241 @@ class ModelConfig(BaseModel):
     temperature: float = 0.0
 
 
+class CheckpointConfig(BaseModel):
+    enabled: bool = False
+    path: str = "data/checkpoints/episodes.sqlite"
+
+
+class ContextConfig(BaseModel):
+    """Token budgets for the history, plan and observation sections of agent prompts."""
+
+    # Off by default: budgeted prompts differ from the paper's full dumps; opt in per run.
+    enabled: bool = False
+    recent_actions: int = Field(default=6, ge=0)
+    history_tokens: int = Field(default=600, ge=16)
+    plan_tokens: int = Field(default=400, ge=16)
+    observation_tokens: int = Field(default=800, ge=16)
+    max_argument_chars: int = Field(default=80, ge=8)
+
+
+class ObservationConfig(BaseModel):
+    """How tool results are compacted into observations and paged back on demand."""
+
+    # Off by default: compacted observations change what the executor sees; opt in per run.
+    enabled: bool = False
+    max_text_chars: int = Field(default=300, ge=16)
+    max_list_items: int = Field(default=5, ge=1)
+    max_depth: int = Field(default=3, ge=1)
+    page_chars: int = Field(default=2000, ge=100)
+    page_items: int = Field(default=10, ge=1)
+    max_entries: int = Field(default=64, ge=1)
+
+
+class ReplanPolicyConfig(BaseModel):
+    """When dynamic replanning calls the replanner; any listed trigger firing is enough."""
+
+    # The paper replans after every step; the cheaper triggers are opt-in.
+    triggers: list[ReplanTrigger] = Field(default_factory=lambda: ["always"], min_length=1)
+    every_n_steps: int = Field(default=3, ge=1)
+    novelty_threshold: float = Field(default=0.6, ge=0, le=1)
+    criteria_min_overlap: float = Field(default=0.5, ge=0, le=1)
+
+
 class RuntimeConfig(BaseModel):
     experiment_name: str = "plan_and_act_baseline"
     seed: int = 42
     max_steps: int = Field(default=8, ge=1)
     dynamic_replanning: bool = True
+    replan_policy: ReplanPolicyConfig = Field(default_factory=ReplanPolicyConfig)
     use_cot: bool = False
     save_artifacts: bool = True
     artifact_dir: str = "artifacts/runs"
+    checkpoint: CheckpointConfig = Field(default_factory=CheckpointConfig)
+    context: ContextConfig = Field(default_factory=ContextConfig)
+    observations: ObservationConfig = Field(default_factory=ObservationConfig)
+
+
+class ClientPoolConfig(BaseModel):
+    max_connections: int = Field(default=32, ge=1)
+    max_keepalive_connections: int = Field(default=16, ge=0)
+    keepalive_expiry_s: float = Field(default=120.0, gt=0)
+    http2: bool = True
+    timeout_s: float = Field(default=120.0, gt=0)
+    default_model_concurrency: int = Field(default=0, ge=0)
+    model_concurrency: dict[str, int] = Field(default_factory=dict)
+
+
+class LLMCacheConfig(BaseModel):
+    enabled: bool = False
+    path: str = "data/cache/llm_responses.sqlite"
+    mode: CacheMode = "read_write"
+    deterministic_only: bool = True
+    ttl_s: float = Field(default=0.0, ge=0)
+    max_entries: int = Field(default=100_000, ge=0)
+    max_bytes: int = Field(default=512 * 1024 * 1024, ge=0)
+
+
+class PlanLibraryConfig(BaseModel):
+    enabled: bool = False
+    path: str = "data/cache/plan_library.sqlite"
+    # Jaccard similarity of goal templates needed to reuse a stored plan.
+    min_similarity: float = Field(default=0.8, gt=0, le=1)
+    num_perm: int = Field(default=64, ge=8)
+    bands: int = Field(default=16, ge=1)
+    max_entries: int = Field(default=50_000, ge=0)
+
+    @model_validator(mode="after")
+    def _bands_divide_permutations(self) -> PlanLibraryConfig:
+        if self.num_perm % self.bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        return self
+
+
+class ModelRateLimit(BaseModel):
+    # Requests and tokens per minute; 0 leaves that dimension unlimited.
+    rpm: int = Field(default=0, ge=0)
+    tpm: int = Field(default=0, ge=0)
+
+
+class RateLimitConfig(BaseModel):
+    """Client-side RPM/TPM limits per model, shared by all agents of a process (or coordinator)."""
+
+    enabled: bool = False
+    # Keys match a model name exactly or as a prefix, like `pricing`.
+    models: dict[str, ModelRateLimit] = Field(default_factory=dict)
+    default_rpm: int = Field(default=0, ge=0)
+    default_tpm: int = Field(default=0, ge=0)
+    # Completion tokens reserved per call on top of the estimated prompt; settled from usage.
+    completion_tokens_estimate: int = Field(default=512, ge=0)
+    adapt_to_headers: bool = True
+    # Lower values are served first; components not listed get default_priority.
+    priorities: dict[str, int] = Field(default_factory=lambda: {"executor": 0, "planner": 1, "replanner": 1, "judge": 5})
+    default_priority: int = 3
+    max_wait_s: float = Field(default=300.0, gt=0)
+    # 429s are retried after the provider's retry-after (at least min_backoff_s) up to this many times.
+    max_rate_limit_retries: int = Field(default=6, ge=0)
+    min_backoff_s: float = Field(default=0.5, ge=0)
+    # host:port of a `RateLimitCoordinator` shared by worker processes; empty limits in-process.
+    coordinator: str = ""
+    # Hex authkey of that coordinator; set by run_batch for its workers and never serialised.
+    coordinator_authkey: str = Field(default="", exclude=True, repr=False)
+
+
+class CallDeadlineConfig(BaseModel):
+    """Per-component deadlines for chat_json requests and optional hedged duplicates."""
+
+    # Seconds per trace component (planner, executor, ...); 0 or unlisted falls back to default_deadline_s.
+    deadlines_s: dict[str, float] = Field(default_factory=dict)
+    # 0 disables the deadline for unlisted components.
+    default_deadline_s: float = Field(default=0.0, ge=0)
+    # Send a duplicate request once the first has been pending longer than the
+    # hedge_percentile of recent latencies of the same model and component.
+    hedge: bool = False
+    hedge_percentile: float = Field(default=90.0, gt=0, le=100)
+    hedge_min_samples: int = Field(default=20, ge=1)
+    hedge_min_delay_s: float = Field(default=0.0, ge=0)
+    latency_window: int = Field(default=200, ge=1)
+    # Threads for the requests of hedged sync calls (two per call while a hedge is out).
+    hedge_pool_workers: int = Field(default=16, ge=2)
+
+
+class JSONRepairConfig(BaseModel):
+    """Recovery of malformed or schema-invalid completions before the request is retried."""
+
+    enabled: bool = True
+    # Coerce near-miss fields (types, Literal case, wrappers) against the caller's schema.
+    coerce: bool = True
+    # Last resort: a short follow-up call that sends only the broken output back for fixing.
+    follow_up: bool = True
+    follow_up_max_chars: int = Field(default=8000, ge=0)
+    follow_up_system_prompt: str = (
+        "The text below was meant to be a single JSON object but is malformed or incomplete. "
+        "Return only the corrected JSON object, keeping its content."
+    )
+
+
+class ModelPrice(BaseModel):
+    """USD per 1M tokens, as listed on the provider's price sheet."""
+
+    prompt_per_1m: float = Field(default=0.0, ge=0)
+    completion_per_1m: float = Field(default=0.0, ge=0)
+
+
+class LLMConfig(BaseModel):
+    client_pool: ClientPoolConfig = Field(default_factory=ClientPoolConfig)
+    cache: LLMCacheConfig = Field(default_factory=LLMCacheConfig)
+    plan_library: PlanLibraryConfig = Field(default_factory=PlanLibraryConfig)
+    rate_limit: RateLimitConfig = Field(default_factory=RateLimitConfig)
+    deadlines: CallDeadlineConfig = Field(default_factory=CallDeadlineConfig)
+    json_repair: JSONRepairConfig = Field(default_factory=JSONRepairConfig)
+    pricing: dict[str, ModelPrice] = Field(default_factory=dict)
+
+
+class StubLatencyConfig(BaseModel):
+    """Response delay of the stub LLM server; `median_ms` is the fixed delay for `fixed`."""
+
+    distribution: LatencyDistribution = "lognormal"
+    median_ms: float = Field(default=400.0, ge=0)
+    # Spread of the lognormal distribution (sigma of the underlying normal).
+    sigma: float = Field(default=0.5, ge=0)
+    min_ms: float = Field(default=0.0, ge=0)
+    max_ms: float = Field(default=10_000.0, ge=0)
+    # Extra delay per completion token, like a streaming decoder.
+    per_completion_token_ms: float = Field(default=0.0, ge=0)
+
+
+class StubServerConfig(BaseModel):
+    """OpenAI-compatible stand-in server used for offline load tests."""
+
+    host: str = "127.0.0.1"
+    port: int = Field(default=8765, ge=0)
+    # heuristic: answers derived from the agents' heuristic fallbacks; scripted: replay `script_path`.
+    mode: Literal["heuristic", "scripted"] = "heuristic"
+    script_path: str = ""
+    # Steps of heuristic plans; 0 keeps the planner's two-step fallback plan.
+    plan_steps: int = Field(default=0, ge=0)
+    seed: int = 0
+    latency: StubLatencyConfig = Field(default_factory=StubLatencyConfig)
+    # Per-role overrides (planner, executor, replanner) of `latency`.
+    role_latency: dict[str, StubLatencyConfig] = Field(default_factory=dict)
+    # Fractions of requests answered with a 429, a 5xx, or a malformed completion.
+    rate_limit_rate: float = Field(default=0.0, ge=0, le=1)
+    server_error_rate: float = Field(default=0.0, ge=0, le=1)
+    malformed_rate: float = Field(default=0.0, ge=0, le=1)
+    malformed_kinds: list[MalformedKind] = Field(
+        default_factory=lambda: ["truncated", "trailing_comma", "prose", "not_json"]
+    )
+    retry_after_s: float = Field(default=1.0, ge=0)
+    # Server-side RPM/TPM limits enforced over a sliding minute; 0 disables them.
+    rpm_limit: int = Field(default=0, ge=0)
+    tpm_limit: int = Field(default=0, ge=0)
+    # Answer requests with response_format with a 400, like models without JSON mode.
+    reject_response_format: bool = False
+    # Multiplies the estimated token counts reported in `usage`.
+    usage_scale: float = Field(default=1.0, gt=0)
+
+
+class LoadStageConfig(BaseModel):
+    """One step of a load-test ramp: `concurrency` closed-loop workers for `duration_s`."""
+
+    concurrency: int = Field(ge=1)
+    duration_s: float = Field(default=30.0, gt=0)
+    # Target episode starts per second across all workers; 0 starts the next episode immediately.
+    arrival_rate: float = Field(default=0.0, ge=0)
+
+
+def _default_stages() -> list[LoadStageConfig]:
+    return [LoadStageConfig(concurrency=n) for n in (1, 2, 4, 8, 16)]
+
+
+class LoadTestConfig(BaseModel):
+    stub_server: StubServerConfig = Field(default_factory=StubServerConfig)
+    stages: list[LoadStageConfig] = Field(default_factory=_default_stages)
+    # Goals are assigned to episodes round-robin.
+    goals: list[str] = Field(default_factory=lambda: ["Find the top contributor of openai/openai-python"])
+    # Stop starting episodes in a stage after this many; 0 means only duration_s limits it.
+    max_episodes_per_stage: int = Field(default=0, ge=0)
+    rss_sample_interval_s: float = Field(default=0.2, gt=0)
+    # A stage whose throughput gain over the best earlier stage is below this fraction is the knee.
+    knee_min_gain: float = Field(default=0.1, ge=0)
+    report_path: str = "artifacts/loadtest/report.json"
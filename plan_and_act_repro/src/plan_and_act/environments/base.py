@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass, field
-from typing import Protocol
+from typing import Any, Protocol
 
 from plan_and_act.core.schemas import ExecutorAction
 
@@ -13,6 +14,8 @@ class EnvironmentStepResult:
     success: bool = False
     final_answer: str = ""
     notes: list[str] = field(default_factory=list)
+    # The action did not take effect (e.g. a failed tool call); a replan trigger.
+    failed: bool = False
 
 
 class EnvironmentAdapter(Protocol):
@@ -23,3 +26,21 @@ class EnvironmentAdapter(Protocol):
 
     def step(self, *, action: ExecutorAction, step_count: int) -> EnvironmentStepResult:
         """Execute one action in the environment and return resulting transition."""
+
+    async def astep(self, *, action: ExecutorAction, step_count: int) -> EnvironmentStepResult:
+        """Async variant of `step` used by the `ainvoke` graph path.
+
+        Adapters that only implement `step` inherit this default, which runs the
+        blocking call in a worker thread so it does not stall the event loop.
+        """
+        return await asyncio.to_thread(self.step, action=action, step_count=step_count)
+
+    def snapshot(self) -> dict[str, Any] | None:
+        """State that outlives a step, checkpointed with the episode; None when there is none.
+
+        Adapters that keep no state between steps inherit this default.
+        """
+        return None
+
+    def restore(self, snapshot: dict[str, Any]) -> None:
+        """Reinstate a `snapshot()` when a checkpointed episode is resumed."""
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+from plan_and_act.core.types import ObservationConfig
 from plan_and_act.environments.base import EnvironmentAdapter
 from plan_and_act.environments.simulator import GenericSimulatorEnvironment
 from plan_and_act.environments.tooling import ToolCallingEnvironment
+from plan_and_act.eval.metrics import UsageMeter
 from plan_and_act.tools.factory import build_default_tool_registry
 from plan_and_act.tracing.collector import TraceCollector
 
 
-def build_environment(kind: str, tracer: TraceCollector | None = None) -> EnvironmentAdapter:
+def build_environment(
+    kind: str,
+    tracer: TraceCollector | None = None,
+    meter: UsageMeter | None = None,
+    observations: ObservationConfig | None = None,
+) -> EnvironmentAdapter:
     normalized = kind.strip().lower()
 
     if normalized == "simulator":
@@ -22,6 +29,8 @@ def build_environment(kind: str, tracer: TraceCollector | None = None) -> Enviro
                 "search": "web_search",
             },
             tracer=tracer,
+            meter=meter,
+            observations=observations,
         )
 
     raise ValueError(f"Unsupported environment kind: '{kind}'. Expected one of: simulator, tool")
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+from collections import OrderedDict
+from typing import Any
+
+from plan_and_act.core.types import ObservationConfig
+
+READ_OBSERVATION_TOOL = "read_observation"
+
+
+class ObservationStore:
+    """Full tool results of one episode, kept off-prompt and addressable by handle.
+
+    The environment stores every tool result here and puts only a compact
+    rendering into the observation. The agent can page through the rest with
+    the `read_observation` tool. The oldest results are evicted once
+    `max_entries` is reached.
+    """
+
+    def __init__(self, config: ObservationConfig | None = None) -> None:
+        self.config = config or ObservationConfig()
+        self._results: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._next_id = 1
+
+    def put(self, result: dict[str, Any]) -> str:
+        handle = f"obs-{self._next_id}"
+        self._next_id += 1
+        self._results[handle] = result
+        while len(self._results) > self.config.max_entries:
+            self._results.popitem(last=False)
+        return handle
+
+    def get(self, handle: str) -> dict[str, Any] | None:
+        return self._results.get(handle)
+
+    def snapshot(self) -> dict[str, Any]:
+        """The stored results, oldest first, and the next handle number."""
+        return {"next_id": self._next_id, "results": [[handle, result] for handle, result in self._results.items()]}
+
+    def restore(self, snapshot: dict[str, Any]) -> None:
+        self._results = OrderedDict((handle, result) for handle, result in snapshot.get("results", []))
+        self._next_id = int(snapshot.get("next_id", len(self._results) + 1))
+
+    def read(self, handle: str, *, field: str = "", offset: int = 0, limit: int = 0) -> dict[str, Any]:
+        """One page of a stored result: a char range of a text field or an item range of a list.
+
+        `field` is a dotted path into the result (e.g. `results` or `data.items`);
+        other values are paged as their JSON text. `next_offset` is None on the last page.
+        """
+        result = self.get(handle)
+        if result is None:
+            return {"ok": False, "handle": handle, "error": f"Unknown or evicted observation handle '{handle}'"}
+        value: Any = result
+        for key in filter(None, field.split(".")):
+            if isinstance(value, dict) and key in value:
+                value = value[key]
+            elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+                value = value[int(key)]
+            else:
+                return {"ok": False, "handle": handle, "error": f"Field '{field}' not found"}
+
+        offset = max(offset, 0)
+        if isinstance(value, list):
+            limit = min(limit, self.config.page_items) if limit > 0 else self.config.page_items
+        else:
+            if not isinstance(value, str):
+                value = json.dumps(value, ensure_ascii=False, default=str)
+            limit = min(limit, self.config.page_chars) if limit > 0 else self.config.page_chars
+        end = min(offset + limit, len(value))
+        return {
+            "ok": True,
+            "handle": handle,
+            "field": field,
+            "offset": offset,
+            "total": len(value),
+            "next_offset": end if end < len(value) else None,
+            "content": value[offset:end],
+        }
+
+
+def compact_value(value: Any, config: ObservationConfig, *, depth: int = 0) -> tuple[Any, bool]:
+    """Prompt-sized copy of a tool result value and whether anything was cut."""
+    if isinstance(value, str):
+        if len(value) <= config.max_text_chars:
+            return value, False
+        return f"{value[: config.max_text_chars]}… (+{len(value) - config.max_text_chars} chars)", True
+    if isinstance(value, list):
+        if depth >= config.max_depth:
+            return f"[{len(value)} items]", bool(value)
+        items = [compact_value(item, config, depth=depth + 1) for item in value[: config.max_list_items]]
+        compacted = [item for item, _ in items]
+        cut = any(item_cut for _, item_cut in items)
+        if len(value) > config.max_list_items:
+            compacted.append(f"… (+{len(value) - config.max_list_items} more items)")
+            cut = True
+        return compacted, cut
+    if isinstance(value, dict):
+        if depth >= config.max_depth:
+            return f"{{{len(value)} keys}}", bool(value)
+        compacted_dict: dict[str, Any] = {}
+        cut = False
+        for key, item in value.items():
+            compacted_dict[key], item_cut = compact_value(item, config, depth=depth + 1)
+            cut = cut or item_cut
+        return compacted_dict, cut
+    return value, False
+
+
+def render_observation(tool_name: str, result: dict[str, Any], handle: str, config: ObservationConfig) -> str:
+    """Compact observation text for a stored tool result, with a pointer to the full copy if it was cut."""
+    compacted, cut = compact_value(result, config)
+    if not cut:
+        # Small results fit whole; the handle would only cost tokens.
+        return f"Tool[{tool_name}] returned: {json.dumps(compacted, ensure_ascii=True)}"
+    return (
+        f"Tool[{tool_name}] returned [{handle}]: {json.dumps(compacted, ensure_ascii=True)}"
+        f" (truncated; call tool:{READ_OBSERVATION_TOOL} with "
+        f'{{"handle": "{handle}", "field": <key>, "offset": <n>}} for more)'
+    )
+
+
+class ReadObservationTool:
+    """Pages through a result kept in the environment's `ObservationStore`."""
+
+    name = READ_OBSERVATION_TOOL
+
+    def __init__(self, store: ObservationStore) -> None:
+        self.store = store
+
+    def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        handle = str(arguments.get("handle", "")).strip()
+        if not handle:
+            return {"ok": False, "error": "Missing handle"}
+        try:
+            offset = int(arguments.get("offset", 0))
+            limit = int(arguments.get("limit", 0))
+        except (TypeError, ValueError):
+            return {"ok": False, "handle": handle, "error": "offset and limit must be integers"}
+        return self.store.read(handle, field=str(arguments.get("field", "")), offset=offset, limit=limit)
+
+    async def arun(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        return self.run(arguments)
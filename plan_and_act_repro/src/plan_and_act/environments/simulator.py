@@ -35,3 +35,6 @@ class GenericSimulatorEnvironment(EnvironmentAdapter):
             )
 
         return EnvironmentStepResult(observation=f"Step {step_count}: Observation updated.")
+
+    async def astep(self, *, action: ExecutorAction, step_count: int) -> EnvironmentStepResult:
+        return self.step(action=action, step_count=step_count)
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
 import json
+import time
+from typing import Any
 
 from plan_and_act.core.schemas import ExecutorAction
+from plan_and_act.core.types import ObservationConfig
 from plan_and_act.environments.base import EnvironmentAdapter, EnvironmentStepResult
+from plan_and_act.environments.observations import (
+    READ_OBSERVATION_TOOL,
+    ObservationStore,
+    ReadObservationTool,
+    compact_value,
+    render_observation,
+)
+from plan_and_act.eval.metrics import UsageMeter
 from plan_and_act.tools.base import ToolRegistry
 from plan_and_act.tracing.collector import TraceCollector
+from plan_and_act.tracing.spans import span
 
 
 class ToolCallingEnvironment(EnvironmentAdapter):
@@ -20,16 +32,35 @@ class ToolCallingEnvironment(EnvironmentAdapter):
         default_tool: str | None = None,
         action_type_tool_map: dict[str, str] | None = None,
         tracer: TraceCollector | None = None,
+        meter: UsageMeter | None = None,
+        observations: ObservationConfig | None = None,
     ) -> None:
         self.registry = registry
         self.default_tool = default_tool
         self.action_type_tool_map = action_type_tool_map or {}
         self.tracer = tracer
+        self.meter = meter
+        self.observation_config = observations or ObservationConfig()
+        self.observations = ObservationStore(self.observation_config)
+        # Environment-owned tools, resolved before the shared registry.
+        self._local_tools = (
+            {READ_OBSERVATION_TOOL: ReadObservationTool(self.observations)} if self.observation_config.enabled else {}
+        )
 
     def reset(self, *, goal: str) -> str:
-        registered = sorted(self.registry.tools.keys())
+        registered = sorted({*self.registry.tools, *self._local_tools})
         return f"Tool environment initialized for goal: {goal}. Registered tools={registered}"
 
+    def snapshot(self) -> dict[str, Any] | None:
+        # The stored results are what later `read_observation` calls and handles refer to.
+        if not self.observation_config.enabled:
+            return None
+        return {"observations": self.observations.snapshot()}
+
+    def restore(self, snapshot: dict[str, Any]) -> None:
+        if "observations" in snapshot:
+            self.observations.restore(snapshot["observations"])
+
     def _resolve_tool_name(self, action: ExecutorAction) -> str | None:
         if action.target.startswith("tool:"):
             return action.target.split(":", 1)[1].strip() or None
@@ -39,6 +70,37 @@ class ToolCallingEnvironment(EnvironmentAdapter):
         return self.default_tool
 
     def step(self, *, action: ExecutorAction, step_count: int) -> EnvironmentStepResult:
+        early = self._early_result(action, step_count)
+        if isinstance(early, EnvironmentStepResult):
+            return early
+        tool_name = early
+        self._log_tool_call_start(tool_name, action, step_count)
+        started = time.perf_counter()
+        with span(self.tracer, "tool.call", step=step_count, attributes={"tool_name": tool_name}):
+            local_tool = self._local_tools.get(tool_name)
+            if local_tool is not None:
+                result = local_tool.run(action.arguments)
+            else:
+                result = self.registry.call(tool_name, action.arguments)
+        return self._tool_result(tool_name, result, step_count, started)
+
+    async def astep(self, *, action: ExecutorAction, step_count: int) -> EnvironmentStepResult:
+        early = self._early_result(action, step_count)
+        if isinstance(early, EnvironmentStepResult):
+            return early
+        tool_name = early
+        self._log_tool_call_start(tool_name, action, step_count)
+        started = time.perf_counter()
+        with span(self.tracer, "tool.call", step=step_count, attributes={"tool_name": tool_name}):
+            local_tool = self._local_tools.get(tool_name)
+            if local_tool is not None:
+                result = await local_tool.arun(action.arguments)
+            else:
+                result = await self.registry.acall(tool_name, action.arguments)
+        return self._tool_result(tool_name, result, step_count, started)
+
+    def _early_result(self, action: ExecutorAction, step_count: int) -> EnvironmentStepResult | str:
+        """Resolve the tool to call, or return the transition when no tool call is needed."""
         if action.action_type == "exit":
             return EnvironmentStepResult(
                 observation=f"Step {step_count}: Exit action requested.",
@@ -53,7 +115,7 @@ class ToolCallingEnvironment(EnvironmentAdapter):
                 self.tracer.log_event(
                     event_type="tool_call_end",
                     step=step_count,
-                    payload={
+                    payload=lambda: {
                         "tool_name": "",
                         "ok": False,
                         "error": "no_tool_selected",
@@ -67,32 +129,59 @@ class ToolCallingEnvironment(EnvironmentAdapter):
                     f"Step {step_count}: No tool selected for action_type='{action.action_type}'. "
                     f"Set target='tool:<name>' or configure a default tool."
                 ),
+                failed=True,
             )
+        return tool_name
 
+    def _log_tool_call_start(self, tool_name: str, action: ExecutorAction, step_count: int) -> None:
         if self.tracer:
             self.tracer.log_event(
                 event_type="tool_call_start",
                 step=step_count,
-                payload={
+                payload=lambda: {
                     "tool_name": tool_name,
                     "action_type": action.action_type,
                     "target": action.target,
                     "arguments": action.arguments,
                 },
             )
-        result = self.registry.call(tool_name, action.arguments)
+
+    def _tool_result(
+        self, tool_name: str, result: dict[str, Any], step_count: int, started: float
+    ) -> EnvironmentStepResult:
+        if self.meter is not None:
+            latency_ms = (time.perf_counter() - started) * 1000
+            self.meter.record("tool", latency_ms=latency_ms, ok=bool(result.get("ok", False)))
+        handle = ""
+        if self.observation_config.enabled and tool_name not in self._local_tools:
+            handle = self.observations.put(result)
         if self.tracer:
             self.tracer.log_event(
                 event_type="tool_call_end",
                 step=step_count,
-                payload={
+                payload=lambda: {
                     "tool_name": tool_name,
                     "ok": bool(result.get("ok", False)),
                     "result": result,
+                    "observation_handle": handle,
                 },
             )
-        observation = (
-            f"Step {step_count}: Tool[{tool_name}] returned: {json.dumps(result, ensure_ascii=True)}"
-        )
-        notes: list[str] = [] if result.get("ok", False) else [f"Tool call failed: {result.get('error', 'unknown')}."]
-        return EnvironmentStepResult(observation=observation, notes=notes)
+        observation = f"Step {step_count}: {self._render_result(tool_name, result, handle)}"
+        ok = bool(result.get("ok", False))
+        notes: list[str] = [] if ok else [f"Tool call failed: {result.get('error', 'unknown')}."]
+        return EnvironmentStepResult(observation=observation, notes=notes, failed=not ok)
+
+    def _render_result(self, tool_name: str, result: dict[str, Any], handle: str) -> str:
+        cfg = self.observation_config
+        if handle:
+            return render_observation(tool_name, result, handle, cfg)
+        if tool_name in self._local_tools:
+            # A page the agent asked for is already bounded by the page size; compacting it to the
+            # observation limits again would drop items the next page's offset skips. Items sit one
+            # level below the page's `content`, so they keep the depth a top-level result gets.
+            page_config = cfg.model_copy(
+                update={"max_text_chars": cfg.page_chars, "max_list_items": cfg.page_items, "max_depth": cfg.max_depth + 1}
+            )
+            page, _ = compact_value(result, page_config)
+            return f"Tool[{tool_name}] returned: {json.dumps(page, ensure_ascii=True)}"
+        return f"Tool[{tool_name}] returned: {json.dumps(result, ensure_ascii=True)}"
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+import orjson
+
+from plan_and_act.eval.episode import (
+    EpisodeSettings,
+    aexecute_episode,
+    configure_llm_runtime,
+    execute_episode,
+    new_run_id,
+)
+from plan_and_act.eval.metrics import percentile
+from plan_and_act.utils.rate_limit import RateLimitCoordinator
+from plan_and_act.utils.seeding import set_seed
+
+WorkerMode = Literal["thread", "process", "asyncio"]
+_EPISODE_OVERRIDE_KEYS = ("dynamic_replanning", "use_cot", "max_steps")
+
+
+@dataclass(frozen=True)
+class BatchGoal:
+    index: int
+    goal: str
+    overrides: dict[str, Any]
+
+
+def load_goals(path: str | Path) -> list[BatchGoal]:
+    """Read one goal per JSONL line: {"goal": ..., optional runtime overrides}.
+
+    A bare JSON string per line is accepted as shorthand for {"goal": ...}.
+    """
+    goals: list[BatchGoal] = []
+    with Path(path).open("rb") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = orjson.loads(line)
+            if isinstance(record, str):
+                record = {"goal": record}
+            goal = str(record.get("goal", "")).strip() if isinstance(record, dict) else ""
+            if not goal:
+                raise ValueError(f"{path}:{line_no} has no 'goal'")
+            overrides = {key: record[key] for key in _EPISODE_OVERRIDE_KEYS if key in record}
+            goals.append(BatchGoal(index=len(goals), goal=goal, overrides=overrides))
+    return goals
+
+
+def _settings_for(settings: EpisodeSettings, item: BatchGoal) -> EpisodeSettings:
+    if not item.overrides:
+        return settings
+    return settings.model_copy(update={"runtime": settings.runtime.model_copy(update=item.overrides)})
+
+
+def _result_row(item: BatchGoal, run_id: str, started: float, outcome: dict[str, Any] | None, error: str) -> dict[str, Any]:
+    row: dict[str, Any] = {
+        "index": item.index,
+        "goal": item.goal,
+        "run_id": run_id,
+        "ok": not error,
+        "latency_s": round(time.perf_counter() - started, 4),
+        "error": error,
+    }
+    if outcome is not None:
+        row.update(
+            {
+                "success": outcome["success"],
+                "step_count": outcome["step_count"],
+                "final_answer": outcome["final_answer"],
+                "metrics": outcome["metrics"],
+            }
+        )
+    else:
+        row["success"] = False
+    return row
+
+
+def _run_one(item: BatchGoal, settings: EpisodeSettings) -> dict[str, Any]:
+    run_id = new_run_id()
+    started = time.perf_counter()
+    try:
+        outcome = execute_episode(item.goal, _settings_for(settings, item), run_id=run_id)
+    except Exception as exc:
+        return _result_row(item, run_id, started, None, f"{type(exc).__name__}: {exc}")
+    return _result_row(item, run_id, started, outcome, "")
+
+
+async def _arun_one(item: BatchGoal, settings: EpisodeSettings) -> dict[str, Any]:
+    run_id = new_run_id()
+    started = time.perf_counter()
+    try:
+        outcome = await aexecute_episode(item.goal, _settings_for(settings, item), run_id=run_id)
+    except Exception as exc:
+        return _result_row(item, run_id, started, None, f"{type(exc).__name__}: {exc}")
+    return _result_row(item, run_id, started, outcome, "")
+
+
+_worker_settings: EpisodeSettings | None = None
+
+
+def _init_process_worker(settings: EpisodeSettings) -> None:
+    # Imports, config parsing and client pools are paid once per worker process, not per goal.
+    global _worker_settings
+    _worker_settings = settings
+    set_seed(settings.runtime.seed)
+    configure_llm_runtime(settings)
+
+
+def _process_run_one(item: BatchGoal) -> dict[str, Any]:
+    assert _worker_settings is not None, "worker process was not initialised"
+    return _run_one(item, _worker_settings)
+
+
+class _ResultSink:
+    """Appends finished episodes to the results file as soon as they complete."""
+
+    def __init__(self, path: Path, on_result: Callable[[dict[str, Any]], None] | None) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("ab")
+        self._lock = threading.Lock()
+        self._on_result = on_result
+        self.rows: list[dict[str, Any]] = []
+
+    def write(self, row: dict[str, Any]) -> None:
+        with self._lock:
+            self._file.write(orjson.dumps(row) + b"\n")
+            self._file.flush()
+            self.rows.append(row)
+        if self._on_result is not None:
+            self._on_result(row)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def summarize_batch(rows: list[dict[str, Any]], wall_time_s: float) -> dict[str, Any]:
+    latencies = [row["latency_s"] for row in rows]
+    costs = [row["metrics"]["token_cost_usd"] for row in rows if "token_cost_usd" in row.get("metrics", {})]
+    total = len(rows)
+    return {
+        "episodes": total,
+        "errors": sum(1 for row in rows if not row["ok"]),
+        "success_rate": round(sum(1 for row in rows if row["success"]) / total, 4) if total else 0.0,
+        "wall_time_s": round(wall_time_s, 4),
+        "throughput_eps_per_s": round(total / wall_time_s, 4) if wall_time_s > 0 else 0.0,
+        "latency_p50_s": round(percentile(latencies, 50), 4),
+        "latency_p95_s": round(percentile(latencies, 95), 4),
+        "token_cost_per_episode": round(sum(costs) / len(costs), 6) if costs else 0.0,
+    }
+
+
+def run_batch(
+    goals: list[BatchGoal],
+    settings: EpisodeSettings,
+    *,
+    output_path: str | Path,
+    workers: int = 4,
+    mode: WorkerMode = "thread",
+    on_result: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """Run every goal on a shared worker pool and stream one JSONL row per finished episode."""
+    workers = max(1, workers)
+    sink = _ResultSink(Path(output_path), on_result)
+    started = time.perf_counter()
+    try:
+        if mode == "asyncio":
+            asyncio.run(_run_asyncio(goals, settings, workers, sink))
+        elif mode == "process":
+            with _shared_rate_limit(settings) as worker_settings, ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_process_worker,
+                initargs=(worker_settings,),
+            ) as pool:
+                _drain([pool.submit(_process_run_one, item) for item in goals], sink)
+        elif mode == "thread":
+            set_seed(settings.runtime.seed)
+            configure_llm_runtime(settings)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                _drain([pool.submit(_run_one, item, settings) for item in goals], sink)
+        else:
+            raise ValueError(f"Unsupported worker mode: '{mode}'. Expected one of: thread, process, asyncio")
+    finally:
+        sink.close()
+    return summarize_batch(sink.rows, time.perf_counter() - started)
+
+
+@contextmanager
+def _shared_rate_limit(settings: EpisodeSettings) -> Iterator[EpisodeSettings]:
+    """Serve one rate limiter from this process so worker processes share its buckets."""
+    rate_limit = settings.llm.rate_limit
+    if not rate_limit.enabled or rate_limit.coordinator:
+        yield settings
+        return
+    coordinator = RateLimitCoordinator(rate_limit)
+    address = coordinator.start()
+    try:
+        worker_rate_limit = rate_limit.model_copy(update={"coordinator": address, "coordinator_authkey": coordinator.authkey.hex()})
+        llm = settings.llm.model_copy(update={"rate_limit": worker_rate_limit})
+        yield settings.model_copy(update={"llm": llm})
+    finally:
+        coordinator.stop()
+
+
+def _drain(futures: list[Future[dict[str, Any]]], sink: _ResultSink) -> None:
+    for future in as_completed(futures):
+        sink.write(future.result())
+
+
+async def _run_asyncio(goals: list[BatchGoal], settings: EpisodeSettings, workers: int, sink: _ResultSink) -> None:
+    set_seed(settings.runtime.seed)
+    configure_llm_runtime(settings)
+    limit = asyncio.Semaphore(workers)
+
+    async def _bounded(item: BatchGoal) -> dict[str, Any]:
+        async with limit:
+            return await _arun_one(item, settings)
+
+    for next_done in asyncio.as_completed([_bounded(item) for item in goals]):
+        sink.write(await next_done)
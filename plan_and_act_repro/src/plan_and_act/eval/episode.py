@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import os
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from plan_and_act.agents.executor import ExecutorAgent
+from plan_and_act.agents.plan_library import configure_plan_library, get_plan_library
+from plan_and_act.agents.planner import PlannerAgent
+from plan_and_act.agents.replanner import ReplannerAgent
+from plan_and_act.core.schemas import EpisodeArtifact
+from plan_and_act.core.state import PlanActState, build_initial_state, plain_state
+from plan_and_act.core.types import LLMConfig, ModelConfig, RuntimeConfig
+from plan_and_act.environments.base import EnvironmentAdapter
+from plan_and_act.environments.factory import build_environment
+from plan_and_act.eval.metrics import UsageMeter, compute_episode_metrics
+from plan_and_act.graph.checkpoint import SqliteCheckpointer, get_sqlite_checkpointer, thread_config
+from plan_and_act.graph.replan_policies import build_replan_policy
+from plan_and_act.graph.workflow import build_workflow
+from plan_and_act.prompts.templates import PromptTemplates
+from plan_and_act.tracing import TraceCollector, TraceConfig
+from plan_and_act.utils.io import load_yaml, write_json
+from plan_and_act.utils.deadlines import configure_call_deadlines, get_call_deadlines
+from plan_and_act.utils.json_repair import configure_json_repairer, get_json_repairer
+from plan_and_act.utils.llm import configure_client_registry, get_client_registry
+from plan_and_act.utils.llm_cache import configure_response_cache, get_response_cache
+from plan_and_act.utils.rate_limit import configure_rate_limiter
+
+
+class EpisodeSettings(BaseModel):
+    """Everything needed to run episodes, loaded once and shared by all of them."""
+
+    runtime: RuntimeConfig
+    models: dict[str, ModelConfig]
+    trace: TraceConfig
+    llm: LLMConfig = Field(default_factory=LLMConfig)
+    environment: str = "simulator"
+    prompts_dir: str = "configs/prompts"
+
+
+def load_episode_settings(
+    *,
+    base_config: str,
+    model_config: str,
+    trace_config: str,
+    llm_config: str,
+    environment: str,
+    trace: bool = False,
+    overrides: dict[str, Any] | None = None,
+) -> EpisodeSettings:
+    runtime_cfg = RuntimeConfig.model_validate(load_yaml(base_config))
+    if overrides:
+        runtime_cfg = runtime_cfg.model_copy(update=overrides)
+
+    model_data = load_yaml(model_config)
+    trace_cfg = TraceConfig.model_validate(load_yaml(trace_config))
+    if trace:
+        trace_cfg.enabled = True
+
+    return EpisodeSettings(
+        runtime=runtime_cfg,
+        models={
+            "planner": ModelConfig.model_validate(model_data.get("planner", {})),
+            "executor": ModelConfig.model_validate(model_data.get("executor", {})),
+            "replanner": ModelConfig.model_validate(model_data.get("replanner", {})),
+        },
+        trace=trace_cfg,
+        llm=LLMConfig.model_validate(load_yaml(llm_config)),
+        environment=environment,
+    )
+
+
+def configure_llm_runtime(settings: EpisodeSettings) -> None:
+    """Install the process-wide LLM runtime (client pool, cache, plan library, limits, JSON repair)."""
+    configure_client_registry(settings.llm.client_pool)
+    configure_response_cache(settings.llm.cache)
+    configure_plan_library(settings.llm.plan_library)
+    configure_rate_limiter(settings.llm.rate_limit)
+    configure_call_deadlines(settings.llm.deadlines)
+    configure_json_repairer(settings.llm.json_repair)
+
+
+def new_run_id() -> str:
+    """Sortable run id that stays unique across threads and processes started in the same second."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    return f"{stamp}_{uuid.uuid4().hex[:8]}"
+
+
+class _PreparedEpisode:
+    def __init__(
+        self,
+        goal: str,
+        settings: EpisodeSettings,
+        run_id: str,
+        resume_from: dict[str, Any] | None = None,
+    ) -> None:
+        self.goal = goal
+        self.settings = settings
+        self.run_id = run_id
+        model_cfgs = settings.models
+
+        checkpoint_cfg = settings.runtime.checkpoint
+        self.checkpointer: SqliteCheckpointer | None = None
+        if checkpoint_cfg.enabled or resume_from is not None:
+            self.checkpointer = get_sqlite_checkpointer(checkpoint_cfg.path)
+
+        self.tracer = TraceCollector(config=settings.trace, run_id=run_id)
+        # Counts the calls made by this process only; a resumed episode reports its resumed part.
+        self.meter = UsageMeter()
+        self.env_adapter: EnvironmentAdapter = build_environment(
+            settings.environment,
+            tracer=self.tracer,
+            meter=self.meter,
+            observations=settings.runtime.observations,
+        )
+
+        prompts = PromptTemplates(config_dir=settings.prompts_dir)
+        agent_kwargs = {"tracer": self.tracer, "meter": self.meter, "context": settings.runtime.context}
+        self.planner = PlannerAgent(model_cfgs["planner"], prompts, plan_library=get_plan_library(), **agent_kwargs)
+        executor = ExecutorAgent(model_cfgs["executor"], prompts, **agent_kwargs)
+        replanner = ReplannerAgent(model_cfgs["replanner"], prompts, **agent_kwargs)
+        if resume_from is None or not self.tracer.resume_session():
+            self.tracer.start_session(
+                goal=goal,
+                environment={"kind": settings.environment, "name": self.env_adapter.name},
+                model_stack={name: cfg.model_dump() for name, cfg in model_cfgs.items()},
+                runtime_config=settings.runtime.model_dump(),
+            )
+
+        self.workflow = build_workflow(
+            self.planner,
+            executor,
+            replanner,
+            self.env_adapter,
+            self.tracer,
+            checkpointer=self.checkpointer,
+            replan_policy=build_replan_policy(settings.runtime.replan_policy),
+        )
+        if resume_from is None:
+            self.start_step = 0
+            # A state dict starts a fresh thread; `None` continues the checkpointed one.
+            self.workflow_input: PlanActState | None = build_initial_state(
+                goal=goal,
+                max_steps=settings.runtime.max_steps,
+                dynamic_replanning=settings.runtime.dynamic_replanning,
+                use_cot=settings.runtime.use_cot,
+                observation=self.env_adapter.reset(goal=goal),
+            )
+        else:
+            self.start_step = int(resume_from.get("step_count", 0))
+            self.workflow_input = None
+            # Tool results the checkpointed steps stored, so their handles still resolve.
+            self.env_adapter.restore(resume_from.get("environment_state") or {})
+            self.tracer.log_event(
+                event_type="episode_resumed",
+                step=self.start_step,
+                payload={"plan_length": len(resume_from.get("plan", [])), "done": bool(resume_from.get("done"))},
+            )
+
+    def invoke_kwargs(self) -> dict[str, Any]:
+        if self.checkpointer is None:
+            return {}
+        return {"config": thread_config(self.run_id)}
+
+    def fail(self, exc: Exception) -> None:
+        self.tracer.log_event(
+            event_type="episode_error",
+            step=self.start_step,
+            payload={"error_type": type(exc).__name__, "error_message": str(exc)},
+        )
+        # A crashed episode counts against a reused library plan like any other failure.
+        self.planner.record_outcome(success=False, run_id=self.run_id)
+        self.tracer.close(
+            status="failed",
+            summary={"error_type": type(exc).__name__, "error_message": str(exc)},
+        )
+
+    def finish(self, final_state: dict[str, Any]) -> dict[str, Any]:
+        final_state = plain_state(final_state)
+        # Only there for resuming; the full tool results are already in the trace.
+        final_state.pop("environment_state", None)
+        settings = self.settings
+        metrics = compute_episode_metrics(final_state, self.meter, settings.llm.pricing)
+        self.tracer.log_event(
+            event_type="episode_end",
+            step=int(final_state.get("step_count", 0)),
+            payload={
+                "success": bool(final_state.get("success", False)),
+                "final_answer": str(final_state.get("final_answer", "")),
+                "metrics": metrics,
+            },
+        )
+        self.planner.record_outcome(success=bool(final_state.get("success", False)), run_id=self.run_id)
+        llm_cache = get_response_cache()
+        plan_library = get_plan_library()
+        deadlines = get_call_deadlines()
+        self.tracer.close(
+            status="completed",
+            summary={
+                "success": bool(final_state.get("success", False)),
+                "step_count": int(final_state.get("step_count", 0)),
+                "metrics": metrics,
+                "llm_client_pool": get_client_registry().stats(),
+                "llm_cache": llm_cache.stats() if llm_cache else {"mode": "disabled"},
+                "plan_library": plan_library.stats() if plan_library else {"enabled": False},
+                "llm_deadlines": deadlines.stats() if deadlines else {"enabled": False},
+                "json_repair": get_json_repairer().stats(),
+            },
+        )
+
+        artifact = EpisodeArtifact(
+            run_id=self.run_id,
+            goal=self.goal,
+            success=bool(final_state.get("success", False)),
+            step_count=int(final_state.get("step_count", 0)),
+            final_answer=str(final_state.get("final_answer", "")),
+            action_history=final_state.get("action_history", []),
+            notes=final_state.get("notes", []),
+        )
+
+        if settings.runtime.save_artifacts:
+            out_dir = Path(settings.runtime.artifact_dir)
+            out_dir.mkdir(parents=True, exist_ok=True)
+            write_json(out_dir / f"episode_{self.run_id}.json", {
+                "config": settings.runtime.model_dump(),
+                "model": {name: cfg.model_dump() for name, cfg in settings.models.items()},
+                "environment": {
+                    "name": self.env_adapter.name,
+                    "kind": settings.environment,
+                },
+                "metrics": metrics,
+                "final_state": final_state,
+                "artifact": artifact.model_dump(),
+            })
+
+        if self.checkpointer is not None:
+            # Finished episodes have nothing left to resume.
+            self.checkpointer.delete_thread(self.run_id)
+
+        return {
+            "run_id": self.run_id,
+            "success": artifact.success,
+            "step_count": artifact.step_count,
+            "final_answer": artifact.final_answer,
+            "metrics": metrics,
+            "environment": self.env_adapter.name,
+            "trace_enabled": settings.trace.enabled,
+            "trace_run_id": self.run_id if settings.trace.enabled else "",
+            "used_openai_key": bool(os.getenv("OPENAI_API_KEY", "").strip()),
+        }
+
+
+def execute_episode(goal: str, settings: EpisodeSettings, run_id: str | None = None) -> dict[str, Any]:
+    """Run one episode with `workflow.invoke` and persist its trace and artifact."""
+    return _run_prepared(_PreparedEpisode(goal, settings, run_id or new_run_id()))
+
+
+def resume_episode(run_id: str, settings: EpisodeSettings) -> dict[str, Any]:
+    """Continue a crashed episode from the last node its checkpoint recorded."""
+    values = load_checkpointed_state(run_id, settings)
+    return _run_prepared(_PreparedEpisode(str(values["goal"]), settings, run_id, resume_from=values))
+
+
+def load_checkpointed_state(run_id: str, settings: EpisodeSettings) -> dict[str, Any]:
+    path = settings.runtime.checkpoint.path
+    snapshot = get_sqlite_checkpointer(path).get_tuple(thread_config(run_id))
+    if snapshot is None:
+        raise ValueError(f"No checkpoint for run_id '{run_id}' in {path}")
+    return dict(snapshot.checkpoint["channel_values"])
+
+
+def _run_prepared(episode: _PreparedEpisode) -> dict[str, Any]:
+    try:
+        final_state: dict[str, Any] = episode.workflow.invoke(episode.workflow_input, **episode.invoke_kwargs())
+    except Exception as exc:
+        episode.fail(exc)
+        raise
+    return episode.finish(final_state)
+
+
+async def aexecute_episode(goal: str, settings: EpisodeSettings, run_id: str | None = None) -> dict[str, Any]:
+    """Async twin of `execute_episode` built on `workflow.ainvoke`."""
+    episode = _PreparedEpisode(goal, settings, run_id or new_run_id())
+    try:
+        final_state: dict[str, Any] = await episode.workflow.ainvoke(episode.workflow_input, **episode.invoke_kwargs())
+    except Exception as exc:
+        episode.fail(exc)
+        raise
+    return episode.finish(final_state)
@@ -1,17 +1,156 @@
 from __future__ import annotations
 
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
 from typing import Any
 
+from plan_and_act.core.types import ModelPrice
 
-def compute_episode_metrics(state: dict[str, Any]) -> dict[str, Any]:
+COMPONENTS = ("planner", "executor", "replanner", "tool")
+_TOKEN_KEYS = ("prompt_tokens", "completion_tokens", "total_tokens")
+
+
+@dataclass(frozen=True)
+class _Call:
+    component: str
+    model: str
+    latency_ms: float
+    ok: bool
+    cache_hit: bool
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+
+
+class UsageMeter:
+    """Collects per-call latency and token usage of one episode, grouped by component.
+
+    Agents feed it through the LLM clients' usage hook and the tool environment
+    records each tool call; `breakdown` turns the calls into per-component
+    totals. Recording is thread-safe because sync tools and LLM calls may run
+    in worker threads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: list[_Call] = []
+
+    def record(
+        self,
+        component: str,
+        *,
+        latency_ms: float,
+        usage: Mapping[str, Any] | None = None,
+        model: str = "",
+        ok: bool = True,
+        cache_hit: bool = False,
+    ) -> None:
+        usage = usage or {}
+        tokens = [int(usage.get(key) or 0) for key in _TOKEN_KEYS]
+        call = _Call(component or "unknown", model, float(latency_ms), ok, cache_hit, *tokens)
+        with self._lock:
+            self._calls.append(call)
+
+    def record_llm_call(self, payload: dict[str, Any]) -> None:
+        """`LLMUsageHook` adapter: records one chat_json call of an agent.
+
+        Tokens of hedged or timed-out requests whose answer was not used
+        (`extra_usage`) are billed to the call as well.
+        """
+        usage = dict(payload.get("usage") or {})
+        for key, value in (payload.get("extra_usage") or {}).items():
+            usage[key] = int(usage.get(key) or 0) + int(value or 0)
+        self.record(
+            str(payload.get("component", "")),
+            latency_ms=payload.get("latency_ms", 0.0),
+            usage=usage,
+            model=str(payload.get("model", "")),
+            ok=payload.get("status") == "success",
+            cache_hit=bool(payload.get("cache_hit", False)),
+        )
+
+    def calls(self) -> list[_Call]:
+        """Snapshot of the recorded calls, oldest first."""
+        with self._lock:
+            return list(self._calls)
+
+    def breakdown(self, pricing: Mapping[str, ModelPrice] | None = None) -> dict[str, dict[str, Any]]:
+        """Per-component calls, errors, total/p95 latency, tokens and estimated cost.
+
+        Cache hits count as calls but add no tokens or cost: the provider was not billed for them.
+        """
+        calls = self.calls()
+        pricing = pricing or {}
+        grouped: dict[str, list[_Call]] = {name: [] for name in COMPONENTS}
+        for call in calls:
+            grouped.setdefault(call.component, []).append(call)
+
+        result: dict[str, dict[str, Any]] = {}
+        for component, items in grouped.items():
+            billed = [call for call in items if not call.cache_hit]
+            cost = 0.0
+            for call in billed:
+                price = price_for(call.model, pricing)
+                if price is not None:
+                    cost += (call.prompt_tokens * price.prompt_per_1m + call.completion_tokens * price.completion_per_1m) / 1e6
+            latencies = [call.latency_ms for call in items]
+            result[component] = {
+                "calls": len(items),
+                "errors": sum(1 for call in items if not call.ok),
+                "cache_hits": len(items) - len(billed),
+                "latency_total_ms": round(sum(latencies), 3),
+                "latency_p95_ms": round(percentile(latencies, 95), 3),
+                **{key: sum(getattr(call, key) for call in billed) for key in _TOKEN_KEYS},
+                "cost_usd": round(cost, 6),
+            }
+        return result
+
+
+def price_for(model: str, pricing: Mapping[str, ModelPrice]) -> ModelPrice | None:
+    """Price of `model`: an exact key, else the longest key it starts with (dated snapshots)."""
+    if not model:
+        return None
+    if model in pricing:
+        return pricing[model]
+    prefixes = [key for key in pricing if model.startswith(key)]
+    return pricing[max(prefixes, key=len)] if prefixes else None
+
+
+def compute_episode_metrics(
+    state: dict[str, Any],
+    meter: UsageMeter | None = None,
+    pricing: Mapping[str, ModelPrice] | None = None,
+) -> dict[str, Any]:
     step_count = int(state.get("step_count", 0))
     success = bool(state.get("success", False))
     action_history = state.get("action_history", [])
     replans = sum(1 for n in state.get("notes", []) if "Replanned" in n)
 
-    return {
+    metrics: dict[str, Any] = {
         "task_success": success,
         "step_count": step_count,
         "actions_taken": len(action_history),
         "replans": replans,
     }
+    if meter is not None:
+        components = meter.breakdown(pricing)
+        metrics.update(
+            {
+                "total_tokens": sum(row["total_tokens"] for row in components.values()),
+                "token_cost_usd": round(sum(row["cost_usd"] for row in components.values()), 6),
+                "components": components,
+            }
+        )
+    return metrics
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Linear-interpolated percentile (q in [0, 100]); 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * (q / 100)
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
@@ -1,30 +1,34 @@
 from __future__ import annotations
 
 import os
-from datetime import datetime
 from pathlib import Path
-from typing import Any
 
 import typer
 from dotenv import load_dotenv
 from rich import print
 
-from plan_and_act.agents.executor import ExecutorAgent
-from plan_and_act.agents.planner import PlannerAgent
-from plan_and_act.agents.replanner import ReplannerAgent
-from plan_and_act.core.schemas import EpisodeArtifact
-from plan_and_act.core.state import build_initial_state
-from plan_and_act.core.types import ModelConfig, RuntimeConfig
-from plan_and_act.environments.factory import build_environment
-from plan_and_act.eval.metrics import compute_episode_metrics
-from plan_and_act.graph.workflow import build_workflow
-from plan_and_act.prompts.templates import PromptTemplates
-from plan_and_act.tracing import TraceCollector, TraceConfig
+from plan_and_act.core.types import LoadStageConfig, LoadTestConfig
+from plan_and_act.eval.batch import load_goals, run_batch
+from plan_and_act.eval.episode import (
+    configure_llm_runtime,
+    execute_episode,
+    load_episode_settings,
+    new_run_id,
+    resume_episode,
+)
+from plan_and_act.loadtest.harness import LoadTestHarness, format_report
+from plan_and_act.loadtest.stub_server import StubLLMServer
 from plan_and_act.tools.factory import build_default_tool_registry
+from plan_and_act.tracing.catalog import TraceCatalog
+from plan_and_act.tracing.columnar import export_events_to_parquet
+from plan_and_act.tracing.spans import export_spans
+from plan_and_act.training.trace_export import export_sft_from_traces
 from plan_and_act.utils.io import load_yaml, write_json
 from plan_and_act.utils.seeding import set_seed
 
 app = typer.Typer(no_args_is_help=True)
+traces_app = typer.Typer(no_args_is_help=True, help="Index and query traces across runs.")
+app.add_typer(traces_app, name="traces")
 
 
 @app.callback()
@@ -32,152 +36,104 @@ def main() -> None:
     """Run Plan-and-Act experiments and evaluations."""
 
 
-def _load_runtime_config(path: str) -> RuntimeConfig:
-    return RuntimeConfig.model_validate(load_yaml(path))
-
-
-def _load_model_configs(path: str) -> dict[str, ModelConfig]:
-    data = load_yaml(path)
-    return {
-        "planner": ModelConfig.model_validate(data.get("planner", {})),
-        "executor": ModelConfig.model_validate(data.get("executor", {})),
-        "replanner": ModelConfig.model_validate(data.get("replanner", {})),
-    }
-
-
-def _load_trace_config(path: str) -> TraceConfig:
-    return TraceConfig.model_validate(load_yaml(path))
-
-
 @app.command("run-episode")
 def run_episode(
-    goal: str = typer.Option(..., help="User goal/instruction."),
+    goal: str = typer.Option("", help="User goal/instruction."),
+    resume: str = typer.Option("", help="Run id of a checkpointed episode to continue instead of starting a new one."),
+    checkpoint: bool = typer.Option(False, help="Checkpoint state after every node so the run can be resumed."),
     base_config: str = typer.Option("configs/base.yaml", help="Path to base runtime config."),
     model_config: str = typer.Option("configs/models.yaml", help="Path to model config."),
     trace_config: str = typer.Option("configs/tracing.yaml", help="Path to tracing config."),
+    llm_config: str = typer.Option("configs/llm.yaml", help="Path to LLM client config."),
     trace: bool = typer.Option(False, help="Enable runtime trace logging for this run."),
     environment: str = typer.Option("simulator", help="Environment adapter: simulator|tool"),
-    dynamic_replanning: bool = typer.Option(True, help="Enable replanning after each action."),
+    dynamic_replanning: bool = typer.Option(
+        True, help="Enable dynamic replanning; the replan_policy in the base config decides after which steps."
+    ),
     use_cot: bool = typer.Option(False, help="Enable CoT hints in prompts."),
 ) -> None:
+    if not goal and not resume:
+        raise typer.BadParameter("Pass --goal for a new episode or --resume <run_id> to continue one.")
+
     load_dotenv()
-    runtime_cfg = _load_runtime_config(base_config)
-    model_cfgs = _load_model_configs(model_config)
-    trace_cfg = _load_trace_config(trace_config)
-    if trace:
-        trace_cfg.enabled = True
-
-    runtime_cfg = runtime_cfg.model_copy(
-        update={
+    settings = load_episode_settings(
+        base_config=base_config,
+        model_config=model_config,
+        trace_config=trace_config,
+        llm_config=llm_config,
+        environment=environment,
+        trace=trace,
+        overrides={
             "dynamic_replanning": dynamic_replanning,
             "use_cot": use_cot,
-        }
-    )
-
-    set_seed(runtime_cfg.seed)
-
-    run_id = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    tracer = TraceCollector(config=trace_cfg, run_id=run_id)
-    env_adapter = build_environment(environment, tracer=tracer)
-
-    prompts = PromptTemplates(config_dir="configs/prompts")
-    planner = PlannerAgent(model_cfgs["planner"], prompts, tracer=tracer)
-    executor = ExecutorAgent(model_cfgs["executor"], prompts, tracer=tracer)
-    replanner = ReplannerAgent(model_cfgs["replanner"], prompts, tracer=tracer)
-    tracer.start_session(
-        goal=goal,
-        environment={"kind": environment, "name": env_adapter.name},
-        model_stack={
-            "planner": model_cfgs["planner"].model_dump(),
-            "executor": model_cfgs["executor"].model_dump(),
-            "replanner": model_cfgs["replanner"].model_dump(),
         },
-        runtime_config=runtime_cfg.model_dump(),
     )
+    if checkpoint:
+        settings.runtime.checkpoint.enabled = True
 
-    workflow = build_workflow(planner, executor, replanner, env_adapter, tracer)
+    set_seed(settings.runtime.seed)
+    configure_llm_runtime(settings)
 
-    initial_state = build_initial_state(
-        goal=goal,
-        max_steps=runtime_cfg.max_steps,
-        dynamic_replanning=runtime_cfg.dynamic_replanning,
-        use_cot=runtime_cfg.use_cot,
-        observation=env_adapter.reset(goal=goal),
-    )
+    if resume:
+        result = resume_episode(resume, settings)
+    else:
+        run_id = new_run_id()
+        if settings.runtime.checkpoint.enabled:
+            print(f"Checkpointing to {settings.runtime.checkpoint.path}; resume with --resume {run_id}")
+        result = execute_episode(goal, settings, run_id=run_id)
 
-    try:
-        final_state: dict[str, Any] = workflow.invoke(initial_state)
-    except Exception as exc:
-        tracer.log_event(
-            event_type="episode_error",
-            step=initial_state["step_count"],
-            payload={"error_type": type(exc).__name__, "error_message": str(exc)},
-        )
-        tracer.close(
-            status="failed",
-            summary={"error_type": type(exc).__name__, "error_message": str(exc)},
-        )
-        raise
-
-    metrics = compute_episode_metrics(final_state)
-    tracer.log_event(
-        event_type="episode_end",
-        step=int(final_state.get("step_count", 0)),
-        payload={
-            "success": bool(final_state.get("success", False)),
-            "final_answer": str(final_state.get("final_answer", "")),
-            "metrics": metrics,
-        },
-    )
-    tracer.close(
-        status="completed",
-        summary={
-            "success": bool(final_state.get("success", False)),
-            "step_count": int(final_state.get("step_count", 0)),
-            "metrics": metrics,
+    print("[bold green]Episode finished[/bold green]")
+    print({key: value for key, value in result.items() if key != "run_id"})
+
+
+@app.command("run-batch")
+def run_batch_command(
+    goals_file: str = typer.Option(..., help="JSONL file with one {\"goal\": ...} object per line."),
+    output: str = typer.Option(
+        "artifacts/runs/batch_results.jsonl",
+        help="JSONL file that receives one result row per finished episode.",
+    ),
+    workers: int = typer.Option(4, min=1, help="Number of concurrent episodes."),
+    mode: str = typer.Option("thread", help="Worker pool: thread|process|asyncio"),
+    base_config: str = typer.Option("configs/base.yaml", help="Path to base runtime config."),
+    model_config: str = typer.Option("configs/models.yaml", help="Path to model config."),
+    trace_config: str = typer.Option("configs/tracing.yaml", help="Path to tracing config."),
+    llm_config: str = typer.Option("configs/llm.yaml", help="Path to LLM client config."),
+    trace: bool = typer.Option(False, help="Enable runtime trace logging for every episode."),
+    environment: str = typer.Option("simulator", help="Environment adapter: simulator|tool"),
+    dynamic_replanning: bool = typer.Option(True, help="Default for goals that do not override it."),
+    use_cot: bool = typer.Option(False, help="Default for goals that do not override it."),
+) -> None:
+    load_dotenv()
+    settings = load_episode_settings(
+        base_config=base_config,
+        model_config=model_config,
+        trace_config=trace_config,
+        llm_config=llm_config,
+        environment=environment,
+        trace=trace,
+        overrides={
+            "dynamic_replanning": dynamic_replanning,
+            "use_cot": use_cot,
         },
     )
-
-    artifact = EpisodeArtifact(
-        run_id=run_id,
-        goal=goal,
-        success=bool(final_state.get("success", False)),
-        step_count=int(final_state.get("step_count", 0)),
-        final_answer=str(final_state.get("final_answer", "")),
-        action_history=list(final_state.get("action_history", [])),
-        notes=list(final_state.get("notes", [])),
+    goals = load_goals(goals_file)
+
+    def _report(row: dict) -> None:
+        status = "[green]ok[/green]" if row["ok"] else f"[red]error[/red] {row['error']}"
+        print(f"[{row['index']}] {status} success={row['success']} latency={row['latency_s']}s run_id={row['run_id']}")
+
+    summary = run_batch(
+        goals,
+        settings,
+        output_path=Path(output),
+        workers=workers,
+        mode=mode,  # type: ignore[arg-type]
+        on_result=_report,
     )
 
-    if runtime_cfg.save_artifacts:
-        out_dir = Path(runtime_cfg.artifact_dir)
-        out_dir.mkdir(parents=True, exist_ok=True)
-        write_json(out_dir / f"episode_{run_id}.json", {
-            "config": runtime_cfg.model_dump(),
-            "model": {
-                "planner": model_cfgs["planner"].model_dump(),
-                "executor": model_cfgs["executor"].model_dump(),
-                "replanner": model_cfgs["replanner"].model_dump(),
-            },
-            "environment": {
-                "name": env_adapter.name,
-                "kind": environment,
-            },
-            "metrics": metrics,
-            "final_state": final_state,
-            "artifact": artifact.model_dump(),
-        })
-
-    print("[bold green]Episode finished[/bold green]")
-    print({
-        "success": artifact.success,
-        "step_count": artifact.step_count,
-        "final_answer": artifact.final_answer,
-        "metrics": metrics,
-        "environment": env_adapter.name,
-        "trace_enabled": trace_cfg.enabled,
-        "trace_run_id": run_id if trace_cfg.enabled else "",
-        "used_openai_key": bool(os.getenv("OPENAI_API_KEY", "").strip()),
-    })
+    print("[bold green]Batch finished[/bold green]")
+    print({**summary, "mode": mode, "workers": workers, "results_path": output})
 
 
 @app.command("demo-tools")
@@ -234,6 +190,189 @@ def demo_tools(
     )
 
 
+def _open_catalog(base_dir: str, catalog: str) -> TraceCatalog:
+    return TraceCatalog(catalog or Path(base_dir) / "catalog.sqlite")
+
+
+@app.command("stub-server")
+def stub_server(
+    config: str = typer.Option("configs/loadtest.yaml", help="Load-test config with a stub_server section."),
+    host: str = typer.Option("", help="Override stub_server.host."),
+    port: int = typer.Option(-1, help="Override stub_server.port (0 picks a free port)."),
+) -> None:
+    """Serve an OpenAI-compatible stand-in for offline load tests."""
+    stub_cfg = LoadTestConfig.model_validate(load_yaml(config)).stub_server
+    if host:
+        stub_cfg.host = host
+    if port >= 0:
+        stub_cfg.port = port
+    server = StubLLMServer(stub_cfg)
+    print(f"[bold green]Stub LLM server on {server.base_url}[/bold green]")
+    print(f"export OPENAI_BASE_URL={server.base_url} OPENAI_API_KEY=stub")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(server.stats())
+
+
+@app.command("loadtest")
+def loadtest(
+    config: str = typer.Option("configs/loadtest.yaml", help="Load-test config (stages, goals, stub_server)."),
+    output: str = typer.Option("", help="JSON report path (default: report_path from the config)."),
+    concurrency: str = typer.Option("", help="Comma-separated concurrency per stage, e.g. 1,2,4,8; overrides the config stages."),
+    duration: float = typer.Option(0.0, help="Seconds per stage when --concurrency is given (default 30)."),
+    arrival_rate: float = typer.Option(0.0, help="Target episode starts per second when --concurrency is given."),
+    stub: bool = typer.Option(False, help="Serve the config's stub_server in-process and point OPENAI_BASE_URL at it."),
+    base_config: str = typer.Option("configs/base.yaml", help="Path to base runtime config."),
+    model_config: str = typer.Option("configs/models.yaml", help="Path to model config."),
+    trace_config: str = typer.Option("configs/tracing.yaml", help="Path to tracing config."),
+    llm_config: str = typer.Option("configs/llm.yaml", help="Path to LLM client config."),
+    environment: str = typer.Option("simulator", help="Environment adapter: simulator|tool"),
+) -> None:
+    """Ramp concurrent episodes through stages and report throughput and latency per stage."""
+    load_dotenv()
+    load_cfg = LoadTestConfig.model_validate(load_yaml(config))
+    if concurrency:
+        stage = {"duration_s": duration or 30.0, "arrival_rate": arrival_rate}
+        load_cfg.stages = [
+            LoadStageConfig(concurrency=int(value), **stage) for value in concurrency.split(",") if value.strip()
+        ]
+    settings = load_episode_settings(
+        base_config=base_config,
+        model_config=model_config,
+        trace_config=trace_config,
+        llm_config=llm_config,
+        environment=environment,
+    )
+    set_seed(settings.runtime.seed)
+
+    server = StubLLMServer(load_cfg.stub_server) if stub else None
+    if server is not None:
+        os.environ["OPENAI_BASE_URL"] = server.start()
+        os.environ.setdefault("OPENAI_API_KEY", "stub")
+    configure_llm_runtime(settings)
+    try:
+        report = LoadTestHarness(settings, load_cfg).run()
+        if server is not None:
+            report["stub_server"] = server.stats()
+    finally:
+        if server is not None:
+            server.stop()
+
+    out_path = Path(output or load_cfg.report_path)
+    write_json(out_path, report)
+    for line in format_report(report):
+        print(line)
+    print(f"[bold green]Report written to {out_path}[/bold green]")
+
+
+@traces_app.command("ingest")
+def traces_ingest(
+    base_dir: str = typer.Option("data/raw/traces", help="Directory holding one trace directory per run."),
+    catalog: str = typer.Option("", help="Catalog path (default: <base-dir>/catalog.sqlite)."),
+    include_running: bool = typer.Option(False, help="Also ingest runs whose session is still marked running."),
+) -> None:
+    with _open_catalog(base_dir, catalog) as trace_catalog:
+        stats = trace_catalog.ingest(base_dir, include_running=include_running)
+    print(stats)
+
+
+@traces_app.command("query")
+def traces_query(
+    base_dir: str = typer.Option("data/raw/traces", help="Directory holding one trace directory per run."),
+    catalog: str = typer.Option("", help="Catalog path (default: <base-dir>/catalog.sqlite)."),
+    ingest: bool = typer.Option(True, help="Ingest new or changed runs before querying."),
+    executor_model: str = typer.Option("", help="Only runs whose executor used this model."),
+    planner_model: str = typer.Option("", help="Only runs whose planner used this model."),
+    run_status: str = typer.Option("", help="Only runs with this session status (completed, failed, ...)."),
+    event_type: str = typer.Option("", help="Only runs with events of this type, e.g. llm_call."),
+    event_status: str = typer.Option("", help="Only runs with events of this status, e.g. parse_error."),
+    tool_name: str = typer.Option("", help="Only runs with tool events for this tool."),
+    ok: str = typer.Option("", help="With tool events: 'true' or 'false'."),
+    sql: str = typer.Option("", help="Read-only SQL against the runs/events tables instead of the filters."),
+    limit: int = typer.Option(50, help="Maximum number of rows."),
+) -> None:
+    if ok not in {"", "true", "false"}:
+        raise typer.BadParameter("--ok must be 'true' or 'false'.")
+
+    with _open_catalog(base_dir, catalog) as trace_catalog:
+        if ingest:
+            trace_catalog.ingest(base_dir)
+        if sql:
+            rows = trace_catalog.query(sql)
+        else:
+            rows = trace_catalog.find_runs(
+                executor_model=executor_model or None,
+                planner_model=planner_model or None,
+                run_status=run_status or None,
+                event_type=event_type or None,
+                event_status=event_status or None,
+                tool_name=tool_name or None,
+                ok=None if not ok else ok == "true",
+                limit=limit,
+            )
+    for row in rows:
+        print(row)
+    print(f"[bold green]{len(rows)} row(s)[/bold green]")
+
+
+@traces_app.command("export-sft")
+def traces_export_sft(
+    out_dir: str = typer.Option("data/processed/sft", help="Directory for the sharded <component>-NNNNN.jsonl files."),
+    base_dir: str = typer.Option("data/raw/traces", help="Directory holding one trace directory per run."),
+    workers: int = typer.Option(0, help="Worker processes (0 = one per CPU core, 1 = in-process)."),
+    runs_per_task: int = typer.Option(16, help="Runs handed to a worker at a time."),
+    max_shard_mb: float = typer.Option(64.0, help="Start a new shard once one reaches this size."),
+    max_shard_rows: int = typer.Option(0, help="Start a new shard after this many rows (0 = no limit)."),
+) -> None:
+    manifest = export_sft_from_traces(
+        base_dir,
+        out_dir,
+        workers=workers or None,
+        runs_per_task=runs_per_task,
+        max_shard_bytes=int(max_shard_mb * 1024 * 1024),
+        max_shard_rows=max_shard_rows,
+    )
+    print("[bold green]SFT export finished[/bold green]")
+    print({key: manifest[key] for key in ("runs", "llm_calls", "rows", "rejected")})
+
+
+@traces_app.command("export-parquet")
+def traces_export_parquet(
+    out_dir: str = typer.Option("data/processed/trace_events", help="Root of the date=/experiment= partitioned dataset."),
+    base_dir: str = typer.Option("data/raw/traces", help="Directory holding one trace directory per run."),
+    experiment: str = typer.Option("", help="Experiment partition for these runs (default: session metadata)."),
+    event_type: list[str] = typer.Option([], help="Only export these event types (repeatable)."),
+    rows_per_file: int = typer.Option(500_000, help="Rows buffered per partition before a part file is written."),
+) -> None:
+    stats = export_events_to_parquet(
+        base_dir,
+        out_dir,
+        experiment=experiment or None,
+        event_types=event_type or None,
+        rows_per_file=rows_per_file,
+    )
+    print("[bold green]Parquet export finished[/bold green]")
+    print(stats)
+
+
+@traces_app.command("spans")
+def traces_spans(
+    run_id: str = typer.Option(..., help="Run whose spans to export."),
+    base_dir: str = typer.Option("data/raw/traces", help="Directory holding one trace directory per run."),
+    format: str = typer.Option("chrome", help="chrome (Perfetto / chrome://tracing) or otel (OTLP/JSON)."),
+    out: str = typer.Option("", help="Output file (default: <run_dir>/spans.<format>.json)."),
+) -> None:
+    if format not in {"chrome", "otel"}:
+        raise typer.BadParameter("--format must be 'chrome' or 'otel'.")
+    run_dir = Path(base_dir) / run_id
+    out_path = Path(out) if out else run_dir / f"spans.{format}.json"
+    count = export_spans(run_dir, out_path, format=format)  # type: ignore[arg-type]
+    print(f"[bold green]Wrote {count} spans to {out_path}[/bold green]")
+
+
 def run_cli() -> None:
     app()
 
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+from collections.abc import AsyncIterator, Sequence
+from pathlib import Path
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+
+class SqliteCheckpointer(SqliteSaver):
+    """Local SQLite checkpoint store usable from both `invoke` and `ainvoke`.
+
+    The upstream `SqliteSaver` is sync-only; the async methods here run the
+    same guarded SQLite calls in a worker thread so the async workflow path can
+    share the store (and its lock) with threaded batch runs.
+    """
+
+    @classmethod
+    def open(cls, path: str | Path) -> "SqliteCheckpointer":
+        db_path = Path(path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        saver = cls(conn)
+        saver.setup()
+        return saver
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+def thread_config(run_id: str) -> RunnableConfig:
+    """Checkpoints are keyed by run id, so a run id is all `--resume` needs."""
+    return {"configurable": {"thread_id": run_id}}
+
+
+_checkpointers_lock = threading.Lock()
+_checkpointers: dict[str, SqliteCheckpointer] = {}
+
+
+def get_sqlite_checkpointer(path: str | Path) -> SqliteCheckpointer:
+    """Process-wide checkpointer per database file, shared by concurrent episodes."""
+    key = str(Path(path).resolve())
+    with _checkpointers_lock:
+        saver = _checkpointers.get(key)
+        if saver is None:
+            saver = SqliteCheckpointer.open(path)
+            _checkpointers[key] = saver
+        return saver
+
+
+def close_sqlite_checkpointers() -> None:
+    with _checkpointers_lock:
+        savers = list(_checkpointers.values())
+        _checkpointers.clear()
+    for saver in savers:
+        saver.close()
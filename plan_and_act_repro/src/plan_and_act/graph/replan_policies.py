@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from plan_and_act.core.state import PlanActState
+from plan_and_act.core.types import ReplanPolicyConfig
+
+_WORD_RE = re.compile(r"[a-z]+")
+# Words too generic to tell whether a success criterion was met.
+_STOPWORDS = frozenset(
+    "a an and are as at be been by for from has have in is it its of on or that the this to was were with".split()
+)
+
+
+class ReplanPolicy(Protocol):
+    """Decides after each executor step whether the replanner should run."""
+
+    name: str
+
+    def reason(self, state: PlanActState) -> str:
+        """Why the plan should be revised now, or "" to keep executing it."""
+
+
+def _words(text: str) -> set[str]:
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def _executed_step(state: PlanActState) -> dict[str, Any]:
+    """The plan step the executor just acted on (its index was advanced past it)."""
+    index = state["current_step_idx"] - 1
+    plan = state["plan"]
+    return plan[index] if 0 <= index < len(plan) else {}
+
+
+@dataclass(frozen=True)
+class AlwaysReplan:
+    """Replan after every step: the paper's dynamic replanning."""
+
+    name: str = "always"
+
+    def reason(self, state: PlanActState) -> str:
+        return "every_step"
+
+
+@dataclass(frozen=True)
+class OnToolFailure:
+    name: str = "tool_failure"
+
+    def reason(self, state: PlanActState) -> str:
+        return "tool_failure" if state.get("step_failed", False) else ""
+
+
+@dataclass(frozen=True)
+class OnPlanExhausted:
+    name: str = "plan_exhausted"
+
+    def reason(self, state: PlanActState) -> str:
+        return "plan_exhausted" if state["current_step_idx"] >= len(state["plan"]) else ""
+
+
+@dataclass(frozen=True)
+class EveryNSteps:
+    n: int = 3
+    name: str = "every_n_steps"
+
+    def reason(self, state: PlanActState) -> str:
+        # current_step_idx restarts at 0 on every (re)plan, so it counts steps since the last one.
+        steps = state["current_step_idx"]
+        return f"every_{self.n}_steps" if steps > 0 and steps % self.n == 0 else ""
+
+
+@dataclass(frozen=True)
+class OnObservationNovelty:
+    """Replan when the new observation shares too few words with the previous one.
+
+    Novelty is 1 - Jaccard similarity of the lowercase word sets; digits are
+    ignored so step counters alone do not look like new information.
+    """
+
+    threshold: float = 0.6
+    name: str = "observation_novelty"
+
+    def reason(self, state: PlanActState) -> str:
+        before = _words(state.get("previous_observation", ""))
+        after = _words(state["observation"])
+        if not before or not after:
+            return ""
+        novelty = 1 - len(before & after) / len(before | after)
+        return f"observation_novelty={novelty:.2f}" if novelty >= self.threshold else ""
+
+
+@dataclass(frozen=True)
+class OnSuccessCriteriaFailure:
+    """Replan when the executed step's success_criteria is not reflected in the observation.
+
+    The check is lexical and deterministic: at least `min_overlap` of the
+    criterion's content words must appear in the observation or final answer.
+    Steps without success_criteria always pass.
+    """
+
+    min_overlap: float = 0.5
+    name: str = "success_criteria"
+
+    def reason(self, state: PlanActState) -> str:
+        criteria = _words(str(_executed_step(state).get("success_criteria", ""))) - _STOPWORDS
+        if not criteria:
+            return ""
+        evidence = _words(state["observation"] + " " + state.get("final_answer", ""))
+        overlap = len(criteria & evidence) / len(criteria)
+        return f"success_criteria_unmet={overlap:.2f}" if overlap < self.min_overlap else ""
+
+
+@dataclass(frozen=True)
+class AnyOf:
+    """Replans when any member policy fires; the first reason wins."""
+
+    policies: Sequence[ReplanPolicy]
+    name: str = "any_of"
+
+    def reason(self, state: PlanActState) -> str:
+        for policy in self.policies:
+            found = policy.reason(state)
+            if found:
+                return found
+        return ""
+
+
+def build_replan_policy(config: ReplanPolicyConfig | None = None) -> ReplanPolicy:
+    config = config or ReplanPolicyConfig()
+    builders = {
+        "always": lambda: AlwaysReplan(),
+        "tool_failure": lambda: OnToolFailure(),
+        "plan_exhausted": lambda: OnPlanExhausted(),
+        "every_n_steps": lambda: EveryNSteps(n=config.every_n_steps),
+        "observation_novelty": lambda: OnObservationNovelty(threshold=config.novelty_threshold),
+        "success_criteria": lambda: OnSuccessCriteriaFailure(min_overlap=config.criteria_min_overlap),
+    }
+    policies = [builders[name]() for name in _unique(config.triggers)]
+    return policies[0] if len(policies) == 1 else AnyOf(policies)
+
+
+def _unique(names: Iterable[str]) -> list[str]:
+    return list(dict.fromkeys(names))
@@ -1,11 +1,31 @@
 from __future__ import annotations
 
 from plan_and_act.core.state import PlanActState
+from plan_and_act.graph.replan_policies import AlwaysReplan, ReplanPolicy
+from plan_and_act.tracing.collector import TraceCollector
 
 
-def route_after_executor(state: PlanActState) -> str:
+def route_after_executor(
+    state: PlanActState,
+    policy: ReplanPolicy | None = None,
+    tracer: TraceCollector | None = None,
+) -> str:
+    """Route to the replanner when dynamic replanning is on and the policy fires.
+
+    A `needs_replan` set by the executor (empty or exhausted plan) always
+    replans. Without a policy every step replans, as in the paper.
+    """
     if state["done"]:
         return "end"
-    if state["dynamic_replanning"] and state["needs_replan"]:
-        return "replan"
-    return "continue"
+    if not state["dynamic_replanning"]:
+        return "continue"
+    reason = "executor_request" if state["needs_replan"] else (policy or AlwaysReplan()).reason(state)
+    if not reason:
+        return "continue"
+    if tracer:
+        tracer.log_event(
+            event_type="replan_triggered",
+            step=state["step_count"],
+            payload={"reason": reason, "policy": policy.name if policy is not None else "always"},
+        )
+    return "replan"
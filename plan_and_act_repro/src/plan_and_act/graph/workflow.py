@@ -1,47 +1,69 @@
 from __future__ import annotations
 
+import asyncio
 from typing import Any
 
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import END, START, StateGraph
 
 from plan_and_act.agents.executor import ExecutorAgent
 from plan_and_act.agents.planner import PlannerAgent
 from plan_and_act.agents.replanner import ReplannerAgent
-from plan_and_act.core.schemas import PlanStep
+from plan_and_act.core.schemas import ExecutorAction, PlannerOutput, PlanStep
 from plan_and_act.core.state import PlanActState
-from plan_and_act.environments.base import EnvironmentAdapter
+from plan_and_act.environments.base import EnvironmentAdapter, EnvironmentStepResult
 from plan_and_act.environments.simulator import GenericSimulatorEnvironment
+from plan_and_act.graph.replan_policies import ReplanPolicy
 from plan_and_act.graph.transitions import route_after_executor
 from plan_and_act.tracing.collector import TraceCollector
+from plan_and_act.tracing.spans import span
 
 
-def planner_node(
-    state: PlanActState,
-    planner: PlannerAgent,
-    tracer: TraceCollector | None = None,
-) -> dict[str, Any]:
+async def _acall(obj: Any, async_name: str, sync_name: str, **kwargs: Any) -> Any:
+    """Prefer the object's native coroutine; run sync-only duck types in a worker thread."""
+    async_fn = getattr(obj, async_name, None)
+    if async_fn is not None:
+        return await async_fn(**kwargs)
+    return await asyncio.to_thread(getattr(obj, sync_name), **kwargs)
+
+
+def _environment_snapshot(environment: EnvironmentAdapter) -> dict[str, Any] | None:
+    # Duck-typed adapters without `snapshot` keep no state worth checkpointing.
+    snapshot = getattr(environment, "snapshot", None)
+    return snapshot() if snapshot is not None else None
+
+
+def _planner_kwargs(state: PlanActState, tracer: TraceCollector | None) -> dict[str, Any]:
     if tracer:
         tracer.log_event(
             event_type="planner_input",
             step=state["step_count"],
-            payload={
+            payload=lambda: {
                 "goal": state["goal"],
                 "observation": state["observation"],
                 "action_history": state["action_history"],
             },
         )
-    output = planner.plan(
-        goal=state["goal"],
-        observation=state["observation"],
-        action_history=state["action_history"],
-        use_cot=state["use_cot"],
-        step=state["step_count"],
-    )
+    return {
+        "goal": state["goal"],
+        "observation": state["observation"],
+        "action_history": state["action_history"],
+        "use_cot": state["use_cot"],
+        "step": state["step_count"],
+    }
+
+
+def _planner_update(
+    state: PlanActState,
+    output: PlannerOutput,
+    tracer: TraceCollector | None,
+) -> dict[str, Any]:
     if tracer:
         tracer.log_event(
             event_type="planner_output",
             step=state["step_count"],
-            payload={"steps": [step.model_dump() for step in output.steps]},
+            payload=lambda: {"steps": [step.model_dump() for step in output.steps]},
         )
     return {
         "plan": [step.model_dump() for step in output.steps],
@@ -50,12 +72,31 @@ def planner_node(
     }
 
 
-def executor_node(
+def planner_node(
     state: PlanActState,
-    executor: ExecutorAgent,
-    environment: EnvironmentAdapter,
+    planner: PlannerAgent,
     tracer: TraceCollector | None = None,
 ) -> dict[str, Any]:
+    with span(tracer, "planner_node", step=state["step_count"]):
+        output = planner.plan(**_planner_kwargs(state, tracer))
+        return _planner_update(state, output, tracer)
+
+
+async def aplanner_node(
+    state: PlanActState,
+    planner: PlannerAgent,
+    tracer: TraceCollector | None = None,
+) -> dict[str, Any]:
+    with span(tracer, "planner_node", step=state["step_count"]):
+        output = await _acall(planner, "aplan", "plan", **_planner_kwargs(state, tracer))
+        return _planner_update(state, output, tracer)
+
+
+def _executor_preflight(
+    state: PlanActState,
+    tracer: TraceCollector | None,
+) -> dict[str, Any] | PlanStep:
+    """Return a terminal state update, or the plan step the executor should act on."""
     if state["done"]:
         return {}
 
@@ -69,13 +110,13 @@ def executor_node(
             tracer.log_event(
                 event_type="episode_stop",
                 step=step_count,
-                payload={"reason": "max_steps_reached", "max_steps": max_steps},
+                payload=lambda: {"reason": "max_steps_reached", "max_steps": max_steps},
             )
         return {
             "done": True,
             "success": False,
             "final_answer": "Stopped: max steps reached.",
-            "notes": state["notes"] + ["Reached max step budget."],
+            "notes": ["Reached max step budget."],
         }
 
     if not plan or current_idx >= len(plan):
@@ -84,23 +125,23 @@ def executor_node(
                 tracer.log_event(
                     event_type="episode_stop",
                     step=step_count,
-                    payload={"reason": "plan_exhausted_without_replanning"},
+                    payload=lambda: {"reason": "plan_exhausted_without_replanning"},
                 )
             return {
                 "done": True,
                 "success": False,
                 "final_answer": "Stopped: plan exhausted while dynamic replanning is disabled.",
-                "notes": state["notes"] + ["Plan exhausted and replanning is disabled."],
+                "notes": ["Plan exhausted and replanning is disabled."],
             }
         if tracer:
             tracer.log_event(
                 event_type="executor_needs_replan",
                 step=step_count,
-                payload={"reason": "plan_exhausted"},
+                payload=lambda: {"reason": "plan_exhausted"},
             )
         return {
             "needs_replan": True,
-            "notes": state["notes"] + ["No remaining plan steps; requesting replanning."],
+            "notes": ["No remaining plan steps; requesting replanning."],
         }
 
     current_step = PlanStep.model_validate(plan[current_idx])
@@ -108,36 +149,49 @@ def executor_node(
         tracer.log_event(
             event_type="executor_input",
             step=step_count,
-            payload={
+            payload=lambda: {
                 "current_step_idx": current_idx,
                 "current_step": current_step.model_dump(),
                 "observation": state["observation"],
             },
         )
-    action = executor.act(
-        goal=state["goal"],
-        current_step=current_step,
-        observation=state["observation"],
-        step_index=current_idx,
-        total_steps=len(plan),
-        use_cot=state["use_cot"],
-        step=step_count,
-    )
+    return current_step
+
+
+def _executor_kwargs(state: PlanActState, current_step: PlanStep) -> dict[str, Any]:
+    return {
+        "goal": state["goal"],
+        "current_step": current_step,
+        "observation": state["observation"],
+        "step_index": state["current_step_idx"],
+        "total_steps": len(state["plan"]),
+        "use_cot": state["use_cot"],
+        "step": state["step_count"],
+    }
+
 
-    new_step_count = step_count + 1
-    new_action_history = state["action_history"] + [action.model_dump()]
+def _log_executor_output(action: ExecutorAction, step: int, tracer: TraceCollector | None) -> None:
     if tracer:
         tracer.log_event(
             event_type="executor_output",
-            step=new_step_count,
-            payload={"action": action.model_dump()},
+            step=step,
+            payload=lambda: {"action": action.model_dump()},
         )
-    env_result = environment.step(action=action, step_count=new_step_count)
+
+
+def _executor_update(
+    state: PlanActState,
+    action: ExecutorAction,
+    env_result: EnvironmentStepResult,
+    tracer: TraceCollector | None,
+    environment_state: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    new_step_count = state["step_count"] + 1
     if tracer:
         tracer.log_event(
             event_type="environment_step",
             step=new_step_count,
-            payload={
+            payload=lambda: {
                 "observation": env_result.observation,
                 "done": env_result.done,
                 "success": env_result.success,
@@ -151,82 +205,188 @@ def executor_node(
     success = bool(action.is_final or env_result.success)
     final_answer = action.final_answer or env_result.final_answer or state["final_answer"]
 
-    needs_replan = bool(state["dynamic_replanning"] and not done)
-    notes = state["notes"] + env_result.notes
+    action_record = action.model_dump()
 
-    return {
-        "latest_action": action.model_dump(),
-        "action_history": new_action_history,
+    # action_history and notes are append-only channels: return only the new items.
+    update = {
+        "latest_action": action_record,
+        "action_history": [action_record],
         "observation": new_observation,
+        "previous_observation": state["observation"],
         "step_count": new_step_count,
-        "current_step_idx": current_idx + 1,
+        "current_step_idx": state["current_step_idx"] + 1,
         "done": done,
         "success": success,
         "final_answer": final_answer,
-        "needs_replan": needs_replan,
-        "notes": notes,
+        # Whether to replan now is decided by the replan policy in `route_after_executor`.
+        "needs_replan": False,
+        "step_failed": env_result.failed,
+        "notes": list(env_result.notes),
     }
+    if environment_state is not None:
+        update["environment_state"] = environment_state
+    return update
 
 
-def replanner_node(
+def executor_node(
     state: PlanActState,
-    replanner: ReplannerAgent,
+    executor: ExecutorAgent,
+    environment: EnvironmentAdapter,
+    tracer: TraceCollector | None = None,
+) -> dict[str, Any]:
+    with span(tracer, "executor_node", step=state["step_count"]):
+        current_step = _executor_preflight(state, tracer)
+        if not isinstance(current_step, PlanStep):
+            return current_step
+
+        action = executor.act(**_executor_kwargs(state, current_step))
+        new_step_count = state["step_count"] + 1
+        _log_executor_output(action, new_step_count, tracer)
+        with span(tracer, "environment.step", step=new_step_count, attributes={"action_type": action.action_type}):
+            env_result = environment.step(action=action, step_count=new_step_count)
+        return _executor_update(state, action, env_result, tracer, _environment_snapshot(environment))
+
+
+async def aexecutor_node(
+    state: PlanActState,
+    executor: ExecutorAgent,
+    environment: EnvironmentAdapter,
     tracer: TraceCollector | None = None,
 ) -> dict[str, Any]:
+    with span(tracer, "executor_node", step=state["step_count"]):
+        current_step = _executor_preflight(state, tracer)
+        if not isinstance(current_step, PlanStep):
+            return current_step
+
+        action = await _acall(executor, "aact", "act", **_executor_kwargs(state, current_step))
+        new_step_count = state["step_count"] + 1
+        _log_executor_output(action, new_step_count, tracer)
+        with span(tracer, "environment.step", step=new_step_count, attributes={"action_type": action.action_type}):
+            env_result = await _acall(environment, "astep", "step", action=action, step_count=new_step_count)
+        return _executor_update(state, action, env_result, tracer, _environment_snapshot(environment))
+
+
+def _replanner_kwargs(state: PlanActState, tracer: TraceCollector | None) -> dict[str, Any]:
     if tracer:
         tracer.log_event(
             event_type="replanner_input",
             step=state["step_count"],
-            payload={
+            payload=lambda: {
                 "previous_plan_length": len(state["plan"]),
                 "previous_plan": state["plan"],
                 "action_history": state["action_history"],
                 "observation": state["observation"],
             },
         )
-    output = replanner.replan(
-        goal=state["goal"],
-        previous_plan=state["plan"],
-        action_history=state["action_history"],
-        observation=state["observation"],
-        use_cot=state["use_cot"],
-        step=state["step_count"],
-    )
+    return {
+        "goal": state["goal"],
+        "previous_plan": state["plan"],
+        "action_history": state["action_history"],
+        "observation": state["observation"],
+        "use_cot": state["use_cot"],
+        "step": state["step_count"],
+    }
+
+
+def _replanner_update(
+    state: PlanActState,
+    output: PlannerOutput,
+    tracer: TraceCollector | None,
+) -> dict[str, Any]:
     if tracer:
         tracer.log_event(
             event_type="replanner_output",
             step=state["step_count"],
-            payload={"steps": [step.model_dump() for step in output.steps]},
+            payload=lambda: {"steps": [step.model_dump() for step in output.steps]},
         )
     return {
         "plan": [step.model_dump() for step in output.steps],
         "current_step_idx": 0,
         "needs_replan": False,
-        "notes": state["notes"] + ["Replanned based on latest observation."],
+        "notes": ["Replanned based on latest observation."],
     }
 
 
+def replanner_node(
+    state: PlanActState,
+    replanner: ReplannerAgent,
+    tracer: TraceCollector | None = None,
+) -> dict[str, Any]:
+    with span(tracer, "replanner_node", step=state["step_count"]):
+        output = replanner.replan(**_replanner_kwargs(state, tracer))
+        return _replanner_update(state, output, tracer)
+
+
+async def areplanner_node(
+    state: PlanActState,
+    replanner: ReplannerAgent,
+    tracer: TraceCollector | None = None,
+) -> dict[str, Any]:
+    with span(tracer, "replanner_node", step=state["step_count"]):
+        output = await _acall(replanner, "areplan", "replan", **_replanner_kwargs(state, tracer))
+        return _replanner_update(state, output, tracer)
+
+
 def build_workflow(
     planner: PlannerAgent,
     executor: ExecutorAgent,
     replanner: ReplannerAgent,
     environment: EnvironmentAdapter | None = None,
     tracer: TraceCollector | None = None,
+    checkpointer: BaseCheckpointSaver | None = None,
+    replan_policy: ReplanPolicy | None = None,
 ):
+    """Compile the Plan-and-Act graph.
+
+    Every node is registered with a sync and an async implementation, so the
+    same compiled graph serves `invoke` (blocking agents, tools and LLM calls)
+    and `ainvoke` (event-loop native, many episodes per loop).
+
+    With a `checkpointer`, `PlanActState` is persisted after every node under
+    the `thread_id` of the invocation config; invoking again with `None` input
+    and the same config continues from the last completed node.
+
+    `replan_policy` decides after each executor step whether dynamic
+    replanning calls the replanner (see `graph/replan_policies.py`). Without
+    one, or with the default `always` trigger, the replanner runs after every
+    step, as in the paper.
+    """
     environment_adapter = environment or GenericSimulatorEnvironment()
     trace_collector = tracer
     graph = StateGraph(PlanActState)
 
-    graph.add_node("planner", lambda s: planner_node(s, planner, trace_collector))
-    graph.add_node("executor", lambda s: executor_node(s, executor, environment_adapter, trace_collector))
-    graph.add_node("replanner", lambda s: replanner_node(s, replanner, trace_collector))
+    async def _aplanner(s: PlanActState) -> dict[str, Any]:
+        return await aplanner_node(s, planner, trace_collector)
+
+    async def _aexecutor(s: PlanActState) -> dict[str, Any]:
+        return await aexecutor_node(s, executor, environment_adapter, trace_collector)
+
+    async def _areplanner(s: PlanActState) -> dict[str, Any]:
+        return await areplanner_node(s, replanner, trace_collector)
+
+    graph.add_node(
+        "planner",
+        RunnableLambda(lambda s: planner_node(s, planner, trace_collector), afunc=_aplanner, name="planner"),
+    )
+    graph.add_node(
+        "executor",
+        RunnableLambda(
+            lambda s: executor_node(s, executor, environment_adapter, trace_collector),
+            afunc=_aexecutor,
+            name="executor",
+        ),
+    )
+    graph.add_node(
+        "replanner",
+        RunnableLambda(lambda s: replanner_node(s, replanner, trace_collector), afunc=_areplanner, name="replanner"),
+    )
 
     graph.add_edge(START, "planner")
     graph.add_edge("planner", "executor")
 
     graph.add_conditional_edges(
         "executor",
-        route_after_executor,
+        RunnableLambda(lambda s: route_after_executor(s, replan_policy, trace_collector), name="route_after_executor"),
         {
             "end": END,
             "replan": "replanner",
@@ -235,4 +395,4 @@ def build_workflow(
     )
     graph.add_edge("replanner", "executor")
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import resource
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from plan_and_act.agents.executor import ExecutorAgent
+from plan_and_act.agents.planner import PlannerAgent
+from plan_and_act.agents.replanner import ReplannerAgent
+from plan_and_act.core.state import build_initial_state
+from plan_and_act.core.types import LoadStageConfig, LoadTestConfig
+from plan_and_act.environments.base import EnvironmentAdapter
+from plan_and_act.environments.factory import build_environment
+from plan_and_act.eval.episode import EpisodeSettings
+from plan_and_act.eval.metrics import UsageMeter, percentile
+from plan_and_act.graph.replan_policies import build_replan_policy
+from plan_and_act.graph.workflow import build_workflow
+from plan_and_act.prompts.templates import PromptTemplates
+from plan_and_act.utils.llm import get_client_registry
+
+# Builds a fresh environment per episode; receives the episode's meter for tool timings.
+EnvironmentFactory = Callable[[UsageMeter], EnvironmentAdapter]
+_QUANTILES = (50, 90, 95, 99)
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process; falls back to the lifetime peak off Linux."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in KiB on Linux and bytes on macOS; /proc exists on the former.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def latency_summary(values: list[float]) -> dict[str, float]:
+    summary = {f"p{q}": round(percentile(values, q), 3) for q in _QUANTILES}
+    summary["count"] = len(values)
+    return summary
+
+
+def find_knee(stages: list[dict[str, Any]], min_gain: float) -> dict[str, Any] | None:
+    """First stage whose episodes/s is less than `min_gain` better than the best before it."""
+    best = 0.0
+    for stage in stages:
+        throughput = stage["episodes_per_s"]
+        if best > 0 and throughput < best * (1 + min_gain):
+            return {"stage": stage["stage"], "concurrency": stage["concurrency"], "best_episodes_per_s": round(best, 3)}
+        best = max(best, throughput)
+    return None
+
+
+@dataclass
+class _StageSamples:
+    started: int = 0
+    completed: int = 0
+    succeeded: int = 0
+    episode_ms: list[float] = field(default_factory=list)
+    node_ms: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    llm_ms: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    llm_calls: int = 0
+    llm_errors: int = 0
+    errors: Counter[str] = field(default_factory=Counter)
+    peak_rss: int = 0
+
+
+class LoadTestHarness:
+    """Closed-loop load generator: ramps concurrent `build_workflow` episodes through stages.
+
+    Each stage runs `concurrency` asyncio workers that start episodes back to
+    back, optionally paced to a shared `arrival_rate`, until `duration_s` has
+    passed; in-flight episodes are drained before the next stage. Agents use
+    whatever endpoint `OPENAI_BASE_URL` points at (e.g. the stub server).
+    Node latencies come from the graph's update stream and LLM latencies and
+    errors from each episode's `UsageMeter`. Retries are the HTTP requests the
+    shared client pool sent beyond one per successful call.
+    """
+
+    def __init__(
+        self,
+        settings: EpisodeSettings,
+        config: LoadTestConfig,
+        *,
+        environment_factory: EnvironmentFactory | None = None,
+    ) -> None:
+        self.settings = settings
+        self.config = config
+        self.environment_factory = environment_factory or self._default_environment
+        self.prompts = PromptTemplates(config_dir=settings.prompts_dir)
+        self._episode_index = 0
+
+    def _default_environment(self, meter: UsageMeter) -> EnvironmentAdapter:
+        return build_environment(self.settings.environment, meter=meter, observations=self.settings.runtime.observations)
+
+    def run(self) -> dict[str, Any]:
+        return asyncio.run(self.arun())
+
+    async def arun(self) -> dict[str, Any]:
+        stages = []
+        for index, stage in enumerate(self.config.stages):
+            stages.append(await self._run_stage(index, stage))
+        return {
+            "base_url": os.getenv("OPENAI_BASE_URL", ""),
+            "environment": self.settings.environment,
+            "models": {name: cfg.model_dump() for name, cfg in self.settings.models.items()},
+            "stages": stages,
+            "knee": find_knee(stages, self.config.knee_min_gain),
+        }
+
+    async def _run_stage(self, index: int, stage: LoadStageConfig) -> dict[str, Any]:
+        samples = _StageSamples()
+        registry = get_client_registry()
+        requests_before = registry.stats()["requests"]
+        start = time.perf_counter()
+        deadline = start + stage.duration_s
+        arrivals = 0
+
+        async def worker() -> None:
+            nonlocal arrivals
+            while True:
+                cap = self.config.max_episodes_per_stage
+                if cap and samples.started >= cap:
+                    return
+                if stage.arrival_rate > 0:
+                    # Arrival n is due n / rate seconds into the stage, whichever worker takes it.
+                    offset = arrivals / stage.arrival_rate
+                    arrivals += 1
+                    if offset >= stage.duration_s:
+                        return
+                    await asyncio.sleep(max(start + offset - time.perf_counter(), 0))
+                elif time.perf_counter() >= deadline:
+                    return
+                samples.started += 1
+                await self._episode(samples)
+
+        sampler = asyncio.create_task(self._sample_rss(samples))
+        await asyncio.gather(*(worker() for _ in range(stage.concurrency)))
+        elapsed = time.perf_counter() - start
+        sampler.cancel()
+        samples.peak_rss = max(samples.peak_rss, current_rss_bytes())
+
+        http_requests = registry.stats()["requests"] - requests_before
+        ok_calls = samples.llm_calls - samples.llm_errors
+        retries = max(http_requests - ok_calls, 0) if http_requests else 0
+        return {
+            "stage": index,
+            "concurrency": stage.concurrency,
+            "arrival_rate": stage.arrival_rate,
+            "elapsed_s": round(elapsed, 3),
+            "episodes_started": samples.started,
+            "episodes_completed": samples.completed,
+            "episodes_per_s": round(samples.completed / elapsed, 3) if elapsed > 0 else 0.0,
+            "success_rate": round(samples.succeeded / samples.completed, 4) if samples.completed else 0.0,
+            "error_rate": round(sum(samples.errors.values()) / samples.started, 4) if samples.started else 0.0,
+            "errors": dict(samples.errors),
+            "episode_latency_ms": latency_summary(samples.episode_ms),
+            "node_latency_ms": {node: latency_summary(values) for node, values in sorted(samples.node_ms.items())},
+            "llm": {
+                "calls": samples.llm_calls,
+                "errors": samples.llm_errors,
+                "error_rate": round(samples.llm_errors / samples.llm_calls, 4) if samples.llm_calls else 0.0,
+                "http_requests": http_requests,
+                "retries": retries,
+                "retry_rate": round(retries / ok_calls, 4) if ok_calls else 0.0,
+                "latency_ms": {name: latency_summary(values) for name, values in sorted(samples.llm_ms.items())},
+            },
+            "peak_rss_mb": round(samples.peak_rss / 2**20, 1),
+        }
+
+    async def _sample_rss(self, samples: _StageSamples) -> None:
+        while True:
+            samples.peak_rss = max(samples.peak_rss, current_rss_bytes())
+            await asyncio.sleep(self.config.rss_sample_interval_s)
+
+    async def _episode(self, samples: _StageSamples) -> None:
+        goals = self.config.goals
+        goal = goals[self._episode_index % len(goals)]
+        self._episode_index += 1
+        settings = self.settings
+
+        meter = UsageMeter()
+        environment = self.environment_factory(meter)
+        agent_kwargs = {"meter": meter, "context": settings.runtime.context}
+        workflow = build_workflow(
+            PlannerAgent(settings.models["planner"], self.prompts, **agent_kwargs),
+            ExecutorAgent(settings.models["executor"], self.prompts, **agent_kwargs),
+            ReplannerAgent(settings.models["replanner"], self.prompts, **agent_kwargs),
+            environment,
+            replan_policy=build_replan_policy(settings.runtime.replan_policy),
+        )
+        state = build_initial_state(
+            goal=goal,
+            max_steps=settings.runtime.max_steps,
+            dynamic_replanning=settings.runtime.dynamic_replanning,
+            use_cot=settings.runtime.use_cot,
+            observation=environment.reset(goal=goal),
+        )
+
+        start = last = time.perf_counter()
+        final: dict[str, Any] = {}
+        try:
+            async for mode, chunk in workflow.astream(state, stream_mode=["updates", "values"]):
+                if mode == "values":
+                    final = chunk
+                    continue
+                # Nodes run one at a time, so the gap between updates is the node's latency.
+                now = time.perf_counter()
+                for node in chunk:
+                    samples.node_ms[node].append((now - last) * 1000)
+                last = now
+        except Exception as exc:
+            samples.errors[type(exc).__name__] += 1
+            return
+        finally:
+            for call in meter.calls():
+                if call.component == "tool":
+                    continue
+                samples.llm_calls += 1
+                samples.llm_errors += not call.ok
+                samples.llm_ms[call.component].append(call.latency_ms)
+        samples.completed += 1
+        samples.succeeded += bool(final.get("success", False))
+        samples.episode_ms.append((time.perf_counter() - start) * 1000)
+
+
+def format_report(report: dict[str, Any]) -> list[str]:
+    """Fixed-width table of the per-stage headline numbers."""
+    lines = [
+        f"{'stage':>5} {'conc':>5} {'ep/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'err%':>6} {'retry%':>7} {'rss MB':>8}"
+    ]
+    for stage in report["stages"]:
+        latency = stage["episode_latency_ms"]
+        lines.append(
+            f"{stage['stage']:>5} {stage['concurrency']:>5} {stage['episodes_per_s']:>8.2f} {latency['p50']:>9.1f} "
+            f"{latency['p95']:>9.1f} {stage['error_rate'] * 100:>6.1f} {stage['llm']['retry_rate'] * 100:>7.1f} "
+            f"{stage['peak_rss_mb']:>8.1f}"
+        )
+    knee = report.get("knee")
+    lines.append(f"knee: concurrency {knee['concurrency']} (stage {knee['stage']})" if knee else "knee: not reached")
+    return lines
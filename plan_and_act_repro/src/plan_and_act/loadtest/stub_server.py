@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+import ast
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from plan_and_act.agents.executor import ExecutorAgent
+from plan_and_act.agents.planner import PlannerAgent
+from plan_and_act.agents.replanner import ReplannerAgent
+from plan_and_act.core.schemas import PlannerOutput, PlanStep
+from plan_and_act.core.types import StubLatencyConfig, StubServerConfig
+from plan_and_act.prompts.context import estimate_tokens
+
+_GOAL_RE = re.compile(r"^Goal: (.*)$", re.MULTILINE)
+_STEP_RE = re.compile(r"^Current step: (\{.*\})$", re.MULTILINE)
+_STEP_KINDS = ("Search for", "Click the result about", "Type the details of")
+
+
+def sample_latency_ms(config: StubLatencyConfig, rng: random.Random) -> float:
+    """One response delay drawn from the configured distribution, clamped to [min_ms, max_ms]."""
+    median = config.median_ms
+    if config.distribution == "fixed":
+        value = median
+    elif config.distribution == "uniform":
+        value = rng.uniform(config.min_ms, config.max_ms)
+    elif config.distribution == "exponential":
+        # The median of an exponential distribution is ln(2) / rate.
+        value = rng.expovariate(math.log(2) / median) if median > 0 else 0.0
+    else:
+        value = rng.lognormvariate(math.log(median), config.sigma) if median > 0 else 0.0
+    return min(max(value, config.min_ms), config.max_ms)
+
+
+def detect_role(system_prompt: str) -> str:
+    """Which agent sent the request, from the system prompt of the bundled templates."""
+    lowered = system_prompt.lower()
+    for role in ("replanner", "executor", "planner"):
+        if f"you are the {role}" in lowered:
+            return role
+    return "executor" if '"action_type"' in system_prompt else "planner"
+
+
+def _goal(user_prompt: str) -> str:
+    match = _GOAL_RE.search(user_prompt)
+    return match.group(1).strip() if match else "unspecified goal"
+
+
+def _current_step(user_prompt: str) -> PlanStep:
+    match = _STEP_RE.search(user_prompt)
+    if match:
+        try:
+            return PlanStep.model_validate(ast.literal_eval(match.group(1)))
+        except (ValueError, SyntaxError):
+            pass
+    return PlanStep(step_id=1, intent="provide the final answer")
+
+
+def malform(content: str, kind: str) -> str:
+    """A broken variant of a JSON completion, as models produce them."""
+    if kind == "truncated":
+        return content[: max(len(content) * 2 // 3, 1)]
+    if kind == "trailing_comma":
+        return content[:-1] + ",}" if content.endswith("}") else content + ","
+    if kind == "prose":
+        return f"Sure! Here is the JSON you asked for:\n```json\n{content}\n```"
+    return "I am unable to produce a structured answer for this request."
+
+
+class StubResponder:
+    """Completion content per agent role: scripted replies first, heuristic answers otherwise.
+
+    Heuristic answers reuse the agents' own offline fallbacks, so episodes
+    against the stub behave like `provider: heuristic` runs but go through
+    the full HTTP client path. `plan_steps` > 0 replaces the two-step
+    heuristic plan with a longer one for load tests.
+    """
+
+    def __init__(self, *, script_path: str = "", plan_steps: int = 0) -> None:
+        self.plan_steps = plan_steps
+        self._lock = threading.Lock()
+        self._scripts: dict[str, itertools.cycle[str]] = {}
+        if script_path:
+            by_role: dict[str, list[str]] = {}
+            for line in Path(script_path).read_text(encoding="utf-8").splitlines():
+                if not line.strip():
+                    continue
+                row = orjson.loads(line)
+                content = row["content"]
+                by_role.setdefault(row["role"], []).append(
+                    content if isinstance(content, str) else orjson.dumps(content).decode("utf-8")
+                )
+            self._scripts = {role: itertools.cycle(replies) for role, replies in by_role.items()}
+
+    def content(self, role: str, user_prompt: str) -> str:
+        with self._lock:
+            script = self._scripts.get(role)
+            if script is not None:
+                return next(script)
+        goal = _goal(user_prompt)
+        if role == "executor":
+            step = _current_step(user_prompt)
+            is_final = "final" in step.intent.lower() or "exit" in step.intent.lower()
+            action = ExecutorAgent._act_heuristic(goal, step, 1 if is_final else 0, 2)
+            return action.model_dump_json()
+        if role == "replanner":
+            return ReplannerAgent._replan_heuristic(goal, "").model_dump_json()
+        return self._plan(goal).model_dump_json()
+
+    def _plan(self, goal: str) -> PlannerOutput:
+        if self.plan_steps <= 0:
+            return PlannerAgent._plan_heuristic(goal)
+        steps = [
+            PlanStep(step_id=i + 1, intent=f"{_STEP_KINDS[i % 3]} {goal}", success_criteria="Step executed")
+            for i in range(self.plan_steps - 1)
+        ]
+        steps.append(PlanStep(step_id=self.plan_steps, intent="Provide the final answer", success_criteria="Final answer produced"))
+        return PlannerOutput(goal=goal, steps=steps)
+
+
+class _MinuteWindow:
+    """Requests and tokens admitted over the last 60 s, for server-side RPM/TPM limits."""
+
+    def __init__(self, rpm: int, tpm: int) -> None:
+        self.rpm = rpm
+        self.tpm = tpm
+        self._events: deque[tuple[float, int]] = deque()
+        self._tokens = 0
+
+    def _expire(self, now: float) -> None:
+        while self._events and self._events[0][0] <= now - 60:
+            self._tokens -= self._events.popleft()[1]
+
+    def admit(self, tokens: int, now: float) -> float:
+        """Record the request and return 0, or return the seconds until it would fit."""
+        self._expire(now)
+        wait = 0.0
+        if self.rpm and len(self._events) >= self.rpm:
+            wait = self._events[0][0] + 60 - now
+        if self.tpm and self._events and self._tokens + tokens > self.tpm:
+            freed, index = self._tokens, 0
+            while index < len(self._events) and freed + tokens > self.tpm:
+                freed -= self._events[index][1]
+                index += 1
+            wait = max(wait, self._events[index - 1][0] + 60 - now)
+        if wait > 0:
+            return wait
+        self._events.append((now, tokens))
+        self._tokens += tokens
+        return 0.0
+
+    def headers(self, now: float) -> dict[str, str]:
+        self._expire(now)
+        reset = f"{max(self._events[0][0] + 60 - now, 0):.3f}s" if self._events else "0s"
+        headers: dict[str, str] = {}
+        if self.rpm:
+            headers["x-ratelimit-limit-requests"] = str(self.rpm)
+            headers["x-ratelimit-remaining-requests"] = str(max(self.rpm - len(self._events), 0))
+            headers["x-ratelimit-reset-requests"] = reset
+        if self.tpm:
+            headers["x-ratelimit-limit-tokens"] = str(self.tpm)
+            headers["x-ratelimit-remaining-tokens"] = str(max(self.tpm - self._tokens, 0))
+            headers["x-ratelimit-reset-tokens"] = reset
+        return headers
+
+
+class StubLLMServer:
+    """Local OpenAI-compatible `/v1/chat/completions` endpoint with latency and failure injection.
+
+    Point the agents at it with `OPENAI_BASE_URL=<server.base_url>` and any
+    non-empty `OPENAI_API_KEY`. Every request is answered after a delay
+    sampled from the configured distribution (per role if overridden) and,
+    at the configured rates, with a 429, a 5xx or a malformed completion.
+    `usage` is estimated from the prompt and completion text. Counters are
+    served at `GET /stats`.
+    """
+
+    def __init__(self, config: StubServerConfig | None = None) -> None:
+        self.config = config or StubServerConfig()
+        script = self.config.script_path if self.config.mode == "scripted" else ""
+        self.responder = StubResponder(script_path=script, plan_steps=self.config.plan_steps)
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._window = _MinuteWindow(self.config.rpm_limit, self.config.tpm_limit)
+        self._ids = itertools.count(1)
+        self._stats: Counter[str] = Counter()
+        self._httpd = ThreadingHTTPServer((self.config.host, self.config.port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self  # type: ignore[attr-defined]
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> str:
+        """Serve from a background thread; returns the base URL."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, name="stub-llm-server", daemon=True
+        )
+        self._thread.start()
+        return self.base_url
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> StubLLMServer:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return dict(sorted(self._stats.items()))
+
+    def _count(self, *names: str, tokens: dict[str, int] | None = None) -> None:
+        with self._lock:
+            for name in names:
+                self._stats[name] += 1
+            for name, value in (tokens or {}).items():
+                self._stats[name] += value
+
+    def _draw(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def _latency_ms(self, role: str, completion_tokens: int) -> float:
+        latency = self.config.role_latency.get(role, self.config.latency)
+        with self._lock:
+            delay = sample_latency_ms(latency, self._rng)
+        return delay + latency.per_completion_token_ms * completion_tokens
+
+    def handle_completion(self, body: dict[str, Any]) -> tuple[int, dict[str, str], dict[str, Any]]:
+        """Status, extra headers and JSON body for one chat completion request."""
+        cfg = self.config
+        messages = body.get("messages") or []
+        system_prompt = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+        user_prompt = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        role = detect_role(system_prompt)
+        self._count("requests", f"requests.{role}")
+
+        prompt_tokens = round((sum(estimate_tokens(str(m.get("content", ""))) + 4 for m in messages)) * cfg.usage_scale)
+        now = time.monotonic()
+        with self._lock:
+            wait_s = self._window.admit(prompt_tokens, now)
+            limit_headers = self._window.headers(now)
+        if wait_s > 0:
+            self._count("rate_limited", "rate_limited.window")
+            return _error(429, "rate_limit_error", "Rate limit reached for requests", {**limit_headers, **_retry_after(wait_s)})
+        if self._draw() < cfg.rate_limit_rate:
+            self._count("rate_limited", "rate_limited.injected")
+            return _error(429, "rate_limit_error", "Rate limit reached for requests", {**limit_headers, **_retry_after(cfg.retry_after_s)})
+        if cfg.reject_response_format and body.get("response_format"):
+            self._count("bad_requests")
+            return _error(400, "invalid_request_error", "'response_format' of type 'json_object' is not supported with this model", {})
+
+        content = self.responder.content(role, user_prompt)
+        completion_tokens = round(estimate_tokens(content) * cfg.usage_scale)
+        time.sleep(self._latency_ms(role, completion_tokens) / 1000)
+        if self._draw() < cfg.server_error_rate:
+            status = (500, 502, 503)[int(self._draw() * 3)]
+            self._count("server_errors", f"server_errors.{status}")
+            return _error(status, "server_error", "The server had an error while processing your request", limit_headers)
+
+        finish_reason = "stop"
+        if cfg.malformed_kinds and self._draw() < cfg.malformed_rate:
+            kind = cfg.malformed_kinds[int(self._draw() * len(cfg.malformed_kinds))]
+            content = malform(content, kind)
+            finish_reason = "length" if kind == "truncated" else "stop"
+            self._count("malformed", f"malformed.{kind}")
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        self._count("completions", tokens=usage)
+        return (
+            200,
+            limit_headers,
+            {
+                "id": f"chatcmpl-stub-{next(self._ids)}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": finish_reason,
+                    }
+                ],
+                "usage": usage,
+            },
+        )
+
+
+def _retry_after(seconds: float) -> dict[str, str]:
+    return {"retry-after": str(max(math.ceil(seconds), 0)), "retry-after-ms": str(round(seconds * 1000))}
+
+
+def _error(status: int, kind: str, message: str, headers: dict[str, str]) -> tuple[int, dict[str, str], dict[str, Any]]:
+    return status, headers, {"error": {"message": message, "type": kind, "param": None, "code": None}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, so pooled clients reuse connections as they would with the real API.
+    protocol_version = "HTTP/1.1"
+    server_version = "plan-and-act-stub/0.1"
+
+    @property
+    def stub(self) -> StubLLMServer:
+        return self.server.stub  # type: ignore[attr-defined]
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") == "/v1/models":
+            self._send(200, {}, {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "plan-and-act"}]})
+        elif self.path.rstrip("/") in ("/stats", "/v1/stats"):
+            self._send(200, {}, self.stub.stats())
+        else:
+            self._send(*_error(404, "invalid_request_error", f"Unknown path {self.path}", {}))
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("content-length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send(*_error(404, "invalid_request_error", f"Unknown path {self.path}", {}))
+            return
+        try:
+            body = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            self._send(*_error(400, "invalid_request_error", "Request body is not valid JSON", {}))
+            return
+        self._send(*self.stub.handle_completion(body))
+
+    def _send(self, status: int, headers: dict[str, str], payload: dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from collections.abc import Sequence
+from typing import Any
+
+from plan_and_act.core.types import ContextConfig
+
+# Local stand-in for a BPE tokenizer: ASCII words cost one token per started
+# 8 letters, digits go in groups of three (as cl100k/o200k split them), every
+# other visible character is one token and whitespace is free. It overestimates
+# English prose slightly, so a budget met here is also met by the provider.
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d{1,3}|\S")
+_TRUNCATION_MARK = " …[truncated]"
+
+
+def _cost(piece: str) -> int:
+    return 1 + len(piece) // 8 if piece[0].isascii() and piece[0].isalpha() else 1
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token count of `text` without a tokenizer dependency."""
+    return sum(_cost(match.group()) for match in _TOKEN_RE.finditer(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of `text` whose estimate, with a truncation mark, fits `max_tokens`."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens - estimate_tokens(_TRUNCATION_MARK)
+    if budget <= 0:
+        return ""
+    used = 0
+    for match in _TOKEN_RE.finditer(text):
+        used += _cost(match.group())
+        if used > budget:
+            return text[: match.start()].rstrip() + _TRUNCATION_MARK
+    return text
+
+
+def _clip(value: Any, max_chars: int) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+    return text if len(text) <= max_chars else text[: max(max_chars - 1, 0)] + "…"
+
+
+def encode_action(index: int, action: dict[str, Any], *, max_argument_chars: int = 80) -> str:
+    """One-line encoding of an `ExecutorAction` record; the rationale is dropped."""
+    parts = [f"{index}. {action.get('action_type', '?')}"]
+    if action.get("target"):
+        parts.append(_clip(action["target"], max_argument_chars))
+    arguments = action.get("arguments") or {}
+    if arguments:
+        parts.append(" ".join(f"{key}={_clip(value, max_argument_chars)}" for key, value in arguments.items()))
+    if action.get("is_final"):
+        parts.append(f"=> final: {_clip(action.get('final_answer', ''), max_argument_chars)}")
+    return " ".join(parts)
+
+
+def summarize_actions(actions: Sequence[dict[str, Any]], *, start: int = 1, top_targets: int = 3) -> str:
+    """Deterministic one-line digest of older actions: counts per type and the most used targets."""
+    if not actions:
+        return ""
+    end = start + len(actions) - 1
+    types = Counter(str(action.get("action_type", "?")) for action in actions)
+    targets = Counter(str(action["target"]) for action in actions if action.get("target"))
+    # Ties break alphabetically so the digest (and the LLM cache key) is stable.
+    by_count = sorted(types.items(), key=lambda item: (-item[1], item[0]))
+    line = f"steps {start}-{end} summarised: " + ", ".join(f"{name} x{count}" for name, count in by_count)
+    if targets:
+        common = sorted(targets.items(), key=lambda item: (-item[1], item[0]))[:top_targets]
+        line += "; top targets: " + ", ".join(f"{name} x{count}" for name, count in common)
+    return line
+
+
+class ContextBuilder:
+    """Renders action history, plans and observations for prompts within token budgets.
+
+    The newest `recent_actions` actions are kept as compact one-line encodings,
+    newest first until the history budget is spent. Everything older is folded
+    into a deterministic digest line. Each section is checked with
+    `estimate_tokens` before the request goes out, so prompt size stays flat
+    as an episode grows instead of growing with every step.
+    """
+
+    def __init__(self, config: ContextConfig | None = None) -> None:
+        self.config = config or ContextConfig()
+
+    def history(self, actions: Sequence[dict[str, Any]]) -> str:
+        cfg = self.config
+        if not cfg.enabled:
+            return str(list(actions))
+        if not actions:
+            return "none"
+        budget = cfg.history_tokens
+        window_start = max(len(actions) - cfg.recent_actions, 0)
+        lines: list[str] = []
+        used = 0
+        first_kept = len(actions)
+        for index in range(len(actions) - 1, window_start - 1, -1):
+            line = encode_action(index + 1, actions[index], max_argument_chars=cfg.max_argument_chars)
+            cost = estimate_tokens(line) + 1
+            if used + cost > budget and lines:
+                break
+            lines.append(line)
+            used += cost
+            first_kept = index
+        lines.reverse()
+        digest = summarize_actions(actions[:first_kept])
+        while digest and lines and used + estimate_tokens(digest) + 1 > budget:
+            # Fold the oldest kept action into the digest until both fit.
+            used -= estimate_tokens(lines.pop(0)) + 1
+            first_kept += 1
+            digest = summarize_actions(actions[:first_kept])
+        return truncate_to_tokens("\n".join(([digest] if digest else []) + lines), budget)
+
+    def plan(self, steps: Sequence[dict[str, Any]]) -> str:
+        cfg = self.config
+        if not cfg.enabled:
+            return str(list(steps))
+        if not steps:
+            return "none"
+        lines: list[str] = []
+        used = 0
+        for position, step in enumerate(steps):
+            line = f"{step.get('step_id', position + 1)}. {_clip(step.get('intent', ''), cfg.max_argument_chars * 2)}"
+            if step.get("success_criteria"):
+                line += f" (done when: {_clip(step['success_criteria'], cfg.max_argument_chars)})"
+            remaining = len(steps) - position - 1
+            reserve = estimate_tokens(f"... {remaining} more steps") + 1 if remaining else 0
+            cost = estimate_tokens(line) + 1
+            if used + cost + reserve > cfg.plan_tokens:
+                lines.append(f"... {len(steps) - position} more steps")
+                break
+            lines.append(line)
+            used += cost
+        return truncate_to_tokens("\n".join(lines), cfg.plan_tokens)
+
+    def observation(self, text: str) -> str:
+        if not self.config.enabled:
+            return text
+        return truncate_to_tokens(text, self.config.observation_tokens)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 from typing import Any, Protocol
 
@@ -10,6 +11,10 @@ class Tool(Protocol):
     def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
         """Run tool with structured arguments."""
 
+    async def arun(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        """Async variant of `run`; tools without one are run in a worker thread."""
+        return await asyncio.to_thread(self.run, arguments)
+
 
 @dataclass
 class ToolRegistry:
@@ -22,3 +27,13 @@ class ToolRegistry:
         if name not in self.tools:
             return {"ok": False, "error": f"Tool '{name}' is not registered"}
         return self.tools[name].run(arguments)
+
+    async def acall(self, name: str, arguments: dict[str, Any]) -> dict[str, Any]:
+        if name not in self.tools:
+            return {"ok": False, "error": f"Tool '{name}' is not registered"}
+        tool = self.tools[name]
+        arun = getattr(tool, "arun", None)
+        if arun is None:
+            # Sync-only tools still work on the async path, off the event loop thread.
+            return await asyncio.to_thread(tool.run, arguments)
+        return await arun(arguments)
@@ -97,3 +97,6 @@ class CalculatorTool:
             "expression": expression,
             "result": value,
         }
+
+    async def arun(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        return self.run(arguments)
@@ -4,6 +4,8 @@ import json
 import urllib.request
 from typing import Any
 
+from plan_and_act.tools.web import async_http_get
+
 
 class GitHubTopContributorTool:
     """Real tool that calls GitHub REST API and returns top contributor."""
@@ -29,11 +31,14 @@ class GitHubTopContributorTool:
 
         return "openai", "openai-python"
 
+    @staticmethod
+    def _contributors_url(owner: str, repo: str) -> str:
+        return f"https://api.github.com/repos/{owner}/{repo}/contributors?per_page=1"
+
     def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
         owner, repo = self._resolve_owner_repo(arguments)
-        url = f"https://api.github.com/repos/{owner}/{repo}/contributors?per_page=1"
         req = urllib.request.Request(
-            url=url,
+            url=self._contributors_url(owner, repo),
             headers={"User-Agent": self.user_agent},
             method="GET",
         )
@@ -50,6 +55,25 @@ class GitHubTopContributorTool:
                 "repo": repo,
             }
 
+        return self._build_result(owner, repo, data)
+
+    async def arun(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        owner, repo = self._resolve_owner_repo(arguments)
+        try:
+            _, _, payload = await async_http_get(self._contributors_url(owner, repo), user_agent=self.user_agent)
+            data = json.loads(payload)
+        except Exception as exc:  # pragma: no cover - network variability
+            return {
+                "ok": False,
+                "error": str(exc),
+                "owner": owner,
+                "repo": repo,
+            }
+
+        return self._build_result(owner, repo, data)
+
+    @staticmethod
+    def _build_result(owner: str, repo: str, data: Any) -> dict[str, Any]:
         if not data:
             return {
                 "ok": False,
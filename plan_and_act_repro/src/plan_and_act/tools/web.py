@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import html
 import re
+import threading
 import urllib.parse
 import urllib.request
+import weakref
 from typing import Any
 
+import httpx
+
 
 def _strip_html(text: str) -> str:
     text = re.sub(r"<script[\\s\\S]*?</script>", " ", text, flags=re.IGNORECASE)
@@ -41,6 +46,28 @@ def parse_duckduckgo_results(html_text: str, max_results: int) -> list[dict[str,
     return items
 
 
+_async_clients_lock = threading.Lock()
+# httpx async pools are bound to the loop that created them.
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = weakref.WeakKeyDictionary()
+
+
+def _async_client() -> httpx.AsyncClient:
+    """Shared client of the running event loop, so tool calls reuse keep-alive connections."""
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = _async_clients[loop] = httpx.AsyncClient(follow_redirects=True)
+        return client
+
+
+async def async_http_get(url: str, *, user_agent: str, timeout: float = 20) -> tuple[int, str, str]:
+    """Non-blocking GET used by the async tool path; returns (status, final_url, text)."""
+    resp = await _async_client().get(url, headers={"User-Agent": user_agent}, timeout=timeout)
+    resp.raise_for_status()
+    return resp.status_code, str(resp.url), resp.text
+
+
 class WebSearchTool:
     """Simple no-key web search via DuckDuckGo HTML endpoint."""
 
@@ -49,18 +76,39 @@ class WebSearchTool:
     def __init__(self, *, user_agent: str = "plan-and-act-repro") -> None:
         self.user_agent = user_agent
 
-    def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+    @staticmethod
+    def _parse_arguments(arguments: dict[str, Any]) -> tuple[str, int, dict[str, Any] | None]:
         query = str(arguments.get("query", "")).strip()
         if not query:
-            return {"ok": False, "error": "Missing query"}
-
-        max_results = int(arguments.get("max_results", 5))
-        max_results = max(1, min(max_results, 10))
+            return query, 0, {"ok": False, "error": "Missing query"}
+        try:
+            max_results = int(arguments.get("max_results", 5))
+        except (TypeError, ValueError):
+            return query, 0, {"ok": False, "query": query, "error": "max_results must be an integer"}
+        return query, max(1, min(max_results, 10)), None
 
+    @staticmethod
+    def _search_url(query: str) -> str:
         q = urllib.parse.quote_plus(query)
-        url = f"https://duckduckgo.com/html/?q={q}"
+        return f"https://duckduckgo.com/html/?q={q}"
+
+    @staticmethod
+    def _build_result(query: str, payload: str, max_results: int) -> dict[str, Any]:
+        results = parse_duckduckgo_results(payload, max_results)
+        return {
+            "ok": True,
+            "query": query,
+            "count": len(results),
+            "results": results,
+        }
+
+    def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        query, max_results, error = self._parse_arguments(arguments)
+        if error is not None:
+            return error
+
         req = urllib.request.Request(
-            url=url,
+            url=self._search_url(query),
             headers={"User-Agent": self.user_agent},
             method="GET",
         )
@@ -75,13 +123,23 @@ class WebSearchTool:
                 "error": str(exc),
             }
 
-        results = parse_duckduckgo_results(payload, max_results)
-        return {
-            "ok": True,
-            "query": query,
-            "count": len(results),
-            "results": results,
-        }
+        return self._build_result(query, payload, max_results)
+
+    async def arun(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        query, max_results, error = self._parse_arguments(arguments)
+        if error is not None:
+            return error
+
+        try:
+            _, _, payload = await async_http_get(self._search_url(query), user_agent=self.user_agent)
+        except Exception as exc:  # pragma: no cover - network variability
+            return {
+                "ok": False,
+                "query": query,
+                "error": str(exc),
+            }
+
+        return self._build_result(query, payload, max_results)
 
 
 class FetchURLTool:
@@ -92,21 +150,46 @@ class FetchURLTool:
     def __init__(self, *, user_agent: str = "plan-and-act-repro") -> None:
         self.user_agent = user_agent
 
-    def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+    @staticmethod
+    def _validate_arguments(arguments: dict[str, Any]) -> tuple[str, int, dict[str, Any] | None]:
         url = str(arguments.get("url", "")).strip()
         if not url:
-            return {"ok": False, "error": "Missing url"}
+            return url, 0, {"ok": False, "error": "Missing url"}
+        try:
+            max_chars = int(arguments.get("max_chars", 1200))
+        except (TypeError, ValueError):
+            return url, 0, {"ok": False, "url": url, "error": "max_chars must be an integer"}
+        max_chars = max(200, min(max_chars, 8000))
 
         parsed = urllib.parse.urlparse(url)
         if parsed.scheme not in {"http", "https"}:
-            return {
+            return url, max_chars, {
                 "ok": False,
                 "url": url,
                 "error": "Only http/https URLs are supported",
             }
+        return url, max_chars, None
 
-        max_chars = int(arguments.get("max_chars", 1200))
-        max_chars = max(200, min(max_chars, 8000))
+    @staticmethod
+    def _build_result(url: str, status: int, final_url: str, payload: str, max_chars: int) -> dict[str, Any]:
+        title_match = re.search(r"<title[^>]*>(.*?)</title>", payload, flags=re.IGNORECASE | re.DOTALL)
+        title = _strip_html(title_match.group(1)) if title_match else ""
+        text = _strip_html(payload)
+
+        return {
+            "ok": True,
+            "url": url,
+            "status": status,
+            "final_url": final_url,
+            "title": title,
+            "content_preview": text[:max_chars],
+            "content_length": len(text),
+        }
+
+    def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        url, max_chars, error = self._validate_arguments(arguments)
+        if error is not None:
+            return error
 
         req = urllib.request.Request(
             url=url,
@@ -126,16 +209,20 @@ class FetchURLTool:
                 "error": str(exc),
             }
 
-        title_match = re.search(r"<title[^>]*>(.*?)</title>", payload, flags=re.IGNORECASE | re.DOTALL)
-        title = _strip_html(title_match.group(1)) if title_match else ""
-        text = _strip_html(payload)
+        return self._build_result(url, status, final_url, payload, max_chars)
 
-        return {
-            "ok": True,
-            "url": url,
-            "status": status,
-            "final_url": final_url,
-            "title": title,
-            "content_preview": text[:max_chars],
-            "content_length": len(text),
-        }
+    async def arun(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        url, max_chars, error = self._validate_arguments(arguments)
+        if error is not None:
+            return error
+
+        try:
+            status, final_url, payload = await async_http_get(url, user_agent=self.user_agent)
+        except Exception as exc:  # pragma: no cover - network variability
+            return {
+                "ok": False,
+                "url": url,
+                "error": str(exc),
+            }
+
+        return self._build_result(url, status, final_url, payload, max_chars)
@@ -1,9 +1,13 @@
 from plan_and_act.tracing.collector import TraceCollector
+from plan_and_act.tracing.reader import TraceReader
 from plan_and_act.tracing.schemas import TraceConfig, TraceEvent, TraceSession
+from plan_and_act.tracing.spans import span
 
 __all__ = [
     "TraceCollector",
     "TraceConfig",
+    "TraceReader",
     "TraceSession",
     "TraceEvent",
+    "span",
 ]
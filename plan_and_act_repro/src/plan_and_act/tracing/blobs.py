@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from plan_and_act.core.state import AppendOnlyList
+
+BLOB_REF = "$blob"
+BLOB_LIST_REF = "$blob_list"
+
+
+class BlobStore:
+    """Content-addressed store: each blob lives at `<root>/<sha[:2]>/<sha>`.
+
+    Writes go through a temp file and `os.replace`, so several runs (or
+    processes) can share one root and a reader never sees a partial blob.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self._known: set[str] = set()
+        self._lock = threading.Lock()
+        self.stats = {"blobs_written": 0, "blobs_deduped": 0, "bytes_written": 0}
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if digest in self._known:
+                self.stats["blobs_deduped"] += 1
+                return digest
+            self._known.add(digest)
+
+        path = self.path_for(digest)
+        if path.exists():
+            with self._lock:
+                self.stats["blobs_deduped"] += 1
+            return digest
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self.stats["blobs_written"] += 1
+            self.stats["bytes_written"] += len(data)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        return self.path_for(digest).read_bytes()
+
+    def put_json(self, value: Any) -> str:
+        return self.put(orjson.dumps(value))
+
+    def get_json(self, digest: str) -> Any:
+        return orjson.loads(self.get(digest))
+
+
+class PayloadCompactor:
+    """Swaps large payload fields for blob references before an event is written.
+
+    - Strings of at least `min_bytes` become `{"$blob": sha, "encoding": "utf-8"}`.
+    - Fields named in `delta_fields` that hold an append-only list are stored
+      as a chain of nodes `{"base": sha | None, "items": [...new items]}` and
+      become `{"$blob_list": sha, "length": n}`. A history view
+      (`AppendOnlyList`) that extends the last one stored adds a node with
+      only its new items, so logging a growing history once per step costs
+      O(new items). A plain list starts a new chain.
+    - Any other list or dict whose JSON encoding reaches `min_bytes` becomes
+      `{"$blob": sha, "encoding": "json"}` (repeated plans dedupe for free).
+    """
+
+    def __init__(self, store: BlobStore, *, min_bytes: int, delta_fields: list[str]) -> None:
+        self.store = store
+        self.min_bytes = min_bytes
+        self.delta_fields = set(delta_fields)
+        # field -> (history view stored last, head digest).
+        self._heads: dict[str, tuple[AppendOnlyList[Any], str]] = {}
+        self._lock = threading.Lock()
+
+    def compact(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return {key: self._compact_field(key, value) for key, value in payload.items()}
+
+    def _compact_field(self, key: str, value: Any) -> Any:
+        if isinstance(value, str):
+            if len(value) >= self.min_bytes:
+                return {BLOB_REF: self.store.put(value.encode("utf-8")), "encoding": "utf-8"}
+            return value
+        if key in self.delta_fields and isinstance(value, (list, AppendOnlyList)):
+            return self._compact_list(key, value)
+        if isinstance(value, AppendOnlyList):
+            value = list(value)
+        if isinstance(value, (list, dict)) and value:
+            encoded = orjson.dumps(value)
+            if len(encoded) >= self.min_bytes:
+                return {BLOB_REF: self.store.put(encoded), "encoding": "json"}
+        return value
+
+    def _compact_list(self, key: str, items: list[Any] | AppendOnlyList[Any]) -> dict[str, Any]:
+        with self._lock:
+            head = self._heads.get(key)
+            base: str | None = None
+            start = 0
+            # A view sharing the stored view's buffer is known to start with its items.
+            if head is not None and isinstance(items, AppendOnlyList) and items.extends(head[0]):
+                base, start = head[1], len(head[0])
+                if start == len(items):
+                    return {BLOB_LIST_REF: base, "length": start}
+            digest = self.store.put_json({"base": base, "items": items[start:]})
+            if isinstance(items, AppendOnlyList):
+                self._heads[key] = (items, digest)
+            else:
+                self._heads.pop(key, None)
+        return {BLOB_LIST_REF: digest, "length": len(items)}
+
+
+class BlobResolver:
+    """Inverse of `PayloadCompactor`, memoising list nodes so chains resolve in linear time."""
+
+    def __init__(self, store: BlobStore) -> None:
+        self.store = store
+        self._lists: dict[str, tuple[list[Any], int]] = {}
+
+    def rehydrate(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return {key: self._resolve(value) for key, value in payload.items()}
+
+    def _resolve(self, value: Any) -> Any:
+        if not isinstance(value, dict) or len(value) > 2:
+            return value
+        if BLOB_REF in value:
+            data = self.store.get(value[BLOB_REF])
+            return orjson.loads(data) if value.get("encoding") == "json" else data.decode("utf-8")
+        if BLOB_LIST_REF in value:
+            return self._resolve_list(value[BLOB_LIST_REF])
+        return value
+
+    def _resolve_list(self, digest: str) -> list[Any]:
+        chain: list[tuple[str, list[Any]]] = []
+        cursor: str | None = digest
+        while cursor is not None and cursor not in self._lists:
+            node = self.store.get_json(cursor)
+            chain.append((cursor, node["items"]))
+            cursor = node["base"]
+
+        if cursor is None:
+            backing: list[Any] = []
+        else:
+            backing, length = self._lists[cursor]
+            if length != len(backing):
+                backing = backing[:length]
+        # Nodes of one history share a single backing list, each remembering its length.
+        for node_digest, items in reversed(chain):
+            backing.extend(items)
+            self._lists[node_digest] = (backing, len(backing))
+
+        backing, length = self._lists[digest]
+        return backing[:length]
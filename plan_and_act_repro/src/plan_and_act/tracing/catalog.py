@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from plan_and_act.tracing.reader import TraceReader
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL UNIQUE,
+    run_dir TEXT NOT NULL,
+    session_mtime_ns INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT NOT NULL,
+    goal TEXT NOT NULL,
+    environment TEXT,
+    planner_model TEXT,
+    executor_model TEXT,
+    replanner_model TEXT,
+    success INTEGER,
+    step_count INTEGER,
+    event_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    run INTEGER NOT NULL REFERENCES runs(id),
+    seq INTEGER NOT NULL,
+    step INTEGER NOT NULL,
+    event_type TEXT NOT NULL,
+    status TEXT,
+    latency_ms REAL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    total_tokens INTEGER,
+    tool_name TEXT,
+    ok INTEGER,
+    PRIMARY KEY (run, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_runs_executor_model ON runs(executor_model, status);
+CREATE INDEX IF NOT EXISTS idx_runs_planner_model ON runs(planner_model, status);
+CREATE INDEX IF NOT EXISTS idx_runs_started_at ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_events_type_status ON events(event_type, status, run);
+CREATE INDEX IF NOT EXISTS idx_events_tool ON events(tool_name, ok, run);
+"""
+
+# Runs are committed in batches so an interrupted ingest keeps what it finished.
+_COMMIT_EVERY = 256
+
+
+def _model(session: dict[str, Any], role: str) -> str | None:
+    model = session.get("model_stack", {}).get(role, {})
+    return str(model.get("model")) if isinstance(model, dict) and model.get("model") else None
+
+
+def _event_row(run: int, event: dict[str, Any]) -> tuple[Any, ...]:
+    payload = event.get("payload") or {}
+    usage = payload.get("usage")
+    usage = usage if isinstance(usage, dict) else {}
+    status = payload.get("status")
+    latency = payload.get("latency_ms")
+    tool_name = payload.get("tool_name")
+    ok = payload.get("ok")
+    return (
+        run,
+        int(event.get("seq", 0)),
+        int(event.get("step", 0)),
+        str(event.get("event_type", "")),
+        status if isinstance(status, str) else None,
+        float(latency) if isinstance(latency, (int, float)) else None,
+        usage.get("prompt_tokens"),
+        usage.get("completion_tokens"),
+        usage.get("total_tokens"),
+        tool_name if isinstance(tool_name, str) else None,
+        int(ok) if isinstance(ok, bool) else None,
+    )
+
+
+class TraceCatalog:
+    """SQLite catalog of run summaries and per-event fields across every run under `base_dir`.
+
+    `ingest()` is incremental: a run is (re)read only when its `session.json`
+    changed since the last ingest, and runs still marked `running` are left
+    for a later pass. Queries then hit the catalog's indexes instead of
+    parsing trace directories.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Large ingests touch every page of the event indexes; the 2 MB default cache thrashes.
+        self._conn.execute("PRAGMA cache_size=-65536")
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "TraceCatalog":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def ingest(self, base_dir: str | Path, *, include_running: bool = False) -> dict[str, int]:
+        stats = {"runs_ingested": 0, "runs_updated": 0, "runs_unchanged": 0, "runs_pending": 0, "events_ingested": 0}
+        known = dict(self._conn.execute("SELECT run_id, session_mtime_ns FROM runs"))
+        pending = 0
+        for run_dir, mtime_ns in iter_run_dirs(Path(base_dir)):
+            if known.get(run_dir.name) == mtime_ns:
+                stats["runs_unchanged"] += 1
+                continue
+            try:
+                session = orjson.loads((run_dir / "session.json").read_bytes())
+            except (OSError, orjson.JSONDecodeError):
+                # Being rewritten right now; the next ingest picks it up.
+                stats["runs_pending"] += 1
+                continue
+            if session.get("status") == "running" and not include_running:
+                stats["runs_pending"] += 1
+                continue
+
+            stats["events_ingested"] += self._ingest_run(run_dir, session, mtime_ns)
+            stats["runs_updated" if run_dir.name in known else "runs_ingested"] += 1
+            pending += 1
+            if pending >= _COMMIT_EVERY:
+                self._conn.commit()
+                pending = 0
+        self._conn.commit()
+        return stats
+
+    def _ingest_run(self, run_dir: Path, session: dict[str, Any], mtime_ns: int) -> int:
+        run_id = run_dir.name
+        summary = session.get("summary") or {}
+        success = summary.get("success")
+        step_count = summary.get("step_count")
+        events = list(TraceReader(run_dir).iter_events(rehydrate=False))
+        values = (
+            str(run_dir),
+            mtime_ns,
+            str(session.get("status", "")),
+            str(session.get("started_at", "")),
+            str(session.get("finished_at", "")),
+            str(session.get("goal", "")),
+            (session.get("environment") or {}).get("name"),
+            _model(session, "planner"),
+            _model(session, "executor"),
+            _model(session, "replanner"),
+            int(success) if isinstance(success, bool) else None,
+            int(step_count) if isinstance(step_count, int) else None,
+            len(events),
+        )
+
+        existing = self._conn.execute("SELECT id FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if existing is None:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (run_id, run_dir, session_mtime_ns, status, started_at, finished_at, goal, environment, "
+                "planner_model, executor_model, replanner_model, success, step_count, event_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, *values),
+            )
+            run = int(cursor.lastrowid or 0)
+        else:
+            run = int(existing[0])
+            self._conn.execute("DELETE FROM events WHERE run = ?", (run,))
+            self._conn.execute(
+                "UPDATE runs SET run_dir = ?, session_mtime_ns = ?, status = ?, started_at = ?, finished_at = ?, goal = ?, "
+                "environment = ?, planner_model = ?, executor_model = ?, replanner_model = ?, success = ?, "
+                "step_count = ?, event_count = ? WHERE id = ?",
+                (*values, run),
+            )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [_event_row(run, event) for event in events],
+        )
+        return len(events)
+
+    def find_runs(
+        self,
+        *,
+        executor_model: str | None = None,
+        planner_model: str | None = None,
+        run_status: str | None = None,
+        event_type: str | None = None,
+        event_status: str | None = None,
+        tool_name: str | None = None,
+        ok: bool | None = None,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """Runs matching the run filters that have at least one event matching every event filter.
+
+        Each row carries `matching_events`, the number of such events (all
+        events of the run when no event filter is given), newest runs first.
+        """
+        run_clauses: list[str] = []
+        params: list[Any] = []
+        for column, value in [("executor_model", executor_model), ("planner_model", planner_model), ("status", run_status)]:
+            if value is not None:
+                run_clauses.append(f"r.{column} = ?")
+                params.append(value)
+
+        event_clauses: list[str] = []
+        event_params: list[Any] = []
+        for column, value in [("event_type", event_type), ("status", event_status), ("tool_name", tool_name)]:
+            if value is not None:
+                event_clauses.append(f"e.{column} = ?")
+                event_params.append(value)
+        if ok is not None:
+            event_clauses.append("e.ok = ?")
+            event_params.append(int(ok))
+
+        columns = "r.run_id, r.status, r.executor_model, r.success, r.step_count, r.started_at, r.goal"
+        if event_clauses:
+            sql = (
+                f"SELECT {columns}, COUNT(*) AS matching_events FROM events e JOIN runs r ON r.id = e.run "
+                f"WHERE {' AND '.join(event_clauses + run_clauses)} "
+                "GROUP BY r.id ORDER BY r.started_at DESC LIMIT ?"
+            )
+            params = event_params + params
+        else:
+            where = f"WHERE {' AND '.join(run_clauses)} " if run_clauses else ""
+            sql = f"SELECT {columns}, r.event_count AS matching_events FROM runs r {where}ORDER BY r.started_at DESC LIMIT ?"
+        return self.query(sql, [*params, limit])
+
+    def query(self, sql: str, params: list[Any] | tuple[Any, ...] = ()) -> list[dict[str, Any]]:
+        """Run a read-only SQL query against the catalog; rows come back as dicts."""
+        conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            cursor = conn.execute(sql, params)
+            names = [column[0] for column in cursor.description or []]
+            return [dict(zip(names, row)) for row in cursor]
+        finally:
+            conn.close()
+
+    def run_count(self) -> int:
+        return int(self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0])
+
+
+def iter_run_dirs(base_dir: str | Path) -> Iterator[tuple[Path, int]]:
+    """(run_dir, session.json mtime_ns) for every run directory directly under `base_dir`."""
+    base_dir = Path(base_dir)
+    if not base_dir.is_dir():
+        return
+    with os.scandir(base_dir) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            try:
+                mtime_ns = os.stat(os.path.join(entry.path, "session.json")).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            yield Path(entry.path), mtime_ns
@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import zlib
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from pathlib import Path
 from typing import Any
 
+from plan_and_act.tracing.blobs import BlobStore, PayloadCompactor
+from plan_and_act.tracing.reader import TraceReader
 from plan_and_act.tracing.schemas import TraceConfig, TraceEvent, TraceSession, utc_now_iso
+from plan_and_act.tracing.spans import Span, span
 from plan_and_act.tracing.writer import TraceWriter
 
+# Payloads may be passed as zero-argument factories; they only run for recorded events.
+TracePayload = dict[str, Any] | Callable[[], dict[str, Any]]
+
 
 class TraceCollector:
     def __init__(self, *, config: TraceConfig, run_id: str) -> None:
@@ -14,9 +24,36 @@ class TraceCollector:
         self.writer: TraceWriter | None = None
         self.session: TraceSession | None = None
         self._event_count = 0
+        self._dropped_count = 0
+        self.blob_store: BlobStore | None = None
+        self._compactor: PayloadCompactor | None = None
 
         if self.enabled:
-            self.writer = TraceWriter(base_dir=config.base_dir, run_id=run_id)
+            self.writer = TraceWriter(
+                base_dir=config.base_dir,
+                run_id=run_id,
+                flush_every=config.flush_every,
+                flush_interval_s=config.flush_interval_s,
+                background=config.background,
+                queue_size=config.queue_size,
+                compression=config.compression,
+                compression_level=config.compression_level,
+                segment_max_bytes=config.segment_max_bytes,
+                segment_max_events=config.segment_max_events,
+                index=config.index,
+            )
+            if config.blobs:
+                blob_root = Path(config.blob_dir) if config.blob_dir else self.writer.run_dir / "blobs"
+                self.blob_store = BlobStore(blob_root)
+                self._compactor = PayloadCompactor(
+                    self.blob_store,
+                    min_bytes=config.blob_min_bytes,
+                    delta_fields=config.blob_delta_fields,
+                )
+
+    def __bool__(self) -> bool:
+        # A disabled collector is falsy, so `if tracer:` guards skip payload construction entirely.
+        return self.enabled
 
     @classmethod
     def disabled(cls) -> "TraceCollector":
@@ -43,22 +80,73 @@ class TraceCollector:
             runtime_config=runtime_config,
             metadata=metadata or {},
         )
+        if self.config.experiment:
+            self.session.metadata.setdefault("experiment", self.config.experiment)
+        if self.blob_store is not None:
+            self.session.metadata["blob_dir"] = str(self.blob_store.root.resolve())
         self.writer.write_session(self.session.model_dump())
 
+    def resume_session(self) -> bool:
+        """Reopen this run's existing trace and continue its event numbering.
+
+        Returns False when there is no session to resume (tracing disabled or
+        the original run was not traced).
+        """
+        if not self.enabled or self.writer is None:
+            return False
+
+        existing = self.writer.read_session()
+        if existing is None:
+            return False
+
+        self.session = TraceSession.model_validate(existing)
+        self.session.status = "running"
+        self.session.finished_at = ""
+        self._event_count = self.writer.count_events()
+        self.writer.write_session(self.session.model_dump())
+        return True
+
+    def wants(self, event_type: str, step: int) -> bool:
+        """Whether an event of this type at this step would be recorded.
+
+        Sampling is keyed by (sample_seed, run_id, event_type, step) rather than
+        drawn at random, so repeated checks agree and a resumed run keeps the
+        decisions of the original one.
+        """
+        if not self.enabled or self.writer is None:
+            return False
+        if not self.config.events.get(event_type, True):
+            return False
+        rate = self.config.sample_rates.get(event_type, self.config.sample_rate)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        key = f"{self.config.sample_seed}:{self.run_id}:{event_type}:{step}".encode("utf-8")
+        return zlib.crc32(key) / 0xFFFFFFFF < rate
+
     def log_event(
         self,
         *,
         event_type: str,
         step: int,
-        payload: dict[str, Any],
+        payload: TracePayload,
         meta: dict[str, Any] | None = None,
     ) -> None:
-        if not self.enabled or self.writer is None:
+        if not self.wants(event_type, step):
+            if self.enabled:
+                self._dropped_count += 1
             return
+        if callable(payload):
+            payload = payload()
+        if self._compactor is not None:
+            payload = self._compactor.compact(payload)
 
+        assert self.writer is not None
         event = TraceEvent(
             schema_version=self.config.schema_version,
             run_id=self.run_id,
+            seq=self._event_count,
             step=step,
             event_type=event_type,
             payload=payload,
@@ -67,8 +155,27 @@ class TraceCollector:
         self.writer.append_event(event.model_dump())
         self._event_count += 1
 
+    def span(
+        self, name: str, *, step: int = -1, attributes: dict[str, Any] | None = None
+    ) -> AbstractContextManager[Span | None]:
+        """Context manager timing a block as a nested span; see `plan_and_act.tracing.spans.span`."""
+        return span(self, name, step=step, attributes=attributes)
+
+    def reader(self) -> TraceReader:
+        """Reader over everything logged so far, with blob references rehydrated."""
+        if self.writer is None:
+            raise RuntimeError("Tracing is disabled; there is no trace to read.")
+        self.writer.flush()
+        blob_dir = self.blob_store.root if self.blob_store is not None else None
+        return TraceReader(self.writer.run_dir, blob_dir=blob_dir)
+
     def close(self, *, status: str, summary: dict[str, Any] | None = None) -> None:
-        if not self.enabled or self.writer is None or self.session is None:
+        if not self.enabled or self.writer is None:
+            return
+
+        # Events are flushed before the session is marked finished.
+        self.writer.close()
+        if self.session is None:
             return
 
         self.session.finished_at = utc_now_iso()
@@ -76,5 +183,8 @@ class TraceCollector:
         self.session.summary = {
             **(summary or {}),
             "event_count": self._event_count,
+            "events_dropped": self._dropped_count,
         }
+        if self.blob_store is not None:
+            self.session.summary["blobs"] = dict(self.blob_store.stats)
         self.writer.write_session(self.session.model_dump())
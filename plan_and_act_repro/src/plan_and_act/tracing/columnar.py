@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import importlib
+import re
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from plan_and_act.tracing.catalog import iter_run_dirs
+from plan_and_act.tracing.reader import TraceReader
+
+# Hot fields of `TraceEvent` and its payloads, flattened into typed columns.
+# Fields that do not apply to an event type (e.g. tool_name on llm_call) are null.
+EVENT_COLUMNS: dict[str, str] = {
+    "run_id": "string",
+    "seq": "int64",
+    "step": "int32",
+    "event_type": "string",
+    "timestamp": "timestamp",
+    "component": "string",
+    "model": "string",
+    "status": "string",
+    "latency_ms": "float64",
+    "prompt_tokens": "int64",
+    "completion_tokens": "int64",
+    "total_tokens": "int64",
+    "tool_name": "string",
+    "ok": "bool",
+    "run_status": "string",
+}
+PARTITION_COLUMNS = ("date", "experiment")
+STATE_FILE = "_export_state.json"
+_UNSAFE_PARTITION_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def _pyarrow() -> Any:
+    try:
+        importlib.import_module("pyarrow.parquet")
+        return importlib.import_module("pyarrow")
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise ImportError("Parquet trace export needs `pyarrow`; install with `pip install -e .[parquet]`") from exc
+
+
+def event_schema() -> Any:
+    pa = _pyarrow()
+    types = {
+        "string": pa.string(),
+        "int32": pa.int32(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in EVENT_COLUMNS.items()])
+
+
+def _str(value: Any) -> str | None:
+    return value if isinstance(value, str) else None
+
+
+def _int(value: Any) -> int | None:
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _float(value: Any) -> float | None:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def flatten_event(event: dict[str, Any], session: dict[str, Any]) -> dict[str, Any]:
+    """One columnar row from a `TraceEvent` dict and its run's `TraceSession` dict."""
+    payload = event.get("payload") or {}
+    usage = payload.get("usage")
+    usage = usage if isinstance(usage, dict) else {}
+    ok = payload.get("ok")
+    return {
+        "run_id": str(event.get("run_id", session.get("run_id", ""))),
+        "seq": int(event.get("seq", 0)),
+        "step": int(event.get("step", 0)),
+        "event_type": str(event.get("event_type", "")),
+        "timestamp": event.get("timestamp") or None,
+        "component": _str(payload.get("component")),
+        "model": _str(payload.get("model")),
+        "status": _str(payload.get("status")),
+        "latency_ms": _float(payload.get("latency_ms")),
+        "prompt_tokens": _int(usage.get("prompt_tokens")),
+        "completion_tokens": _int(usage.get("completion_tokens")),
+        "total_tokens": _int(usage.get("total_tokens")),
+        "tool_name": _str(payload.get("tool_name")),
+        "ok": ok if isinstance(ok, bool) else None,
+        "run_status": str(session.get("status", "")),
+    }
+
+
+def partition_of(session: dict[str, Any], experiment: str | None = None) -> tuple[str, str]:
+    """(date, experiment) partition of a run: its start date and the experiment it belongs to.
+
+    The experiment is the explicit override, else `metadata.experiment` of the
+    session, else "default".
+    """
+    date = str(session.get("started_at", ""))[:10] or "unknown"
+    name = experiment or str((session.get("metadata") or {}).get("experiment", "")) or "default"
+    return date, _UNSAFE_PARTITION_CHARS.sub("_", name)
+
+
+class ParquetTraceExporter:
+    """Appends trace events to a hive-partitioned Parquet dataset under `out_dir`.
+
+    Files land in `date=YYYY-MM-DD/experiment=<name>/part-*.parquet`, so
+    `pyarrow.dataset` (or DuckDB, polars, Spark) can prune partitions and scan
+    only the typed columns a query touches. Exports are incremental: runs
+    already exported are skipped unless their `session.json` changed (e.g. a
+    resumed run), in which case their old rows are dropped from the part files
+    that held them before the run is written again.
+    """
+
+    def __init__(self, out_dir: str | Path, *, rows_per_file: int = 500_000) -> None:
+        self.out_dir = Path(out_dir)
+        self.rows_per_file = rows_per_file
+        self._state_path = self.out_dir / STATE_FILE
+        self._state: dict[str, dict[str, Any]] = {}
+        if self._state_path.exists():
+            self._state = orjson.loads(self._state_path.read_bytes()).get("runs", {})
+        self._buffers: dict[tuple[str, str], dict[str, list[Any]]] = {}
+        self._buffered_runs: dict[tuple[str, str], list[tuple[str, int]]] = {}
+        self._parts_written = 0
+
+    def export(
+        self,
+        base_dir: str | Path,
+        *,
+        experiment: str | None = None,
+        event_types: Iterable[str] | None = None,
+        include_running: bool = False,
+    ) -> dict[str, int]:
+        wanted = set(event_types) if event_types is not None else None
+        stats = {"runs_exported": 0, "runs_replaced": 0, "runs_unchanged": 0, "runs_pending": 0, "events_exported": 0}
+        stale: dict[str, set[str]] = {}
+        for run_dir, mtime_ns in iter_run_dirs(base_dir):
+            run_id = run_dir.name
+            previous = self._state.get(run_id)
+            if previous is not None and previous["mtime_ns"] == mtime_ns:
+                stats["runs_unchanged"] += 1
+                continue
+            try:
+                session = orjson.loads((run_dir / "session.json").read_bytes())
+            except (OSError, orjson.JSONDecodeError):
+                stats["runs_pending"] += 1
+                continue
+            if session.get("status") == "running" and not include_running:
+                stats["runs_pending"] += 1
+                continue
+
+            if previous is not None:
+                stale.setdefault(previous["part"], set()).add(run_id)
+                stats["runs_replaced"] += 1
+            partition = partition_of(session, experiment)
+            buffer = self._buffers.setdefault(partition, {name: [] for name in EVENT_COLUMNS})
+            count = 0
+            for event in TraceReader(run_dir).iter_events(rehydrate=False):
+                if wanted is not None and event.get("event_type") not in wanted:
+                    continue
+                for name, value in flatten_event(event, session).items():
+                    buffer[name].append(value)
+                count += 1
+            self._buffered_runs.setdefault(partition, []).append((run_id, mtime_ns))
+            stats["runs_exported"] += 1
+            stats["events_exported"] += count
+            if len(buffer["run_id"]) >= self.rows_per_file:
+                self._flush_partition(partition)
+
+        # Old copies go first so a run is never present twice once the export finishes.
+        self._drop_runs(stale)
+        for partition in list(self._buffers):
+            self._flush_partition(partition)
+        self._save_state()
+        return stats
+
+    def dataset(self) -> Any:
+        """The exported events as a `pyarrow.dataset.Dataset` with `date`/`experiment` partition columns."""
+        _pyarrow()
+        ds = importlib.import_module("pyarrow.dataset")
+        return ds.dataset(self.out_dir, format="parquet", partitioning="hive")
+
+    def _flush_partition(self, partition: tuple[str, str]) -> None:
+        buffer = self._buffers.pop(partition)
+        runs = self._buffered_runs.pop(partition, [])
+        if not buffer["run_id"]:
+            return
+        pa = _pyarrow()
+        pq = importlib.import_module("pyarrow.parquet")
+        schema = event_schema()
+        columns = {}
+        for field in schema:
+            values = buffer[field.name]
+            if pa.types.is_timestamp(field.type):
+                columns[field.name] = pa.array(values, type=pa.string()).cast(field.type)
+            else:
+                columns[field.name] = pa.array(values, type=field.type)
+        table = pa.table(columns, schema=schema)
+
+        date, experiment = partition
+        part_dir = self.out_dir / f"date={date}" / f"experiment={experiment}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        self._parts_written += 1
+        path = part_dir / f"part-{time.time_ns()}-{self._parts_written:04d}.parquet"
+        tmp_path = path.with_name("." + path.name)
+        pq.write_table(table, tmp_path, compression="zstd")
+        tmp_path.replace(path)
+        relative = str(path.relative_to(self.out_dir))
+        for run_id, mtime_ns in runs:
+            self._state[run_id] = {"mtime_ns": mtime_ns, "part": relative}
+
+    def _drop_runs(self, stale: dict[str, set[str]]) -> None:
+        if not stale:
+            return
+        pa = _pyarrow()
+        pq = importlib.import_module("pyarrow.parquet")
+        pc = importlib.import_module("pyarrow.compute")
+        for relative, run_ids in stale.items():
+            path = self.out_dir / relative
+            if not path.exists():
+                continue
+            table = pq.read_table(path)
+            keep = table.filter(pc.invert(pc.is_in(table["run_id"], value_set=pa.array(sorted(run_ids)))))
+            if keep.num_rows == 0:
+                path.unlink()
+                continue
+            tmp_path = path.with_name("." + path.name)
+            pq.write_table(keep, tmp_path, compression="zstd")
+            tmp_path.replace(path)
+
+    def _save_state(self) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._state_path.with_name(self._state_path.name + ".tmp")
+        tmp_path.write_bytes(orjson.dumps({"runs": self._state}))
+        tmp_path.replace(self._state_path)
+
+
+def export_events_to_parquet(
+    base_dir: str | Path,
+    out_dir: str | Path,
+    *,
+    experiment: str | None = None,
+    event_types: Iterable[str] | None = None,
+    rows_per_file: int = 500_000,
+) -> dict[str, int]:
+    return ParquetTraceExporter(out_dir, rows_per_file=rows_per_file).export(
+        base_dir, experiment=experiment, event_types=event_types
+    )
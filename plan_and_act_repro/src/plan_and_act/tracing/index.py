@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import struct
+import zlib
+from pathlib import Path
+from typing import NamedTuple
+
+# One fixed-size record per event: byte offset of the line in the (uncompressed)
+# segment, line length without the newline, step, crc32 of the event type.
+_RECORD = struct.Struct("<QIiI")
+INDEX_SUFFIX = ".idx"
+
+
+class IndexEntry(NamedTuple):
+    offset: int
+    length: int
+    step: int
+    type_key: int
+
+
+def index_path(events_path: Path) -> Path:
+    return events_path.with_name(events_path.name + INDEX_SUFFIX)
+
+
+def event_type_key(event_type: str) -> int:
+    return zlib.crc32(event_type.encode("utf-8"))
+
+
+def pack_entry(offset: int, length: int, step: int, type_key: int) -> bytes:
+    return _RECORD.pack(offset, length, step, type_key)
+
+
+def read_index(path: Path) -> list[IndexEntry]:
+    """Entries of a sidecar index; a torn trailing record from a crash is ignored."""
+    if not path.exists():
+        return []
+    data = path.read_bytes()
+    usable = len(data) - len(data) % _RECORD.size
+    return [IndexEntry(*fields) for fields in _RECORD.iter_unpack(data[:usable])]
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import mmap
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from plan_and_act.tracing.blobs import BlobResolver, BlobStore
+from plan_and_act.tracing.index import IndexEntry, event_type_key, index_path, read_index
+from plan_and_act.tracing.segments import is_compressed, iter_event_lines, iter_segment_chunks, list_segments
+
+
+class _IndexedSegment:
+    """One events file plus its sidecar index, opened for random access.
+
+    Plain files are memory-mapped; compressed segments are decoded once into
+    memory. An index that is missing or stops short of the data (a crash
+    between writing lines and their entries, or a trace recorded before
+    indexing existed) is completed by scanning only the unindexed bytes.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file: Any = None
+        self._data: bytes | mmap.mmap = b""
+        if is_compressed(path):
+            self._data = b"".join(iter_segment_chunks(path))
+        elif path.stat().st_size > 0:
+            self._file = path.open("rb")
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.entries = self._load_entries()
+
+    def _load_entries(self) -> list[IndexEntry]:
+        entries = read_index(index_path(self.path))
+        expected = 0
+        for entry in entries:
+            if entry.offset != expected:
+                entries, expected = [], 0
+                break
+            expected = entry.offset + entry.length + 1
+        if expected > len(self._data):
+            entries, expected = [], 0
+        return entries + self._scan(expected)
+
+    def _scan(self, start: int) -> list[IndexEntry]:
+        entries: list[IndexEntry] = []
+        data = self._data
+        offset = start
+        while offset < len(data):
+            end = data.find(b"\n", offset)
+            if end < 0:
+                break  # torn last line
+            if end > offset:
+                event = orjson.loads(data[offset:end])
+                entries.append(
+                    IndexEntry(offset, end - offset, int(event.get("step", 0)), event_type_key(str(event.get("event_type", ""))))
+                )
+            offset = end + 1
+        return entries
+
+    def line(self, entry: IndexEntry) -> bytes:
+        return self._data[entry.offset : entry.offset + entry.length]
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        if self._file is not None:
+            self._file.close()
+
+
+class TraceReader:
+    """Reads a run's `session.json` and event segments, rehydrating blob references.
+
+    Events are streamed in write order across `events.jsonl` and any rotated,
+    compressed `events-NNNNN.jsonl[.gz|.zst]` segments; nothing is loaded
+    into memory beyond the current chunk.
+
+    `find`, `last`, `event_at` and `len()` use the sidecar indexes instead:
+    only the lines that match are sliced out of the memory-mapped file and
+    decoded.
+    """
+
+    def __init__(self, run_dir: str | Path, *, blob_dir: str | Path | None = None) -> None:
+        self.run_dir = Path(run_dir)
+        self.session_path = self.run_dir / "session.json"
+        self._blob_dir = Path(blob_dir) if blob_dir is not None else None
+        self._resolver: BlobResolver | None = None
+        self._segments: list[_IndexedSegment] | None = None
+        self._positions: list[tuple[int, int]] = []
+        self._by_type: dict[int, list[int]] = {}
+        self._by_step: dict[int, list[int]] = {}
+
+    @classmethod
+    def for_run(cls, base_dir: str | Path, run_id: str) -> "TraceReader":
+        return cls(Path(base_dir) / run_id)
+
+    def __enter__(self) -> "TraceReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def session(self) -> dict[str, Any]:
+        return orjson.loads(self.session_path.read_bytes())
+
+    @property
+    def blob_dir(self) -> Path:
+        if self._blob_dir is None:
+            recorded = ""
+            if self.session_path.exists():
+                recorded = str(self.session().get("metadata", {}).get("blob_dir", ""))
+            # Fall back to the per-run location when a trace was moved after recording.
+            self._blob_dir = Path(recorded) if recorded and Path(recorded).exists() else self.run_dir / "blobs"
+        return self._blob_dir
+
+    def segment_paths(self) -> list[Path]:
+        return list_segments(self.run_dir)
+
+    def iter_events(self, *, rehydrate: bool = True) -> Iterator[dict[str, Any]]:
+        for line in iter_event_lines(self.run_dir):
+            yield self._decode(line, rehydrate)
+
+    def events(self, *, rehydrate: bool = True) -> list[dict[str, Any]]:
+        return list(self.iter_events(rehydrate=rehydrate))
+
+    def __len__(self) -> int:
+        self._ensure_index()
+        return len(self._positions)
+
+    def event_at(self, position: int, *, rehydrate: bool = True) -> dict[str, Any]:
+        """The event at `position` in write order; negative positions count from the end."""
+        self._ensure_index()
+        segment_no, entry_no = self._positions[position]
+        assert self._segments is not None
+        segment = self._segments[segment_no]
+        return self._decode(segment.line(segment.entries[entry_no]), rehydrate)
+
+    def find(
+        self,
+        *,
+        event_type: str | None = None,
+        step: int | None = None,
+        rehydrate: bool = True,
+    ) -> Iterator[dict[str, Any]]:
+        """Events matching every given filter, in write order, touching only the matches."""
+        self._ensure_index()
+        type_key = event_type_key(event_type) if event_type is not None else None
+        candidates: list[int] | range
+        if type_key is not None and step is not None:
+            by_type = self._by_type.get(type_key, [])
+            by_step = self._by_step.get(step, [])
+            # Walk the shorter list and check the other filter on the index entry itself.
+            if len(by_step) <= len(by_type):
+                candidates = [p for p in by_step if self._entry(p).type_key == type_key]
+            else:
+                candidates = [p for p in by_type if self._entry(p).step == step]
+        elif type_key is not None:
+            candidates = self._by_type.get(type_key, [])
+        elif step is not None:
+            candidates = self._by_step.get(step, [])
+        else:
+            candidates = range(len(self._positions))
+
+        for position in candidates:
+            event = self.event_at(position, rehydrate=rehydrate)
+            # crc32 keys can collide; the decoded event has the final say.
+            if event_type is None or event.get("event_type") == event_type:
+                yield event
+
+    def last(self, event_type: str | None = None, *, rehydrate: bool = True) -> dict[str, Any] | None:
+        self._ensure_index()
+        candidates = self._by_type.get(event_type_key(event_type), []) if event_type else range(len(self._positions))
+        for position in reversed(candidates):
+            event = self.event_at(position, rehydrate=rehydrate)
+            if event_type is None or event.get("event_type") == event_type:
+                return event
+        return None
+
+    def _entry(self, position: int) -> IndexEntry:
+        assert self._segments is not None
+        segment_no, entry_no = self._positions[position]
+        return self._segments[segment_no].entries[entry_no]
+
+    def close(self) -> None:
+        for segment in self._segments or []:
+            segment.close()
+        self._segments = None
+        self._positions = []
+        self._by_type = {}
+        self._by_step = {}
+
+    def _ensure_index(self) -> None:
+        if self._segments is not None:
+            return
+        self._segments = [_IndexedSegment(path) for path in self.segment_paths()]
+        for segment_no, segment in enumerate(self._segments):
+            for entry_no, entry in enumerate(segment.entries):
+                position = len(self._positions)
+                self._positions.append((segment_no, entry_no))
+                self._by_type.setdefault(entry.type_key, []).append(position)
+                self._by_step.setdefault(entry.step, []).append(position)
+
+    def _decode(self, line: bytes, rehydrate: bool) -> dict[str, Any]:
+        event = orjson.loads(line)
+        if rehydrate:
+            event["payload"] = self._get_resolver().rehydrate(event.get("payload", {}))
+        return event
+
+    def _get_resolver(self) -> BlobResolver:
+        if self._resolver is None:
+            self._resolver = BlobResolver(BlobStore(self.blob_dir))
+        return self._resolver
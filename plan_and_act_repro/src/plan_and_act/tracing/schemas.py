@@ -5,6 +5,8 @@ from typing import Any
 
 from pydantic import BaseModel, Field
 
+from plan_and_act.tracing.segments import TraceCompression
+
 TRACE_SCHEMA_VERSION = "1.1.0"
 TRACE_EVENT_VERSION = 1
 
@@ -16,7 +18,24 @@ def utc_now_iso() -> str:
 class TraceConfig(BaseModel):
     enabled: bool = False
     base_dir: str = "data/raw/traces"
+    experiment: str = ""
     flush_every: int = Field(default=1, ge=1)
+    flush_interval_s: float = Field(default=1.0, gt=0)
+    background: bool = False
+    queue_size: int = Field(default=1024, ge=1)
+    compression: TraceCompression = "none"
+    compression_level: int | None = None
+    segment_max_bytes: int = Field(default=0, ge=0)
+    segment_max_events: int = Field(default=0, ge=0)
+    index: bool = True
+    events: dict[str, bool] = Field(default_factory=dict)
+    sample_rate: float = Field(default=1.0, ge=0.0, le=1.0)
+    sample_rates: dict[str, float] = Field(default_factory=dict)
+    sample_seed: int = 0
+    blobs: bool = False
+    blob_dir: str = ""
+    blob_min_bytes: int = Field(default=1024, ge=1)
+    blob_delta_fields: list[str] = Field(default_factory=lambda: ["action_history", "notes"])
     schema_version: str = TRACE_SCHEMA_VERSION
 
 
@@ -38,6 +57,7 @@ class TraceEvent(BaseModel):
     schema_version: str = TRACE_SCHEMA_VERSION
     event_version: int = TRACE_EVENT_VERSION
     run_id: str
+    seq: int = 0
     step: int = 0
     event_type: str
     timestamp: str = Field(default_factory=utc_now_iso)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import gzip
+import importlib
+import re
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any, BinaryIO, Literal
+
+TraceCompression = Literal["none", "gzip", "zstd"]
+
+LEGACY_EVENTS_FILE = "events.jsonl"
+_SUFFIXES: dict[str, str] = {"none": ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+_SEGMENT_RE = re.compile(r"^events-(\d{5,})\.jsonl(\.gz|\.zst)?$")
+_DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+_READ_CHUNK = 1 << 16
+
+
+def segment_name(index: int, compression: TraceCompression) -> str:
+    return f"events-{index:05d}{_SUFFIXES[compression]}"
+
+
+def segment_index(path: Path) -> int | None:
+    match = _SEGMENT_RE.match(path.name)
+    return int(match.group(1)) if match else None
+
+
+def list_segments(run_dir: str | Path) -> list[Path]:
+    """Event files of a run in write order: a legacy `events.jsonl` first, then numbered segments."""
+    run_dir = Path(run_dir)
+    segments = sorted(
+        (path for path in run_dir.glob("events-*.jsonl*") if segment_index(path) is not None),
+        key=lambda path: segment_index(path) or 0,
+    )
+    legacy = run_dir / LEGACY_EVENTS_FILE
+    return ([legacy] if legacy.exists() else []) + segments
+
+
+def _zstandard() -> Any:
+    try:
+        return importlib.import_module("zstandard")
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise ImportError("zstd trace compression needs `zstandard`; install with `pip install -e .[zstd]`") from exc
+
+
+def open_segment_writer(path: Path, compression: TraceCompression, level: int | None = None) -> BinaryIO:
+    """Append handle that compresses as a stream; `flush()` makes everything written so far decodable."""
+    if compression == "none":
+        return path.open("ab")
+    if level is None:
+        level = _DEFAULT_LEVELS[compression]
+    if compression == "gzip":
+        return gzip.open(path, "ab", compresslevel=level)  # type: ignore[return-value]
+    if compression == "zstd":
+        return _zstandard().ZstdCompressor(level=level).stream_writer(path.open("ab"), closefd=True)
+    raise ValueError(f"Unsupported trace compression: '{compression}'. Expected one of: none, gzip, zstd")
+
+
+def _chunk_reader(path: Path, f: BinaryIO) -> Callable[[int], bytes]:
+    if path.suffix == ".gz":
+        # read1 hands back what has been decoded so far instead of losing it to the EOFError of a cut stream.
+        return gzip.GzipFile(fileobj=f, mode="rb").read1
+    if path.suffix == ".zst":
+        return _zstandard().ZstdDecompressor().stream_reader(f, read_across_frames=True).read
+    return f.read
+
+
+def iter_segment_chunks(path: Path) -> Iterator[bytes]:
+    """Decoded bytes of one segment, chunk by chunk; stops quietly where a crash cut the stream."""
+    with path.open("rb") as f:
+        read = _chunk_reader(path, f)
+        while True:
+            try:
+                chunk = read(_READ_CHUNK)
+            except EOFError:
+                return
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_segment_lines(path: Path) -> Iterator[bytes]:
+    """Stream complete JSONL lines out of one segment, decompressing chunk by chunk.
+
+    A segment cut short by a crash (no end-of-stream marker, or a torn last
+    line) yields every complete line before the cut instead of raising.
+    """
+    pending = b""
+    for chunk in iter_segment_chunks(path):
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+
+
+def is_compressed(path: Path) -> bool:
+    return path.suffix in {".gz", ".zst"}
+
+
+def iter_event_lines(run_dir: str | Path) -> Iterator[bytes]:
+    for path in list_segments(run_dir):
+        yield from iter_segment_lines(path)
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import os
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal
+
+import orjson
+
+from plan_and_act.tracing.reader import TraceReader
+
+if TYPE_CHECKING:
+    from plan_and_act.tracing.collector import TraceCollector
+
+SPAN_EVENT = "span"
+SpanExportFormat = Literal["chrome", "otel"]
+
+# Wall-clock anchor for the monotonic clock: span starts are perf_counter_ns
+# readings shifted onto the Unix epoch, so durations never go negative when
+# the system clock is adjusted mid-episode.
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+# The innermost open span of the current thread or asyncio task. asyncio tasks
+# and `asyncio.to_thread` copy the context, so children find their parent there.
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar("plan_and_act_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    run_id: str
+    span_id: str
+    parent_id: str
+    step: int
+    start_ns: int
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    error: str = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+@contextmanager
+def _record_span(
+    tracer: TraceCollector, name: str, step: int, attributes: dict[str, Any] | None
+) -> Iterator[Span]:
+    parent = _current_span.get()
+    span = Span(
+        name=name,
+        run_id=tracer.run_id,
+        span_id=os.urandom(8).hex(),
+        # A parent from another run (nested episodes in one task) is not this span's parent.
+        parent_id=parent.span_id if parent is not None and parent.run_id == tracer.run_id else "",
+        step=step,
+        start_ns=time.perf_counter_ns(),
+        attributes=dict(attributes or {}),
+    )
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.status = "error"
+        span.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        end_ns = time.perf_counter_ns()
+        _current_span.reset(token)
+        thread_id = threading.get_ident()
+        tracer.log_event(
+            event_type=SPAN_EVENT,
+            step=step,
+            payload=lambda: {
+                "name": span.name,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "start_unix_ns": _EPOCH_OFFSET_NS + span.start_ns,
+                "duration_ms": round((end_ns - span.start_ns) / 1e6, 3),
+                "status": span.status,
+                "error": span.error,
+                "thread_id": thread_id,
+                "attributes": span.attributes,
+            },
+        )
+
+
+def span(
+    tracer: TraceCollector | None, name: str, *, step: int = -1, attributes: dict[str, Any] | None = None
+) -> AbstractContextManager[Span | None]:
+    """Time a block as a span nested under the current one; a no-op without an active tracer.
+
+    Works unchanged in sync and async code: the parent is looked up in the
+    current context, which each asyncio task and worker thread carries on its
+    own. The span is emitted as one `span` event when the block exits, so the
+    `events` switches and sampling of `TraceConfig` apply to it.
+    """
+    if not tracer or not tracer.wants(SPAN_EVENT, step):
+        return nullcontext()
+    return _record_span(tracer, name, step, attributes)
+
+
+def spans_from_events(events: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """The `span` payloads of a run's events (plus their run_id/step), in start order."""
+    spans = [
+        {**event["payload"], "run_id": event.get("run_id", ""), "step": event.get("step", 0)}
+        for event in events
+        if event.get("event_type") == SPAN_EVENT
+    ]
+    return sorted(spans, key=lambda item: item["start_unix_ns"])
+
+
+def to_chrome_trace(spans: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Chrome trace-event format ("X" complete events), loadable in Perfetto or chrome://tracing."""
+    trace_events = [
+        {
+            "name": item["name"],
+            "cat": item["name"].split(".", 1)[0],
+            "ph": "X",
+            "ts": item["start_unix_ns"] / 1000,
+            "dur": item["duration_ms"] * 1000,
+            "pid": item["run_id"],
+            "tid": item["thread_id"],
+            "args": {
+                "step": item["step"],
+                "span_id": item["span_id"],
+                "parent_id": item["parent_id"],
+                "status": item["status"],
+                **item["attributes"],
+            },
+        }
+        for item in spans
+    ]
+    return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+
+def _otel_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otel_trace_id(run_id: str) -> str:
+    """16-byte OpenTelemetry trace id derived from the run id, so every span of a run shares it."""
+    return hashlib.sha256(run_id.encode("utf-8")).hexdigest()[:32]
+
+
+def to_otel_json(spans: Iterable[dict[str, Any]], *, service_name: str = "plan-and-act") -> dict[str, Any]:
+    """OTLP/JSON `ExportTraceServiceRequest` body, accepted by collectors and Jaeger/Tempo importers."""
+    otel_spans = []
+    for item in spans:
+        start = int(item["start_unix_ns"])
+        attributes = {"step": item["step"], "thread.id": item["thread_id"], **item["attributes"]}
+        otel_span: dict[str, Any] = {
+            "traceId": otel_trace_id(item["run_id"]),
+            "spanId": item["span_id"],
+            "name": item["name"],
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(start),
+            "endTimeUnixNano": str(start + int(item["duration_ms"] * 1e6)),
+            "attributes": [{"key": key, "value": _otel_value(value)} for key, value in attributes.items()],
+            "status": {"code": 2, "message": item["error"]} if item["status"] == "error" else {"code": 1},
+        }
+        if item["parent_id"]:
+            otel_span["parentSpanId"] = item["parent_id"]
+        otel_spans.append(otel_span)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+                "scopeSpans": [{"scope": {"name": "plan_and_act.tracing"}, "spans": otel_spans}],
+            }
+        ]
+    }
+
+
+def export_spans(run_dir: str | Path, out_path: str | Path, *, format: SpanExportFormat = "chrome") -> int:
+    """Write a run's spans as a Chrome trace or OTLP/JSON file; returns the number of spans."""
+    spans = spans_from_events(TraceReader(run_dir).iter_events(rehydrate=False))
+    body = to_chrome_trace(spans) if format == "chrome" else to_otel_json(spans)
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_bytes(orjson.dumps(body))
+    return len(spans)
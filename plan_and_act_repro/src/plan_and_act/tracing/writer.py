@@ -1,24 +1,262 @@
 from __future__ import annotations
 
+import atexit
+import queue
+import threading
+import time
+import weakref
+from collections.abc import Sequence
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 
 import orjson
 
+from plan_and_act.tracing.index import event_type_key, index_path, pack_entry
+from plan_and_act.tracing.segments import (
+    LEGACY_EVENTS_FILE,
+    TraceCompression,
+    iter_event_lines,
+    list_segments,
+    open_segment_writer,
+    segment_index,
+    segment_name,
+)
+
+_STOP = object()
+_open_writers: "weakref.WeakSet[TraceWriter]" = weakref.WeakSet()
+
+
+def _encode_default(value: Any) -> Any:
+    # Read-only sequences such as the state's history views are written as JSON arrays.
+    if isinstance(value, Sequence) and not isinstance(value, (str, bytes)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+@atexit.register
+def _close_open_writers() -> None:
+    for writer in list(_open_writers):
+        writer.close()
+
 
 class TraceWriter:
-    def __init__(self, *, base_dir: str, run_id: str) -> None:
+    """Appends trace events to `events.jsonl` through one long-lived file handle.
+
+    Events are serialised when they are appended and written in batches of
+    `flush_every` lines, or once `flush_interval_s` has passed since the last
+    write. With `background=True` batches are written by a daemon thread fed
+    through a bounded queue; producers block when the queue is full.
+
+    Buffered events are flushed on `close()`, when used as a context manager
+    (including on exceptions) and at interpreter exit.
+
+    By default all events go to one plain `events.jsonl`. With `compression`
+    (gzip or zstd, streamed at `compression_level`) or a segment limit, events
+    go to numbered segments `events-00001.jsonl[.gz|.zst]` that rotate once
+    `segment_max_events` events or `segment_max_bytes` uncompressed bytes
+    have been written. A reopened run starts a new segment.
+
+    With `index=True` every events file gets a sidecar `<file>.idx` of
+    fixed-size (offset, length, step, event type) records, written in the
+    same flush as the lines they describe; `TraceReader` uses it for
+    random access.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_dir: str,
+        run_id: str,
+        flush_every: int = 1,
+        flush_interval_s: float = 1.0,
+        background: bool = False,
+        queue_size: int = 1024,
+        compression: TraceCompression = "none",
+        compression_level: int | None = None,
+        segment_max_bytes: int = 0,
+        segment_max_events: int = 0,
+        index: bool = True,
+    ) -> None:
         self.run_id = run_id
         self.run_dir = Path(base_dir) / run_id
         self.run_dir.mkdir(parents=True, exist_ok=True)
         self.session_path = self.run_dir / "session.json"
-        self.events_path = self.run_dir / "events.jsonl"
+
+        self.compression: TraceCompression = compression
+        self.compression_level = compression_level
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_events = segment_max_events
+        self.segmented = compression != "none" or segment_max_bytes > 0 or segment_max_events > 0
+        self._segment_index = 0
+        self._segment_bytes = 0
+        self._segment_events = 0
+        if self.segmented:
+            existing = [segment_index(path) or 0 for path in list_segments(self.run_dir)]
+            self._segment_index = max(existing, default=0) + 1
+            self.events_path = self.run_dir / segment_name(self._segment_index, compression)
+        else:
+            self.events_path = self.run_dir / LEGACY_EVENTS_FILE
+
+        self.flush_every = max(1, flush_every)
+        self.flush_interval_s = flush_interval_s
+        self._lock = threading.Lock()
+        self._file: BinaryIO | None = None
+        self._index_file: BinaryIO | None = None
+        self.index = index
+        self._offset = 0
+        self._buffer: list[tuple[bytes, int, int]] = []
+        self._last_flush = time.monotonic()
+        self._closed = False
+
+        self._queue: queue.Queue[Any] | None = None
+        self._thread: threading.Thread | None = None
+        if background:
+            self._queue = queue.Queue(maxsize=max(1, queue_size))
+            self._thread = threading.Thread(target=self._drain, name=f"trace-writer-{run_id}", daemon=True)
+            self._thread.start()
+        _open_writers.add(self)
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
     def write_session(self, payload: dict[str, Any]) -> None:
         self.session_path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
 
+    def read_session(self) -> dict[str, Any] | None:
+        if not self.session_path.exists():
+            return None
+        return orjson.loads(self.session_path.read_bytes())
+
+    def segment_paths(self) -> list[Path]:
+        return list_segments(self.run_dir)
+
+    def count_events(self) -> int:
+        self.flush()
+        return sum(1 for _ in iter_event_lines(self.run_dir))
+
     def append_event(self, payload: dict[str, Any]) -> None:
-        line = orjson.dumps(payload)
-        with self.events_path.open("ab") as f:
-            f.write(line)
-            f.write(b"\n")
+        line = orjson.dumps(payload, default=_encode_default) + b"\n"
+        if self._closed:
+            # Stragglers after close still land on disk, just unbuffered (readers index them on the fly).
+            with open_segment_writer(self.events_path, self.compression, self.compression_level) as f:
+                f.write(line)
+            return
+        item = (line, int(payload.get("step", 0)), event_type_key(str(payload.get("event_type", ""))))
+        if self._queue is not None:
+            self._queue.put(item)
+            return
+        with self._lock:
+            self._buffer.append(item)
+            if len(self._buffer) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval_s:
+                self._write_buffer_locked()
+
+    def flush(self) -> None:
+        """Write everything appended so far to disk."""
+        if self._queue is not None and self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+        with self._lock:
+            self._write_buffer_locked()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._queue is not None and self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+        with self._lock:
+            self._write_buffer_locked()
+            self._close_files_locked()
+        _open_writers.discard(self)
+
+    def _write_buffer_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        index_records: list[bytes] = []
+        for line, step, type_key in self._buffer:
+            if self.segmented and self._segment_full():
+                self._flush_files_locked(index_records)
+                index_records = []
+                self._rotate_locked()
+            if self._file is None:
+                self._open_files_locked()
+            assert self._file is not None
+            self._file.write(line)
+            if self.index:
+                index_records.append(pack_entry(self._offset, len(line) - 1, step, type_key))
+            self._offset += len(line)
+            self._segment_bytes += len(line)
+            self._segment_events += 1
+        self._flush_files_locked(index_records)
+        self._buffer.clear()
+
+    def _open_files_locked(self) -> None:
+        if self.segmented:
+            self._file = open_segment_writer(self.events_path, self.compression, self.compression_level)
+            self._offset = 0
+        else:
+            self._file = self.events_path.open("ab")
+            self._offset = self._file.tell()
+        if self.index:
+            self._index_file = index_path(self.events_path).open("ab")
+
+    def _flush_files_locked(self, index_records: list[bytes]) -> None:
+        if self._file is None:
+            return
+        self._file.flush()
+        # The index is written after its lines, so an entry never points past the data.
+        if self._index_file is not None and index_records:
+            self._index_file.write(b"".join(index_records))
+            self._index_file.flush()
+
+    def _close_files_locked(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+    def _segment_full(self) -> bool:
+        if self._segment_events == 0:
+            return False
+        if self.segment_max_events and self._segment_events >= self.segment_max_events:
+            return True
+        return bool(self.segment_max_bytes and self._segment_bytes >= self.segment_max_bytes)
+
+    def _rotate_locked(self) -> None:
+        self._close_files_locked()
+        self._segment_index += 1
+        self._segment_bytes = 0
+        self._segment_events = 0
+        self.events_path = self.run_dir / segment_name(self._segment_index, self.compression)
+
+    def _drain(self) -> None:
+        assert self._queue is not None
+        while True:
+            # Idle with nothing buffered: sleep until the next event arrives.
+            timeout = None
+            if self._buffer:
+                timeout = max(0.0, self.flush_interval_s - (time.monotonic() - self._last_flush))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._write_buffer_locked()
+                continue
+
+            if item is _STOP:
+                with self._lock:
+                    self._write_buffer_locked()
+                self._queue.task_done()
+                return
+
+            with self._lock:
+                self._buffer.append(item)
+                if len(self._buffer) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval_s:
+                    self._write_buffer_locked()
+            self._queue.task_done()
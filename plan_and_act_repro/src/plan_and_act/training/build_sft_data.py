@@ -1,18 +1,32 @@
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator
 from typing import Any
 
 
-def build_sft_dataset(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    """Convert normalized records into SFT-ready JSONL-like rows."""
-    rows: list[dict[str, Any]] = []
+def sft_row(record: dict[str, Any]) -> dict[str, Any]:
+    """Convert one normalized record into an SFT chat row.
+
+    An optional `system` prompt becomes a leading system message and optional
+    `metadata` (provenance such as run_id/step/component) is carried along.
+    """
+    messages = [
+        {"role": "user", "content": record.get("input", "")},
+        {"role": "assistant", "content": record.get("output", "")},
+    ]
+    if record.get("system"):
+        messages.insert(0, {"role": "system", "content": record["system"]})
+    row: dict[str, Any] = {"messages": messages}
+    if "metadata" in record:
+        row["metadata"] = record["metadata"]
+    return row
+
+
+def iter_sft_rows(records: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
     for record in records:
-        rows.append(
-            {
-                "messages": [
-                    {"role": "user", "content": record.get("input", "")},
-                    {"role": "assistant", "content": record.get("output", "")},
-                ]
-            }
-        )
-    return rows
+        yield sft_row(record)
+
+
+def build_sft_dataset(records: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Convert normalized records into SFT-ready JSONL-like rows."""
+    return list(iter_sft_rows(records))
@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from typing import Any
 
 
 REQUIRED_KEYS = {"input", "output"}
 
 
-def validate_dataset(records: list[dict[str, Any]]) -> list[str]:
+def validate_record(row: dict[str, Any]) -> list[str]:
+    """Problems with one record; empty when it is usable."""
+    missing = REQUIRED_KEYS - row.keys()
+    if missing:
+        return [f"missing keys: {sorted(missing)}"]
+    return [f"empty {key}" for key in sorted(REQUIRED_KEYS) if not str(row[key]).strip()]
+
+
+def validate_dataset(records: Iterable[dict[str, Any]]) -> list[str]:
     errors: list[str] = []
     for idx, row in enumerate(records):
-        missing = REQUIRED_KEYS - row.keys()
-        if missing:
-            errors.append(f"row[{idx}] missing keys: {sorted(missing)}")
+        errors.extend(f"row[{idx}] {problem}" for problem in validate_record(row))
     return errors
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import os
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import IO, Any
+
+import orjson
+
+from plan_and_act.tracing.reader import TraceReader
+from plan_and_act.training.build_sft_data import sft_row
+from plan_and_act.training.dataset_checks import validate_record
+
+SFT_COMPONENTS = ("planner", "executor", "replanner")
+
+
+def iter_trace_runs(base_dir: str | Path) -> Iterator[Path]:
+    """Finished run directories under `base_dir`, in run_id order; runs still recording are skipped."""
+    for session_path in sorted(Path(base_dir).glob("*/session.json")):
+        try:
+            status = orjson.loads(session_path.read_bytes()).get("status")
+        except (OSError, orjson.JSONDecodeError):
+            continue
+        if status != "running":
+            yield session_path.parent
+
+
+def iter_llm_call_records(run_dir: str | Path) -> Iterator[tuple[dict[str, Any] | None, str]]:
+    """(record, reject_reason) per `llm_call` event of one run, streamed in write order.
+
+    Records follow `build_sft_dataset`'s input shape (system/input/output plus
+    provenance metadata). Calls that failed or produced no parsed output come
+    back as `(None, reason)` so exports can count why rows were dropped.
+    """
+    reader = TraceReader(run_dir)
+    for event in reader.iter_events():
+        if event.get("event_type") != "llm_call":
+            continue
+        payload = event.get("payload", {})
+        component = str(payload.get("component", ""))
+        if payload.get("status") != "success":
+            yield None, f"status:{payload.get('status', 'missing')}"
+            continue
+        if payload.get("parsed_output") is None:
+            yield None, "unparsed_output"
+            continue
+        yield {
+            "system": payload.get("system_prompt", ""),
+            "input": payload.get("user_prompt", ""),
+            "output": payload.get("raw_response", ""),
+            "metadata": {
+                "component": component,
+                "run_id": event.get("run_id", ""),
+                "seq": event.get("seq", 0),
+                "step": event.get("step", 0),
+                "model": payload.get("model", ""),
+            },
+        }, ""
+
+
+def _export_runs(run_dirs: Sequence[str], components: Sequence[str]) -> dict[str, Any]:
+    """Worker task: SFT rows of a batch of runs, already encoded as JSONL lines per component."""
+    lines: dict[str, list[bytes]] = {component: [] for component in components}
+    rejected: Counter[str] = Counter()
+    llm_calls = 0
+    for run_dir in run_dirs:
+        for record, reason in iter_llm_call_records(run_dir):
+            llm_calls += 1
+            if record is None:
+                rejected[reason] += 1
+                continue
+            component = record["metadata"]["component"]
+            if component not in lines:
+                rejected[f"component:{component or 'missing'}"] += 1
+                continue
+            problems = validate_record(record)
+            if problems:
+                rejected[f"invalid:{problems[0]}"] += 1
+                continue
+            lines[component].append(orjson.dumps(sft_row(record)) + b"\n")
+    return {"runs": len(run_dirs), "llm_calls": llm_calls, "lines": lines, "rejected": dict(rejected)}
+
+
+class ShardedJsonlWriter:
+    """Appends JSONL lines to `<prefix>-00000.jsonl`, `<prefix>-00001.jsonl`, ... under `out_dir`.
+
+    A shard is closed once it reaches `max_bytes` or `max_rows` (0 = no limit);
+    a single line larger than `max_bytes` still gets a shard of its own.
+    """
+
+    def __init__(self, out_dir: str | Path, prefix: str, *, max_bytes: int = 0, max_rows: int = 0) -> None:
+        self.out_dir = Path(out_dir)
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_rows = max_rows
+        self.shards: list[dict[str, Any]] = []
+        self._file: IO[bytes] | None = None
+
+    def write(self, line: bytes) -> None:
+        shard = self.shards[-1] if self.shards else None
+        if (
+            shard is None
+            or (self.max_rows and shard["rows"] >= self.max_rows)
+            or (self.max_bytes and shard["bytes"] and shard["bytes"] + len(line) > self.max_bytes)
+        ):
+            shard = self._next_shard()
+        assert self._file is not None
+        self._file.write(line)
+        shard["rows"] += 1
+        shard["bytes"] += len(line)
+
+    def _next_shard(self) -> dict[str, Any]:
+        self.close()
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / f"{self.prefix}-{len(self.shards):05d}.jsonl"
+        self._file = path.open("wb")
+        shard = {"path": str(path), "rows": 0, "bytes": 0}
+        self.shards.append(shard)
+        return shard
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def export_sft_from_traces(
+    base_dir: str | Path,
+    out_dir: str | Path,
+    *,
+    components: Sequence[str] = SFT_COMPONENTS,
+    workers: int | None = None,
+    runs_per_task: int = 16,
+    max_shard_bytes: int = 64 * 1024 * 1024,
+    max_shard_rows: int = 0,
+) -> dict[str, Any]:
+    """Stream every finished run under `base_dir` into sharded per-component SFT JSONL files.
+
+    Runs are read, reconstructed and validated in a process pool
+    (`workers=None` uses every core, `workers<=1` stays in-process). At most
+    two batches per worker are in flight, and the parent only appends the
+    encoded lines of finished batches in submission order, so memory stays
+    bounded however many events are exported and the output is identical
+    for any worker count. Counts and shard paths are also written to
+    `<out_dir>/manifest.json`.
+    """
+    writers = {
+        component: ShardedJsonlWriter(out_dir, component, max_bytes=max_shard_bytes, max_rows=max_shard_rows)
+        for component in components
+    }
+    stats: dict[str, Any] = {"runs": 0, "llm_calls": 0, "rows": Counter(), "rejected": Counter()}
+
+    def _collect(result: dict[str, Any]) -> None:
+        stats["runs"] += result["runs"]
+        stats["llm_calls"] += result["llm_calls"]
+        stats["rejected"].update(result["rejected"])
+        for component, lines in result["lines"].items():
+            stats["rows"][component] += len(lines)
+            for line in lines:
+                writers[component].write(line)
+
+    batches = _batched((str(run_dir) for run_dir in iter_trace_runs(base_dir)), runs_per_task)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    try:
+        if workers <= 1:
+            for batch in batches:
+                _collect(_export_runs(batch, components))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                in_flight: deque[Future[dict[str, Any]]] = deque()
+                for batch in batches:
+                    in_flight.append(pool.submit(_export_runs, batch, components))
+                    if len(in_flight) >= 2 * workers:
+                        _collect(in_flight.popleft().result())
+                while in_flight:
+                    _collect(in_flight.popleft().result())
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    manifest = {
+        "base_dir": str(base_dir),
+        "runs": stats["runs"],
+        "llm_calls": stats["llm_calls"],
+        "rows": {component: stats["rows"][component] for component in components},
+        "rejected": dict(stats["rejected"]),
+        "shards": {component: writer.shards for component, writer in writers.items()},
+    }
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    (Path(out_dir) / "manifest.json").write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+    return manifest
+
+
+def _batched(items: Iterable[str], size: int) -> Iterator[list[str]]:
+    batch: list[str] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
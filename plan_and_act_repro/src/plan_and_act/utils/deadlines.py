@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from plan_and_act.core.types import CallDeadlineConfig
+from plan_and_act.eval.metrics import percentile
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """A chat_json request got no answer within its component's deadline."""
+
+
+class CallDeadlines:
+    """Deadlines and hedge delays for chat_json requests, per model and component.
+
+    `deadline_s` is the configured wall-clock budget of one request (all of
+    its hedged copies included). `hedge_delay_s` is the `hedge_percentile` of
+    the latencies `observe` recorded for the same model and component, once
+    at least `hedge_min_samples` are in the window; before that no duplicate
+    is sent. `record` accumulates hedge and timeout outcomes for `stats`.
+    Sync clients run hedged requests on `hedge_pool`; calls without a hedge
+    stay on the caller's thread.
+    """
+
+    def __init__(self, config: CallDeadlineConfig | None = None) -> None:
+        self.config = config or CallDeadlineConfig()
+        self._lock = threading.Lock()
+        self._latencies: dict[tuple[str, str], deque[float]] = {}
+        self._pool: ThreadPoolExecutor | None = None
+        self._stats: dict[str, int] = {
+            "requests": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "timeouts": 0,
+            "losers_cancelled": 0,
+            "losers_abandoned": 0,
+            "extra_tokens": 0,
+        }
+
+    @property
+    def active(self) -> bool:
+        cfg = self.config
+        return cfg.hedge or cfg.default_deadline_s > 0 or any(value > 0 for value in cfg.deadlines_s.values())
+
+    def deadline_s(self, component: str) -> float | None:
+        value = self.config.deadlines_s.get(component) or self.config.default_deadline_s
+        return value if value > 0 else None
+
+    def hedge_delay_s(self, model: str, component: str) -> float | None:
+        if not self.config.hedge:
+            return None
+        with self._lock:
+            samples = list(self._latencies.get((model, component), ()))
+        if len(samples) < self.config.hedge_min_samples:
+            return None
+        return max(percentile(samples, self.config.hedge_percentile) / 1000, self.config.hedge_min_delay_s)
+
+    def hedge_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.config.hedge_pool_workers, thread_name_prefix="llm-hedge")
+            return self._pool
+
+    def observe(self, model: str, component: str, latency_ms: float) -> None:
+        with self._lock:
+            window = self._latencies.get((model, component))
+            if window is None:
+                window = self._latencies[(model, component)] = deque(maxlen=self.config.latency_window)
+            window.append(latency_ms)
+
+    def record(self, **counts: int) -> None:
+        with self._lock:
+            for key, value in counts.items():
+                self._stats[key] = self._stats.get(key, 0) + value
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+        out["hedge_rate"] = round(out["hedged"] / out["requests"], 4) if out["requests"] else 0.0
+        return out
+
+
+_deadlines_lock = threading.Lock()
+_deadlines: CallDeadlines | None = None
+
+
+def get_call_deadlines() -> CallDeadlines | None:
+    with _deadlines_lock:
+        return _deadlines
+
+
+def configure_call_deadlines(config: CallDeadlineConfig) -> CallDeadlines | None:
+    """Install the process-wide deadlines (None when no deadline or hedging is configured)."""
+    global _deadlines
+    deadlines = CallDeadlines(config)
+    with _deadlines_lock:
+        _deadlines = deadlines if deadlines.active else None
+        return _deadlines
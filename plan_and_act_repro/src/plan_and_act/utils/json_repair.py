@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import threading
+import types
+import typing
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+import orjson
+from pydantic import BaseModel, ValidationError
+
+from plan_and_act.core.types import JSONRepairConfig
+
+_CLOSERS = {"{": "}", "[": "]"}
+_TRUE = {"true", "yes", "y", "1"}
+_FALSE = {"false", "no", "n", "0", ""}
+
+
+@dataclass
+class RepairResult:
+    """What `repair_json` recovered from a completion and which fixes it needed."""
+
+    value: Any = None
+    repairs: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.value is not None
+
+
+def repair_json(text: str) -> RepairResult:
+    """Parse the first JSON object or array in `text`, fixing what models commonly break.
+
+    One pass over the text copies the value that starts at the first `{` or
+    `[` while tracking strings and open brackets. Prose around the value is
+    dropped, commas right before a closing bracket are skipped, and raw
+    newlines inside strings are escaped. When the text ends early (a
+    completion cut off by max_tokens), the open string and brackets are
+    closed. If that is not valid JSON either, the copy is cut back to the
+    last complete value first. The result is parsed with orjson.
+    """
+    result = RepairResult()
+    try:
+        result.value = orjson.loads(text)
+        return result
+    except orjson.JSONDecodeError:
+        pass
+
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        return result
+    start = min(starts)
+    if start > 0:
+        result.repairs.append("extracted")
+
+    out: list[str] = []
+    stack: list[str] = []
+    # Per open object: True while the next string is a key.
+    expect_key: list[bool] = []
+    safe_len, safe_closers = 0, ""
+    in_string = escaped = False
+    index, end = start, len(text)
+    while index < end:
+        char = text[index]
+        index += 1
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+                is_key = bool(stack) and stack[-1] == "}" and expect_key[-1]
+                out.append(char)
+                if not is_key:
+                    safe_len, safe_closers = len(out), "".join(reversed(stack))
+                continue
+            elif char in "\n\r\t":
+                out.append({"\n": "\\n", "\r": "\\r", "\t": "\\t"}[char])
+                _note(result, "control_char")
+                continue
+            out.append(char)
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+            expect_key.append(char == "{")
+            out.append(char)
+            safe_len, safe_closers = len(out), "".join(reversed(stack))
+            continue
+        elif char in "}]":
+            if not stack:
+                break
+            # A closer that does not match the innermost open bracket is replaced by the right one.
+            closer = stack.pop()
+            expect_key.pop()
+            if closer != char:
+                _note(result, "mismatched_bracket")
+            out.append(closer)
+            if not stack:
+                break
+            safe_len, safe_closers = len(out), "".join(reversed(stack))
+            continue
+        elif char == ",":
+            rest = text[index:].lstrip()
+            if rest[:1] in ("}", "]"):
+                _note(result, "trailing_comma")
+                continue
+            # Everything before a separator is a complete member.
+            safe_len, safe_closers = len(out), "".join(reversed(stack))
+            if stack and stack[-1] == "}":
+                expect_key[-1] = True
+        elif char == ":" and stack and stack[-1] == "}":
+            expect_key[-1] = False
+        out.append(char)
+
+    if text[index:].strip():
+        _note(result, "extracted")
+    repaired = "".join(out)
+    if stack or in_string:
+        _note(result, "truncated")
+        closed = repaired + ('"' if in_string else "") + "".join(reversed(stack))
+        for candidate in (closed, "".join(out[:safe_len]).rstrip().rstrip(",") + safe_closers):
+            value = _loads(candidate)
+            if value is not None:
+                result.value = value
+                return result
+        return result
+    result.value = _loads(repaired)
+    return result
+
+
+def _note(repairs: list[str] | RepairResult, repair: str) -> None:
+    repairs = repairs.repairs if isinstance(repairs, RepairResult) else repairs
+    if repair not in repairs:
+        repairs.append(repair)
+
+
+def _loads(text: str) -> Any:
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return None
+
+
+def coerce_to_schema(value: Any, schema: type[BaseModel], repairs: list[str] | None = None) -> dict[str, Any]:
+    """Validate `value` against `schema`, coercing near-misses field by field first.
+
+    Handles what models get almost right: scalars for `str` fields, "yes" for
+    booleans, numeric strings for ints, case or spacing of Literal values,
+    JSON-encoded strings for objects, a single item for a list, a one-key
+    wrapper such as {"action": {...}}, and list items missing their
+    required integer id (filled with the 1-based position). After a
+    truncation repair, an invalid last list item is dropped. Raises
+    `ValidationError` if the result still does not fit.
+    """
+    repairs = repairs if repairs is not None else []
+    try:
+        return schema.model_validate(value).model_dump()
+    except ValidationError:
+        pass
+    coerced = _coerce(value, schema, repairs)
+    out = schema.model_validate(coerced).model_dump()
+    _note(repairs, "coerced")
+    return out
+
+
+def _coerce(value: Any, annotation: Any, repairs: list[str], position: int = 0) -> Any:
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Union or origin is types.UnionType:
+        options = [arg for arg in args if arg is not type(None)]
+        return value if value is None or len(options) != 1 else _coerce(value, options[0], repairs, position)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _coerce_model(value, annotation, repairs, position)
+    if origin is Literal:
+        if isinstance(value, str):
+            lowered = value.strip().lower()
+            for option in args:
+                if isinstance(option, str) and option.lower() == lowered:
+                    return option
+        return value
+    if origin is list:
+        if isinstance(value, str):
+            value = _loads(value) if value.strip().startswith("[") else value
+        if not isinstance(value, list):
+            value = [] if value is None else [value]
+        item_type = args[0] if args else Any
+        items = [_coerce(item, item_type, repairs, position=i + 1) for i, item in enumerate(value)]
+        if items and "truncated" in repairs and isinstance(item_type, type) and issubclass(item_type, BaseModel):
+            # The item a completion was cut off in is usually incomplete; drop it rather than the whole answer.
+            try:
+                item_type.model_validate(items[-1])
+            except ValidationError:
+                items.pop()
+                _note(repairs, "dropped_partial_item")
+        return items
+    if origin is dict or annotation is dict:
+        if isinstance(value, str):
+            parsed = repair_json(value).value if value.strip() else {}
+            return parsed if isinstance(parsed, dict) else value
+        return {} if value is None else value
+    if annotation is str:
+        if value is None:
+            return ""
+        return value if isinstance(value, str) else orjson.dumps(value).decode() if isinstance(value, (dict, list)) else str(value)
+    if annotation is bool and isinstance(value, str):
+        lowered = value.strip().lower()
+        return True if lowered in _TRUE else False if lowered in _FALSE else value
+    if annotation is int:
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+            return int(value.strip())
+    return value
+
+
+def _coerce_model(value: Any, model: type[BaseModel], repairs: list[str], position: int) -> Any:
+    fields = model.model_fields
+    if isinstance(value, str):
+        parsed = repair_json(value).value
+        if isinstance(parsed, dict):
+            value = parsed
+        else:
+            # A bare string stands for the model's first required text field, e.g. a plan step's intent.
+            text_fields = [name for name, info in fields.items() if info.is_required() and info.annotation is str]
+            value = {text_fields[0]: value} if text_fields else value
+    if not isinstance(value, dict):
+        return value
+    if len(value) == 1 and not set(value) & set(fields):
+        inner = next(iter(value.values()))
+        if isinstance(inner, dict):
+            _note(repairs, "unwrapped")
+            value = inner
+    out = dict(value)
+    for name, info in fields.items():
+        if name in out:
+            out[name] = _coerce(out[name], info.annotation, repairs)
+        elif position and info.is_required() and info.annotation is int:
+            out[name] = position
+    return out
+
+
+class JSONRepairer:
+    """Recovery of unparseable or schema-invalid completions, with process-wide counters.
+
+    `chat_json` calls `recover` when the strict parse or schema validation of
+    a completion fails; it returns the payload or None if only a follow-up
+    call can help. `stats` reports how many calls needed recovery and the
+    fraction of them saved from a full retry of the request.
+    """
+
+    def __init__(self, config: JSONRepairConfig | None = None) -> None:
+        self.config = config or JSONRepairConfig()
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "needed_repair": 0, "repaired_local": 0, "repaired_follow_up": 0, "failed": 0}
+
+    def recover(self, content: str, schema: type[BaseModel] | None, repairs: list[str]) -> dict[str, Any] | None:
+        if not self.config.enabled:
+            return None
+        result = repair_json(content)
+        repairs.extend(repair for repair in result.repairs if repair not in repairs)
+        value = result.value
+        if value is None:
+            return None
+        if schema is None:
+            return value if isinstance(value, dict) else None
+        if not self.config.coerce:
+            try:
+                return schema.model_validate(value).model_dump()
+            except ValidationError:
+                return None
+        try:
+            return coerce_to_schema(value, schema, repairs)
+        except ValidationError:
+            return None
+
+    def wants_follow_up(self, content: str) -> bool:
+        return self.config.enabled and self.config.follow_up and 0 < len(content) <= self.config.follow_up_max_chars
+
+    def follow_up_prompt(self, schema: type[BaseModel] | None) -> str:
+        prompt = self.config.follow_up_system_prompt
+        if schema is not None:
+            prompt += "\nOutput JSON schema: " + orjson.dumps(_schema_hint(schema)).decode()
+        return prompt
+
+    def record(self, outcome: str) -> None:
+        """Count one call: "clean", "repaired_local", "repaired_follow_up" or "failed"."""
+        with self._lock:
+            self._stats["calls"] += 1
+            if outcome != "clean":
+                self._stats["needed_repair"] += 1
+                self._stats[outcome] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+        saved = out["repaired_local"] + out["repaired_follow_up"]
+        out["saved_fraction"] = round(saved / out["needed_repair"], 4) if out["needed_repair"] else 0.0
+        return out
+
+
+def _schema_hint(schema: type[BaseModel]) -> dict[str, Any]:
+    """Field names with their type names: a compact stand-in for the full JSON schema."""
+    hint: dict[str, Any] = {}
+    for name, info in schema.model_fields.items():
+        annotation = info.annotation
+        args = typing.get_args(annotation)
+        if typing.get_origin(annotation) is list and args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+            hint[name] = [_schema_hint(args[0])]
+        elif typing.get_origin(annotation) is Literal:
+            hint[name] = "|".join(str(arg) for arg in args)
+        else:
+            hint[name] = getattr(annotation, "__name__", str(annotation))
+    return hint
+
+
+_repairer_lock = threading.Lock()
+_repairer: JSONRepairer | None = None
+
+
+def get_json_repairer() -> JSONRepairer:
+    global _repairer
+    with _repairer_lock:
+        if _repairer is None:
+            _repairer = JSONRepairer()
+        return _repairer
+
+
+def configure_json_repairer(config: JSONRepairConfig) -> JSONRepairer:
+    global _repairer
+    with _repairer_lock:
+        _repairer = JSONRepairer(config)
+        return _repairer
@@ -1,37 +1,734 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import importlib.util
 import json
 import os
 import re
+import threading
 import time
-from collections.abc import Callable
+import weakref
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field, replace
 from typing import Any
 
-from openai import BadRequestError, OpenAI
+import httpx
+from openai import (
+    DEFAULT_MAX_RETRIES,
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    BadRequestError,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
+from pydantic import BaseModel
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from plan_and_act.core.types import ClientPoolConfig
+from plan_and_act.prompts.context import estimate_tokens
+from plan_and_act.utils.deadlines import CallDeadlines, LLMDeadlineExceeded, get_call_deadlines
+from plan_and_act.utils.json_repair import JSONRepairer, get_json_repairer
+from plan_and_act.utils.llm_cache import LLMResponseCache, get_response_cache, request_cache_key
+from plan_and_act.utils.rate_limit import Limiter, RateLimitTimeout, get_rate_limiter, retry_after_s
+
 LLMTraceHook = Callable[[dict[str, Any]], None]
+# Decides from a call's trace_context whether its trace payload is needed at all.
+LLMTraceFilter = Callable[[dict[str, Any]], bool]
+# Receives a small usage record of every call, whether or not it is traced.
+LLMUsageHook = Callable[[dict[str, Any]], None]
 _SECRET_PATTERNS = (
     re.compile(r"sk-proj-[A-Za-z0-9_-]+"),
     re.compile(r"sk-[A-Za-z0-9_-]+"),
 )
 
 
-class LLMClient:
-    def __init__(self, trace_hook: LLMTraceHook | None = None) -> None:
+class ClientRegistry:
+    """Process-wide pool of long-lived OpenAI clients keyed by (base_url, api_key).
+
+    Every agent shares the same underlying HTTP connection pool, so keep-alive
+    connections (and HTTP/2 when `h2` is installed) survive across planner,
+    executor and replanner calls instead of paying a TLS handshake per request.
+    """
+
+    def __init__(self, config: ClientPoolConfig | None = None) -> None:
+        self.config = config or ClientPoolConfig()
+        self._lock = threading.Lock()
+        self._clients: dict[tuple[str, str], OpenAI] = {}
+        self._model_slots: dict[str, threading.BoundedSemaphore | None] = {}
+        # httpx async pools and asyncio semaphores are bound to the loop that created them.
+        self._async_clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[tuple[str, str], AsyncOpenAI]
+        ] = weakref.WeakKeyDictionary()
+        self._async_model_slots: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore | None]
+        ] = weakref.WeakKeyDictionary()
+        self._stats = {
+            "clients_created": 0,
+            "client_reuses": 0,
+            "requests": 0,
+            "connections_opened": 0,
+            "slot_waits": 0,
+            "slot_wait_ms_total": 0.0,
+            "slot_wait_ms_max": 0.0,
+        }
+
+    def get_client(self, *, api_key: str, base_url: str = "", max_retries: int | None = None) -> OpenAI:
+        """Shared client for these credentials; `max_retries` overrides the SDK's own retry count."""
+        key = _client_key(api_key=api_key, base_url=base_url, max_retries=max_retries)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._stats["client_reuses"] += 1
+                return client
+            client = self._build_client(api_key=api_key, base_url=base_url, max_retries=max_retries)
+            self._clients[key] = client
+            self._stats["clients_created"] += 1
+            return client
+
+    def get_async_client(self, *, api_key: str, base_url: str = "", max_retries: int | None = None) -> AsyncOpenAI:
+        """Async counterpart of `get_client`; clients are pooled per running event loop."""
+        loop = asyncio.get_running_loop()
+        key = _client_key(api_key=api_key, base_url=base_url, max_retries=max_retries)
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is not None:
+                self._stats["client_reuses"] += 1
+                return client
+            client = self._build_async_client(api_key=api_key, base_url=base_url, max_retries=max_retries)
+            clients[key] = client
+            self._stats["clients_created"] += 1
+            return client
+
+    def _http_client_kwargs(self) -> dict[str, Any]:
+        cfg = self.config
+        return {
+            "http2": cfg.http2 and _http2_available(),
+            "timeout": cfg.timeout_s,
+            "limits": httpx.Limits(
+                max_connections=cfg.max_connections,
+                max_keepalive_connections=cfg.max_keepalive_connections,
+                keepalive_expiry=cfg.keepalive_expiry_s,
+            ),
+        }
+
+    def _build_client(self, *, api_key: str, base_url: str, max_retries: int | None) -> OpenAI:
+        http_client = DefaultHttpxClient(
+            **self._http_client_kwargs(),
+            event_hooks={"request": [self._on_request]},
+        )
+        return OpenAI(**_openai_kwargs(api_key, base_url, max_retries, http_client))
+
+    def _build_async_client(self, *, api_key: str, base_url: str, max_retries: int | None) -> AsyncOpenAI:
+        http_client = DefaultAsyncHttpxClient(
+            **self._http_client_kwargs(),
+            event_hooks={"request": [self._on_async_request]},
+        )
+        return AsyncOpenAI(**_openai_kwargs(api_key, base_url, max_retries, http_client))
+
+    def _on_request(self, request: Any) -> None:
+        self._incr("requests")
+        request.extensions["trace"] = self._on_transport_event
+
+    async def _on_async_request(self, request: Any) -> None:
+        self._incr("requests")
+        request.extensions["trace"] = self._on_async_transport_event
+
+    def _on_transport_event(self, event_name: str, info: dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self._incr("connections_opened")
+
+    async def _on_async_transport_event(self, event_name: str, info: dict[str, Any]) -> None:
+        self._on_transport_event(event_name, info)
+
+    def _incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._stats[name] += value
+
+    def _slot_for(self, model: str) -> threading.BoundedSemaphore | None:
+        with self._lock:
+            if model not in self._model_slots:
+                limit = self.config.model_concurrency.get(model, self.config.default_model_concurrency)
+                self._model_slots[model] = threading.BoundedSemaphore(limit) if limit > 0 else None
+            return self._model_slots[model]
+
+    def _async_slot_for(self, model: str) -> asyncio.Semaphore | None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._async_model_slots.setdefault(loop, {})
+            if model not in slots:
+                limit = self.config.model_concurrency.get(model, self.config.default_model_concurrency)
+                slots[model] = asyncio.Semaphore(limit) if limit > 0 else None
+            return slots[model]
+
+    def _record_wait(self, wait_ms: float) -> float:
+        with self._lock:
+            self._stats["slot_waits"] += 1
+            self._stats["slot_wait_ms_total"] += wait_ms
+            self._stats["slot_wait_ms_max"] = max(self._stats["slot_wait_ms_max"], wait_ms)
+        return round(wait_ms, 3)
+
+    @contextmanager
+    def model_slot(self, model: str) -> Iterator[float]:
+        """Hold one of the model's concurrency slots; yields the wait time in ms."""
+        slot = self._slot_for(model)
+        if slot is None:
+            yield 0.0
+            return
+
+        start = time.perf_counter()
+        slot.acquire()
+        try:
+            yield self._record_wait((time.perf_counter() - start) * 1000)
+        finally:
+            slot.release()
+
+    @asynccontextmanager
+    async def async_model_slot(self, model: str) -> AsyncIterator[float]:
+        slot = self._async_slot_for(model)
+        if slot is None:
+            yield 0.0
+            return
+
+        start = time.perf_counter()
+        await slot.acquire()
+        try:
+            yield self._record_wait((time.perf_counter() - start) * 1000)
+        finally:
+            slot.release()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+        out["connection_reuses"] = max(0, out["requests"] - out["connections_opened"])
+        out["slot_wait_ms_total"] = round(out["slot_wait_ms_total"], 3)
+        out["slot_wait_ms_max"] = round(out["slot_wait_ms_max"], 3)
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            # Async clients can only be closed from their own loop; dropping them
+            # lets the loop's transports be garbage-collected with it.
+            self._async_clients.clear()
+            self._async_model_slots.clear()
+        for client in clients:
+            client.close()
+
+
+_registry_lock = threading.Lock()
+_registry: ClientRegistry | None = None
+
+
+def get_client_registry() -> ClientRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ClientRegistry()
+        return _registry
+
+
+def configure_client_registry(config: ClientPoolConfig) -> ClientRegistry:
+    """Replace the process-wide registry, closing clients built with the old settings."""
+    global _registry
+    with _registry_lock:
+        previous = _registry
+        _registry = ClientRegistry(config)
+        current = _registry
+    if previous is not None:
+        previous.close()
+    return current
+
+
+def _client_key(*, api_key: str, base_url: str, max_retries: int | None = None) -> tuple[str, str, int | None]:
+    return base_url, hashlib.sha256(api_key.encode("utf-8")).hexdigest(), max_retries
+
+
+def _openai_kwargs(api_key: str, base_url: str, max_retries: int | None, http_client: Any) -> dict[str, Any]:
+    kwargs: dict[str, Any] = {"api_key": api_key, "http_client": http_client}
+    if base_url:
+        kwargs["base_url"] = base_url
+    if max_retries is not None:
+        kwargs["max_retries"] = max_retries
+    return kwargs
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class _ChatCall:
+    """Mutable record of one chat_json call, shared by the sync and async clients."""
+
+    model: str
+    system_prompt: str
+    user_prompt: str
+    temperature: float
+    trace_context: dict[str, Any] | None
+    cache: LLMResponseCache | None
+    cache_key: str = ""
+    start_time: float = field(default_factory=time.perf_counter)
+    pool_wait_ms: float = 0.0
+    raw_content: str = ""
+    parsed_output: dict[str, Any] | None = None
+    usage: dict[str, int] = field(default_factory=dict)
+    used_response_format: bool = True
+    cache_hit: bool = False
+    status: str = "success"
+    error: str = ""
+    # Rate limiting: reserved tokens, queue priority, time spent waiting and 429s absorbed.
+    limiter: Limiter | None = None
+    reserved_tokens: int = 0
+    priority: int = 0
+    rate_limit_wait_ms: float = 0.0
+    rate_limited: int = 0
+    # Connection errors and 5xx re-sent by `_send_leg` while the SDK's own retries are off.
+    transient_retries: int = 0
+    response_headers: dict[str, str] = field(default_factory=dict)
+    # Deadline and hedging: a duplicate request goes out after hedge_delay_s and the first
+    # answer wins; extra_usage holds the tokens spent on requests whose answer was not used.
+    deadlines: CallDeadlines | None = None
+    deadline_s: float | None = None
+    hedge_delay_s: float | None = None
+    deadline_at: float | None = None
+    request_timeout_s: float | None = None
+    request_ms: float = 0.0
+    hedged: bool = False
+    winner: str = ""
+    loser: str = ""
+    timed_out: bool = False
+    extra_usage: dict[str, int] = field(default_factory=dict)
+    extra_usage_estimated: bool = False
+    # Structured-output recovery: the schema the payload must fit and how it was made to fit.
+    schema: type[BaseModel] | None = None
+    repairer: JSONRepairer | None = None
+    repair_status: str = ""
+    repairs: list[str] = field(default_factory=list)
+    repaired_content: str = ""
+    follow_up_usage: dict[str, int] = field(default_factory=dict)
+    # Set on the "fix this JSON" request: it is neither a latency sample nor a call of its own in the stats.
+    follow_up: bool = False
+
+    @property
+    def messages(self) -> list[dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": self.user_prompt},
+        ]
+
+    @property
+    def request_bytes(self) -> int:
+        return len(self.system_prompt.encode("utf-8")) + len(self.user_prompt.encode("utf-8"))
+
+    def request_kwargs(self, *, with_response_format: bool) -> dict[str, Any]:
+        request_kwargs: dict[str, Any] = {
+            "model": self.model,
+            "temperature": self.temperature,
+            "messages": self.messages,
+        }
+        if with_response_format:
+            request_kwargs["response_format"] = {"type": "json_object"}
+        if self.request_timeout_s is not None:
+            request_kwargs["timeout"] = self.request_timeout_s
+        return request_kwargs
+
+    def usage_payload(self) -> dict[str, Any]:
+        return {
+            "component": (self.trace_context or {}).get("component", ""),
+            "model": self.model,
+            "status": self.status,
+            "cache_hit": self.cache_hit,
+            "latency_ms": round((time.perf_counter() - self.start_time) * 1000, 3),
+            "usage": self.usage,
+            "extra_usage": self.extra_usage,
+        }
+
+    def rate_limit_trace(self) -> dict[str, Any]:
+        if self.limiter is None:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "priority": self.priority,
+            "reserved_tokens": self.reserved_tokens,
+            "wait_ms": round(self.rate_limit_wait_ms, 3),
+            "rate_limited": self.rate_limited,
+        }
+
+    def deadline_trace(self) -> dict[str, Any]:
+        if self.deadlines is None:
+            return {"enabled": False}
+        return {
+            "enabled": True,
+            "deadline_s": self.deadline_s,
+            "timed_out": self.timed_out,
+            "hedge_delay_s": None if self.hedge_delay_s is None else round(self.hedge_delay_s, 4),
+            "hedged": self.hedged,
+            "winner": self.winner,
+            "loser": self.loser,
+            "extra_usage": self.extra_usage,
+            "extra_usage_estimated": self.extra_usage_estimated,
+        }
+
+    def repair_trace(self) -> dict[str, Any]:
+        return {
+            "status": self.repair_status,
+            "schema": self.schema.__name__ if self.schema is not None else "",
+            "repairs": list(self.repairs),
+            "follow_up_usage": self.follow_up_usage,
+        }
+
+    def trace_payload(self) -> dict[str, Any]:
+        return {
+            **(self.trace_context or {}),
+            "status": self.status,
+            "error": self.error,
+            "model": self.model,
+            "temperature": self.temperature,
+            "used_response_format_json_object": self.used_response_format,
+            "latency_ms": round((time.perf_counter() - self.start_time) * 1000, 3),
+            "pool_wait_ms": self.pool_wait_ms,
+            "usage": self.usage,
+            "cache": _cache_trace(self.cache, hit=self.cache_hit, key=self.cache_key),
+            "rate_limit": self.rate_limit_trace(),
+            "deadline": self.deadline_trace(),
+            "json_repair": self.repair_trace(),
+            "system_prompt": _redact_secrets(self.system_prompt),
+            "user_prompt": _redact_secrets(self.user_prompt),
+            "raw_response": _redact_secrets(self.raw_content),
+            "parsed_output": self.parsed_output,
+        }
+
+
+class _BaseLLMClient:
+    def __init__(
+        self,
+        trace_hook: LLMTraceHook | None = None,
+        registry: ClientRegistry | None = None,
+        cache: LLMResponseCache | None = None,
+        trace_filter: LLMTraceFilter | None = None,
+        usage_hook: LLMUsageHook | None = None,
+        limiter: Limiter | None = None,
+        deadlines: CallDeadlines | None = None,
+    ) -> None:
         self.api_key = os.getenv("OPENAI_API_KEY", "").strip()
         self.base_url = os.getenv("OPENAI_BASE_URL", "").strip()
         self.trace_hook = trace_hook
+        self.trace_filter = trace_filter
+        self.usage_hook = usage_hook
+        self._registry = registry
+        self._cache = cache
+        self._limiter = limiter
+        self._deadlines = deadlines
 
     @property
     def enabled(self) -> bool:
         return bool(self.api_key)
 
+    @property
+    def registry(self) -> ClientRegistry:
+        return self._registry or get_client_registry()
+
+    @property
+    def cache(self) -> LLMResponseCache | None:
+        return self._cache or get_response_cache()
+
+    @property
+    def limiter(self) -> Limiter | None:
+        return self._limiter or get_rate_limiter()
+
+    @property
+    def deadlines(self) -> CallDeadlines | None:
+        return self._deadlines or get_call_deadlines()
+
+    @property
+    def _max_retries(self) -> int | None:
+        # With a limiter, 429s are retried by `_send` after the provider's retry-after, not by the SDK.
+        # With deadlines, SDK retries could not be kept within the deadline. Either way `_send_leg`
+        # re-sends transient failures itself (see `_transient_backoff_s`).
+        return 0 if self.limiter is not None or self.deadlines is not None else None
+
+    def _start_call(
+        self,
+        *,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        trace_context: dict[str, Any] | None,
+        schema: type[BaseModel] | None = None,
+    ) -> _ChatCall:
+        if not self.enabled:
+            raise RuntimeError("OPENAI_API_KEY is not set")
+
+        repairer = get_json_repairer()
+        call = _ChatCall(
+            model=model,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            trace_context=trace_context,
+            cache=self.cache,
+            schema=schema,
+            # With repair disabled, a call neither attempts a repair nor counts in the repairer's stats.
+            repairer=repairer if repairer.config.enabled else None,
+        )
+        component = str((trace_context or {}).get("component", ""))
+        call.deadlines = self.deadlines
+        if call.deadlines is not None:
+            call.deadline_s = call.deadlines.deadline_s(component)
+            call.hedge_delay_s = call.deadlines.hedge_delay_s(model, component)
+        call.limiter = self.limiter
+        if call.limiter is not None:
+            cfg = call.limiter.config
+            call.priority = cfg.priorities.get(component, cfg.default_priority)
+            call.reserved_tokens = (
+                estimate_tokens(system_prompt) + estimate_tokens(user_prompt) + cfg.completion_tokens_estimate
+            )
+        if call.cache is not None and call.cache.accepts(temperature=temperature):
+            call.cache_key = request_cache_key(
+                {
+                    "base_url": self.base_url,
+                    "model": model,
+                    "temperature": temperature,
+                    "messages": call.messages,
+                    "response_format": {"type": "json_object"},
+                }
+            )
+        return call
+
+    @staticmethod
+    def _load_cached(call: _ChatCall) -> bool:
+        if not call.cache_key or call.cache is None:
+            return False
+        cached = call.cache.get(call.cache_key, request_bytes=call.request_bytes)
+        if cached is None:
+            return False
+        call.cache_hit = True
+        call.raw_content = cached.raw_content
+        call.usage = cached.usage
+        call.used_response_format = cached.used_response_format
+        return True
+
+    @staticmethod
+    def _parse(call: _ChatCall, content: str) -> bool:
+        """Strict parse and schema check of `content`, then in-place repair; False if both fail."""
+        try:
+            parsed = _parse_json_content(content)
+            if call.schema is not None:
+                call.schema.model_validate(parsed)
+            call.parsed_output = parsed
+            call.repair_status = "clean"
+            return True
+        except ValueError:
+            pass
+        if call.repairer is None:
+            return False
+        recovered = call.repairer.recover(content, call.schema, call.repairs)
+        if recovered is None:
+            return False
+        call.parsed_output = recovered
+        call.repair_status = "repaired_local"
+        return True
+
+    def _fix_call(self, call: _ChatCall) -> _ChatCall | None:
+        """The short "fix this JSON" request for `call`, or None if no follow-up should be made."""
+        if call.repairer is None or not call.repairer.wants_follow_up(call.raw_content):
+            return None
+        system_prompt = call.repairer.follow_up_prompt(call.schema)
+        fix = replace(
+            call,
+            system_prompt=system_prompt,
+            user_prompt=call.raw_content,
+            temperature=0.0,
+            raw_content="",
+            usage={},
+            response_headers={},
+            used_response_format=True,
+            hedge_delay_s=None,
+            repairs=call.repairs,
+            follow_up=True,
+        )
+        if fix.limiter is not None:
+            fix.reserved_tokens = (
+                estimate_tokens(system_prompt) + estimate_tokens(call.raw_content) + fix.limiter.config.completion_tokens_estimate
+            )
+        return fix
+
+    def _adopt_fix(self, call: _ChatCall, fix: _ChatCall) -> bool:
+        call.follow_up_usage = fix.usage
+        for key, value in fix.usage.items():
+            call.usage[key] = call.usage.get(key, 0) + value
+        if not self._parse(call, fix.raw_content):
+            return False
+        call.repaired_content = fix.raw_content
+        call.repair_status = "repaired_follow_up"
+        return True
+
+    @staticmethod
+    def _finish(call: _ChatCall) -> dict[str, Any]:
+        if call.parsed_output is None:
+            if call.repairer is not None and not call.cache_hit:
+                call.repair_status = "failed"
+                call.repairer.record("failed")
+            # Raises the strict parser's (or the schema's) error for tenacity to retry the request.
+            parsed = _parse_json_content(call.raw_content)
+            if call.schema is not None:
+                call.schema.model_validate(parsed)
+            call.parsed_output = parsed
+        elif call.repairer is not None and not call.cache_hit:
+            call.repairer.record(call.repair_status)
+        if call.cache_key and call.cache is not None and not call.cache_hit:
+            call.cache.put(
+                call.cache_key,
+                model=call.model,
+                raw_content=call.repaired_content or call.raw_content,
+                usage=call.usage,
+                used_response_format=call.used_response_format,
+            )
+        return call.parsed_output
+
+    @staticmethod
+    def _on_rate_limited(call: _ChatCall, exc: RateLimitError) -> None:
+        """Block the model for the provider's retry-after, or re-raise once retries are spent."""
+        assert call.limiter is not None
+        headers = dict(exc.response.headers)
+        call.limiter.observe(call.model, headers)
+        if call.rate_limited >= call.limiter.config.max_rate_limit_retries:
+            raise exc
+        call.rate_limited += 1
+        call.limiter.penalize(call.model, retry_after_s(headers))
+
+    @staticmethod
+    def _on_response(call: _ChatCall) -> None:
+        if call.limiter is None:
+            return
+        call.limiter.observe(call.model, call.response_headers)
+        call.limiter.settle(call.model, call.reserved_tokens, int(call.usage.get("total_tokens", 0)))
+
+    @staticmethod
+    def _new_leg(call: _ChatCall, started: float, role: str) -> _ChatCall:
+        """Copy of `call` for one request of it; the winning copy is merged back by `_adopt`."""
+        deadline_at = None if call.deadline_s is None else started + call.deadline_s
+        if role == "hedge":
+            call.hedged = True
+        return replace(call, usage={}, response_headers={}, deadline_at=deadline_at, winner=role)
+
+    @staticmethod
+    def _remaining_s(call: _ChatCall) -> float | None:
+        """Time left before the leg's deadline, or None without one."""
+        return None if call.deadline_at is None else max(call.deadline_at - time.monotonic(), 0.001)
+
+    @staticmethod
+    def _transient_backoff_s(call: _ChatCall, exc: Exception) -> float:
+        """Delay before re-sending after a connection error or 5xx; re-raises once none may follow.
+
+        Mirrors the SDK's retry budget, but a timed-out request is never re-sent
+        and a retry must start before the leg's deadline.
+        """
+        if isinstance(exc, APITimeoutError) or call.transient_retries >= DEFAULT_MAX_RETRIES:
+            raise exc
+        delay = 0.5 * 2**call.transient_retries
+        if call.deadline_at is not None and time.monotonic() + delay >= call.deadline_at:
+            raise exc
+        call.transient_retries += 1
+        return delay
+
+    @staticmethod
+    def _check_acquire_timeout(call: _ChatCall, budget_s: float | None, exc: RateLimitTimeout) -> None:
+        """Turn a limiter timeout caused by the call's deadline into a deadline miss."""
+        assert call.limiter is not None
+        if budget_s is not None and budget_s < call.limiter.config.max_wait_s:
+            raise LLMDeadlineExceeded(f"{call.model} could not get rate-limit capacity within its deadline") from exc
+
+    @staticmethod
+    def _adopt(call: _ChatCall, leg: _ChatCall, started: float) -> None:
+        call.raw_content = leg.raw_content
+        call.usage = leg.usage
+        call.used_response_format = leg.used_response_format
+        call.response_headers = leg.response_headers
+        call.pool_wait_ms = leg.pool_wait_ms
+        call.rate_limit_wait_ms = leg.rate_limit_wait_ms
+        call.rate_limited += leg.rate_limited
+        call.winner = leg.winner
+        assert call.deadlines is not None
+        if not call.follow_up:
+            component = str((call.trace_context or {}).get("component", ""))
+            call.deadlines.observe(call.model, component, (time.monotonic() - started) * 1000)
+
+    @staticmethod
+    def _charge_losers(call: _ChatCall, finished: list[_ChatCall], pending: int, outcome: str) -> None:
+        """Account the tokens of requests whose answer is not used.
+
+        Finished losers are charged their reported usage; requests still in
+        flight are charged an estimate of their prompt, which the provider
+        bills even if the answer is cancelled or discarded.
+        """
+        extra = dict.fromkeys(("prompt_tokens", "completion_tokens", "total_tokens"), 0)
+        for leg in finished:
+            for key in extra:
+                extra[key] += int(leg.usage.get(key, 0))
+        if pending:
+            prompt = estimate_tokens(call.system_prompt) + estimate_tokens(call.user_prompt)
+            extra["prompt_tokens"] += prompt * pending
+            extra["total_tokens"] += prompt * pending
+            call.extra_usage_estimated = True
+            call.loser = outcome
+        elif finished and call.winner:
+            call.loser = "completed"
+        if any(extra.values()):
+            call.extra_usage = extra
+        assert call.deadlines is not None
+        if call.follow_up:
+            return
+        call.deadlines.record(
+            requests=1,
+            hedged=int(call.hedged),
+            hedge_wins=int(call.winner == "hedge"),
+            timeouts=int(call.timed_out),
+            losers_cancelled=pending if outcome == "cancelled" else 0,
+            losers_abandoned=pending if outcome == "abandoned" else 0,
+            extra_tokens=extra["total_tokens"],
+        )
+
+    @staticmethod
+    def _deadline_error(call: _ChatCall) -> LLMDeadlineExceeded:
+        call.timed_out = True
+        call.winner = ""
+        return LLMDeadlineExceeded(f"{call.model} gave no answer within the {call.deadline_s}s deadline")
+
+    @staticmethod
+    def _record_error(call: _ChatCall, exc: Exception) -> None:
+        if isinstance(exc, LLMDeadlineExceeded):
+            call.status = "timeout"
+        elif isinstance(exc, BadRequestError):
+            call.status = "api_error"
+        else:
+            call.status = "parse_error" if isinstance(exc, ValueError) else "error"
+        call.error = f"{type(exc).__name__}: {exc}"
+
+    def _emit_trace(self, call: _ChatCall) -> None:
+        if self.usage_hook is not None:
+            self.usage_hook(call.usage_payload())
+        if self.trace_hook is None:
+            return
+        # Redacting and copying prompts is the expensive part; skip it for filtered-out calls.
+        if self.trace_filter is not None and not self.trace_filter(call.trace_context or {}):
+            return
+        self.trace_hook(call.trace_payload())
+
+
+class LLMClient(_BaseLLMClient):
     def _build_client(self) -> OpenAI:
-        kwargs: dict[str, Any] = {"api_key": self.api_key}
-        if self.base_url:
-            kwargs["base_url"] = self.base_url
-        return OpenAI(**kwargs)
+        return self.registry.get_client(api_key=self.api_key, base_url=self.base_url, max_retries=self._max_retries)
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=6))
     def chat_json(
@@ -42,76 +739,315 @@ class LLMClient:
         user_prompt: str,
         temperature: float,
         trace_context: dict[str, Any] | None = None,
+        schema: type[BaseModel] | None = None,
     ) -> dict[str, Any]:
-        if not self.enabled:
-            raise RuntimeError("OPENAI_API_KEY is not set")
-
+        """JSON object answer of the model; with `schema`, malformed or near-miss output is repaired to fit it."""
+        call = self._start_call(
+            model=model,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            trace_context=trace_context,
+            schema=schema,
+        )
         client = self._build_client()
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
-        start_time = time.perf_counter()
-        raw_content = ""
-        parsed_output: dict[str, Any] | None = None
-        usage: dict[str, int] = {}
-        used_response_format = True
-        status = "success"
-        error = ""
-
-        def _request(*, with_response_format: bool) -> tuple[str, dict[str, int]]:
-            request_kwargs: dict[str, Any] = {
-                "model": model,
-                "temperature": temperature,
-                "messages": messages,
-            }
-            if with_response_format:
-                request_kwargs["response_format"] = {"type": "json_object"}
-            response = client.chat.completions.create(**request_kwargs)
-            content = response.choices[0].message.content or "{}"
-            return content, _extract_usage(response)
+        try:
+            if not self._load_cached(call):
+                self._send(client, call)
+            if not self._parse(call, call.raw_content) and not call.cache_hit:
+                self._follow_up(client, call)
+            return self._finish(call)
+        except Exception as exc:
+            self._record_error(call, exc)
+            raise
+        finally:
+            self._emit_trace(call)
+
+    def _follow_up(self, client: OpenAI, call: _ChatCall) -> None:
+        fix = self._fix_call(call)
+        if fix is None:
+            return
+        try:
+            self._send(client, fix)
+        except Exception as exc:
+            # The original parse error is what gets retried; the follow-up's failure is only noted.
+            call.repairs.append(f"follow_up_error:{type(exc).__name__}")
+            return
+        self._adopt_fix(call, fix)
 
+    def _send(self, client: OpenAI, call: _ChatCall) -> None:
+        if call.deadlines is None:
+            self._send_leg(client, call)
+        elif call.hedge_delay_s is None:
+            self._send_with_deadline(client, call)
+        else:
+            self._send_hedged(client, call)
+
+    def _send_with_deadline(self, client: OpenAI, call: _ChatCall) -> None:
+        """Send on the calling thread with the remaining deadline as the client timeout."""
+        started = time.monotonic()
+        leg = self._new_leg(call, started, "primary")
         try:
+            self._send_leg(client, leg)
+        except (APITimeoutError, httpx.TimeoutException) as exc:
+            if call.deadline_s is None:
+                raise
+            error = self._deadline_error(call)
+            # The client aborted the request; its prompt is still billed.
+            self._charge_losers(call, [], 1, "cancelled")
+            raise error from exc
+        except LLMDeadlineExceeded as exc:
+            # The deadline ran out in the rate-limit queue; nothing was sent.
+            error = self._deadline_error(call)
+            self._charge_losers(call, [], 0, "")
+            raise error from exc
+        except Exception:
+            self._charge_losers(call, [], 0, "")
+            raise
+        self._adopt(call, leg, started)
+        self._charge_losers(call, [], 0, "")
+
+    def _send_leg(self, client: OpenAI, call: _ChatCall) -> None:
+        while True:
+            if call.limiter is not None:
+                # The queue wait counts against the deadline, and the request gets what is left of it.
+                budget_s = self._remaining_s(call)
+                try:
+                    call.rate_limit_wait_ms += call.limiter.acquire(call.model, call.reserved_tokens, call.priority, budget_s)
+                except RateLimitTimeout as exc:
+                    self._check_acquire_timeout(call, budget_s, exc)
+                    raise
+            call.request_timeout_s = self._remaining_s(call)
             try:
-                raw_content, usage = _request(with_response_format=True)
-            except BadRequestError as exc:
-                if "response_format" not in str(exc):
+                with self.registry.model_slot(call.model) as call.pool_wait_ms:
+                    call.raw_content, call.usage = self._request(client, call)
+            except RateLimitError as exc:
+                if call.limiter is None:
+                    raise
+                self._on_rate_limited(call, exc)
+                continue
+            except (APIConnectionError, InternalServerError) as exc:
+                if self._max_retries != 0:
                     raise
-                used_response_format = False
-                raw_content, usage = _request(with_response_format=False)
+                time.sleep(self._transient_backoff_s(call, exc))
+                continue
+            self._on_response(call)
+            return
+
+    def _send_hedged(self, client: OpenAI, call: _ChatCall) -> None:
+        """Run the request and, once due, its hedge on the hedge pool under the call's deadline.
+
+        Threads cannot be interrupted, so a losing or timed-out request is
+        abandoned: its answer is dropped, and its own request timeout (the
+        remaining deadline) bounds how long it keeps a worker busy.
+        """
+        assert call.deadlines is not None
+        pool = call.deadlines.hedge_pool()
+        started = time.monotonic()
+        end = None if call.deadline_s is None else started + call.deadline_s
+        hedge_at = None if call.hedge_delay_s is None else started + call.hedge_delay_s
+        primary = self._new_leg(call, started, "primary")
+        legs: dict[Future[None], _ChatCall] = {pool.submit(self._send_leg, client, primary): primary}
+        failed: list[BaseException] = []
+        while True:
+            due = [t for t in (hedge_at, end) if t is not None]
+            timeout = max(min(due) - time.monotonic(), 0.0) if due else None
+            done, _ = wait(legs, timeout=timeout, return_when=FIRST_COMPLETED)
+            finished = []
+            for future in done:
+                leg = legs.pop(future)
+                if future.exception() is None:
+                    finished.append(leg)
+                else:
+                    failed.append(future.exception())
+            if finished:
+                self._adopt(call, finished[0], started)
+                self._abandon(call, legs, finished[1:])
+                return
+            now = time.monotonic()
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                hedge = self._new_leg(call, started, "hedge")
+                legs[pool.submit(self._send_leg, client, hedge)] = hedge
+            elif not legs:
+                if isinstance(failed[0], LLMDeadlineExceeded):
+                    failed[0] = self._deadline_error(call)
+                self._charge_losers(call, [], 0, "")
+                raise failed[0]
+            elif end is not None and now >= end:
+                error = self._deadline_error(call)
+                self._abandon(call, legs, [])
+                raise error
 
-            parsed_output = _parse_json_content(raw_content)
-            return parsed_output
+    def _abandon(self, call: _ChatCall, legs: dict[Future[None], _ChatCall], finished: list[_ChatCall]) -> None:
+        for future in legs:
+            future.cancel()
+        self._charge_losers(call, finished, len(legs), "abandoned")
+
+    @staticmethod
+    def _request(client: OpenAI, call: _ChatCall) -> tuple[str, dict[str, int]]:
+        completions = client.chat.completions.with_raw_response if call.limiter is not None else client.chat.completions
+        try:
+            response = completions.create(**call.request_kwargs(with_response_format=True))
         except BadRequestError as exc:
-            status = "api_error"
-            error = f"{type(exc).__name__}: {exc}"
-            raise
+            if "response_format" not in str(exc):
+                raise
+            call.used_response_format = False
+            response = completions.create(**call.request_kwargs(with_response_format=False))
+        return _read_completion(response, call)
+
+
+class AsyncLLMClient(_BaseLLMClient):
+    """Event-loop native variant of `LLMClient` sharing its cache and trace payloads."""
+
+    def _build_client(self) -> AsyncOpenAI:
+        return self.registry.get_async_client(api_key=self.api_key, base_url=self.base_url, max_retries=self._max_retries)
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=6))
+    async def chat_json(
+        self,
+        *,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        trace_context: dict[str, Any] | None = None,
+        schema: type[BaseModel] | None = None,
+    ) -> dict[str, Any]:
+        call = self._start_call(
+            model=model,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            trace_context=trace_context,
+            schema=schema,
+        )
+        client = self._build_client()
+        try:
+            if not self._load_cached(call):
+                await self._send(client, call)
+            if not self._parse(call, call.raw_content) and not call.cache_hit:
+                await self._follow_up(client, call)
+            return self._finish(call)
         except Exception as exc:
-            status = "parse_error" if isinstance(exc, ValueError) else "error"
-            error = f"{type(exc).__name__}: {exc}"
+            self._record_error(call, exc)
             raise
         finally:
-            self._emit_trace(
-                {
-                    **(trace_context or {}),
-                    "status": status,
-                    "error": error,
-                    "model": model,
-                    "temperature": temperature,
-                    "used_response_format_json_object": used_response_format,
-                    "latency_ms": round((time.perf_counter() - start_time) * 1000, 3),
-                    "usage": usage,
-                    "system_prompt": _redact_secrets(system_prompt),
-                    "user_prompt": _redact_secrets(user_prompt),
-                    "raw_response": _redact_secrets(raw_content),
-                    "parsed_output": parsed_output,
-                }
-            )
+            self._emit_trace(call)
 
-    def _emit_trace(self, payload: dict[str, Any]) -> None:
-        if self.trace_hook is None:
+    async def _follow_up(self, client: AsyncOpenAI, call: _ChatCall) -> None:
+        fix = self._fix_call(call)
+        if fix is None:
+            return
+        try:
+            await self._send(client, fix)
+        except Exception as exc:
+            call.repairs.append(f"follow_up_error:{type(exc).__name__}")
+            return
+        self._adopt_fix(call, fix)
+
+    async def _send(self, client: AsyncOpenAI, call: _ChatCall) -> None:
+        if call.deadlines is None:
+            await self._send_leg(client, call)
+        else:
+            await self._send_guarded(client, call)
+
+    async def _send_guarded(self, client: AsyncOpenAI, call: _ChatCall) -> None:
+        """Run the request under the call's deadline, hedging it if due; losers are cancelled."""
+        started = time.monotonic()
+        end = None if call.deadline_s is None else started + call.deadline_s
+        hedge_at = None if call.hedge_delay_s is None else started + call.hedge_delay_s
+        primary = self._new_leg(call, started, "primary")
+        legs: dict[asyncio.Task[None], _ChatCall] = {asyncio.ensure_future(self._send_leg(client, primary)): primary}
+        failed: list[BaseException] = []
+        try:
+            while True:
+                due = [t for t in (hedge_at, end) if t is not None]
+                timeout = max(min(due) - time.monotonic(), 0.0) if due else None
+                done, _ = await asyncio.wait(legs, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                finished = []
+                for task in done:
+                    leg = legs.pop(task)
+                    if task.exception() is None:
+                        finished.append(leg)
+                    else:
+                        failed.append(task.exception())
+                if finished:
+                    self._adopt(call, finished[0], started)
+                    self._charge_losers(call, finished[1:], len(legs), "cancelled")
+                    return
+                now = time.monotonic()
+                if hedge_at is not None and now >= hedge_at:
+                    hedge_at = None
+                    hedge = self._new_leg(call, started, "hedge")
+                    legs[asyncio.ensure_future(self._send_leg(client, hedge))] = hedge
+                elif not legs:
+                    if isinstance(failed[0], LLMDeadlineExceeded):
+                        failed[0] = self._deadline_error(call)
+                    self._charge_losers(call, [], 0, "")
+                    raise failed[0]
+                elif end is not None and now >= end:
+                    error = self._deadline_error(call)
+                    self._charge_losers(call, [], len(legs), "cancelled")
+                    raise error
+        finally:
+            for task in legs:
+                task.cancel()
+            if legs:
+                await asyncio.gather(*legs, return_exceptions=True)
+
+    async def _send_leg(self, client: AsyncOpenAI, call: _ChatCall) -> None:
+        while True:
+            if call.limiter is not None:
+                budget_s = self._remaining_s(call)
+                try:
+                    call.rate_limit_wait_ms += await call.limiter.aacquire(call.model, call.reserved_tokens, call.priority, budget_s)
+                except RateLimitTimeout as exc:
+                    self._check_acquire_timeout(call, budget_s, exc)
+                    raise
+            call.request_timeout_s = self._remaining_s(call)
+            try:
+                async with self.registry.async_model_slot(call.model) as call.pool_wait_ms:
+                    call.raw_content, call.usage = await self._request(client, call)
+            except RateLimitError as exc:
+                if call.limiter is None:
+                    raise
+                self._on_rate_limited(call, exc)
+                continue
+            except (APIConnectionError, InternalServerError) as exc:
+                if self._max_retries != 0:
+                    raise
+                await asyncio.sleep(self._transient_backoff_s(call, exc))
+                continue
+            self._on_response(call)
             return
-        self.trace_hook(payload)
+
+    @staticmethod
+    async def _request(client: AsyncOpenAI, call: _ChatCall) -> tuple[str, dict[str, int]]:
+        completions = client.chat.completions.with_raw_response if call.limiter is not None else client.chat.completions
+        try:
+            response = await completions.create(**call.request_kwargs(with_response_format=True))
+        except BadRequestError as exc:
+            if "response_format" not in str(exc):
+                raise
+            call.used_response_format = False
+            response = await completions.create(**call.request_kwargs(with_response_format=False))
+        return _read_completion(response, call)
+
+
+def _read_completion(response: Any, call: _ChatCall) -> tuple[str, dict[str, int]]:
+    if hasattr(response, "parse"):
+        # Raw responses (requested when rate limiting) carry the x-ratelimit-* headers.
+        call.response_headers = dict(response.headers)
+        response = response.parse()
+    content = response.choices[0].message.content or "{}"
+    return content, _extract_usage(response)
+
+
+def _cache_trace(cache: LLMResponseCache | None, *, hit: bool, key: str) -> dict[str, Any]:
+    if cache is None:
+        return {"mode": "disabled", "hit": False}
+    return {**cache.stats(), "hit": hit, "key": key}
 
 
 def _parse_json_content(content: str) -> dict[str, Any]:
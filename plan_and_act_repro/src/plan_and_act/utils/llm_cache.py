@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from plan_and_act.core.types import LLMCacheConfig
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    raw_content TEXT NOT NULL,
+    usage TEXT NOT NULL,
+    used_response_format INTEGER NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_accessed ON responses(last_accessed);
+CREATE TABLE IF NOT EXISTS cache_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    entries INTEGER NOT NULL,
+    size_bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cache_totals (id, entries, size_bytes)
+    SELECT 1, COUNT(*), COALESCE(SUM(size_bytes), 0) FROM responses;
+CREATE TRIGGER IF NOT EXISTS responses_totals_insert AFTER INSERT ON responses BEGIN
+    UPDATE cache_totals SET entries = entries + 1, size_bytes = size_bytes + NEW.size_bytes WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_totals_update AFTER UPDATE OF size_bytes ON responses BEGIN
+    UPDATE cache_totals SET size_bytes = size_bytes - OLD.size_bytes + NEW.size_bytes WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_totals_delete AFTER DELETE ON responses BEGIN
+    UPDATE cache_totals SET entries = entries - 1, size_bytes = size_bytes - OLD.size_bytes WHERE id = 1;
+END;
+"""
+_EVICT = (
+    "DELETE FROM responses WHERE rowid IN "
+    "(SELECT rowid FROM responses ORDER BY last_accessed ASC LIMIT ?)"
+)
+
+
+@dataclass
+class CachedResponse:
+    raw_content: str
+    usage: dict[str, int]
+    used_response_format: bool
+
+
+def request_cache_key(request: dict[str, Any]) -> str:
+    """Content address for a chat request: sha256 of its canonical JSON encoding."""
+    return hashlib.sha256(orjson.dumps(request, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed response store for deterministic chat requests.
+
+    Entries are evicted least-recently-used first once `max_entries` or
+    `max_bytes` is exceeded, and treated as missing once older than `ttl_s`.
+    Triggers keep the entry count and byte total in the one-row
+    `cache_totals` table, so a write never scans the responses table.
+    """
+
+    def __init__(self, config: LLMCacheConfig) -> None:
+        self.config = config
+        self.mode = config.mode
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "bytes_saved": 0}
+
+        path = Path(config.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @property
+    def readable(self) -> bool:
+        return self.mode in {"read_write", "read_only"}
+
+    @property
+    def writable(self) -> bool:
+        return self.mode == "read_write"
+
+    def accepts(self, *, temperature: float) -> bool:
+        if self.mode == "bypass":
+            return False
+        return temperature == 0.0 or not self.config.deterministic_only
+
+    def get(self, key: str, *, request_bytes: int = 0) -> CachedResponse | None:
+        if not self.readable:
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT raw_content, usage, used_response_format, size_bytes, created_at "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None and self.config.ttl_s and now - row[4] > self.config.ttl_s:
+                if self.writable:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._stats["hits"] += 1
+            self._stats["bytes_saved"] += request_bytes + row[3]
+            if self.writable:
+                self._conn.execute("UPDATE responses SET last_accessed = ? WHERE key = ?", (now, key))
+
+        return CachedResponse(
+            raw_content=row[0],
+            usage=orjson.loads(row[1]),
+            used_response_format=bool(row[2]),
+        )
+
+    def put(
+        self,
+        key: str,
+        *,
+        model: str,
+        raw_content: str,
+        usage: dict[str, int],
+        used_response_format: bool,
+    ) -> None:
+        if not self.writable:
+            return
+
+        now = time.time()
+        size_bytes = len(raw_content.encode("utf-8"))
+        with self._lock:
+            # An upsert rather than INSERT OR REPLACE: REPLACE deletes without firing the delete trigger.
+            self._conn.execute(
+                "INSERT INTO responses "
+                "(key, model, raw_content, usage, used_response_format, size_bytes, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET model = excluded.model, raw_content = excluded.raw_content, "
+                "usage = excluded.usage, used_response_format = excluded.used_response_format, "
+                "size_bytes = excluded.size_bytes, created_at = excluded.created_at, "
+                "last_accessed = excluded.last_accessed",
+                (key, model, raw_content, orjson.dumps(usage).decode("utf-8"), int(used_response_format), size_bytes, now, now),
+            )
+            self._stats["writes"] += 1
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        max_entries = self.config.max_entries
+        max_bytes = self.config.max_bytes
+        evicted = 0
+        while True:
+            count, total_bytes = self._conn.execute("SELECT entries, size_bytes FROM cache_totals WHERE id = 1").fetchone()
+            over_entries = count - max_entries if max_entries else 0
+            over_bytes = total_bytes - max_bytes if max_bytes else 0
+            if count <= 0 or (over_entries <= 0 and over_bytes <= 0):
+                break
+            # Enough of the oldest rows to cover the byte overshoot at the average entry size.
+            batch = max(over_entries, -(-over_bytes * count // total_bytes) if over_bytes > 0 else 0, 1)
+            evicted += self._conn.execute(_EVICT, (batch,)).rowcount
+        self._stats["evictions"] += evicted
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+        out["mode"] = self.mode
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache_lock = threading.Lock()
+_cache: LLMResponseCache | None = None
+
+
+def get_response_cache() -> LLMResponseCache | None:
+    with _cache_lock:
+        return _cache
+
+
+def configure_response_cache(config: LLMCacheConfig) -> LLMResponseCache | None:
+    """Install (or remove, when disabled) the process-wide response cache."""
+    global _cache
+    with _cache_lock:
+        previous = _cache
+        _cache = LLMResponseCache(config) if config.enabled else None
+        current = _cache
+    if previous is not None:
+        previous.close()
+    return current
@@ -0,0 +1,467 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import ipaddress
+import itertools
+import os
+import re
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Protocol
+
+from plan_and_act.core.types import ModelRateLimit, RateLimitConfig
+
+_RESET_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_RESET_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+# Polling interval of waiters that are not at the head of their model's queue.
+_QUEUE_POLL_S = 0.005
+# Fallback for the coordinator's authkey (hex) when it is not in the config, e.g. for separately launched workers.
+AUTHKEY_ENV = "PLAN_AND_ACT_RATE_LIMIT_AUTHKEY"
+
+
+class RateLimitTimeout(TimeoutError):
+    """A request would wait longer than `max_wait_s` (or its own bound) for rate-limit capacity."""
+
+
+def parse_reset(value: str) -> float:
+    """Seconds in an `x-ratelimit-reset-*` value such as "20ms", "1.5s" or "6m0s"."""
+    try:
+        return float(value)
+    except ValueError:
+        return sum(float(number) * _RESET_UNITS[unit] for number, unit in _RESET_RE.findall(value))
+
+
+def retry_after_s(headers: Mapping[str, str]) -> float:
+    """Delay a 429 asks for, from `retry-after-ms` or `retry-after`; 0 if absent."""
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return max(float(value) * scale, 0.0)
+            except ValueError:
+                continue
+    return 0.0
+
+
+@dataclass
+class _Bucket:
+    capacity: float
+    level: float
+    updated: float
+
+    @property
+    def rate_per_s(self) -> float:
+        return self.capacity / 60
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate_per_s)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        # A request larger than the whole bucket waits for a full bucket instead of forever.
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate_per_s
+
+    def resize(self, capacity: float) -> None:
+        if capacity > 0 and capacity != self.capacity:
+            self.level = min(self.level, capacity)
+            self.capacity = capacity
+
+
+@dataclass
+class _ModelState:
+    requests: _Bucket | None = None
+    tokens: _Bucket | None = None
+    blocked_until: float = 0.0
+    waiters: list[tuple[int, int]] = field(default_factory=list)
+
+
+class Limiter(Protocol):
+    """What the LLM clients need from a rate limiter, local or behind a coordinator."""
+
+    config: RateLimitConfig
+
+    def acquire(self, model: str, tokens: int, priority: int, max_wait_s: float | None = None) -> float: ...
+
+    async def aacquire(self, model: str, tokens: int, priority: int, max_wait_s: float | None = None) -> float: ...
+
+    def settle(self, model: str, reserved: int, actual: int) -> None: ...
+
+    def release(self, model: str, tokens: int) -> None: ...
+
+    def observe(self, model: str, headers: Mapping[str, str]) -> None: ...
+
+    def penalize(self, model: str, delay_s: float) -> None: ...
+
+    def stats(self) -> dict[str, Any]: ...
+
+
+class RateLimiter:
+    """Client-side RPM/TPM token buckets per model with priority lanes.
+
+    `acquire` reserves one request and the estimated tokens of a call and
+    blocks (or, via `aacquire`, sleeps) until both buckets have room. Waiters
+    of a model are served strictly by (priority, arrival), so an executor call
+    with priority 0 overtakes queued background calls. After the response,
+    `settle` corrects the token reservation with the reported usage and
+    `observe` adopts the provider's `x-ratelimit-*` view: limits resize the
+    buckets, remaining counts cap them and a zero remaining count blocks the
+    model until the reset time. `penalize` blocks a model after a 429.
+    Models without configured limits are only limited once headers arrive.
+    """
+
+    def __init__(self, config: RateLimitConfig | None = None) -> None:
+        self.config = config or RateLimitConfig()
+        self._cond = threading.Condition()
+        self._models: dict[str, _ModelState] = {}
+        self._seq = itertools.count()
+        self._stats = {"acquired": 0, "waited": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0, "penalties": 0, "timeouts": 0, "cancelled": 0, "released": 0}
+
+    def _limits_for(self, model: str) -> ModelRateLimit:
+        limits = self.config.models
+        if model in limits:
+            return limits[model]
+        prefixes = [key for key in limits if model.startswith(key)]
+        if prefixes:
+            return limits[max(prefixes, key=len)]
+        return ModelRateLimit(rpm=self.config.default_rpm, tpm=self.config.default_tpm)
+
+    def _state(self, model: str, now: float) -> _ModelState:
+        state = self._models.get(model)
+        if state is None:
+            limits = self._limits_for(model)
+            state = _ModelState(
+                requests=_Bucket(limits.rpm, limits.rpm, now) if limits.rpm else None,
+                tokens=_Bucket(limits.tpm, limits.tpm, now) if limits.tpm else None,
+            )
+            self._models[model] = state
+        return state
+
+    def _try_grant(self, model: str, ticket: tuple[int, int], tokens: int, now: float) -> float:
+        """Consume capacity for `ticket` and return 0, or return how long to wait before retrying."""
+        state = self._state(model, now)
+        if state.waiters[0] != ticket:
+            return _QUEUE_POLL_S
+        wait = max(state.blocked_until - now, 0.0)
+        for bucket, amount in ((state.requests, 1), (state.tokens, tokens)):
+            if bucket is not None:
+                bucket.refill(now)
+                wait = max(wait, bucket.wait_for(amount))
+        if wait > 0:
+            return wait
+        if state.requests is not None:
+            state.requests.level -= 1
+        if state.tokens is not None:
+            state.tokens.level -= min(tokens, state.tokens.capacity)
+        heapq.heappop(state.waiters)
+        return 0.0
+
+    def _enqueue(self, model: str, priority: int) -> tuple[int, int]:
+        ticket = (priority, next(self._seq))
+        heapq.heappush(self._state(model, time.monotonic()).waiters, ticket)
+        return ticket
+
+    def _abandon(self, model: str, ticket: tuple[int, int], reason: str = "timeouts") -> None:
+        waiters = self._models[model].waiters
+        if ticket in waiters:
+            waiters.remove(ticket)
+            heapq.heapify(waiters)
+        self._stats[reason] += 1
+        self._cond.notify_all()
+
+    def _granted(self, started: float) -> float:
+        waited_ms = (time.monotonic() - started) * 1000
+        self._stats["acquired"] += 1
+        if waited_ms >= 1:
+            self._stats["waited"] += 1
+        self._stats["wait_ms_total"] += waited_ms
+        self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], waited_ms)
+        # The next waiter in line may be grantable now.
+        self._cond.notify_all()
+        return round(waited_ms, 3)
+
+    def acquire(self, model: str, tokens: int, priority: int, max_wait_s: float | None = None) -> float:
+        """Block until the call may be sent; returns the time waited in ms.
+
+        `max_wait_s` tightens the configured bound, e.g. to the caller's remaining deadline.
+        """
+        started = time.monotonic()
+        bound = self.config.max_wait_s if max_wait_s is None else min(max_wait_s, self.config.max_wait_s)
+        deadline = started + bound
+        with self._cond:
+            ticket = self._enqueue(model, priority)
+            while True:
+                now = time.monotonic()
+                wait = self._try_grant(model, ticket, tokens, now)
+                if wait == 0:
+                    return self._granted(started)
+                if now + wait > deadline:
+                    self._abandon(model, ticket)
+                    raise RateLimitTimeout(f"Rate limit wait for {model} exceeds {bound:g}s")
+                self._cond.wait(wait)
+
+    async def aacquire(self, model: str, tokens: int, priority: int, max_wait_s: float | None = None) -> float:
+        """`acquire` for coroutines: sleeps on the event loop instead of blocking it."""
+        started = time.monotonic()
+        bound = self.config.max_wait_s if max_wait_s is None else min(max_wait_s, self.config.max_wait_s)
+        deadline = started + bound
+        with self._cond:
+            ticket = self._enqueue(model, priority)
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                wait = self._try_grant(model, ticket, tokens, now)
+                if wait == 0:
+                    return self._granted(started)
+                if now + wait > deadline:
+                    self._abandon(model, ticket)
+                    raise RateLimitTimeout(f"Rate limit wait for {model} exceeds {bound:g}s")
+            try:
+                await asyncio.sleep(wait)
+            except BaseException:
+                # A cancelled waiter (e.g. a losing hedge) must not block the queue behind its ticket.
+                with self._cond:
+                    self._abandon(model, ticket, "cancelled")
+                raise
+
+    def settle(self, model: str, reserved: int, actual: int) -> None:
+        """Return over-reserved tokens to the bucket (or charge the shortfall)."""
+        if actual <= 0:
+            return
+        with self._cond:
+            state = self._models.get(model)
+            if state is None or state.tokens is None:
+                return
+            state.tokens.refill(time.monotonic())
+            state.tokens.level = min(state.tokens.capacity, state.tokens.level + reserved - actual)
+            self._cond.notify_all()
+
+    def release(self, model: str, tokens: int) -> None:
+        """Give back the request and tokens of a grant whose call will not be sent."""
+        with self._cond:
+            state = self._models.get(model)
+            if state is None:
+                return
+            now = time.monotonic()
+            for bucket, amount in ((state.requests, 1), (state.tokens, tokens)):
+                if bucket is not None:
+                    bucket.refill(now)
+                    bucket.level = min(bucket.capacity, bucket.level + min(amount, bucket.capacity))
+            self._stats["released"] += 1
+            self._cond.notify_all()
+
+    def observe(self, model: str, headers: Mapping[str, str]) -> None:
+        if not self.config.adapt_to_headers or not headers:
+            return
+        now = time.monotonic()
+        with self._cond:
+            state = self._state(model, now)
+            for kind in ("requests", "tokens"):
+                limit = _int_header(headers, f"x-ratelimit-limit-{kind}")
+                remaining = _int_header(headers, f"x-ratelimit-remaining-{kind}")
+                bucket: _Bucket | None = getattr(state, kind)
+                if bucket is None and limit:
+                    bucket = _Bucket(limit, limit, now)
+                    setattr(state, kind, bucket)
+                if bucket is None:
+                    continue
+                bucket.refill(now)
+                if limit:
+                    bucket.resize(limit)
+                if remaining is not None:
+                    bucket.level = min(bucket.level, remaining)
+                    if remaining == 0:
+                        reset = parse_reset(headers.get(f"x-ratelimit-reset-{kind}", "0"))
+                        state.blocked_until = max(state.blocked_until, now + reset)
+
+    def penalize(self, model: str, delay_s: float) -> None:
+        with self._cond:
+            state = self._state(model, time.monotonic())
+            state.blocked_until = max(state.blocked_until, time.monotonic() + max(delay_s, self.config.min_backoff_s))
+            self._stats["penalties"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            out: dict[str, Any] = dict(self._stats)
+            out["queued"] = sum(len(state.waiters) for state in self._models.values())
+        out["wait_ms_total"] = round(out["wait_ms_total"], 3)
+        out["wait_ms_max"] = round(out["wait_ms_max"], 3)
+        return out
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> int | None:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+class RateLimitCoordinator:
+    """Serves one `RateLimiter` to worker processes over a localhost socket.
+
+    Each client connection gets a thread; `acquire` blocks that thread until
+    the shared limiter grants the call, so every process draws from the same
+    buckets and priority queues. Connections must present `authkey`, random
+    per coordinator unless given, and may only call the limiter operations
+    in `_OPS`. Binding a non-loopback host needs `allow_remote=True`.
+    """
+
+    _OPS = ("acquire", "settle", "release", "observe", "penalize", "stats")
+
+    def __init__(
+        self,
+        config: RateLimitConfig | None = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        authkey: bytes | None = None,
+        allow_remote: bool = False,
+    ) -> None:
+        if not allow_remote and not _is_loopback(host):
+            raise ValueError(f"Refusing to serve the rate limiter on non-loopback host {host!r}; pass allow_remote=True")
+        self.limiter = RateLimiter(config)
+        self.authkey = authkey or os.urandom(32)
+        self._ops = {op: getattr(self.limiter, op) for op in self._OPS}
+        self._listener = Listener((host, port), authkey=self.authkey)
+        self._closed = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._listener.address
+        return f"{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._accept_loop, name="rate-limit-coordinator", daemon=True)
+        self._thread.start()
+        return self.address
+
+    def _accept_loop(self) -> None:
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except AuthenticationError:
+                continue
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    op, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                handler = self._ops.get(op)
+                if handler is None:
+                    conn.send((False, ValueError(f"Unknown rate limiter operation: {op!r}")))
+                    continue
+                try:
+                    conn.send((True, handler(*args)))
+                except Exception as exc:
+                    conn.send((False, exc))
+
+    def stop(self) -> None:
+        self._closed.set()
+        self._listener.close()
+
+
+class RemoteRateLimiter:
+    """`RateLimiter` interface forwarded to a `RateLimitCoordinator`; one connection per thread."""
+
+    def __init__(self, config: RateLimitConfig) -> None:
+        self.config = config
+        host, _, port = config.coordinator.rpartition(":")
+        self.address = (host or "127.0.0.1", int(port))
+        authkey = config.coordinator_authkey or os.environ.get(AUTHKEY_ENV, "")
+        if not authkey:
+            raise ValueError(f"rate_limit.coordinator is set but no authkey was given (coordinator_authkey or ${AUTHKEY_ENV})")
+        self.authkey = bytes.fromhex(authkey)
+        self._local = threading.local()
+
+    def _call(self, op: str, *args: Any) -> Any:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = Client(self.address, authkey=self.authkey)
+        conn.send((op, args))
+        ok, value = conn.recv()
+        if not ok:
+            raise value
+        return value
+
+    def acquire(self, model: str, tokens: int, priority: int, max_wait_s: float | None = None) -> float:
+        return self._call("acquire", model, tokens, priority, max_wait_s)
+
+    async def aacquire(self, model: str, tokens: int, priority: int, max_wait_s: float | None = None) -> float:
+        # The coordinator call runs on a worker thread and cannot be interrupted; if the caller is
+        # cancelled, the grant it still receives is handed back.
+        pending = asyncio.ensure_future(asyncio.to_thread(self._call, "acquire", model, tokens, priority, max_wait_s))
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            pending.add_done_callback(lambda done: self._release_granted(done, model, tokens))
+            raise
+
+    def _release_granted(self, done: asyncio.Future[float], model: str, tokens: int) -> None:
+        if not done.cancelled() and done.exception() is None:
+            self.release(model, tokens)
+
+    def settle(self, model: str, reserved: int, actual: int) -> None:
+        self._call("settle", model, reserved, actual)
+
+    def release(self, model: str, tokens: int) -> None:
+        self._call("release", model, tokens)
+
+    def observe(self, model: str, headers: Mapping[str, str]) -> None:
+        self._call("observe", model, dict(headers))
+
+    def penalize(self, model: str, delay_s: float) -> None:
+        self._call("penalize", model, delay_s)
+
+    def stats(self) -> dict[str, Any]:
+        return self._call("stats")
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+_limiter_lock = threading.Lock()
+_limiter: Limiter | None = None
+
+
+def get_rate_limiter() -> Limiter | None:
+    with _limiter_lock:
+        return _limiter
+
+
+def configure_rate_limiter(config: RateLimitConfig) -> Limiter | None:
+    """Install (or remove, when disabled) the process-wide limiter.
+
+    With `coordinator` set, calls are limited by the coordinator at that
+    address, shared with every other process pointing at it.
+    """
+    global _limiter
+    if not config.enabled:
+        limiter: Limiter | None = None
+    elif config.coordinator:
+        limiter = RemoteRateLimiter(config)
+    else:
+        limiter = RateLimiter(config)
+    with _limiter_lock:
+        _limiter = limiter
+    return limiter
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from plan_and_act.agents.executor import ExecutorAgent
+from plan_and_act.agents.planner import PlannerAgent
+from plan_and_act.agents.replanner import ReplannerAgent
+from plan_and_act.core.schemas import ExecutorAction, PlannerOutput
+from plan_and_act.core.state import build_initial_state
+from plan_and_act.core.types import ModelConfig
+from plan_and_act.environments.tooling import ToolCallingEnvironment
+from plan_and_act.graph.workflow import build_workflow
+from plan_and_act.prompts.templates import PromptTemplates
+from plan_and_act.tools.base import ToolRegistry
+from plan_and_act.utils.llm import AsyncLLMClient
+
+
+@dataclass
+class SyncEchoTool:
+    name: str = "echo"
+
+    def run(self, arguments: dict) -> dict:
+        return {"ok": True, "echo": arguments}
+
+
+class AsyncEchoTool:
+    name = "aecho"
+
+    def run(self, arguments: dict) -> dict:
+        raise AssertionError("async path must not call run()")
+
+    async def arun(self, arguments: dict) -> dict:
+        await asyncio.sleep(0)
+        return {"ok": True, "echo": arguments}
+
+
+def test_ainvoke_runs_many_episodes_on_one_loop() -> None:
+    prompts = PromptTemplates(config_dir="configs/prompts")
+    workflow = build_workflow(
+        PlannerAgent(ModelConfig(provider="heuristic"), prompts),
+        ExecutorAgent(ModelConfig(provider="heuristic"), prompts),
+        ReplannerAgent(ModelConfig(provider="heuristic"), prompts),
+    )
+
+    async def _run_all() -> list[dict[str, Any]]:
+        states = [
+            build_initial_state(goal=f"goal {i}", max_steps=6, dynamic_replanning=True, use_cot=False)
+            for i in range(200)
+        ]
+        return await asyncio.gather(*(workflow.ainvoke(state) for state in states))
+
+    results = asyncio.run(_run_all())
+
+    assert len(results) == 200
+    assert all(state["done"] for state in results)
+    assert results[7]["goal"] == "goal 7"
+    assert results[0]["step_count"] == workflow.invoke(
+        build_initial_state(goal="goal 0", max_steps=6, dynamic_replanning=True, use_cot=False)
+    )["step_count"]
+
+
+def test_ainvoke_accepts_sync_only_agents() -> None:
+    class Planner:
+        def plan(self, **kwargs) -> PlannerOutput:
+            return PlannerOutput(goal=kwargs["goal"], steps=[])
+
+    class Executor:
+        def act(self, **kwargs) -> ExecutorAction:
+            return ExecutorAction(action_type="click", target="x")
+
+    workflow = build_workflow(planner=Planner(), executor=Executor(), replanner=Planner())
+    init = build_initial_state(goal="g", max_steps=3, dynamic_replanning=False, use_cot=False)
+
+    final_state = asyncio.run(workflow.ainvoke(init))
+
+    assert final_state["done"] is True
+    assert "plan exhausted" in final_state["final_answer"].lower()
+
+
+def test_tool_environment_astep_uses_native_and_threaded_tools() -> None:
+    env = ToolCallingEnvironment(ToolRegistry({"echo": SyncEchoTool(), "aecho": AsyncEchoTool()}))
+
+    async def _steps() -> list[Any]:
+        return [
+            await env.astep(action=ExecutorAction(action_type="search", target="tool:echo", arguments={"q": 1}), step_count=1),
+            await env.astep(action=ExecutorAction(action_type="search", target="tool:aecho", arguments={"q": 2}), step_count=2),
+        ]
+
+    sync_result, async_result = asyncio.run(_steps())
+
+    assert "Tool[echo]" in sync_result.observation
+    assert "Tool[aecho]" in async_result.observation
+
+
+def test_async_llm_client_chat_json(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+
+    class _Completions:
+        async def create(self, **kwargs: Any) -> Any:
+            message = SimpleNamespace(content='```json\n{"goal": "g", "steps": []}\n```')
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    traces: list[dict[str, Any]] = []
+    llm = AsyncLLMClient(trace_hook=traces.append)
+    monkeypatch.setattr(llm, "_build_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=_Completions())))
+
+    out = asyncio.run(
+        llm.chat_json(model="gpt-4", system_prompt="s", user_prompt="u", temperature=0.0, trace_context={"component": "planner"})
+    )
+
+    assert out == {"goal": "g", "steps": []}
+    assert traces[0]["component"] == "planner"
+    assert traces[0]["status"] == "success"
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from plan_and_act.core.types import ObservationConfig
+from plan_and_act.environments.observations import ObservationStore
+from plan_and_act.environments.simulator import GenericSimulatorEnvironment
+from plan_and_act.environments.tooling import ToolCallingEnvironment
+from plan_and_act.eval.episode import (
+    aexecute_episode,
+    execute_episode,
+    load_checkpointed_state,
+    load_episode_settings,
+    resume_episode,
+)
+from plan_and_act.graph.checkpoint import close_sqlite_checkpointers
+from plan_and_act.tools.base import ToolRegistry
+
+
+@pytest.fixture(autouse=True)
+def _isolated_checkpointers(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    yield
+    close_sqlite_checkpointers()
+
+
+def _settings(tmp_path: Path, *, trace: bool = True):
+    settings = load_episode_settings(
+        base_config="configs/base.yaml",
+        model_config="configs/models.yaml",
+        trace_config="configs/tracing.yaml",
+        llm_config="configs/llm.yaml",
+        environment="simulator",
+        trace=trace,
+    )
+    settings.trace.base_dir = str(tmp_path / "traces")
+    runtime = settings.runtime.model_copy(
+        update={
+            "artifact_dir": str(tmp_path / "runs"),
+            "checkpoint": settings.runtime.checkpoint.model_copy(
+                update={"enabled": True, "path": str(tmp_path / "checkpoints.sqlite")}
+            ),
+        }
+    )
+    return settings.model_copy(update={"runtime": runtime})
+
+
+def _events(tmp_path: Path, run_id: str) -> list[dict]:
+    lines = (tmp_path / "traces" / run_id / "events.jsonl").read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def test_resume_continues_from_last_completed_node(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    settings = _settings(tmp_path)
+    baseline = execute_episode("checkpoint goal", settings, run_id="baseline")
+
+    original_step = GenericSimulatorEnvironment.step
+
+    def _crash_on_last_step(self, *, action, step_count):
+        if step_count == baseline["step_count"]:
+            raise RuntimeError("worker died")
+        return original_step(self, action=action, step_count=step_count)
+
+    monkeypatch.setattr(GenericSimulatorEnvironment, "step", _crash_on_last_step)
+    with pytest.raises(RuntimeError, match="worker died"):
+        execute_episode("checkpoint goal", settings, run_id="crashed")
+
+    saved = load_checkpointed_state("crashed", settings)
+    assert saved["step_count"] == baseline["step_count"] - 1
+    assert len(saved["action_history"]) == baseline["step_count"] - 1
+
+    monkeypatch.setattr(GenericSimulatorEnvironment, "step", original_step)
+    resumed = resume_episode("crashed", settings)
+
+    assert resumed["success"] == baseline["success"]
+    assert resumed["step_count"] == baseline["step_count"]
+    artifact = json.loads((tmp_path / "runs" / "episode_crashed.json").read_text(encoding="utf-8"))
+    assert len(artifact["final_state"]["action_history"]) == baseline["step_count"]
+
+    events = _events(tmp_path, "crashed")
+    assert [event["seq"] for event in events] == list(range(len(events)))
+    event_types = [event["event_type"] for event in events]
+    assert event_types.count("planner_output") == 1
+    assert event_types.count("episode_error") == 1
+    assert event_types.count("episode_resumed") == 1
+    assert event_types[-1] == "episode_end"
+
+    session = json.loads((tmp_path / "traces" / "crashed" / "session.json").read_text(encoding="utf-8"))
+    assert session["status"] == "completed"
+    assert session["summary"]["event_count"] == len(events)
+
+    with pytest.raises(ValueError, match="No checkpoint"):
+        load_checkpointed_state("crashed", settings)
+
+
+def test_resume_unknown_run_id_fails_cleanly(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="No checkpoint for run_id 'missing'"):
+        resume_episode("missing", _settings(tmp_path))
+
+
+def test_async_episode_uses_the_same_checkpointer(tmp_path: Path) -> None:
+    settings = _settings(tmp_path, trace=False)
+
+    async def _run_many() -> list[dict]:
+        return await asyncio.gather(
+            *(aexecute_episode(f"async goal {i}", settings, run_id=f"async_{i}") for i in range(8))
+        )
+
+    results = asyncio.run(_run_many())
+
+    assert all(result["success"] for result in results)
+    # Finished threads are dropped from the store, so nothing is left to resume.
+    with pytest.raises(ValueError, match="No checkpoint"):
+        load_checkpointed_state("async_0", settings)
+
+
+def test_resume_restores_the_tool_environment_observation_store(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    settings = _settings(tmp_path, trace=False)
+    runtime = settings.runtime.model_copy(update={"observations": ObservationConfig(enabled=True)})
+    settings = settings.model_copy(update={"environment": "tool", "runtime": runtime})
+    # Every tool call returns a result large enough to be stored behind a handle.
+    calls = itertools.count(1)
+
+    def _search(self, name, arguments):
+        return {"ok": True, "call": next(calls), "results": [{"title": f"hit {i}"} for i in range(40)]}
+
+    monkeypatch.setattr(ToolRegistry, "call", _search)
+    original_step = ToolCallingEnvironment.step
+
+    def _crash_on_step_two(self, *, action, step_count):
+        if step_count == 2:
+            raise RuntimeError("worker died")
+        return original_step(self, action=action, step_count=step_count)
+
+    monkeypatch.setattr(ToolCallingEnvironment, "step", _crash_on_step_two)
+    with pytest.raises(RuntimeError, match="worker died"):
+        execute_episode("tool goal", settings, run_id="tool_crashed")
+    saved = load_checkpointed_state("tool_crashed", settings)
+    assert saved["environment_state"]["observations"]["next_id"] == 2
+
+    restored: list[ObservationStore] = []
+    original_restore = ToolCallingEnvironment.restore
+
+    def _record_restore(self, snapshot):
+        original_restore(self, snapshot)
+        restored.append(self.observations)
+
+    monkeypatch.setattr(ToolCallingEnvironment, "step", original_step)
+    monkeypatch.setattr(ToolCallingEnvironment, "restore", _record_restore)
+    resume_episode("tool_crashed", settings)
+
+    # The handle the checkpointed step handed out still resolves, and new handles do not reuse it.
+    store = restored[0]
+    assert store.get("obs-1")["call"] == 1
+    assert store.read("obs-1", field="results", offset=10)["content"][0] == {"title": "hit 10"}
+    assert store.put({"ok": True}) == "obs-2"
+    artifact = json.loads((tmp_path / "runs" / "episode_tool_crashed.json").read_text(encoding="utf-8"))
+    assert "environment_state" not in artifact["final_state"]
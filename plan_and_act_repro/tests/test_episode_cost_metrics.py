@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import orjson
+import pytest
+
+from plan_and_act.agents.planner import PlannerAgent
+from plan_and_act.core.types import ModelConfig, ModelPrice
+from plan_and_act.eval.batch import summarize_batch
+from plan_and_act.eval.episode import execute_episode, load_episode_settings
+from plan_and_act.eval.metrics import UsageMeter, compute_episode_metrics, price_for
+from plan_and_act.prompts.templates import PromptTemplates
+
+PRICING = {
+    "gpt-4": ModelPrice(prompt_per_1m=30.0, completion_per_1m=60.0),
+    "gpt-4o-mini": ModelPrice(prompt_per_1m=0.15, completion_per_1m=0.6),
+}
+
+
+def _usage(prompt: int, completion: int) -> dict[str, int]:
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+def test_breakdown_per_component_with_pricing() -> None:
+    meter = UsageMeter()
+    meter.record("planner", latency_ms=900.0, usage=_usage(1000, 200), model="gpt-4")
+    for latency in (100.0, 200.0, 300.0):
+        meter.record("executor", latency_ms=latency, usage=_usage(2000, 100), model="gpt-4o-mini-2024-07-18")
+    # Served from the response cache: a call, but nothing billed.
+    meter.record("executor", latency_ms=1.0, usage=_usage(2000, 100), model="gpt-4o-mini", cache_hit=True)
+    meter.record("tool", latency_ms=40.0, ok=False)
+
+    metrics = compute_episode_metrics({"step_count": 3, "success": True}, meter, PRICING)
+    planner, executor, tool = (metrics["components"][name] for name in ("planner", "executor", "tool"))
+
+    assert planner["cost_usd"] == pytest.approx((1000 * 30 + 200 * 60) / 1e6)
+    assert (executor["calls"], executor["cache_hits"], executor["total_tokens"]) == (4, 1, 6300)
+    assert executor["cost_usd"] == pytest.approx(3 * (2000 * 0.15 + 100 * 0.6) / 1e6)
+    assert executor["latency_total_ms"] == 601.0
+    assert executor["latency_p95_ms"] == pytest.approx(285.0)
+    assert (tool["calls"], tool["errors"], tool["cost_usd"]) == (1, 1, 0.0)
+    assert metrics["components"]["replanner"]["calls"] == 0
+    assert metrics["total_tokens"] == 1200 + 6300
+    assert metrics["token_cost_usd"] == pytest.approx(planner["cost_usd"] + executor["cost_usd"])
+    assert price_for("qwen2.5-7b", PRICING) is None
+    assert "components" not in compute_episode_metrics({})
+
+
+def test_agent_llm_calls_are_metered_without_tracing(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    meter = UsageMeter()
+    planner = PlannerAgent(ModelConfig(model="gpt-4"), PromptTemplates(config_dir="configs/prompts"), meter=meter)
+
+    def create(**kwargs: Any) -> Any:
+        message = SimpleNamespace(content='{"goal": "g", "steps": [{"step_id": 1, "intent": "look"}]}')
+        usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30, total_tokens=150)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(planner.llm, "_build_client", lambda: client)
+    planner.plan(goal="g", observation="o", action_history=[], use_cot=False, step=0)
+
+    row = meter.breakdown(PRICING)["planner"]
+    assert (row["calls"], row["errors"], row["prompt_tokens"], row["completion_tokens"]) == (1, 0, 120, 30)
+    assert row["cost_usd"] == pytest.approx((120 * 30 + 30 * 60) / 1e6)
+
+
+def test_breakdown_lands_in_artifact_trace_summary_and_batch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    settings = load_episode_settings(
+        base_config="configs/base.yaml",
+        model_config="configs/models.yaml",
+        trace_config="configs/tracing.yaml",
+        llm_config="configs/llm.yaml",
+        environment="simulator",
+        trace=True,
+    )
+    settings = settings.model_copy(
+        update={
+            "runtime": settings.runtime.model_copy(update={"artifact_dir": str(tmp_path / "runs")}),
+            "trace": settings.trace.model_copy(update={"base_dir": str(tmp_path / "traces")}),
+        }
+    )
+    assert settings.llm.pricing["gpt-4o-mini"].completion_per_1m == 0.6
+
+    outcome = execute_episode("find the answer", settings, run_id="r1")
+
+    artifact = orjson.loads((tmp_path / "runs" / "episode_r1.json").read_bytes())
+    session = orjson.loads((tmp_path / "traces" / "r1" / "session.json").read_bytes())
+    for metrics in (outcome["metrics"], artifact["metrics"], session["summary"]["metrics"]):
+        assert set(metrics["components"]) == {"planner", "executor", "replanner", "tool"}
+        assert metrics["token_cost_usd"] == 0.0
+    rows = [{"ok": True, "success": True, "latency_s": 1.0, "metrics": {"token_cost_usd": cost}} for cost in (0.5, 0.25)]
+    assert summarize_batch(rows, 2.0)["token_cost_per_episode"] == 0.375
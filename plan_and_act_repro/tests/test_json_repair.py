@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from tenacity import stop_after_attempt
+
+from plan_and_act.core.schemas import ExecutorAction, PlannerOutput
+from plan_and_act.core.types import JSONRepairConfig
+from plan_and_act.utils.json_repair import JSONRepairer, coerce_to_schema, configure_json_repairer, repair_json
+from plan_and_act.utils.llm import LLMClient
+
+
+class _ScriptedCompletions:
+    def __init__(self, *contents: str) -> None:
+        self.contents = list(contents)
+        self.requests: list[dict[str, Any]] = []
+
+    def create(self, **kwargs: Any) -> Any:
+        self.requests.append(kwargs)
+        message = SimpleNamespace(content=self.contents[min(len(self.requests), len(self.contents)) - 1])
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+@pytest.fixture
+def repairer() -> Iterator[JSONRepairer]:
+    yield configure_json_repairer(JSONRepairConfig())
+    configure_json_repairer(JSONRepairConfig())
+
+
+def _client(monkeypatch: pytest.MonkeyPatch, completions: _ScriptedCompletions, traces: list[dict[str, Any]]) -> LLMClient:
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    llm = LLMClient(trace_hook=traces.append)
+    monkeypatch.setattr(llm, "_build_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    return llm
+
+
+def test_scanner_repairs_prose_commas_control_chars_and_truncation() -> None:
+    fenced = repair_json('Sure! Here it is:\n```json\n{"a": [1, 2,], "b": "x\ny",}\n```')
+    assert fenced.value == {"a": [1, 2], "b": "x\ny"}
+    assert fenced.repairs == ["extracted", "trailing_comma", "control_char"]
+
+    truncated = repair_json('{"goal": "g", "steps": [{"step_id": 1, "intent": "sear')
+    assert truncated.value == {"goal": "g", "steps": [{"step_id": 1, "intent": "sear"}]}
+    # A dangling key or partial literal is cut back to the last complete member.
+    assert repair_json('{"a": 1, "b": tr').value == {"a": 1}
+    assert repair_json('{"a": 1, "b"').value == {"a": 1}
+    assert repair_json("no json at all").value is None
+
+    repairs: list[str] = []
+    action = coerce_to_schema(
+        {"action": {"action_type": "Search ", "target": 5, "arguments": '{"q": "x"}', "is_final": "no"}}, ExecutorAction, repairs
+    )
+    assert action["action_type"] == "search" and action["target"] == "5" and action["arguments"] == {"q": "x"}
+    assert repairs == ["unwrapped", "coerced"]
+    plan = coerce_to_schema({"goal": "g", "steps": ["search it", {"intent": "exit"}]}, PlannerOutput)
+    assert [(step["step_id"], step["intent"]) for step in plan["steps"]] == [(1, "search it"), (2, "exit")]
+
+
+def test_truncated_completion_is_repaired_without_a_second_request(monkeypatch: pytest.MonkeyPatch, repairer: JSONRepairer) -> None:
+    completions = _ScriptedCompletions(
+        '{"goal": "g", "steps": [{"step_id": 1, "intent": "search"}, {"step_id": 2, "inte',
+        '{"goal": "g", "steps": [{"step_id": 1, "intent": "search"}]}',
+    )
+    traces: list[dict[str, Any]] = []
+    llm = _client(monkeypatch, completions, traces)
+
+    out = llm.chat_json(model="gpt-4", system_prompt="s", user_prompt="u", temperature=0.0, schema=PlannerOutput)
+
+    assert [step.intent for step in PlannerOutput.model_validate(out).steps] == ["search"]
+    assert len(completions.requests) == 1
+    assert traces[0]["json_repair"]["status"] == "repaired_local"
+    assert traces[0]["json_repair"]["repairs"] == ["truncated", "dropped_partial_item", "coerced"]
+    llm.chat_json(model="gpt-4", system_prompt="s", user_prompt="v", temperature=0.0, schema=PlannerOutput)
+    assert repairer.stats() == {
+        "calls": 2,
+        "needed_repair": 1,
+        "repaired_local": 1,
+        "repaired_follow_up": 0,
+        "failed": 0,
+        "saved_fraction": 1.0,
+    }
+
+
+def test_follow_up_sends_only_the_broken_output(monkeypatch: pytest.MonkeyPatch, repairer: JSONRepairer) -> None:
+    broken = "I would search for the repository and then click the first result."
+    completions = _ScriptedCompletions(broken, '{"action_type": "search", "target": "repo"}')
+    traces: list[dict[str, Any]] = []
+    llm = _client(monkeypatch, completions, traces)
+
+    out = llm.chat_json(model="gpt-4", system_prompt="s", user_prompt="u", temperature=0.7, schema=ExecutorAction)
+
+    assert out == {"action_type": "search", "target": "repo"}
+    fix_request = completions.requests[1]
+    assert fix_request["messages"][1]["content"] == broken and fix_request["temperature"] == 0.0
+    assert '"action_type"' in fix_request["messages"][0]["content"]
+    block = traces[0]["json_repair"]
+    assert block["status"] == "repaired_follow_up" and block["follow_up_usage"]["total_tokens"] == 15
+    # Both requests are billed to the call.
+    assert traces[0]["usage"]["total_tokens"] == 30
+    assert repairer.stats()["repaired_follow_up"] == 1
+
+    # With follow-ups off the call fails and is left to the full retry.
+    configure_json_repairer(JSONRepairConfig(follow_up=False))
+    completions.contents = [broken]
+    once = LLMClient.chat_json.retry_with(stop=stop_after_attempt(1), reraise=True)
+    with pytest.raises(ValueError):
+        once(llm, model="gpt-4", system_prompt="s", user_prompt="w", temperature=0.7, schema=ExecutorAction)
+    assert len(completions.requests) == 3
+    assert traces[-1]["json_repair"]["status"] == "failed" and traces[-1]["status"] == "parse_error"
+
+    # With repair off the call is not counted at all.
+    disabled = configure_json_repairer(JSONRepairConfig(enabled=False))
+    with pytest.raises(ValueError):
+        once(llm, model="gpt-4", system_prompt="s", user_prompt="x", temperature=0.7, schema=ExecutorAction)
+    assert disabled.stats()["calls"] == 0 and traces[-1]["json_repair"]["status"] == ""
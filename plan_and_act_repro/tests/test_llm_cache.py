@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from plan_and_act.core.types import LLMCacheConfig
+from plan_and_act.utils.llm import LLMClient
+from plan_and_act.utils.llm_cache import LLMResponseCache
+
+
+class _FakeCompletions:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def create(self, **kwargs: Any) -> Any:
+        self.calls += 1
+        message = SimpleNamespace(content='{"answer": 42}')
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=4, total_tokens=14)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+def _client_with_cache(
+    monkeypatch: pytest.MonkeyPatch,
+    cache: LLMResponseCache,
+    traces: list[dict[str, Any]],
+) -> tuple[LLMClient, _FakeCompletions]:
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    completions = _FakeCompletions()
+    llm = LLMClient(trace_hook=traces.append, cache=cache)
+    monkeypatch.setattr(llm, "_build_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    return llm, completions
+
+
+def _call(llm: LLMClient, user_prompt: str = "u", temperature: float = 0.0) -> dict[str, Any]:
+    return llm.chat_json(model="gpt-4", system_prompt="s", user_prompt=user_prompt, temperature=temperature)
+
+
+def test_cache_hit_skips_request_and_reports_metadata(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    cache = LLMResponseCache(LLMCacheConfig(enabled=True, path=str(tmp_path / "cache.sqlite")))
+    traces: list[dict[str, Any]] = []
+    llm, completions = _client_with_cache(monkeypatch, cache, traces)
+
+    assert _call(llm) == {"answer": 42}
+    assert _call(llm) == {"answer": 42}
+
+    assert completions.calls == 1
+    assert traces[0]["cache"]["hit"] is False
+    assert traces[1]["cache"]["hit"] is True
+    assert traces[1]["cache"]["hits"] == 1
+    assert traces[1]["cache"]["misses"] == 1
+    assert traces[1]["cache"]["bytes_saved"] > 0
+    assert traces[1]["usage"]["total_tokens"] == 14
+
+
+def test_cache_modes_and_nonzero_temperature(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite")
+    traces: list[dict[str, Any]] = []
+
+    read_only = LLMResponseCache(LLMCacheConfig(enabled=True, path=path, mode="read_only"))
+    llm, completions = _client_with_cache(monkeypatch, read_only, traces)
+    _call(llm)
+    _call(llm)
+    assert completions.calls == 2
+
+    read_write = LLMResponseCache(LLMCacheConfig(enabled=True, path=path))
+    llm, completions = _client_with_cache(monkeypatch, read_write, traces)
+    _call(llm, temperature=0.7)
+    _call(llm, temperature=0.7)
+    assert completions.calls == 2
+
+    _call(llm)
+    bypass = LLMResponseCache(LLMCacheConfig(enabled=True, path=path, mode="bypass"))
+    llm, completions = _client_with_cache(monkeypatch, bypass, traces)
+    _call(llm)
+    assert completions.calls == 1
+    assert traces[-1]["cache"]["mode"] == "bypass"
+
+
+def test_cache_evicts_least_recently_used_and_expires(tmp_path: Path) -> None:
+    cache = LLMResponseCache(LLMCacheConfig(enabled=True, path=str(tmp_path / "c.sqlite"), max_entries=2))
+    for key in ("a", "b"):
+        cache.put(key, model="m", raw_content="{}", usage={}, used_response_format=True)
+        time.sleep(0.01)
+    assert cache.get("a") is not None
+    cache.put("c", model="m", raw_content="{}", usage={}, used_response_format=True)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+    sized = LLMResponseCache(LLMCacheConfig(enabled=True, path=str(tmp_path / "s.sqlite"), max_entries=0, max_bytes=100))
+    for index in range(10):
+        sized.put(str(index), model="m", raw_content="x" * 30, usage={}, used_response_format=True)
+        time.sleep(0.002)
+    # Rewriting a key replaces its size in the running totals.
+    sized.put("9", model="m", raw_content="x" * 10, usage={}, used_response_format=True)
+    totals = sized._conn.execute("SELECT entries, size_bytes FROM cache_totals").fetchone()
+    assert totals == sized._conn.execute("SELECT COUNT(*), SUM(size_bytes) FROM responses").fetchone() == (3, 70)
+    assert sized.get("9") is not None and sized.get("6") is None
+
+    expiring = LLMResponseCache(LLMCacheConfig(enabled=True, path=str(tmp_path / "t.sqlite"), ttl_s=0.01))
+    expiring.put("k", model="m", raw_content="{}", usage={}, used_response_format=True)
+    time.sleep(0.03)
+    assert expiring.get("k") is None
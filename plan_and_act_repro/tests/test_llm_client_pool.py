@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from plan_and_act.core.types import ClientPoolConfig
+from plan_and_act.utils.llm import ClientRegistry, LLMClient
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length", "0"))
+        self.rfile.read(length)
+        body = json.dumps(
+            {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "stub",
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": "{\"ok\": true}"},
+                    }
+                ],
+                "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5},
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+@pytest.fixture
+def chat_server(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_BASE_URL", base_url)
+    yield base_url
+    server.shutdown()
+
+
+def test_registry_shares_one_client_across_llm_clients(chat_server: str) -> None:
+    registry = ClientRegistry(ClientPoolConfig(http2=False))
+    planner_llm = LLMClient(registry=registry)
+    executor_llm = LLMClient(registry=registry)
+
+    for llm in (planner_llm, executor_llm, planner_llm):
+        out = llm.chat_json(model="stub", system_prompt="s", user_prompt="u", temperature=0.0)
+        assert out == {"ok": True}
+
+    stats = registry.stats()
+    assert stats["clients_created"] == 1
+    assert stats["client_reuses"] == 2
+    assert stats["requests"] == 3
+    assert stats["connections_opened"] == 1
+    assert stats["connection_reuses"] == 2
+    registry.close()
+
+
+def test_model_concurrency_limit_records_wait_time() -> None:
+    registry = ClientRegistry(ClientPoolConfig(model_concurrency={"gpt-4": 1}))
+    release = threading.Event()
+    acquired = threading.Event()
+
+    def _hold_slot() -> None:
+        with registry.model_slot("gpt-4"):
+            acquired.set()
+            release.wait(timeout=5)
+
+    holder = threading.Thread(target=_hold_slot)
+    holder.start()
+    acquired.wait(timeout=5)
+    threading.Timer(0.05, release.set).start()
+
+    with registry.model_slot("gpt-4") as wait_ms:
+        assert wait_ms >= 40
+    holder.join()
+
+    with registry.model_slot("unlimited-model") as wait_ms:
+        assert wait_ms == 0.0
+
+    stats = registry.stats()
+    assert stats["slot_waits"] == 2
+    assert stats["slot_wait_ms_max"] >= 40
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+import openai
+import pytest
+from tenacity import stop_after_attempt
+
+from plan_and_act.core.types import CallDeadlineConfig, ModelRateLimit, RateLimitConfig
+from plan_and_act.eval.metrics import UsageMeter
+from plan_and_act.utils.deadlines import CallDeadlines, LLMDeadlineExceeded
+from plan_and_act.utils.llm import AsyncLLMClient, LLMClient
+from plan_and_act.utils.rate_limit import RateLimiter
+
+
+def _response(content: str) -> Any:
+    usage = SimpleNamespace(prompt_tokens=10, completion_tokens=4, total_tokens=14)
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+
+class _SlowThenFast:
+    """Answers the n-th request after delays[n]; later requests use the last delay."""
+
+    def __init__(self, *delays: float) -> None:
+        self.delays = delays
+        self.calls = 0
+        self.cancelled = 0
+        self.timeouts: list[float | None] = []
+        # A rate-limited client asks for the raw response; plain responses read the same.
+        self.with_raw_response = self
+
+    def _next(self) -> tuple[int, float]:
+        index = self.calls
+        self.calls += 1
+        return index, self.delays[min(index, len(self.delays) - 1)]
+
+    def create(self, **kwargs: Any) -> Any:
+        index, delay = self._next()
+        self.timeouts.append(kwargs.get("timeout"))
+        # Like the SDK, give up once the request timeout has passed.
+        timeout = kwargs.get("timeout")
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise openai.APITimeoutError(request=httpx.Request("POST", "https://api.test/chat/completions"))
+        time.sleep(delay)
+        return _response(f'{{"request": {index}}}')
+
+
+class _AsyncSlowThenFast(_SlowThenFast):
+    async def create(self, **kwargs: Any) -> Any:
+        index, delay = self._next()
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return _response(f'{{"request": {index}}}')
+
+
+def _client(monkeypatch: pytest.MonkeyPatch, cls: type, completions: _SlowThenFast, deadlines: CallDeadlines, **kwargs: Any) -> Any:
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    llm = cls(deadlines=deadlines, **kwargs)
+    monkeypatch.setattr(llm, "_build_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    return llm
+
+
+def _kwargs(component: str = "executor") -> dict[str, Any]:
+    return {"model": "gpt-4", "system_prompt": "s", "user_prompt": "u", "temperature": 0.0, "trace_context": {"component": component}}
+
+
+def test_hedge_after_observed_p90_wins_and_bills_the_abandoned_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    deadlines = CallDeadlines(CallDeadlineConfig(hedge=True, hedge_min_samples=3))
+    for latency_ms in (10, 20, 30):
+        assert deadlines.hedge_delay_s("gpt-4", "executor") is None
+        deadlines.observe("gpt-4", "executor", latency_ms)
+    assert deadlines.hedge_delay_s("gpt-4", "executor") == pytest.approx(0.028)
+
+    traces: list[dict[str, Any]] = []
+    meter = UsageMeter()
+    completions = _SlowThenFast(0.5, 0.01)
+    llm = _client(monkeypatch, LLMClient, completions, deadlines, trace_hook=traces.append, usage_hook=meter.record_llm_call)
+    start = time.perf_counter()
+    out = llm.chat_json(**_kwargs())
+
+    assert out == {"request": 1}
+    assert time.perf_counter() - start < 0.3
+    block = traces[0]["deadline"]
+    assert block["hedged"] is True and block["winner"] == "hedge" and block["loser"] == "abandoned"
+    assert block["extra_usage_estimated"] is True and block["extra_usage"]["prompt_tokens"] > 0
+    # The meter bills the winner's usage plus the estimated prompt of the dropped request.
+    assert meter.breakdown()["executor"]["prompt_tokens"] == 10 + block["extra_usage"]["prompt_tokens"]
+    assert deadlines.stats()["hedge_wins"] == 1 and deadlines.stats()["losers_abandoned"] == 1
+
+
+def test_sync_deadline_raises_and_records_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    deadlines = CallDeadlines(CallDeadlineConfig(deadlines_s={"executor": 0.1, "planner": 30}))
+    traces: list[dict[str, Any]] = []
+    llm = _client(monkeypatch, LLMClient, _SlowThenFast(0.4), deadlines, trace_hook=traces.append)
+    once = LLMClient.chat_json.retry_with(stop=stop_after_attempt(1), reraise=True)
+
+    start = time.perf_counter()
+    with pytest.raises(LLMDeadlineExceeded):
+        once(llm, **_kwargs())
+    assert time.perf_counter() - start < 0.3
+
+    assert traces[0]["status"] == "timeout"
+    assert traces[0]["deadline"]["timed_out"] is True and traces[0]["deadline"]["deadline_s"] == 0.1
+    assert deadlines.deadline_s("planner") == 30 and deadlines.deadline_s("judge") is None
+    assert deadlines.stats()["timeouts"] == 1
+    # Without a hedge the request runs on the caller's thread; the pool is never started.
+    assert deadlines._pool is None
+
+
+def test_async_hedge_cancels_the_loser_and_deadline_cancels_everything(monkeypatch: pytest.MonkeyPatch) -> None:
+    deadlines = CallDeadlines(CallDeadlineConfig(deadlines_s={"executor": 0.2}, hedge=True, hedge_min_samples=1))
+    deadlines.observe("gpt-4", "executor", 30)
+    traces: list[dict[str, Any]] = []
+    completions = _AsyncSlowThenFast(1.0, 0.01)
+    llm = _client(monkeypatch, AsyncLLMClient, completions, deadlines, trace_hook=traces.append)
+
+    assert asyncio.run(llm.chat_json(**_kwargs())) == {"request": 1}
+    assert completions.cancelled == 1
+    assert traces[0]["deadline"]["loser"] == "cancelled" and traces[0]["deadline"]["winner"] == "hedge"
+
+    # Both the request and its hedge outlive the deadline: both are cancelled.
+    completions.delays = (1.0,)
+    once = AsyncLLMClient.chat_json.retry_with(stop=stop_after_attempt(1), reraise=True)
+    with pytest.raises(LLMDeadlineExceeded):
+        asyncio.run(once(llm, **_kwargs()))
+    assert completions.cancelled == 3
+    assert traces[1]["status"] == "timeout" and traces[1]["deadline"]["hedged"] is True
+    assert deadlines.stats()["losers_cancelled"] == 3
+
+
+def test_json_fix_follow_up_is_not_a_latency_sample_or_a_second_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _ProseThenJSON(_SlowThenFast):
+        def create(self, **kwargs: Any) -> Any:
+            super().create(**kwargs)
+            content = "I would search for it." if self.calls == 1 else '{"action": "search"}'
+            return _response(content)
+
+    deadlines = CallDeadlines(CallDeadlineConfig(deadlines_s={"executor": 5}))
+    completions = _ProseThenJSON(0.0)
+    llm = _client(monkeypatch, LLMClient, completions, deadlines)
+
+    assert llm.chat_json(**_kwargs()) == {"action": "search"}
+    assert completions.calls == 2
+    assert len(deadlines._latencies[("gpt-4", "executor")]) == 1
+    assert deadlines.stats()["requests"] == 1
+
+
+def test_rate_limit_wait_counts_against_the_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    # 60000 tokens/min refills 1000 tokens/s; once drained, 200 tokens take ~0.2 s.
+    limiter = RateLimiter(RateLimitConfig(enabled=True, models={"gpt-4": ModelRateLimit(tpm=60000)}, completion_tokens_estimate=190))
+    limiter.acquire("gpt-4", 60000, priority=0)
+    deadlines = CallDeadlines(CallDeadlineConfig(deadlines_s={"executor": 0.5, "planner": 0.1}))
+    completions = _SlowThenFast(0.0)
+    llm = _client(monkeypatch, LLMClient, completions, deadlines, limiter=limiter)
+    once = LLMClient.chat_json.retry_with(stop=stop_after_attempt(1), reraise=True)
+
+    # The queue wait alone outlasts the planner's deadline: it fails at once and nothing is sent.
+    start = time.perf_counter()
+    with pytest.raises(LLMDeadlineExceeded):
+        once(llm, **_kwargs("planner"))
+    assert time.perf_counter() - start < 0.05 and completions.calls == 0
+
+    # The executor waits in the queue; the request only gets what is left of its deadline.
+    assert once(llm, **_kwargs()) == {"request": 0}
+    assert 0.0 < completions.timeouts[0] < 0.4
+    assert deadlines.stats()["timeouts"] == 1
+
+
+def test_transient_errors_are_resent_within_the_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _FailsOnce(_SlowThenFast):
+        def create(self, **kwargs: Any) -> Any:
+            if self.calls == 0:
+                self.calls += 1
+                request = httpx.Request("POST", "https://api.test/chat/completions")
+                raise openai.InternalServerError("overloaded", response=httpx.Response(500, request=request), body=None)
+            return super().create(**kwargs)
+
+    deadlines = CallDeadlines(CallDeadlineConfig(deadlines_s={"executor": 5, "planner": 0.2}))
+    completions = _FailsOnce(0.0)
+    llm = _client(monkeypatch, LLMClient, completions, deadlines)
+    once = LLMClient.chat_json.retry_with(stop=stop_after_attempt(1), reraise=True)
+
+    # The SDK does not retry under a deadline; the client re-sends after its backoff.
+    assert llm._max_retries == 0
+    assert once(llm, **_kwargs()) == {"request": 1}
+    # A backoff that would outlast the deadline is not taken.
+    completions.calls = 0
+    with pytest.raises(openai.InternalServerError):
+        once(llm, **_kwargs("planner"))
+    assert completions.calls == 1
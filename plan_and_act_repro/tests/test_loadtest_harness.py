@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+
+from plan_and_act.core.types import (
+    ClientPoolConfig,
+    LoadStageConfig,
+    LoadTestConfig,
+    ModelConfig,
+    RuntimeConfig,
+    StubLatencyConfig,
+    StubServerConfig,
+)
+from plan_and_act.eval.episode import EpisodeSettings
+from plan_and_act.loadtest.harness import LoadTestHarness, find_knee, format_report
+from plan_and_act.loadtest.stub_server import StubLLMServer
+from plan_and_act.tracing import TraceConfig
+from plan_and_act.utils.llm import configure_client_registry
+
+
+def _settings() -> EpisodeSettings:
+    model = ModelConfig(provider="openai", model="gpt-4")
+    return EpisodeSettings(
+        runtime=RuntimeConfig(max_steps=8, save_artifacts=False),
+        models={"planner": model, "executor": model, "replanner": model},
+        trace=TraceConfig(enabled=False),
+    )
+
+
+@pytest.fixture
+def stub(monkeypatch: pytest.MonkeyPatch, request: pytest.FixtureRequest) -> Iterator[StubLLMServer]:
+    config = StubServerConfig(port=0, latency=StubLatencyConfig(distribution="fixed", median_ms=2), **getattr(request, "param", {}))
+    with StubLLMServer(config) as server:
+        monkeypatch.setenv("OPENAI_API_KEY", "stub")
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        configure_client_registry(ClientPoolConfig(http2=False))
+        yield server
+    configure_client_registry(ClientPoolConfig())
+
+
+def test_stages_report_throughput_latency_and_rss(stub: StubLLMServer) -> None:
+    config = LoadTestConfig(
+        stages=[LoadStageConfig(concurrency=1, duration_s=0.3), LoadStageConfig(concurrency=3, duration_s=0.3)],
+        goals=["goal a", "goal b"],
+    )
+
+    report = LoadTestHarness(_settings(), config).run()
+
+    assert [stage["concurrency"] for stage in report["stages"]] == [1, 3]
+    for stage in report["stages"]:
+        assert stage["episodes_completed"] == stage["episodes_started"] > 0
+        assert stage["episodes_per_s"] > 0 and stage["success_rate"] == 1.0 and stage["error_rate"] == 0.0
+        assert set(stage["node_latency_ms"]) == {"planner", "executor", "replanner"}
+        assert stage["node_latency_ms"]["executor"]["p95"] >= stage["node_latency_ms"]["executor"]["p50"] > 0
+        assert stage["llm"]["calls"] == stage["llm"]["http_requests"] and stage["llm"]["retries"] == 0
+        assert stage["peak_rss_mb"] > 0
+    assert stub.stats()["requests"] == sum(stage["llm"]["http_requests"] for stage in report["stages"])
+    assert format_report(report)[0].split()[:3] == ["stage", "conc", "ep/s"]
+
+
+@pytest.mark.parametrize("stub", [{"rate_limit_rate": 0.2, "retry_after_s": 0.001, "seed": 3}], indirect=True)
+def test_arrival_rate_paces_starts_and_retries_are_counted(stub: StubLLMServer) -> None:
+    config = LoadTestConfig(stages=[LoadStageConfig(concurrency=4, duration_s=0.5, arrival_rate=10)])
+
+    stage = LoadTestHarness(_settings(), config).run()["stages"][0]
+
+    # 10 episodes/s over 0.5 s: starts at 0, 0.1, ..., 0.4 however many workers are idle.
+    assert stage["episodes_started"] == 5
+    assert stage["llm"]["retries"] == stub.stats()["rate_limited"] > 0
+    assert stage["llm"]["retry_rate"] > 0
+
+
+def test_knee_is_the_first_stage_without_meaningful_gain() -> None:
+    stages = [
+        {"stage": i, "concurrency": c, "episodes_per_s": eps}
+        for i, (c, eps) in enumerate([(1, 2.0), (2, 3.9), (4, 7.5), (8, 8.0), (16, 7.0)])
+    ]
+    assert find_knee(stages, 0.1) == {"stage": 3, "concurrency": 8, "best_episodes_per_s": 7.5}
+    assert find_knee(stages[:3], 0.1) is None
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+from plan_and_act.core.schemas import ExecutorAction
+from plan_and_act.core.types import ObservationConfig
+from plan_and_act.environments.observations import ObservationStore
+from plan_and_act.environments.tooling import ToolCallingEnvironment
+from plan_and_act.tools.base import ToolRegistry
+from plan_and_act.tracing import TraceCollector, TraceConfig
+
+PAGE_TEXT = "".join(f"sentence {i}. " for i in range(1000))
+COMPACT = ObservationConfig(enabled=True)
+
+
+class FakeFetchTool:
+    name = "fetch_url"
+
+    def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "ok": True,
+            "url": arguments["url"],
+            "title": "Report",
+            "content_preview": PAGE_TEXT[:8000],
+            "content_length": len(PAGE_TEXT),
+            "links": [{"href": f"/page/{i}", "text": f"link {i}"} for i in range(40)],
+        }
+
+
+def _call(env: ToolCallingEnvironment, tool: str, arguments: dict[str, Any], step: int = 1) -> str:
+    action = ExecutorAction(action_type="click", target=f"tool:{tool}", arguments=arguments)
+    return env.step(action=action, step_count=step).observation
+
+
+def test_large_results_are_compacted_and_readable_on_demand(tmp_path: Path) -> None:
+    tracer = TraceCollector(config=TraceConfig(enabled=True, base_dir=str(tmp_path)), run_id="r")
+    tracer.start_session(goal="g", environment={}, model_stack={}, runtime_config={})
+    env = ToolCallingEnvironment(ToolRegistry({"fetch_url": FakeFetchTool()}), tracer=tracer, observations=COMPACT)
+    assert "read_observation" in env.reset(goal="g")
+
+    observation = _call(env, "fetch_url", {"url": "https://example.com"})
+    assert observation.startswith("Step 1: Tool[fetch_url] returned [obs-1]: ")
+    assert len(observation) < 1500
+    assert '"title": "Report"' in observation and "(+7700 chars)" in observation and "(+35 more items)" in observation
+    assert 'call tool:read_observation with {"handle": "obs-1"' in observation
+
+    page = _call(env, "read_observation", {"handle": "obs-1", "field": "content_preview", "offset": 300}, step=2)
+    body = json.loads(page.split("returned: ", 1)[1])
+    assert body["content"] == PAGE_TEXT[300:2300] and body["next_offset"] == 2300 and body["total"] == 8000
+
+    links = json.loads(_call(env, "read_observation", {"handle": "obs-1", "field": "links", "offset": 35}, step=3).split("returned: ", 1)[1])
+    assert [item["href"] for item in links["content"]] == [f"/page/{i}" for i in range(35, 40)]
+    assert links["next_offset"] is None
+
+    # The trace keeps the full result next to its handle.
+    tracer.close(status="completed")
+    end = next(e for e in tracer.reader().events() if e["event_type"] == "tool_call_end")
+    assert end["payload"]["observation_handle"] == "obs-1"
+    assert end["payload"]["result"]["content_preview"] == PAGE_TEXT[:8000]
+
+
+def test_async_path_and_disabled_compaction() -> None:
+    env = ToolCallingEnvironment(ToolRegistry({"fetch_url": FakeFetchTool()}), observations=COMPACT)
+    action = ExecutorAction(action_type="click", target="tool:read_observation", arguments={"handle": "obs-9"})
+    result = asyncio.run(env.astep(action=action, step_count=1))
+    assert "Unknown or evicted observation handle 'obs-9'" in result.observation
+
+    legacy = ToolCallingEnvironment(ToolRegistry({"fetch_url": FakeFetchTool()}))
+    assert "read_observation" not in legacy.reset(goal="g")
+    assert PAGE_TEXT[:8000] in _call(legacy, "fetch_url", {"url": "https://example.com"})
+
+
+def test_store_evicts_oldest_and_reports_bad_fields() -> None:
+    store = ObservationStore(ObservationConfig(max_entries=2))
+    handles = [store.put({"ok": True, "n": i}) for i in range(3)]
+
+    assert handles == ["obs-1", "obs-2", "obs-3"]
+    assert store.get("obs-1") is None and store.get("obs-3") == {"ok": True, "n": 2}
+    assert store.read("obs-3", field="missing")["ok"] is False
+    assert store.read("obs-3")["content"] == '{"ok": true, "n": 2}'
+
+
+def test_paging_a_list_longer_than_the_compaction_limit_loses_no_items() -> None:
+    env = ToolCallingEnvironment(ToolRegistry({"fetch_url": FakeFetchTool()}), observations=COMPACT.model_copy(update={"page_items": 10}))
+    _call(env, "fetch_url", {"url": "https://example.com"})
+
+    hrefs: list[str] = []
+    offset: int | None = 0
+    step = 2
+    while offset is not None:
+        # An oversized limit is held to the page size.
+        arguments = {"handle": "obs-1", "field": "links", "offset": offset, "limit": 100}
+        page = json.loads(_call(env, "read_observation", arguments, step=step).split("returned: ", 1)[1])
+        assert len(page["content"]) <= 10
+        hrefs.extend(item["href"] for item in page["content"])
+        offset = page["next_offset"]
+        step += 1
+    assert hrefs == [f"/page/{i}" for i in range(40)]
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from plan_and_act.agents.plan_library import PlanLibrary, extract_slots
+from plan_and_act.agents.planner import PlannerAgent
+from plan_and_act.core.schemas import PlannerOutput, PlanStep
+from plan_and_act.core.types import ModelConfig, PlanLibraryConfig
+from plan_and_act.prompts.templates import PromptTemplates
+from plan_and_act.tracing import TraceCollector, TraceConfig
+
+GOAL = "Find the top contributor of openai/openai-python on GitHub"
+
+
+def _plan(goal: str = GOAL) -> PlannerOutput:
+    return PlannerOutput(
+        goal=goal,
+        steps=[
+            PlanStep(step_id=1, intent="Open the repository page of openai/openai-python", success_criteria="openai-python page is shown"),
+            PlanStep(step_id=2, intent="Open the contributors graph of openai", success_criteria=""),
+            PlanStep(step_id=3, intent="exit with the top contributor"),
+        ],
+    )
+
+
+def _library(tmp_path: Path, **overrides: object) -> PlanLibrary:
+    return PlanLibrary(PlanLibraryConfig(enabled=True, path=str(tmp_path / "plans.sqlite"), **overrides))
+
+
+def test_similar_goal_reuses_plan_with_its_own_entities(tmp_path: Path) -> None:
+    assert extract_slots(GOAL) == ("find the top contributor of <<0>> on <<1>>", ["openai/openai-python", "GitHub"])
+    library = _library(tmp_path)
+    library.add(GOAL, _plan(), run_id="run-1")
+
+    match = library.lookup("find the top contributor of pallets/flask on GitHub.")
+    assert match is not None and match.similarity == 1.0
+    assert [step.intent for step in match.plan.steps] == [
+        "Open the repository page of pallets/flask",
+        "Open the contributors graph of pallets",
+        "exit with the top contributor",
+    ]
+    assert match.plan.steps[0].success_criteria == "flask page is shown"
+
+    # Different task or a different number of entities: no reuse.
+    assert library.lookup("Find the oldest open issue of pallets/flask on GitHub") is None
+    assert library.lookup("Find the top contributor of pallets/flask") is None
+    assert library.stats() == {"lookups": 3, "hits": 1, "stores": 1, "entries": 1, "hit_rate": 0.3333}
+
+
+def test_entries_persist_and_failing_plans_are_skipped(tmp_path: Path) -> None:
+    library = _library(tmp_path)
+    entry_id = library.add(GOAL, _plan(), run_id="run-1")
+    library.close()
+
+    reopened = _library(tmp_path)
+    assert len(reopened) == 1
+    assert reopened.lookup("Find the top contributor of psf/requests on GitHub") is not None
+
+    reopened.record_outcome(entry_id, success=False)
+    reopened.record_outcome(entry_id, success=False)
+    assert reopened.lookup("Find the top contributor of psf/requests on GitHub") is None
+    # Storing a fresh successful plan for the template resets its record.
+    assert reopened.add(GOAL, _plan(), run_id="run-2") == entry_id
+    assert reopened.lookup("Find the top contributor of psf/requests on GitHub") is not None
+
+    small = _library(tmp_path / "small", max_entries=2)
+    for owner in ("a", "b", "c"):
+        small.add(f"Summarize the README of {owner}/repo for task kind {owner}x", _plan(), run_id=owner)
+    assert len(small) == 2
+
+
+def test_planner_uses_library_and_records_outcome(tmp_path: Path) -> None:
+    tracer = TraceCollector(config=TraceConfig(enabled=True, base_dir=str(tmp_path / "traces")), run_id="r")
+    tracer.start_session(goal=GOAL, environment={}, model_stack={}, runtime_config={})
+    library = _library(tmp_path)
+    planner = PlannerAgent(
+        ModelConfig(provider="heuristic"),
+        PromptTemplates(config_dir="configs/prompts"),
+        tracer=tracer,
+        plan_library=library,
+    )
+
+    miss = planner.plan(goal="Book a table for two", observation="", action_history=[], use_cot=False)
+    assert planner.last_plan_source == "heuristic" and miss.steps
+    planner.record_outcome(success=True, run_id="r")
+    assert len(library) == 0  # only LLM plans are worth storing
+
+    library.add(GOAL, _plan(), run_id="run-1")
+    hit = planner.plan(goal="Find the top contributor of pallets/flask on GitHub", observation="", action_history=[], use_cot=False)
+    assert planner.last_plan_source == "library"
+    assert hit.steps[0].intent == "Open the repository page of pallets/flask"
+    planner.record_outcome(success=False)
+    planner.record_outcome(success=False)
+    assert library.lookup("Find the top contributor of pallets/flask on GitHub") is None
+
+    tracer.close(status="completed")
+    lookups = [e["payload"] for e in tracer.reader().events() if e["event_type"] == "plan_library_lookup"]
+    assert [p["hit"] for p in lookups] == [False, True]
+    assert lookups[1]["similarity"] == 1.0 and lookups[1]["hit_rate"] == 0.5
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Any
+
+from plan_and_act.agents.replanner import ReplannerAgent
+from plan_and_act.core.types import ContextConfig, ModelConfig
+from plan_and_act.prompts.context import ContextBuilder, encode_action, estimate_tokens, truncate_to_tokens
+from plan_and_act.prompts.templates import PromptTemplates
+
+
+def _action(i: int) -> dict[str, Any]:
+    return {
+        "action_type": ("search", "click", "type")[i % 3],
+        "target": "tool:web_search" if i % 3 == 0 else f"#button-{i % 4}",
+        "arguments": {"query": f"population of city {i} " * 8},
+        "rationale": "long internal reasoning " * 20,
+        "is_final": False,
+        "final_answer": "",
+    }
+
+
+def test_history_stays_within_budget_and_keeps_recent_actions() -> None:
+    builder = ContextBuilder(ContextConfig(enabled=True, recent_actions=4, history_tokens=160))
+    actions = [_action(i) for i in range(200)]
+
+    rendered = builder.history(actions)
+
+    assert estimate_tokens(rendered) <= 160
+    lines = rendered.splitlines()
+    assert lines[0].startswith("steps 1-") and "search x" in lines[0]
+    assert lines[-1].startswith("200. click #button-3 query=population of city 199")
+    assert "reasoning" not in rendered
+    # Deterministic: the same history always renders the same prompt (and LLM cache key).
+    assert builder.history(list(actions)) == rendered
+    assert builder.history([]) == "none"
+
+
+def test_prompt_size_is_flat_as_the_episode_grows() -> None:
+    cfg = ContextConfig(enabled=True)
+    agent = ReplannerAgent(ModelConfig(), PromptTemplates(config_dir="configs/prompts"), context=cfg)
+    plan = [{"step_id": i + 1, "intent": f"visit page {i} and read the table", "success_criteria": "table read"} for i in range(60)]
+
+    def prompt_tokens(steps: int) -> int:
+        _, user = agent._build_prompts(
+            goal="g",
+            previous_plan=plan,
+            action_history=[_action(i) for i in range(steps)],
+            observation="page text " * 2000,
+            use_cot=False,
+        )
+        return estimate_tokens(user)
+
+    bound = cfg.history_tokens + cfg.plan_tokens + cfg.observation_tokens + 16
+    short, long = prompt_tokens(40), prompt_tokens(400)
+    assert short <= bound and long <= bound and abs(long - short) < 16
+
+
+def test_helpers_and_disabled_builder() -> None:
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("plan 12345!") == 4
+    assert truncate_to_tokens("short", 10) == "short"
+    clipped = truncate_to_tokens("word " * 100, 20)
+    assert clipped.endswith("…[truncated]") and estimate_tokens(clipped) <= 20
+
+    final = {"action_type": "exit", "is_final": True, "final_answer": "42", "arguments": {}}
+    assert encode_action(7, final) == "7. exit => final: 42"
+
+    legacy = ContextBuilder()
+    actions = [_action(0)]
+    assert legacy.history(actions) == str(actions)
+    assert legacy.observation("x " * 5000) == "x " * 5000
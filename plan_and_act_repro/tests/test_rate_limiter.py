@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from multiprocessing import AuthenticationError
+from typing import Any
+
+import pytest
+
+from plan_and_act.core.types import ClientPoolConfig, ModelRateLimit, RateLimitConfig, StubLatencyConfig, StubServerConfig
+from plan_and_act.loadtest.stub_server import StubLLMServer
+from plan_and_act.utils.llm import LLMClient, configure_client_registry
+from plan_and_act.utils.rate_limit import RateLimitCoordinator, RateLimiter, RemoteRateLimiter, parse_reset
+
+
+def _config(**overrides: Any) -> RateLimitConfig:
+    # 60000 tokens/min refills 1000 tokens/s, so 100 tokens take ~0.1 s once the bucket is drained.
+    return RateLimitConfig(enabled=True, models={"gpt-4": ModelRateLimit(tpm=60000)}, **overrides)
+
+
+def test_drained_bucket_paces_calls_and_serves_executor_before_judge() -> None:
+    limiter = RateLimiter(_config())
+    assert limiter.acquire("gpt-4", 60000, priority=0) < 50
+    order: list[str] = []
+
+    def call(name: str, priority: int) -> None:
+        limiter.acquire("gpt-4", 100, priority)
+        order.append(name)
+
+    judge = threading.Thread(target=call, args=("judge", 5))
+    judge.start()
+    time.sleep(0.02)
+    executor = threading.Thread(target=call, args=("executor", 0))
+    started = time.monotonic()
+    executor.start()
+    judge.join()
+    executor.join()
+
+    # The judge queued first, but the executor's lane is served first once tokens refill.
+    assert order == ["executor", "judge"]
+    assert time.monotonic() - started >= 0.15
+    assert limiter.stats()["waited"] == 2
+    assert parse_reset("6m0s") == 360 and parse_reset("20ms") == pytest.approx(0.02)
+
+
+def test_client_absorbs_429s_and_adopts_rate_limit_headers(monkeypatch: pytest.MonkeyPatch) -> None:
+    stub_config = StubServerConfig(
+        port=0, latency=StubLatencyConfig(distribution="fixed", median_ms=1), rate_limit_rate=0.4, retry_after_s=0.01, tpm_limit=10**6, seed=1
+    )
+    limiter = RateLimiter(RateLimitConfig(enabled=True, min_backoff_s=0.01))
+    traces: list[dict[str, Any]] = []
+    with StubLLMServer(stub_config) as server:
+        monkeypatch.setenv("OPENAI_API_KEY", "stub")
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        configure_client_registry(ClientPoolConfig(http2=False))
+        client = LLMClient(limiter=limiter, trace_hook=traces.append)
+        for _ in range(10):
+            client.chat_json(
+                model="gpt-4",
+                system_prompt="You are the Executor.",
+                user_prompt="Goal: g",
+                temperature=0.0,
+                trace_context={"component": "executor"},
+            )
+        stats = server.stats()
+    configure_client_registry(ClientPoolConfig())
+
+    blocks = [payload["rate_limit"] for payload in traces]
+    assert all(block["enabled"] and block["priority"] == 0 for block in blocks)
+    # Each injected 429 was retried by the limiter loop (SDK retries are off), none surfaced.
+    assert sum(block["rate_limited"] for block in blocks) == stats["rate_limited"] > 0
+    assert stats["completions"] == 10 and limiter.stats()["penalties"] == stats["rate_limited"]
+    # The model had no configured limits; the token bucket comes from the response headers.
+    assert limiter._models["gpt-4"].tokens is not None and limiter._models["gpt-4"].tokens.capacity == 10**6
+
+
+def test_coordinator_shares_buckets_between_clients() -> None:
+    coordinator = RateLimitCoordinator(_config())
+    address = coordinator.start()
+    try:
+        first = RemoteRateLimiter(_config(coordinator=address, coordinator_authkey=coordinator.authkey.hex()))
+        second = RemoteRateLimiter(_config(coordinator=address, coordinator_authkey=coordinator.authkey.hex()))
+        first.acquire("gpt-4", 60000, 0)
+        waited_ms = second.acquire("gpt-4", 300, 0)
+        assert waited_ms >= 150
+        assert second.stats()["acquired"] == 2
+
+        # Only holders of this coordinator's random key get in, and only for limiter operations.
+        with pytest.raises(AuthenticationError):
+            RemoteRateLimiter(_config(coordinator=address, coordinator_authkey=os.urandom(32).hex())).stats()
+        with pytest.raises(ValueError, match="Unknown rate limiter operation"):
+            first._call("__init__", None)
+        # A rejected client does not stop the coordinator from accepting others.
+        assert RemoteRateLimiter(_config(coordinator=address, coordinator_authkey=coordinator.authkey.hex())).stats()["acquired"] == 2
+        assert "coordinator_authkey" not in first.config.model_dump()
+    finally:
+        coordinator.stop()
+    with pytest.raises(ValueError, match="non-loopback"):
+        RateLimitCoordinator(_config(), host="0.0.0.0")
+
+
+def test_cancelled_waiters_leave_the_queue_and_hand_back_grants() -> None:
+    limiter = RateLimiter(_config(max_wait_s=2))
+    limiter.acquire("gpt-4", 60000, priority=0)
+
+    async def cancel_then_acquire() -> float:
+        waiter = asyncio.create_task(limiter.aacquire("gpt-4", 300, 0))
+        await asyncio.sleep(0.02)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        # Before the fix the dead ticket headed the queue until max_wait_s.
+        return await limiter.aacquire("gpt-4", 50, 0)
+
+    assert asyncio.run(cancel_then_acquire()) < 500
+    assert limiter._models["gpt-4"].waiters == [] and limiter.stats()["cancelled"] == 1
+
+    coordinator = RateLimitCoordinator(_config())
+    address = coordinator.start()
+    try:
+        remote = RemoteRateLimiter(_config(coordinator=address, coordinator_authkey=coordinator.authkey.hex()))
+        remote.acquire("gpt-4", 60000, 0)
+
+        async def cancel_remote() -> None:
+            waiter = asyncio.create_task(remote.aacquire("gpt-4", 200, 0))
+            await asyncio.sleep(0.02)
+            waiter.cancel()
+            # The coordinator still grants the request; its capacity comes straight back.
+            for _ in range(100):
+                await asyncio.sleep(0.02)
+                if coordinator.limiter.stats()["released"]:
+                    return
+
+        asyncio.run(cancel_remote())
+        assert coordinator.limiter.stats()["released"] == 1
+    finally:
+        coordinator.stop()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+from plan_and_act.core.schemas import ExecutorAction, PlannerOutput, PlanStep
+from plan_and_act.core.state import build_initial_state
+from plan_and_act.core.types import ReplanPolicyConfig
+from plan_and_act.environments.base import EnvironmentStepResult
+from plan_and_act.environments.simulator import GenericSimulatorEnvironment
+from plan_and_act.graph.replan_policies import (
+    AnyOf,
+    EveryNSteps,
+    OnObservationNovelty,
+    OnPlanExhausted,
+    OnSuccessCriteriaFailure,
+    OnToolFailure,
+    build_replan_policy,
+)
+from plan_and_act.graph.transitions import route_after_executor
+from plan_and_act.graph.workflow import build_workflow
+from plan_and_act.tracing import TraceCollector, TraceConfig
+
+
+def _state(**overrides: Any) -> dict[str, Any]:
+    state = dict(build_initial_state(goal="g", max_steps=10, dynamic_replanning=True, use_cot=False))
+    state.update(
+        plan=[
+            {"step_id": 1, "intent": "search", "success_criteria": "Search results listed"},
+            {"step_id": 2, "intent": "open", "success_criteria": ""},
+        ],
+        current_step_idx=1,
+        step_count=1,
+        previous_observation="Step 0: Environment initialized for goal g",
+        observation="Step 1: Search results listed for g",
+    )
+    state.update(overrides)
+    return state
+
+
+def test_each_trigger_fires_only_on_its_condition() -> None:
+    quiet = _state()
+    for policy in (OnToolFailure(), OnPlanExhausted(), EveryNSteps(n=2), OnSuccessCriteriaFailure()):
+        assert policy.reason(quiet) == "", policy.name
+
+    assert OnToolFailure().reason(_state(step_failed=True)) == "tool_failure"
+    assert OnPlanExhausted().reason(_state(current_step_idx=2)) == "plan_exhausted"
+    assert EveryNSteps(n=2).reason(_state(current_step_idx=2)) == "every_2_steps"
+    assert OnSuccessCriteriaFailure().reason(_state(observation="Step 1: Error: element not found.")).startswith(
+        "success_criteria_unmet="
+    )
+    assert OnObservationNovelty(threshold=0.5).reason(quiet).startswith("observation_novelty=")
+    assert OnObservationNovelty(threshold=0.5).reason(_state(observation="Step 7: Environment initialized for goal g")) == ""
+
+    policy = build_replan_policy(ReplanPolicyConfig(triggers=["plan_exhausted", "tool_failure", "tool_failure"]))
+    assert isinstance(policy, AnyOf) and [p.name for p in policy.policies] == ["plan_exhausted", "tool_failure"]
+    assert policy.reason(_state(step_failed=True)) == "tool_failure"
+
+
+def test_router_respects_switches_and_forced_replans() -> None:
+    policy = OnToolFailure()
+    assert route_after_executor(_state(), policy) == "continue"
+    assert route_after_executor(_state(step_failed=True), policy) == "replan"
+    assert route_after_executor(_state(step_failed=True, dynamic_replanning=False), policy) == "continue"
+    assert route_after_executor(_state(step_failed=True, done=True), policy) == "end"
+    # The executor asks for a plan when it has none left; that always replans.
+    assert route_after_executor(_state(needs_replan=True), policy) == "replan"
+    # No policy keeps the paper's replan-after-every-step behaviour.
+    assert route_after_executor(_state()) == "replan"
+
+
+class FourStepPlanner:
+    def __init__(self) -> None:
+        self.replans = 0
+
+    def plan(self, **kwargs: Any) -> PlannerOutput:
+        steps = [PlanStep(step_id=i + 1, intent=f"click {i}", success_criteria="Click executed") for i in range(3)]
+        return PlannerOutput(goal=kwargs["goal"], steps=[*steps, PlanStep(step_id=4, intent="exit")])
+
+    def replan(self, **kwargs: Any) -> PlannerOutput:
+        self.replans += 1
+        return PlannerOutput(goal=kwargs["goal"], steps=[PlanStep(step_id=1, intent="exit")])
+
+
+class StepExecutor:
+    def act(self, **kwargs: Any) -> ExecutorAction:
+        if kwargs["current_step"].intent == "exit":
+            return ExecutorAction(action_type="exit", is_final=True, final_answer="done")
+        return ExecutorAction(action_type="click", target=kwargs["current_step"].intent)
+
+
+class FailSecondClick(GenericSimulatorEnvironment):
+    def step(self, *, action: ExecutorAction, step_count: int) -> EnvironmentStepResult:
+        if step_count == 2:
+            return EnvironmentStepResult(observation="Step 2: Error: element not found.", failed=True)
+        return super().step(action=action, step_count=step_count)
+
+
+def test_workflow_replans_only_when_the_policy_fires(tmp_path: Path) -> None:
+    tracer = TraceCollector(config=TraceConfig(enabled=True, base_dir=str(tmp_path)), run_id="r")
+    tracer.start_session(goal="g", environment={}, model_stack={}, runtime_config={})
+    planner = FourStepPlanner()
+    workflow = build_workflow(
+        planner,
+        StepExecutor(),
+        planner,
+        environment=FailSecondClick(),
+        tracer=tracer,
+        replan_policy=build_replan_policy(ReplanPolicyConfig(triggers=["tool_failure", "success_criteria", "plan_exhausted"])),
+    )
+
+    final = workflow.invoke(build_initial_state(goal="g", max_steps=10, dynamic_replanning=True, use_cot=False))
+
+    assert final["success"] is True and final["step_count"] == 3
+    assert planner.replans == 1
+    tracer.close(status="completed")
+    triggered = [e["payload"] for e in tracer.reader().events() if e["event_type"] == "replan_triggered"]
+    assert triggered == [{"reason": "tool_failure", "policy": "any_of"}]
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from plan_and_act.eval.batch import load_goals, run_batch
+from plan_and_act.eval.episode import load_episode_settings, new_run_id
+from plan_and_act.eval.metrics import percentile
+
+
+def _settings(tmp_path: Path):
+    settings = load_episode_settings(
+        base_config="configs/base.yaml",
+        model_config="configs/models.yaml",
+        trace_config="configs/tracing.yaml",
+        llm_config="configs/llm.yaml",
+        environment="simulator",
+    )
+    runtime = settings.runtime.model_copy(update={"artifact_dir": str(tmp_path / "runs")})
+    return settings.model_copy(update={"runtime": runtime})
+
+
+def test_new_run_id_is_unique_within_one_second() -> None:
+    ids = {new_run_id() for _ in range(1000)}
+    assert len(ids) == 1000
+
+
+def test_load_goals_supports_objects_strings_and_overrides(tmp_path: Path) -> None:
+    path = tmp_path / "goals.jsonl"
+    path.write_text(
+        '{"goal": "a", "use_cot": true}\n\n"b"\n',
+        encoding="utf-8",
+    )
+
+    goals = load_goals(path)
+
+    assert [g.goal for g in goals] == ["a", "b"]
+    assert goals[0].overrides == {"use_cot": True}
+    assert goals[1].index == 1
+
+
+@pytest.mark.parametrize("mode", ["thread", "process", "asyncio"])
+def test_run_batch_streams_results_and_aggregates(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mode: str,
+) -> None:
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    goals_path = tmp_path / "goals.jsonl"
+    goals_path.write_text(
+        "\n".join(json.dumps({"goal": f"goal {i}", "dynamic_replanning": i % 2 == 0}) for i in range(6)),
+        encoding="utf-8",
+    )
+    output = tmp_path / "results.jsonl"
+    seen: list[int] = []
+
+    summary = run_batch(
+        load_goals(goals_path),
+        _settings(tmp_path),
+        output_path=output,
+        workers=3,
+        mode=mode,  # type: ignore[arg-type]
+        on_result=lambda row: seen.append(row["index"]),
+    )
+
+    rows = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted(row["index"] for row in rows) == list(range(6))
+    assert sorted(seen) == list(range(6))
+    assert len({row["run_id"] for row in rows}) == 6
+    assert all(row["ok"] for row in rows)
+    assert summary["episodes"] == 6
+    assert summary["errors"] == 0
+    assert 0.0 <= summary["success_rate"] <= 1.0
+    assert summary["latency_p95_s"] >= summary["latency_p50_s"]
+    assert len(list((tmp_path / "runs").glob("episode_*.json"))) == 6
+
+
+def test_percentile_interpolates() -> None:
+    assert percentile([], 95) == 0.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile([5.0], 95) == 5.0
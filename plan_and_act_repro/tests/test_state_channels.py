@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from plan_and_act.core.schemas import ExecutorAction, PlannerOutput, PlanStep
+from plan_and_act.core.state import AppendOnlyChannel, AppendOnlyList, append_items, build_initial_state
+from plan_and_act.graph.workflow import build_workflow
+
+
+class LongPlanner:
+    def __init__(self, length: int) -> None:
+        self.length = length
+        self.seen_history_lengths: list[int] = []
+
+    def plan(self, **kwargs) -> PlannerOutput:
+        self.seen_history_lengths.append(len(kwargs["action_history"]))
+        steps = [PlanStep(step_id=i + 1, intent=f"step {i + 1}") for i in range(self.length)]
+        return PlannerOutput(goal=kwargs["goal"], steps=steps)
+
+    def replan(self, **kwargs) -> PlannerOutput:
+        self.seen_history_lengths.append(len(kwargs["action_history"]))
+        return PlannerOutput(goal=kwargs["goal"], steps=[PlanStep(step_id=1, intent="again")])
+
+
+class ClickExecutor:
+    def act(self, **kwargs) -> ExecutorAction:
+        return ExecutorAction(action_type="click", target=f"t{kwargs['step']}")
+
+
+def test_append_items_shares_the_buffer_and_never_changes_older_views() -> None:
+    first = append_items([1], [2])
+    batch = [3, 4]
+    second = append_items(first, batch)
+
+    assert first == [1, 2] and second == [1, 2, 3, 4]
+    assert second.extends(first)
+    # The same writes applied again to the older view (LangGraph's scratch copy, then the real
+    # channels) reuse the buffer; a reused batch object on the newest view is a real append.
+    again = append_items(first, batch)
+    assert again == second and again.extends(second)
+    assert append_items(second, batch) == [1, 2, 3, 4, 3, 4]
+    # A different branch from an older view copies its prefix and leaves the others alone.
+    branch = append_items(first, [9])
+    assert branch == [1, 2, 9] and not branch.extends(first)
+    assert second == [1, 2, 3, 4] and second[1:] == [2, 3, 4] and second[-1] == 4
+
+
+def test_channel_checkpoints_a_plain_list() -> None:
+    channel = AppendOnlyChannel(list)
+    channel.update([["a"], ["b", "c"]])
+    snapshot = channel.copy()
+    channel.update([["d"]])
+
+    assert snapshot.get() == ["a", "b", "c"]
+    assert type(channel.checkpoint()) is list and channel.checkpoint() == ["a", "b", "c", "d"]
+    restored = channel.from_checkpoint(["a", "b"])
+    assert isinstance(restored.get(), AppendOnlyList) and restored.get() == ["a", "b"]
+
+
+def test_history_channels_accumulate_without_touching_input_state() -> None:
+    planner = LongPlanner(length=3)
+    workflow = build_workflow(planner=planner, executor=ClickExecutor(), replanner=planner)
+    init = build_initial_state(goal="g", max_steps=7, dynamic_replanning=True, use_cot=False)
+
+    final_state = workflow.invoke(init)
+    second_state = workflow.invoke(init)
+
+    assert init["action_history"] == []
+    assert init["notes"] == []
+    assert final_state["step_count"] == 7
+    assert [a["target"] for a in final_state["action_history"]] == [f"t{i}" for i in range(7)]
+    assert final_state["notes"].count("Replanned based on latest observation.") == 7
+    assert final_state["notes"][-1] == "Reached max step budget."
+    assert planner.seen_history_lengths[:3] == [0, 1, 2]
+    assert second_state["action_history"] == final_state["action_history"]
+    assert second_state["action_history"] is not final_state["action_history"]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import random
+from collections.abc import Iterator
+from statistics import median
+
+import httpx
+import pytest
+
+from plan_and_act.agents.executor import ExecutorAgent
+from plan_and_act.agents.planner import PlannerAgent
+from plan_and_act.agents.replanner import ReplannerAgent
+from plan_and_act.core.state import build_initial_state
+from plan_and_act.core.types import ClientPoolConfig, ModelConfig, StubLatencyConfig, StubServerConfig
+from plan_and_act.environments.simulator import GenericSimulatorEnvironment
+from plan_and_act.graph.workflow import build_workflow
+from plan_and_act.loadtest.stub_server import StubLLMServer, malform, sample_latency_ms
+from plan_and_act.prompts.templates import PromptTemplates
+from plan_and_act.utils.llm import ClientRegistry, LLMClient, _parse_json_content, configure_client_registry
+
+_FAST = StubLatencyConfig(distribution="fixed", median_ms=1)
+
+
+def _chat(base_url: str, *, system: str = "You are the Executor.", **extra: object) -> httpx.Response:
+    body = {"model": "gpt-4", "messages": [{"role": "system", "content": system}, {"role": "user", "content": "Goal: g"}]}
+    return httpx.post(f"{base_url}/chat/completions", json={**body, **extra}, timeout=5)
+
+
+@pytest.fixture
+def stub_env(monkeypatch: pytest.MonkeyPatch) -> Iterator[StubLLMServer]:
+    with StubLLMServer(StubServerConfig(port=0, latency=_FAST, plan_steps=4)) as server:
+        monkeypatch.setenv("OPENAI_API_KEY", "stub")
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        configure_client_registry(ClientPoolConfig(http2=False))
+        yield server
+    configure_client_registry(ClientPoolConfig())
+
+
+def test_agents_complete_an_episode_against_the_stub(stub_env: StubLLMServer) -> None:
+    prompts = PromptTemplates(config_dir="configs/prompts")
+    model = ModelConfig(provider="openai", model="gpt-4")
+    workflow = build_workflow(
+        PlannerAgent(model, prompts),
+        ExecutorAgent(model, prompts),
+        ReplannerAgent(model, prompts),
+        environment=GenericSimulatorEnvironment(),
+    )
+
+    final = workflow.invoke(
+        build_initial_state(goal="Find the top contributor of pallets/flask", max_steps=10, dynamic_replanning=False, use_cot=False)
+    )
+
+    assert final["success"] is True
+    assert [a["action_type"] for a in final["action_history"]] == ["search", "click", "type", "exit"]
+    stats = stub_env.stats()
+    assert stats["requests.planner"] == 1 and stats["requests.executor"] == 4
+    assert stats["total_tokens"] == stats["prompt_tokens"] + stats["completion_tokens"] > 0
+
+
+def test_failure_injection_and_rate_limit_headers() -> None:
+    config = StubServerConfig(port=0, latency=_FAST, rate_limit_rate=1.0, retry_after_s=2.5)
+    with StubLLMServer(config) as server:
+        response = _chat(server.base_url)
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "3" and response.headers["retry-after-ms"] == "2500"
+
+    with StubLLMServer(StubServerConfig(port=0, latency=_FAST, server_error_rate=1.0)) as server:
+        assert _chat(server.base_url).status_code in {500, 502, 503}
+
+    with StubLLMServer(StubServerConfig(port=0, latency=_FAST, rpm_limit=2)) as server:
+        first, second, third = (_chat(server.base_url) for _ in range(3))
+        assert first.headers["x-ratelimit-remaining-requests"] == "1"
+        assert second.status_code == 200 and third.status_code == 429
+        assert server.stats()["rate_limited.window"] == 1
+
+    config = StubServerConfig(port=0, latency=_FAST, malformed_rate=1.0, malformed_kinds=["truncated"])
+    with StubLLMServer(config) as server:
+        choice = _chat(server.base_url).json()["choices"][0]
+    assert choice["finish_reason"] == "length"
+    with pytest.raises(ValueError):
+        _parse_json_content(choice["message"]["content"])
+    # Prose-wrapped output is what the fenced-block fallback of the parser is for.
+    assert _parse_json_content(malform('{"a": 1}', "prose")) == {"a": 1}
+
+
+def test_response_format_rejection_and_latency_distributions(monkeypatch: pytest.MonkeyPatch) -> None:
+    with StubLLMServer(StubServerConfig(port=0, latency=_FAST, reject_response_format=True)) as server:
+        monkeypatch.setenv("OPENAI_API_KEY", "stub")
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        payloads: list[dict] = []
+        client = LLMClient(registry=ClientRegistry(ClientPoolConfig(http2=False)), trace_hook=payloads.append)
+        out = client.chat_json(
+            model="gpt-4", system_prompt="You are the Planner.", user_prompt="Goal: book a table", temperature=0.0
+        )
+    assert out["goal"] == "book a table" and payloads[0]["used_response_format_json_object"] is False
+    assert payloads[0]["usage"]["total_tokens"] > 0
+
+    rng = random.Random(0)
+    lognormal = [sample_latency_ms(StubLatencyConfig(median_ms=200, sigma=0.5), rng) for _ in range(4000)]
+    assert 180 < median(lognormal) < 220
+    exponential = [sample_latency_ms(StubLatencyConfig(distribution="exponential", median_ms=200), rng) for _ in range(4000)]
+    assert 180 < median(exponential) < 220
+    clamped = StubLatencyConfig(distribution="uniform", min_ms=10, max_ms=20)
+    assert all(10 <= sample_latency_ms(clamped, rng) <= 20 for _ in range(100))
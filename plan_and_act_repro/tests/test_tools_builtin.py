@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+
 from plan_and_act.tools.calc import CalculatorTool
-from plan_and_act.tools.web import parse_duckduckgo_results
+from plan_and_act.tools.web import FetchURLTool, WebSearchTool, _async_client, parse_duckduckgo_results
 
 
 def test_calculator_tool_evaluates_expression() -> None:
@@ -31,3 +33,22 @@ def test_parse_duckduckgo_results_extracts_links() -> None:
     assert len(out) == 2
     assert out[0]["url"] == "https://example.com/a"
     assert out[1]["url"] == "https://example.org/b"
+
+
+def test_web_tools_report_bad_arguments_without_raising() -> None:
+    search, fetch = WebSearchTool(), FetchURLTool()
+
+    assert search.run({"max_results": "many"}) == {"ok": False, "error": "Missing query"}
+    assert search.run({"query": "q", "max_results": "many"})["error"] == "max_results must be an integer"
+    assert fetch.run({"max_chars": None}) == {"ok": False, "error": "Missing url"}
+    assert fetch.run({"url": "https://example.com", "max_chars": [1]})["error"] == "max_chars must be an integer"
+    assert asyncio.run(search.arun({"query": " "})) == {"ok": False, "error": "Missing query"}
+
+
+def test_async_http_client_is_shared_within_an_event_loop() -> None:
+    async def clients() -> tuple[object, object]:
+        return _async_client(), _async_client()
+
+    first, second = asyncio.run(clients())
+    assert first is second
+    assert asyncio.run(clients())[0] is not first
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from plan_and_act.core.schemas import ExecutorAction, PlannerOutput, PlanStep
+from plan_and_act.core.state import append_items, build_initial_state
+from plan_and_act.graph.workflow import build_workflow
+from plan_and_act.tracing import TraceCollector, TraceConfig, TraceReader
+from plan_and_act.tracing.blobs import BLOB_LIST_REF, BLOB_REF, BlobResolver, BlobStore, PayloadCompactor
+
+
+class LongPlanner:
+    def plan(self, **kwargs) -> PlannerOutput:
+        steps = [PlanStep(step_id=i + 1, intent=f"step {i + 1} " + "x" * 40) for i in range(4)]
+        return PlannerOutput(goal=kwargs["goal"], steps=steps)
+
+    replan = plan
+
+
+class ClickExecutor:
+    def act(self, **kwargs) -> ExecutorAction:
+        return ExecutorAction(action_type="click", target=f"t{kwargs['step']}", rationale="r" * 60)
+
+
+def _traced_run(tmp_path: Path, run_id: str, **trace_overrides) -> TraceCollector:
+    cfg = TraceConfig(enabled=True, base_dir=str(tmp_path), blob_min_bytes=128, **trace_overrides)
+    tracer = TraceCollector(config=cfg, run_id=run_id)
+    tracer.start_session(goal="g", environment={}, model_stack={}, runtime_config={})
+    planner = LongPlanner()
+    workflow = build_workflow(planner=planner, executor=ClickExecutor(), replanner=planner, tracer=tracer)
+    workflow.invoke(build_initial_state(goal="g", max_steps=12, dynamic_replanning=True, use_cot=False))
+    return tracer
+
+
+def _comparable(events: list[dict]) -> list[tuple]:
+    # Span events carry random ids and wall-clock timings, so they differ between any two runs.
+    return [(e["seq"], e["event_type"], e["step"], e["payload"]) for e in events if e["event_type"] != "span"]
+
+
+def test_blob_trace_rehydrates_to_the_inline_trace(tmp_path: Path) -> None:
+    inline = _traced_run(tmp_path, "inline", blobs=False)
+    blobbed = _traced_run(tmp_path, "blobbed", blobs=True)
+
+    raw = blobbed.reader().events(rehydrate=False)
+    replanner_inputs = [e["payload"] for e in raw if e["event_type"] == "replanner_input"]
+    assert replanner_inputs and all(BLOB_LIST_REF in p["action_history"] for p in replanner_inputs)
+    assert all(BLOB_REF in p["previous_plan"] for p in replanner_inputs)
+
+    assert _comparable(blobbed.reader().events()) == _comparable(inline.reader().events())
+
+    inline.close(status="completed")
+    blobbed.close(status="completed")
+    reread = TraceReader.for_run(tmp_path, "blobbed")
+    assert _comparable(reread.events()) == _comparable(inline.reader().events())
+
+
+def test_history_is_stored_as_deltas_and_repeated_plans_dedupe(tmp_path: Path) -> None:
+    tracer = _traced_run(tmp_path, "deltas", blobs=True)
+    store = tracer.blob_store
+    assert store is not None
+
+    refs = [
+        e["payload"]["action_history"]
+        for e in tracer.reader().events(rehydrate=False)
+        if e["event_type"] == "replanner_input"
+    ]
+    lengths = [ref["length"] for ref in refs]
+    assert lengths == list(range(1, len(refs) + 1))
+    for ref in refs:
+        node = store.get_json(ref[BLOB_LIST_REF])
+        assert len(node["items"]) == 1
+
+    # Every replan returns the same plan: one blob, many references.
+    plan_digests = {
+        e["payload"]["previous_plan"][BLOB_REF]
+        for e in tracer.reader().events(rehydrate=False)
+        if e["event_type"] == "replanner_input"
+    }
+    assert len(plan_digests) == 1
+    assert store.stats["blobs_deduped"] > 0
+    tracer.close(status="completed")
+
+
+def test_shared_blob_dir_dedupes_across_runs(tmp_path: Path) -> None:
+    shared = tmp_path / "shared_blobs"
+    first = _traced_run(tmp_path, "first", blobs=True, blob_dir=str(shared))
+    second = _traced_run(tmp_path, "second", blobs=True, blob_dir=str(shared))
+    first.close(status="completed")
+    second.close(status="completed")
+
+    assert second.blob_store is not None
+    assert second.blob_store.stats["blobs_written"] == 0
+    assert _comparable(TraceReader.for_run(tmp_path, "second").events()) == _comparable(
+        TraceReader.for_run(tmp_path, "first").events()
+    )
+    assert not (tmp_path / "second" / "blobs").exists()
+
+
+def test_blob_store_round_trips_text_and_json(tmp_path: Path) -> None:
+    store = BlobStore(tmp_path)
+    digest = store.put("system prompt".encode("utf-8"))
+
+    assert store.put("system prompt".encode("utf-8")) == digest
+    assert store.get(digest) == b"system prompt"
+    assert store.get_json(store.put_json({"a": [1, 2]})) == {"a": [1, 2]}
+    assert store.stats["blobs_written"] == 2
+
+
+def test_only_a_history_view_extending_the_last_one_is_chained(tmp_path: Path) -> None:
+    store = BlobStore(tmp_path)
+    compactor = PayloadCompactor(store, min_bytes=1024, delta_fields=["history"])
+    first = append_items([], ["a", "b"])
+    compactor.compact({"history": first})
+    ref = compactor.compact({"history": append_items(first, ["c"])})["history"]
+    assert store.get_json(ref[BLOB_LIST_REF])["items"] == ["c"]
+
+    # A plain list can't be known to extend what was stored: it starts a new chain.
+    plain = compactor.compact({"history": ["a", "b", "c", "d"]})["history"]
+    assert store.get_json(plain[BLOB_LIST_REF]) == {"base": None, "items": ["a", "b", "c", "d"]}
+    assert BlobResolver(store).rehydrate({"history": ref}) == {"history": ["a", "b", "c"]}
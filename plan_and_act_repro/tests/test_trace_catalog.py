@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from plan_and_act.eval.runner import app
+from plan_and_act.tracing import TraceCollector, TraceConfig
+from plan_and_act.tracing.catalog import TraceCatalog
+
+
+def _record_run(base_dir: Path, run_id: str, *, executor_model: str, llm_status: str, finish: bool = True) -> TraceCollector:
+    tracer = TraceCollector(config=TraceConfig(enabled=True, base_dir=str(base_dir)), run_id=run_id)
+    tracer.start_session(
+        goal=f"goal for {run_id}",
+        environment={"kind": "simulator", "name": "sim"},
+        model_stack={"planner": {"model": "gpt-4"}, "executor": {"model": executor_model}},
+        runtime_config={},
+    )
+    tracer.log_event(
+        event_type="llm_call",
+        step=1,
+        payload={"status": llm_status, "latency_ms": 12.5, "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}},
+    )
+    tracer.log_event(event_type="tool_call_end", step=1, payload={"tool_name": "calculator", "ok": llm_status == "ok"})
+    if finish:
+        tracer.close(status="completed", summary={"success": llm_status == "ok", "step_count": 1})
+    return tracer
+
+
+def test_catalog_answers_cross_run_queries(tmp_path: Path) -> None:
+    _record_run(tmp_path, "a", executor_model="gpt-4", llm_status="parse_error")
+    _record_run(tmp_path, "b", executor_model="gpt-4", llm_status="ok")
+    _record_run(tmp_path, "c", executor_model="gpt-4o-mini", llm_status="parse_error")
+
+    with TraceCatalog(tmp_path / "catalog.sqlite") as catalog:
+        stats = catalog.ingest(tmp_path)
+        assert stats["runs_ingested"] == 3 and stats["events_ingested"] == 6
+
+        rows = catalog.find_runs(executor_model="gpt-4", event_type="llm_call", event_status="parse_error")
+        assert [row["run_id"] for row in rows] == ["a"]
+        assert rows[0]["matching_events"] == 1
+
+        failed_tools = catalog.find_runs(tool_name="calculator", ok=False)
+        assert sorted(row["run_id"] for row in failed_tools) == ["a", "c"]
+
+        tokens = catalog.query("SELECT SUM(total_tokens) AS tokens FROM events WHERE event_type = 'llm_call'")
+        assert tokens == [{"tokens": 45}]
+
+
+def test_ingest_is_incremental_and_waits_for_running_runs(tmp_path: Path) -> None:
+    _record_run(tmp_path, "done", executor_model="gpt-4", llm_status="ok")
+    live = _record_run(tmp_path, "live", executor_model="gpt-4", llm_status="ok", finish=False)
+
+    with TraceCatalog(tmp_path / "catalog.sqlite") as catalog:
+        first = catalog.ingest(tmp_path)
+        assert (first["runs_ingested"], first["runs_pending"]) == (1, 1)
+
+        second = catalog.ingest(tmp_path)
+        assert (second["runs_ingested"], second["runs_unchanged"], second["runs_pending"]) == (0, 1, 1)
+
+        live.close(status="failed")
+        third = catalog.ingest(tmp_path)
+        assert (third["runs_ingested"], third["runs_unchanged"]) == (1, 1)
+        assert catalog.run_count() == 2
+        assert catalog.find_runs(run_status="failed")[0]["run_id"] == "live"
+
+
+def test_traces_query_command_ingests_and_filters(tmp_path: Path) -> None:
+    _record_run(tmp_path, "a", executor_model="gpt-4", llm_status="parse_error")
+    _record_run(tmp_path, "b", executor_model="gpt-4", llm_status="ok")
+
+    result = CliRunner().invoke(
+        app,
+        ["traces", "query", "--base-dir", str(tmp_path), "--event-type", "llm_call", "--event-status", "parse_error"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "'a'" in result.output and "'b'" not in result.output
+    assert (tmp_path / "catalog.sqlite").exists()
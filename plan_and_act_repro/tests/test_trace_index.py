@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from plan_and_act.tracing import TraceReader
+from plan_and_act.tracing.index import index_path, read_index
+from plan_and_act.tracing.writer import TraceWriter
+
+EVENT_TYPES = ["executor_input", "llm_call", "tool_call_end", "llm_call", "environment_step"]
+
+
+def _write_run(tmp_path: Path, count: int = 300, **writer_options) -> TraceWriter:
+    writer = TraceWriter(base_dir=str(tmp_path), run_id="r", flush_every=16, **writer_options)
+    for seq in range(count):
+        writer.append_event(
+            {"seq": seq, "step": seq // 10, "event_type": EVENT_TYPES[seq % len(EVENT_TYPES)], "payload": {"n": seq}}
+        )
+    writer.close()
+    return writer
+
+
+def _expected(count: int, event_type: str | None = None, step: int | None = None) -> list[int]:
+    return [
+        seq
+        for seq in range(count)
+        if (event_type is None or EVENT_TYPES[seq % len(EVENT_TYPES)] == event_type)
+        and (step is None or seq // 10 == step)
+    ]
+
+
+def test_index_serves_filtered_and_random_access_lookups(tmp_path: Path) -> None:
+    writer = _write_run(tmp_path)
+    assert len(read_index(index_path(writer.events_path))) == 300
+
+    with TraceReader(tmp_path / "r") as reader:
+        assert len(reader) == 300
+        assert [e["seq"] for e in reader.find(event_type="llm_call", step=5)] == _expected(300, "llm_call", 5)
+        assert [e["seq"] for e in reader.find(step=7)] == _expected(300, step=7)
+        assert [e["seq"] for e in reader.find(event_type="tool_call_end")] == _expected(300, "tool_call_end")
+        assert reader.last("tool_call_end")["seq"] == _expected(300, "tool_call_end")[-1]
+        assert reader.last("missing_type") is None
+        assert reader.event_at(-1)["seq"] == 299
+        assert reader.event_at(123)["seq"] == 123
+
+
+def test_lookups_decode_only_the_matching_lines(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _write_run(tmp_path)
+    reader = TraceReader(tmp_path / "r")
+    decoded: list[bytes] = []
+    original = reader._decode
+    monkeypatch.setattr(reader, "_decode", lambda line, rehydrate: decoded.append(line) or original(line, rehydrate))
+
+    matches = list(reader.find(event_type="llm_call", step=5))
+
+    assert len(decoded) == len(matches) == 4
+    reader.close()
+
+
+def test_missing_or_stale_index_is_completed_from_the_data(tmp_path: Path) -> None:
+    writer = _write_run(tmp_path, count=100)
+    idx = index_path(writer.events_path)
+    idx.write_bytes(idx.read_bytes()[: 40 * 20 + 7])  # 40 entries plus a torn record
+    writer.append_event({"seq": 100, "step": 10, "event_type": "episode_end"})  # straggler, never indexed
+
+    with TraceReader(tmp_path / "r") as reader:
+        assert len(reader) == 101
+        assert reader.last("episode_end")["seq"] == 100
+        assert [e["seq"] for e in reader.find(step=9)] == _expected(100, step=9)
+
+    idx.unlink()
+    with TraceReader(tmp_path / "r") as reader:
+        assert [e["seq"] for e in reader.find(event_type="llm_call")] == _expected(100, "llm_call")
+
+
+def test_index_spans_rotated_compressed_segments(tmp_path: Path) -> None:
+    _write_run(tmp_path, compression="gzip", segment_max_events=64)
+
+    with TraceReader(tmp_path / "r") as reader:
+        assert len(reader.segment_paths()) == 5
+        assert [e["seq"] for e in reader.find(event_type="llm_call", step=20)] == _expected(300, "llm_call", 20)
+        assert reader.event_at(-1)["seq"] == 299
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from plan_and_act.tracing import TraceCollector, TraceConfig
+from plan_and_act.tracing.columnar import ParquetTraceExporter
+
+pa = pytest.importorskip("pyarrow")
+pc = pytest.importorskip("pyarrow.compute")
+
+
+def _record_run(base_dir: Path, run_id: str, *, experiment: str = "", model: str = "gpt-4", finish: bool = True) -> TraceCollector:
+    tracer = TraceCollector(config=TraceConfig(enabled=True, base_dir=str(base_dir), experiment=experiment), run_id=run_id)
+    tracer.start_session(goal="g", environment={}, model_stack={}, runtime_config={})
+    for step in range(3):
+        tracer.log_event(
+            event_type="llm_call",
+            step=step,
+            payload={
+                "component": "executor",
+                "model": model,
+                "status": "parse_error" if step == 2 else "success",
+                "latency_ms": 100.0 * (step + 1),
+                "usage": {"prompt_tokens": 50, "completion_tokens": 10, "total_tokens": 60},
+            },
+        )
+        tracer.log_event(event_type="tool_call_end", step=step, payload={"tool_name": "calculator", "ok": step != 1})
+    if finish:
+        tracer.close(status="completed")
+    return tracer
+
+
+def test_export_writes_typed_partitioned_columns(tmp_path: Path) -> None:
+    _record_run(tmp_path / "traces", "a", experiment="ablation/no-cot")
+    _record_run(tmp_path / "traces", "b", model="gpt-4o-mini")
+
+    exporter = ParquetTraceExporter(tmp_path / "parquet")
+    stats = exporter.export(tmp_path / "traces")
+    assert (stats["runs_exported"], stats["events_exported"]) == (2, 12)
+
+    table = exporter.dataset().to_table()
+    assert table.schema.field("latency_ms").type == pa.float64()
+    assert table.schema.field("ok").type == pa.bool_()
+    assert pa.types.is_timestamp(table.schema.field("timestamp").type)
+    assert set(table["experiment"].to_pylist()) == {"ablation_no-cot", "default"}
+    assert len(list((tmp_path / "parquet").glob("date=*/experiment=*/part-*.parquet"))) == 2
+
+    llm = table.filter(pc.equal(table["event_type"], "llm_call"))
+    by_model = llm.group_by("model").aggregate([("latency_ms", "mean"), ("total_tokens", "sum")])
+    assert sorted(by_model.to_pylist(), key=lambda row: row["model"]) == [
+        {"model": "gpt-4", "latency_ms_mean": 200.0, "total_tokens_sum": 180},
+        {"model": "gpt-4o-mini", "latency_ms_mean": 200.0, "total_tokens_sum": 180},
+    ]
+    tools = table.filter(pc.equal(table["event_type"], "tool_call_end"))
+    assert tools["ok"].to_pylist().count(False) == 2
+    assert tools["component"].null_count == tools.num_rows
+
+
+def test_export_is_incremental_and_replaces_changed_runs(tmp_path: Path) -> None:
+    traces = tmp_path / "traces"
+    _record_run(traces, "done")
+    live = _record_run(traces, "live", finish=False)
+
+    first = ParquetTraceExporter(tmp_path / "parquet").export(traces)
+    assert (first["runs_exported"], first["runs_pending"]) == (1, 1)
+
+    live.close(status="completed")
+    second = ParquetTraceExporter(tmp_path / "parquet").export(traces, event_types=["llm_call"])
+    assert (second["runs_exported"], second["runs_unchanged"]) == (1, 1)
+
+    # A resumed run rewrites its session; its rows are replaced rather than duplicated.
+    resumed = TraceCollector(config=TraceConfig(enabled=True, base_dir=str(traces)), run_id="done")
+    assert resumed.resume_session()
+    resumed.log_event(event_type="llm_call", step=3, payload={"status": "success"})
+    resumed.close(status="completed")
+    third = ParquetTraceExporter(tmp_path / "parquet").export(traces)
+    assert (third["runs_exported"], third["runs_replaced"], third["events_exported"]) == (1, 1, 7)
+
+    table = ParquetTraceExporter(tmp_path / "parquet").dataset().to_table()
+    counts = {row["run_id"]: row["run_id_count"] for row in table.group_by("run_id").aggregate([("run_id", "count")]).to_pylist()}
+    assert counts == {"done": 7, "live": 3}
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from plan_and_act.tracing import TraceReader
+from plan_and_act.tracing.writer import TraceWriter
+
+
+def _compressions() -> list[str]:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return ["none", "gzip"]
+    return ["none", "gzip", "zstd"]
+
+
+@pytest.mark.parametrize("compression", _compressions())
+def test_segments_rotate_by_event_count_and_read_back_in_order(tmp_path: Path, compression: str) -> None:
+    with TraceWriter(
+        base_dir=str(tmp_path),
+        run_id="r",
+        flush_every=4,
+        compression=compression,  # type: ignore[arg-type]
+        segment_max_events=7,
+    ) as writer:
+        for i in range(50):
+            writer.append_event({"seq": i, "payload": {"text": "observation " * 10}})
+
+    names = [path.name for path in TraceReader(tmp_path / "r").segment_paths()]
+    suffix = {"none": ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}[compression]
+    assert names == [f"events-{i:05d}{suffix}" for i in range(1, 9)]
+    assert [event["seq"] for event in TraceReader(tmp_path / "r").iter_events()] == list(range(50))
+
+
+def test_segments_rotate_by_uncompressed_size(tmp_path: Path) -> None:
+    with TraceWriter(base_dir=str(tmp_path), run_id="r", compression="gzip", segment_max_bytes=500) as writer:
+        for i in range(40):
+            writer.append_event({"seq": i, "text": "x" * 80})
+
+    segments = TraceReader(tmp_path / "r").segment_paths()
+    assert len(segments) > 1
+    # Compressed segments are much smaller than the uncompressed rotation limit.
+    assert all(path.stat().st_size < 500 for path in segments)
+    assert [event["seq"] for event in TraceReader(tmp_path / "r").iter_events()] == list(range(40))
+
+
+@pytest.mark.parametrize("compression", _compressions())
+def test_reader_tolerates_a_segment_cut_short_by_a_crash(tmp_path: Path, compression: str) -> None:
+    writer = TraceWriter(
+        base_dir=str(tmp_path / "live"),
+        run_id="r",
+        flush_every=1,
+        compression=compression,  # type: ignore[arg-type]
+    )
+    for i in range(25):
+        writer.append_event({"seq": i})
+
+    # Snapshot the run while the stream is still open: no end-of-stream marker.
+    shutil.copytree(tmp_path / "live" / "r", tmp_path / "crashed")
+    writer.close()
+
+    assert [event["seq"] for event in TraceReader(tmp_path / "crashed").iter_events()] == list(range(25))
+
+
+def test_reopened_run_continues_in_a_new_segment(tmp_path: Path) -> None:
+    with TraceWriter(base_dir=str(tmp_path), run_id="r", compression="gzip") as writer:
+        writer.append_event({"seq": 0})
+    with TraceWriter(base_dir=str(tmp_path), run_id="r", compression="gzip") as writer:
+        assert writer.count_events() == 1
+        writer.append_event({"seq": 1})
+
+    reader = TraceReader(tmp_path / "r")
+    assert [path.name for path in reader.segment_paths()] == ["events-00001.jsonl.gz", "events-00002.jsonl.gz"]
+    assert [event["seq"] for event in reader.iter_events()] == [0, 1]
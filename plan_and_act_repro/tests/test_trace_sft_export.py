@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import orjson
+
+from plan_and_act.tracing import TraceCollector, TraceConfig
+from plan_and_act.training.build_sft_data import build_sft_dataset
+from plan_and_act.training.dataset_checks import validate_dataset
+from plan_and_act.training.trace_export import export_sft_from_traces
+
+COMPONENTS = ["planner", "executor", "executor", "replanner"]
+
+
+def _record_runs(base_dir: Path, runs: int = 5) -> None:
+    config = TraceConfig(enabled=True, base_dir=str(base_dir), blobs=True, blob_min_bytes=64)
+    for r in range(runs):
+        tracer = TraceCollector(config=config, run_id=f"run-{r:02d}")
+        tracer.start_session(goal="g", environment={}, model_stack={}, runtime_config={})
+        for seq, component in enumerate(COMPONENTS):
+            status = "parse_error" if (r, seq) == (0, 1) else "success"
+            tracer.log_event(
+                event_type="llm_call",
+                step=seq,
+                payload={
+                    "component": component,
+                    "status": status,
+                    "model": "gpt-4",
+                    "system_prompt": f"You are the {component}. " * 10,
+                    "user_prompt": f"run {r} call {seq}",
+                    "raw_response": '{"ok": true}',
+                    "parsed_output": None if status != "success" else {"ok": True},
+                },
+            )
+            tracer.log_event(event_type="environment_step", step=seq, payload={"observation": "obs"})
+        tracer.close(status="completed")
+
+
+def _read_rows(paths: list[Path]) -> list[dict]:
+    return [orjson.loads(line) for path in paths for line in path.read_bytes().splitlines()]
+
+
+def test_export_reconstructs_component_rows_into_bounded_shards(tmp_path: Path) -> None:
+    _record_runs(tmp_path / "traces")
+
+    manifest = export_sft_from_traces(tmp_path / "traces", tmp_path / "sft", workers=1, runs_per_task=2, max_shard_rows=3)
+
+    assert manifest["runs"] == 5 and manifest["llm_calls"] == 20
+    assert manifest["rows"] == {"planner": 5, "executor": 9, "replanner": 5}
+    assert manifest["rejected"] == {"status:parse_error": 1}
+    executor_shards = sorted((tmp_path / "sft").glob("executor-*.jsonl"))
+    assert [path.name for path in executor_shards] == [f"executor-{i:05d}.jsonl" for i in range(3)]
+    assert orjson.loads((tmp_path / "sft" / "manifest.json").read_bytes())["rows"] == manifest["rows"]
+
+    planner_rows = _read_rows(sorted((tmp_path / "sft").glob("planner-*.jsonl")))
+    first = planner_rows[0]
+    # Blob references in the trace are rehydrated into the full prompt text.
+    assert first["messages"][0] == {"role": "system", "content": "You are the planner. " * 10}
+    assert first["messages"][1:] == [
+        {"role": "user", "content": "run 0 call 0"},
+        {"role": "assistant", "content": '{"ok": true}'},
+    ]
+    assert first["metadata"] == {"component": "planner", "run_id": "run-00", "seq": 0, "step": 0, "model": "gpt-4"}
+
+
+def test_parallel_export_matches_in_process_export(tmp_path: Path) -> None:
+    _record_runs(tmp_path / "traces", runs=9)
+
+    export_sft_from_traces(tmp_path / "traces", tmp_path / "serial", workers=1, runs_per_task=2)
+    export_sft_from_traces(tmp_path / "traces", tmp_path / "parallel", workers=2, runs_per_task=2)
+
+    for component in ("planner", "executor", "replanner"):
+        serial = _read_rows(sorted((tmp_path / "serial").glob(f"{component}-*.jsonl")))
+        parallel = _read_rows(sorted((tmp_path / "parallel").glob(f"{component}-*.jsonl")))
+        assert serial == parallel and serial
+
+
+def test_builders_accept_streams() -> None:
+    records = ({"input": f"in {i}", "output": "" if i == 1 else "out"} for i in range(3))
+    assert validate_dataset(records) == ["row[1] empty output"]
+    assert build_sft_dataset(iter([{"input": "a", "output": "b"}])) == [
+        {"messages": [{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}]}
+    ]
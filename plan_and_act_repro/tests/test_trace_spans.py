@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import orjson
+import pytest
+
+from plan_and_act.core.schemas import ExecutorAction, PlannerOutput, PlanStep
+from plan_and_act.core.state import build_initial_state
+from plan_and_act.environments.tooling import ToolCallingEnvironment
+from plan_and_act.graph.workflow import build_workflow
+from plan_and_act.tools.base import ToolRegistry
+from plan_and_act.tracing import TraceCollector, TraceConfig, span
+from plan_and_act.tracing.spans import export_spans, spans_from_events, to_otel_json
+
+
+class TwoStepPlanner:
+    def plan(self, **kwargs: Any) -> PlannerOutput:
+        return PlannerOutput(goal=kwargs["goal"], steps=[PlanStep(step_id=1, intent="echo"), PlanStep(step_id=2, intent="exit")])
+
+    replan = plan
+
+
+class EchoThenExit:
+    def act(self, **kwargs: Any) -> ExecutorAction:
+        if kwargs["step_index"] == 0:
+            return ExecutorAction(action_type="click", target="tool:echo", arguments={"text": "hi"})
+        return ExecutorAction(action_type="exit", is_final=True, final_answer="done")
+
+
+class SyncEchoTool:
+    name = "echo"
+
+    def run(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        return {"ok": True, "echo": arguments}
+
+
+def _episode(tmp_path: Path, run_id: str, **trace_overrides: Any) -> tuple[TraceCollector, Any, dict[str, Any]]:
+    tracer = TraceCollector(config=TraceConfig(enabled=True, base_dir=str(tmp_path), **trace_overrides), run_id=run_id)
+    tracer.start_session(goal="g", environment={}, model_stack={}, runtime_config={})
+    env = ToolCallingEnvironment(ToolRegistry({"echo": SyncEchoTool()}), tracer=tracer)
+    planner = TwoStepPlanner()
+    workflow = build_workflow(planner=planner, executor=EchoThenExit(), replanner=planner, environment=env, tracer=tracer)
+    return tracer, workflow, build_initial_state(goal="g", max_steps=6, dynamic_replanning=False, use_cot=False)
+
+
+def _run(tmp_path: Path, run_id: str, **trace_overrides: Any) -> TraceCollector:
+    tracer, workflow, state = _episode(tmp_path, run_id, **trace_overrides)
+    workflow.invoke(state)
+    return tracer
+
+
+def _spans(tracer: TraceCollector) -> list[dict[str, Any]]:
+    return spans_from_events(tracer.reader().events())
+
+
+def _assert_nested(spans: list[dict[str, Any]]) -> None:
+    by_id = {item["span_id"]: item for item in spans}
+    tool = next(item for item in spans if item["name"] == "tool.call")
+    env_step = by_id[tool["parent_id"]]
+    node = by_id[env_step["parent_id"]]
+    assert (env_step["name"], node["name"], node["parent_id"]) == ("environment.step", "executor_node", "")
+    assert tool["attributes"] == {"tool_name": "echo"}
+    # Children start after and end before their parent.
+    for child in (tool, env_step):
+        parent = by_id[child["parent_id"]]
+        assert child["start_unix_ns"] >= parent["start_unix_ns"]
+        assert child["start_unix_ns"] + child["duration_ms"] * 1e6 <= parent["start_unix_ns"] + parent["duration_ms"] * 1e6 + 1e3
+
+
+def test_nodes_environment_and_tool_calls_are_nested_spans(tmp_path: Path) -> None:
+    spans = _spans(_run(tmp_path, "sync"))
+
+    assert [item["name"] for item in spans].count("executor_node") == 2
+    assert {item["name"] for item in spans} == {"planner_node", "executor_node", "environment.step", "tool.call"}
+    _assert_nested(spans)
+
+
+def test_concurrent_async_episodes_keep_their_own_span_trees(tmp_path: Path) -> None:
+    episodes = [_episode(tmp_path, f"run-{i}") for i in range(4)]
+
+    async def _all() -> None:
+        await asyncio.gather(*(workflow.ainvoke(state) for _, workflow, state in episodes))
+
+    asyncio.run(_all())
+    for tracer, _, _ in episodes:
+        spans = _spans(tracer)
+        assert {item["run_id"] for item in spans} == {tracer.run_id}
+        # The sync tool ran in a worker thread and still found its parent span.
+        _assert_nested(spans)
+
+
+def test_failed_spans_and_exports(tmp_path: Path) -> None:
+    tracer = TraceCollector(config=TraceConfig(enabled=True, base_dir=str(tmp_path)), run_id="r")
+    tracer.start_session(goal="g", environment={}, model_stack={}, runtime_config={})
+    with pytest.raises(RuntimeError):
+        with tracer.span("outer", step=1):
+            with tracer.span("inner", step=1, attributes={"retries": 2}):
+                raise RuntimeError("boom")
+    tracer.close(status="failed")
+
+    chrome_count = export_spans(tmp_path / "r", tmp_path / "chrome.json", format="chrome")
+    chrome = orjson.loads((tmp_path / "chrome.json").read_bytes())
+    assert chrome_count == 2 and {event["ph"] for event in chrome["traceEvents"]} == {"X"}
+
+    otel = to_otel_json(spans_from_events(tracer.reader().events()))
+    outer, inner = otel["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert inner["parentSpanId"] == outer["spanId"] and "parentSpanId" not in outer
+    assert inner["status"] == {"code": 2, "message": "RuntimeError: boom"}
+    assert {"key": "retries", "value": {"intValue": "2"}} in inner["attributes"]
+    assert len(outer["traceId"]) == 32 and outer["traceId"] == inner["traceId"]
+
+
+def test_spans_cost_nothing_when_disabled_or_switched_off(tmp_path: Path) -> None:
+    with span(None, "noop") as disabled:
+        assert disabled is None
+    with TraceCollector.disabled().span("noop") as disabled:
+        assert disabled is None
+
+    tracer = _run(tmp_path, "off", events={"span": False})
+    assert _spans(tracer) == []
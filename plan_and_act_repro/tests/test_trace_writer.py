@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from plan_and_act.tracing.writer import TraceWriter
+
+
+def _lines(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_writer_batches_by_count_and_flushes_on_close(tmp_path: Path) -> None:
+    writer = TraceWriter(base_dir=str(tmp_path), run_id="r", flush_every=3, flush_interval_s=60)
+
+    writer.append_event({"i": 0})
+    writer.append_event({"i": 1})
+    assert _lines(writer.events_path) == []
+
+    writer.append_event({"i": 2})
+    assert [e["i"] for e in _lines(writer.events_path)] == [0, 1, 2]
+
+    writer.append_event({"i": 3})
+    writer.close()
+    assert [e["i"] for e in _lines(writer.events_path)] == [0, 1, 2, 3]
+
+
+def test_writer_flushes_by_elapsed_time(tmp_path: Path) -> None:
+    writer = TraceWriter(base_dir=str(tmp_path), run_id="r", flush_every=1000, flush_interval_s=0.05)
+
+    writer.append_event({"i": 0})
+    time.sleep(0.06)
+    writer.append_event({"i": 1})
+
+    assert len(_lines(writer.events_path)) == 2
+    writer.close()
+
+
+def test_context_manager_flushes_on_exception(tmp_path: Path) -> None:
+    with pytest.raises(RuntimeError):
+        with TraceWriter(base_dir=str(tmp_path), run_id="r", flush_every=1000, flush_interval_s=60) as writer:
+            writer.append_event({"i": 0})
+            raise RuntimeError("boom")
+
+    assert len(_lines(writer.events_path)) == 1
+
+
+def test_background_writer_keeps_every_event_under_backpressure(tmp_path: Path) -> None:
+    writer = TraceWriter(
+        base_dir=str(tmp_path),
+        run_id="r",
+        flush_every=16,
+        flush_interval_s=60,
+        background=True,
+        queue_size=4,
+    )
+
+    def _produce(worker: int) -> None:
+        for i in range(250):
+            writer.append_event({"worker": worker, "i": i})
+
+    threads = [threading.Thread(target=_produce, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+
+    events = _lines(writer.events_path)
+    assert len(events) == 1000
+    for w in range(4):
+        assert [e["i"] for e in events if e["worker"] == w] == list(range(250))
+
+
+def test_background_writer_flushes_idle_buffer_on_timer(tmp_path: Path) -> None:
+    writer = TraceWriter(base_dir=str(tmp_path), run_id="r", flush_every=1000, flush_interval_s=0.05, background=True)
+    writer.append_event({"i": 0})
+
+    deadline = time.monotonic() + 2.0
+    while not _lines(writer.events_path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(_lines(writer.events_path)) == 1
+    writer.close()
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_unclosed_writer_is_flushed_at_interpreter_exit(tmp_path: Path, background: bool) -> None:
+    script = (
+        "from plan_and_act.tracing.writer import TraceWriter\n"
+        f"w = TraceWriter(base_dir={str(tmp_path)!r}, run_id='r', flush_every=1000, flush_interval_s=60, "
+        f"background={background})\n"
+        "for i in range(5):\n"
+        "    w.append_event({'i': i})\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=Path(__file__).resolve().parents[1] / "src")
+
+    assert len(_lines(tmp_path / "r" / "events.jsonl")) == 5
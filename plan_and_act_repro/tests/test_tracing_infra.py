@@ -68,3 +68,54 @@ def test_trace_schema_backward_compatible_defaults() -> None:
     parsed_event = TraceEvent.model_validate(old_event)
     assert parsed_event.schema_version == TRACE_SCHEMA_VERSION
     assert parsed_event.event_version == TRACE_EVENT_VERSION
+
+
+def _exploding_payload() -> dict:
+    raise AssertionError("payload factory must not run for dropped events")
+
+
+def test_disabled_collector_is_falsy_and_skips_payload_factories() -> None:
+    collector = TraceCollector.disabled()
+
+    assert not collector
+    collector.log_event(event_type="planner_input", step=0, payload=_exploding_payload)
+
+
+def test_event_switches_and_lazy_payloads(tmp_path: Path) -> None:
+    cfg = TraceConfig(enabled=True, base_dir=str(tmp_path), events={"llm_call": False})
+    collector = TraceCollector(config=cfg, run_id="run_switch")
+    collector.start_session(goal="g", environment={}, model_stack={}, runtime_config={})
+
+    collector.log_event(event_type="llm_call", step=0, payload=_exploding_payload)
+    collector.log_event(event_type="planner_output", step=0, payload=lambda: {"steps": []})
+    collector.close(status="completed")
+
+    events_path = tmp_path / "run_switch" / "events.jsonl"
+    events = [json.loads(line) for line in events_path.read_text(encoding="utf-8").splitlines()]
+    assert [e["event_type"] for e in events] == ["planner_output"]
+    assert events[0]["payload"] == {"steps": []}
+
+    session = json.loads((tmp_path / "run_switch" / "session.json").read_text(encoding="utf-8"))
+    assert session["summary"]["event_count"] == 1
+    assert session["summary"]["events_dropped"] == 1
+
+
+def test_sampling_is_per_event_type_and_deterministic(tmp_path: Path) -> None:
+    cfg = TraceConfig(
+        enabled=True,
+        base_dir=str(tmp_path),
+        sample_rate=0.25,
+        sample_rates={"episode_end": 1.0, "tool_call_end": 0.0},
+    )
+    collector = TraceCollector(config=cfg, run_id="run_sampled")
+
+    kept = [step for step in range(400) if collector.wants("llm_call", step)]
+    assert 60 < len(kept) < 140
+    assert kept == [step for step in range(400) if collector.wants("llm_call", step)]
+    assert all(collector.wants("episode_end", step) for step in range(50))
+    assert not any(collector.wants("tool_call_end", step) for step in range(50))
+
+    other_run = TraceCollector(config=cfg, run_id="run_other")
+    assert kept != [step for step in range(400) if other_run.wants("llm_call", step)]
+    collector.close(status="completed")
+    other_run.close(status="completed")